@@ -8,7 +8,11 @@ gestión de múltiples configuraciones.
 
 from flask import Flask
 import config
+from backend.acceso_datos.repositorio import obtener_repositorio
 from backend.rutas import registrar_rutas
+from backend.servicios.planificador_mercado import registrar_planificador
+from backend.servicios.streaming_precios import registrar_streaming
+from backend.servicios.trading.motor_eventos import registrar_motor_eventos
 
 def crear_app() -> Flask:
     """Crea y configura una instancia de la aplicación Flask.
@@ -17,6 +21,11 @@ def crear_app() -> Flask:
     1.  Crear la instancia de Flask, apuntando a las carpetas del frontend.
     2.  Establecer la clave secreta para la seguridad de las sesiones.
     3.  Registrar todos los Blueprints que contienen las rutas de la aplicación.
+    4.  Completar las transacciones que quedaron confirmadas en el diario y sin
+        aplicar a los archivos (ej. tras una caída del proceso).
+    5.  Registrar el planificador que actualiza los datos de mercado en
+        segundo plano (ver `planificador_mercado`) y, si está configurada, la
+        fuente de precios en streaming (ver `streaming_precios`).
 
     Returns:
         Flask: La instancia de la aplicación, configurada y lista para usarse.
@@ -37,4 +46,12 @@ def crear_app() -> Flask:
     # 3. Registro de todas las rutas (Blueprints) de la aplicación.
     registrar_rutas(app)
 
+    # 4. Recuperación de transacciones pendientes del almacenamiento.
+    obtener_repositorio().recuperar()
+
+    # 5. Actualización periódica de cotizaciones y del motor de órdenes.
+    registrar_planificador(app)
+    registrar_streaming(app)
+    registrar_motor_eventos(app)
+
     return app
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""Almacén de registros de solo-anexado en formato JSON Lines (JSONL).
+
+Este módulo implementa las primitivas de bajo nivel para persistir registros
+inmutables (ej. operaciones del historial) como una línea JSON por registro.
+A diferencia de un archivo JSON con una lista completa, agregar un registro
+no requiere leer ni reescribir el archivo: es una única escritura al final.
+
+Las lecturas se resuelven recorriendo el archivo desde el final hacia el
+principio en bloques, de modo que obtener los N registros más recientes
+cuesta O(N) y no depende del tamaño total del archivo.
+"""
+
+import json
+import os
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
+
+from backend.acceso_datos.escritura_atomica import escribir_atomico
+
+# Tamaño de bloque usado al leer el archivo desde el final.
+TAMANO_BLOQUE_LECTURA = 8192
+
+
+def _decodificar_linea(linea: bytes, ruta_archivo: str) -> Optional[Dict[str, Any]]:
+    """Decodifica una línea JSONL, devolviendo None si está dañada.
+
+    Una línea puede quedar truncada si el proceso se interrumpe a mitad de una
+    escritura. En ese caso se descarta con una advertencia en lugar de
+    invalidar el archivo completo.
+    """
+    try:
+        return json.loads(linea.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        print(f"Advertencia: Línea dañada ignorada en '{ruta_archivo}'. Error: {e}")
+        return None
+
+
+def iterar_inverso(
+    ruta_archivo: str, tamano_bloque: int = TAMANO_BLOQUE_LECTURA
+) -> Iterator[Dict[str, Any]]:
+    """Recorre los registros de un archivo JSONL del más reciente al más antiguo.
+
+    Lee el archivo en bloques desde el final, por lo que consumir solo los
+    primeros elementos del iterador no requiere leer el archivo completo.
+
+    Args:
+        ruta_archivo (str): Ruta al archivo JSONL.
+        tamano_bloque (int): Cantidad de bytes leídos en cada paso.
+
+    Yields:
+        Dict[str, Any]: Cada registro decodificado, en orden inverso de escritura.
+    """
+    if not os.path.exists(ruta_archivo):
+        return
+
+    with open(ruta_archivo, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        posicion = f.tell()
+        resto = b""
+
+        while posicion > 0:
+            a_leer = min(tamano_bloque, posicion)
+            posicion -= a_leer
+            f.seek(posicion)
+            lineas = (f.read(a_leer) + resto).split(b"\n")
+            # La primera línea del bloque puede estar incompleta: se completa
+            # con el bloque anterior en la siguiente iteración.
+            resto = lineas[0]
+            for linea in reversed(lineas[1:]):
+                if linea.strip():
+                    registro = _decodificar_linea(linea, ruta_archivo)
+                    if registro is not None:
+                        yield registro
+
+        if resto.strip():
+            registro = _decodificar_linea(resto, ruta_archivo)
+            if registro is not None:
+                yield registro
+
+
+def leer_ultimos(
+    ruta_archivo: str, limite: Optional[int] = None, desplazamiento: int = 0
+) -> List[Dict[str, Any]]:
+    """Devuelve una página de registros, del más reciente al más antiguo.
+
+    Args:
+        ruta_archivo (str): Ruta al archivo JSONL.
+        limite (Optional[int]): Cantidad máxima de registros. Si es None, se
+                                devuelven todos a partir del desplazamiento.
+        desplazamiento (int): Cantidad de registros recientes a omitir.
+
+    Returns:
+        List[Dict[str, Any]]: Los registros solicitados, más recientes primero.
+    """
+    fin = None if limite is None else desplazamiento + limite
+    return list(islice(iterar_inverso(ruta_archivo), desplazamiento, fin))
+
+
+def leer_ultimo(ruta_archivo: str) -> Optional[Dict[str, Any]]:
+    """Devuelve el último registro escrito, o None si el archivo está vacío."""
+    return next(iterar_inverso(ruta_archivo), None)
+
+
+def agregar_registro(ruta_archivo: str, registro: Dict[str, Any], sincronizar: bool = False) -> None:
+    """Anexa un registro como una nueva línea al final del archivo.
+
+    Si la última línea existente quedó truncada (sin salto de línea final),
+    se antepone un salto de línea para que el nuevo registro no se mezcle
+    con ella.
+
+    Args:
+        ruta_archivo (str): Ruta al archivo JSONL.
+        registro (Dict[str, Any]): El registro serializable a JSON.
+        sincronizar (bool): Si es True, fuerza la persistencia en disco con
+                            `fsync` antes de retornar.
+
+    Side Effects:
+        - Crea el directorio y el archivo si no existen.
+        - Escribe una línea al final del archivo.
+    """
+    os.makedirs(os.path.dirname(ruta_archivo), exist_ok=True)
+    linea = json.dumps(registro, ensure_ascii=False).encode("utf-8") + b"\n"
+
+    with open(ruta_archivo, "a+b") as f:
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                linea = b"\n" + linea
+        f.write(linea)
+        if sincronizar:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def escribir_registros(ruta_archivo: str, registros: List[Dict[str, Any]]) -> None:
+    """Escribe una lista de registros, en orden, reemplazando el archivo.
+
+    La escritura es atómica (ver `escritura_atomica`), para que un lector
+    concurrente nunca vea un archivo a medio escribir.
+
+    Args:
+        ruta_archivo (str): Ruta al archivo JSONL.
+        registros (List[Dict[str, Any]]): Registros del más antiguo al más reciente.
+    """
+    contenido = "".join(json.dumps(registro, ensure_ascii=False) + "\n" for registro in registros)
+    escribir_atomico(ruta_archivo, contenido.encode("utf-8"))
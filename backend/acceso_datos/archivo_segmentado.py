@@ -0,0 +1,234 @@
+"""Archivo Histórico Segmentado por Mes, con Índice de Rangos Temporales.
+
+El historial y las comisiones crecen indefinidamente. Para que leer "las
+últimas 50 operaciones" o "las operaciones de marzo" no dependa del tamaño
+total, los registros de meses anteriores se trasladan ("rotan") desde el
+archivo activo a un segmento por mes:
+
+    datos/historial.segmentos/
+        indice.json         <- límites temporales y cantidades de cada segmento
+        2025-01.jsonl.gz    <- segmentos fríos, comprimidos con gzip
+        2025-02.jsonl       <- segmentos recientes, sin comprimir
+
+El índice permite:
+-   Saltar segmentos completos al paginar, usando solo su cantidad de registros.
+-   Abrir únicamente los segmentos cuyo rango `[desde, hasta]` se superpone con
+    el rango consultado.
+
+Los segmentos se escriben de forma atómica y la rotación es idempotente: si
+se interrumpe, repetirla no duplica registros (se descartan los IDs que el
+segmento ya contiene).
+"""
+
+import gzip
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+from backend.acceso_datos.cache_lectura import cache_lectura
+from backend.acceso_datos.escritura_atomica import escribir_atomico
+import config
+
+NOMBRE_INDICE = "indice.json"
+VERSION_INDICE = 1
+
+# Mes asignado a los registros sin fecha válida.
+MES_SIN_FECHA = "0000-00"
+
+
+def mes_de_registro(registro: Dict[str, Any]) -> str:
+    """Devuelve el mes (`AAAA-MM`) de un registro a partir de su timestamp ISO."""
+    timestamp = registro.get("timestamp")
+    if isinstance(timestamp, str) and len(timestamp) >= 7:
+        return timestamp[:7]
+    return MES_SIN_FECHA
+
+
+def _id_numerico(registro: Dict[str, Any]) -> Optional[int]:
+    try:
+        return int(registro.get("id"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _en_rango(timestamp: Optional[str], desde: Optional[str], hasta: Optional[str]) -> bool:
+    """Indica si un timestamp ISO cae en `[desde, hasta)` (límites opcionales)."""
+    if timestamp is None:
+        return desde is None and hasta is None
+    return (desde is None or timestamp >= desde) and (hasta is None or timestamp < hasta)
+
+
+class ArchivoSegmentado:
+    """Conjunto de segmentos mensuales asociados a un archivo activo."""
+
+    def __init__(self, ruta_activa: str):
+        """Inicializa el archivo de segmentos de un archivo activo.
+
+        Args:
+            ruta_activa (str): Ruta del archivo activo (ej. `historial.jsonl`).
+                Los segmentos se guardan en `<nombre>.segmentos/` junto a él.
+        """
+        self.directorio = os.path.splitext(ruta_activa)[0] + ".segmentos"
+        self.ruta_indice = os.path.join(self.directorio, NOMBRE_INDICE)
+
+    # --- Índice ---
+
+    def segmentos(self) -> List[Dict[str, Any]]:
+        """Devuelve las entradas del índice, del mes más antiguo al más reciente."""
+        def cargar():
+            if not os.path.exists(self.ruta_indice):
+                return []
+            with open(self.ruta_indice, "r", encoding="utf-8") as f:
+                return json.load(f).get("segmentos", [])
+
+        try:
+            return cache_lectura.obtener(self.ruta_indice, cargar)
+        except Exception as e:
+            print(f"Advertencia: No se pudo leer el índice de segmentos '{self.ruta_indice}'. Error: {e}")
+            return []
+
+    def _escribir_indice(self, segmentos: List[Dict[str, Any]]) -> None:
+        segmentos = sorted(segmentos, key=lambda s: s["mes"])
+        contenido = {"version": VERSION_INDICE, "segmentos": segmentos}
+        escribir_atomico(self.ruta_indice, json.dumps(contenido, indent=4).encode("utf-8"))
+
+    def cantidad_total(self) -> int:
+        """Cantidad de registros archivados en todos los segmentos."""
+        return sum(s["cantidad"] for s in self.segmentos())
+
+    # --- Segmentos ---
+
+    def _leer_segmento(self, segmento: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Lee los registros de un segmento, del más antiguo al más reciente."""
+        ruta = os.path.join(self.directorio, segmento["archivo"])
+
+        def cargar():
+            abrir = gzip.open if segmento.get("comprimido") else open
+            with abrir(ruta, "rb") as f:
+                return [json.loads(linea) for linea in f.read().splitlines() if linea.strip()]
+
+        return cache_lectura.obtener(ruta, cargar)
+
+    def _escribir_segmento(self, mes: str, registros: List[Dict[str, Any]], comprimido: bool) -> Dict[str, Any]:
+        """Escribe un segmento completo y devuelve su entrada de índice."""
+        contenido = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in registros).encode("utf-8")
+        archivo = f"{mes}.jsonl"
+        if comprimido:
+            archivo += ".gz"
+            contenido = gzip.compress(contenido, mtime=0)
+        escribir_atomico(os.path.join(self.directorio, archivo), contenido)
+
+        timestamps = [r["timestamp"] for r in registros if isinstance(r.get("timestamp"), str)]
+        ids = [i for i in (_id_numerico(r) for r in registros) if i is not None]
+        return {
+            "mes": mes,
+            "archivo": archivo,
+            "comprimido": comprimido,
+            "cantidad": len(registros),
+            "desde": min(timestamps, default=None),
+            "hasta": max(timestamps, default=None),
+            "id_max": max(ids, default=None),
+        }
+
+    def archivar(self, registros: List[Dict[str, Any]]) -> int:
+        """Agrega registros a los segmentos de sus meses y actualiza el índice.
+
+        Args:
+            registros (List[Dict[str, Any]]): Registros en orden cronológico.
+
+        Returns:
+            int: La cantidad de registros efectivamente archivados (los que
+                 el segmento ya contenía se omiten).
+        """
+        por_mes: Dict[str, List[Dict[str, Any]]] = {}
+        for registro in registros:
+            por_mes.setdefault(mes_de_registro(registro), []).append(registro)
+
+        indice = {s["mes"]: s for s in self.segmentos()}
+        archivados = 0
+        for mes, nuevos in sorted(por_mes.items()):
+            existente = indice.get(mes)
+            anteriores = self._leer_segmento(existente) if existente else []
+            id_max = existente.get("id_max") if existente else None
+            if id_max is not None:
+                nuevos = [r for r in nuevos if _id_numerico(r) is None or _id_numerico(r) > id_max]
+            if not nuevos:
+                continue
+            comprimido = existente.get("comprimido", False) if existente else False
+            indice[mes] = self._escribir_segmento(mes, anteriores + nuevos, comprimido)
+            if existente and existente["archivo"] != indice[mes]["archivo"]:
+                self._eliminar(existente["archivo"])
+            archivados += len(nuevos)
+
+        self._escribir_indice(list(indice.values()))
+        self.comprimir_frios()
+        return archivados
+
+    def comprimir_frios(self) -> None:
+        """Comprime con gzip todos los segmentos salvo los más recientes.
+
+        Se conservan sin comprimir los últimos `config.SEGMENTOS_SIN_COMPRIMIR`
+        segmentos, que son los que más se consultan.
+        """
+        segmentos = self.segmentos()
+        frios = segmentos[: max(0, len(segmentos) - config.SEGMENTOS_SIN_COMPRIMIR)]
+        pendientes = [s for s in frios if not s.get("comprimido")]
+        if not pendientes:
+            return
+
+        indice = {s["mes"]: s for s in segmentos}
+        for segmento in pendientes:
+            registros = self._leer_segmento(segmento)
+            indice[segmento["mes"]] = self._escribir_segmento(segmento["mes"], registros, comprimido=True)
+        # El índice se actualiza antes de borrar los archivos sin comprimir,
+        # para que nunca apunte a un archivo inexistente.
+        self._escribir_indice(list(indice.values()))
+        for segmento in pendientes:
+            self._eliminar(segmento["archivo"])
+
+    def _eliminar(self, archivo: str) -> None:
+        try:
+            os.remove(os.path.join(self.directorio, archivo))
+        except FileNotFoundError:
+            pass
+
+    # --- Consultas ---
+
+    def iterar_inverso(self, saltar: int = 0) -> Iterator[Dict[str, Any]]:
+        """Recorre los registros archivados del más reciente al más antiguo.
+
+        Args:
+            saltar (int): Cantidad de registros recientes a omitir. Los
+                segmentos que quedan completamente dentro de lo omitido no
+                se abren: alcanza con la cantidad guardada en el índice.
+        """
+        for segmento in reversed(self.segmentos()):
+            if saltar >= segmento["cantidad"]:
+                saltar -= segmento["cantidad"]
+                continue
+            registros = self._leer_segmento(segmento)
+            yield from reversed(registros[: len(registros) - saltar])
+            saltar = 0
+
+    def iterar_rango(self, desde: Optional[str], hasta: Optional[str]) -> Iterator[Dict[str, Any]]:
+        """Recorre, del más reciente al más antiguo, los registros con timestamp en `[desde, hasta)`.
+
+        Solo se abren los segmentos cuyo rango en el índice se superpone con
+        el consultado.
+        """
+        for segmento in reversed(self.segmentos()):
+            if segmento.get("desde") is not None:
+                if hasta is not None and segmento["desde"] >= hasta:
+                    continue
+                if desde is not None and segmento["hasta"] < desde:
+                    continue
+            for registro in reversed(self._leer_segmento(segmento)):
+                if _en_rango(registro.get("timestamp"), desde, hasta):
+                    yield registro
+
+
+def filtrar_rango(
+    registros: List[Dict[str, Any]], desde: Optional[str], hasta: Optional[str]
+) -> List[Dict[str, Any]]:
+    """Filtra registros por timestamp en `[desde, hasta)`, conservando su orden."""
+    return [r for r in registros if _en_rango(r.get("timestamp"), desde, hasta)]
@@ -0,0 +1,115 @@
+"""Caché de Lecturas de Archivos Validado por Metadatos.
+
+Las páginas del frontend consultan el estado cada pocos segundos, y cada
+consulta vuelve a decodificar los mismos archivos JSON aunque no hayan
+cambiado. Este módulo guarda el resultado ya decodificado de cada archivo y
+solo lo vuelve a leer cuando cambia su firma `(st_mtime_ns, st_size, st_ino)`.
+
+Las escrituras de la aplicación reemplazan los archivos con `os.replace`
+(nuevo inodo) o los extienden (nuevo tamaño), por lo que siempre invalidan la
+entrada; la fecha de modificación cubre además las ediciones externas.
+
+La fecha de modificación tiene una resolución limitada (del orden de
+milisegundos en muchos sistemas de archivos): dos escrituras del mismo tamaño
+muy seguidas pueden dejar la misma firma. Por eso, igual que hace git con su
+índice, una entrada guardada cuando el archivo acababa de modificarse no se
+considera confiable y se vuelve a leer hasta que el archivo se estabilice.
+
+Cada lectura devuelve una copia independiente del resultado guardado, de modo
+que los llamadores pueden modificarlo libremente sin corromper el caché.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+# Cantidad máxima de resultados guardados; se descartan los menos usados.
+MAX_ENTRADAS = 64
+
+# Un archivo modificado hace menos de este margen (respecto del momento en que
+# se leyó) puede volver a cambiar sin que cambie su firma.
+MARGEN_MODIFICACION_NS = 100_000_000
+
+
+def copiar_json(datos: Any) -> Any:
+    """Copia en profundidad una estructura de listas, diccionarios y escalares.
+
+    Es equivalente a `copy.deepcopy` para datos provenientes de JSON, pero
+    bastante más rápida porque no necesita registrar referencias compartidas.
+    """
+    if isinstance(datos, dict):
+        return {clave: copiar_json(valor) for clave, valor in datos.items()}
+    if isinstance(datos, list):
+        return [copiar_json(valor) for valor in datos]
+    return datos
+
+
+def firma_archivo(ruta_archivo: str) -> Optional[Tuple[int, int, int]]:
+    """Devuelve la firma `(st_mtime_ns, st_size, st_ino)` de un archivo, o None si no existe."""
+    try:
+        estado = os.stat(ruta_archivo)
+    except FileNotFoundError:
+        return None
+    return estado.st_mtime_ns, estado.st_size, estado.st_ino
+
+
+class CacheLectura:
+    """Caché LRU de archivos decodificados, invalidado por la firma del archivo."""
+
+    def __init__(self, max_entradas: int = MAX_ENTRADAS):
+        self.max_entradas = max_entradas
+        # clave -> (firma, instante de lectura en ns, resultado)
+        self._entradas: "OrderedDict[Hashable, Tuple[Tuple[int, int, int], int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, ruta_archivo: str, cargar: Callable[[], Any], clave: Hashable = None) -> Any:
+        """Devuelve una copia del contenido decodificado de un archivo.
+
+        Args:
+            ruta_archivo (str): Archivo cuya firma valida la entrada.
+            cargar (Callable[[], Any]): Función que lee y decodifica el archivo.
+                Solo se invoca si no hay una entrada válida. Sus excepciones se
+                propagan y no se guarda nada.
+            clave (Hashable): Clave de la entrada. Por defecto, la ruta; se usa
+                para guardar varias lecturas distintas del mismo archivo (ej.
+                distintas páginas del historial).
+
+        Returns:
+            Any: Una copia del resultado de `cargar`.
+        """
+        clave = ruta_archivo if clave is None else clave
+        firma = firma_archivo(ruta_archivo)
+
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if (
+                entrada is not None
+                and firma is not None
+                and entrada[0] == firma
+                and firma[0] < entrada[1] - MARGEN_MODIFICACION_NS
+            ):
+                self._entradas.move_to_end(clave)
+                return copiar_json(entrada[2])
+
+        instante_lectura = time.time_ns()
+        resultado = cargar()
+
+        # Solo se guarda si el archivo no cambió durante la lectura.
+        if firma is not None and firma_archivo(ruta_archivo) == firma:
+            with self._lock:
+                self._entradas[clave] = (firma, instante_lectura, copiar_json(resultado))
+                self._entradas.move_to_end(clave)
+                while len(self._entradas) > self.max_entradas:
+                    self._entradas.popitem(last=False)
+        return resultado
+
+    def limpiar(self) -> None:
+        """Descarta todas las entradas."""
+        with self._lock:
+            self._entradas.clear()
+
+
+# Instancia compartida por los lectores de archivos de `acceso_datos`.
+cache_lectura = CacheLectura()
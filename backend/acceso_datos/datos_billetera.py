@@ -1,23 +1,32 @@
 """Módulo para la persistencia de datos de la billetera del usuario.
 
 Este componente gestiona el ciclo completo de lectura y escritura del estado
-de la billetera en un archivo JSON. Está diseñado para ser resiliente:
-si el archivo no existe o está corrupto, se autogenera una billetera inicial
-para garantizar la continuidad operativa de la aplicación.
+de la billetera a través del repositorio configurado (ver `repositorio.py`).
+Está diseñado para ser resiliente: si la billetera no existe o está corrupta,
+se autogenera una billetera inicial para garantizar la continuidad operativa
+de la aplicación.
 
 Centraliza la lógica de serialización (Decimal -> str) y deserialización
 (str -> Decimal), asegurando la integridad y precisión de los datos financieros.
+Con `config.LIBRO_UNIDADES_ATOMICAS` activo, los saldos se guardan como enteros
+en unidades atómicas (ver `unidades_atomicas`).
 """
 
-import json
-import os
 from typing import Dict, Optional
 
+from backend.acceso_datos.indice_tickers import NOMBRE_FIAT
+from backend.acceso_datos.repositorio import obtener_repositorio
 from backend.utils.utilidades_numericas import (
     a_decimal,
     cuantizar_cripto,
     cuantizar_usd,
 )
+from backend.utils.unidades_atomicas import (
+    a_unidades_cripto,
+    a_unidades_usd,
+    leer_monto_cripto,
+    leer_monto_usd,
+)
 import config
 
 
@@ -30,7 +39,7 @@ def _crear_billetera_inicial() -> Dict[str, Dict]:
     """
     return {
         "USDT": {
-            "nombre": "Tether",
+            "nombre": NOMBRE_FIAT,
             "saldos": {
                 "disponible": a_decimal(config.BALANCE_INICIAL_USDT),
                 "reservado": a_decimal("0"),
@@ -39,80 +48,25 @@ def _crear_billetera_inicial() -> Dict[str, Dict]:
     }
 
 
-def cargar_billetera(ruta_archivo: Optional[str] = None) -> Dict[str, Dict]:
-    """Carga la billetera desde un archivo JSON, creándola si es necesario.
-
-    Este proceso es "autocorrectivo": si el archivo no existe, está vacío o
-    corrupto, se genera una billetera inicial para asegurar que la aplicación
-    siempre tenga un estado de billetera válido con el que operar.
-
-    Args:
-        ruta_archivo (Optional[str]): Ruta al archivo. Si es None, se usa la
-                                     ruta por defecto de la configuración.
-
-    Returns:
-        Dict[str, Dict]: Un diccionario que representa la billetera. Los saldos
-                         se deserializan a objetos `Decimal` para permitir
-                         cálculos precisos.
-
-    Side Effects:
-        - Crea el directorio y el archivo de la billetera si no existen.
-        - Sobrescribe archivos corruptos o vacíos con una billetera nueva.
-    """
-    ruta_efectiva = ruta_archivo or config.BILLETERA_PATH
-    os.makedirs(os.path.dirname(ruta_efectiva), exist_ok=True)
-
-    if not os.path.exists(ruta_efectiva) or os.path.getsize(ruta_efectiva) == 0:
-        billetera_inicial = _crear_billetera_inicial()
-        guardar_billetera(billetera_inicial, ruta_archivo=ruta_efectiva)
-        return billetera_inicial
-
-    try:
-        with open(ruta_efectiva, "r", encoding="utf-8") as f:
-            datos_cargados = json.load(f)
-    except Exception as e:
-        # Si el archivo está corrupto, se crea una billetera una nueva para asegurar la continuidad de la aplicación.
-        print(
-            f"Advertencia: Archivo '{ruta_efectiva}' corrupto o ilegible. Se reiniciará la billetera. Error: {e}"
-        )
-        billetera_inicial = _crear_billetera_inicial()
-        guardar_billetera(billetera_inicial, ruta_archivo=ruta_efectiva)
-        return billetera_inicial
-
-    # Deserialización: convierte los saldos de string (en JSON) a Decimal.
+def _deserializar_billetera(datos_cargados: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Convierte la billetera almacenada (saldos como texto o enteros) a saldos `Decimal`."""
     billetera_final = {}
     for ticker, activo in datos_cargados.items():
+        leer_monto = leer_monto_usd if ticker == config.MONEDA_FIAT_DEFAULT else leer_monto_cripto
         billetera_final[ticker] = {
             "nombre": activo.get("nombre", ticker),
             "saldos": {
-                "disponible": a_decimal(
+                "disponible": leer_monto(
                     activo.get("saldos", {}).get("disponible", "0")
                 ),
-                "reservado": a_decimal(activo.get("saldos", {}).get("reservado", "0")),
+                "reservado": leer_monto(activo.get("saldos", {}).get("reservado", "0")),
             },
         }
     return billetera_final
 
 
-def guardar_billetera(billetera: Dict[str, Dict], ruta_archivo: Optional[str] = None):
-    """Guarda el estado de la billetera en un archivo JSON.
-
-    Serializa el diccionario de la billetera a un formato JSON legible.
-    Antes de guardar, los saldos (objetos `Decimal`) se cuantizan para
-    asegurar una precisión estándar y luego se convierten a `str`.
-
-    Args:
-        billetera (Dict[str, Dict]): El objeto de la billetera a guardar.
-        ruta_archivo (Optional[str]): Ruta al archivo. Si es None, se usa la
-                                     ruta por defecto de la configuración.
-
-    Side Effects:
-        - Crea el directorio de la billetera si no existe.
-        - Sobrescribe completamente el archivo de la billetera en disco.
-    """
-    ruta_efectiva = ruta_archivo or config.BILLETERA_PATH
-    os.makedirs(os.path.dirname(ruta_efectiva), exist_ok=True)
-
+def _serializar_billetera(billetera: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Convierte la billetera en memoria al formato almacenado (ver `guardar_billetera`)."""
     datos_para_json = {}
     for ticker, activo in billetera.items():
         saldos = activo.get("saldos", {})
@@ -120,6 +74,18 @@ def guardar_billetera(billetera: Dict[str, Dict], ruta_archivo: Optional[str] =
         saldo_disponible = saldos.get("disponible", a_decimal(0))
         saldo_reservado = saldos.get("reservado", a_decimal(0))
 
+        if config.LIBRO_UNIDADES_ATOMICAS:
+            # Un solo paso: escalar y redondear a un entero de unidades mínimas.
+            a_unidades = a_unidades_usd if ticker == config.MONEDA_FIAT_DEFAULT else a_unidades_cripto
+            datos_para_json[ticker] = {
+                "nombre": activo.get("nombre", ticker),
+                "saldos": {
+                    "disponible": a_unidades(saldo_disponible),
+                    "reservado": a_unidades(saldo_reservado),
+                },
+            }
+            continue
+
         # 1. Cuantizar para asegurar la precisión estándar antes de guardar.
         if ticker == config.MONEDA_FIAT_DEFAULT:
             # Usar la precisión de USD para la moneda fiat (USDT).
@@ -147,10 +113,54 @@ def guardar_billetera(billetera: Dict[str, Dict], ruta_archivo: Optional[str] =
             },
         }
 
-    try:
-        with open(ruta_efectiva, "w", encoding="utf-8") as f:
-            json.dump(datos_para_json, f, indent=4)
-    except Exception as e:
-        print(
-            f"Error Crítico: No se pudo guardar el archivo de billetera en '{ruta_efectiva}'. Error: {e}"
-        )
+    return datos_para_json
+
+
+def cargar_billetera(ruta_archivo: Optional[str] = None) -> Dict[str, Dict]:
+    """Carga la billetera desde el almacenamiento, creándola si es necesario.
+
+    Este proceso es "autocorrectivo": si el archivo no existe, está vacío o
+    corrupto, se genera una billetera inicial para asegurar que la aplicación
+    siempre tenga un estado de billetera válido con el que operar.
+
+    Args:
+        ruta_archivo (Optional[str]): Ruta al archivo. Si es None, se usa la
+                                     ruta por defecto de la configuración.
+
+    Returns:
+        Dict[str, Dict]: Un diccionario que representa la billetera. Los saldos
+                         se deserializan a objetos `Decimal` para permitir
+                         cálculos precisos.
+
+    Side Effects:
+        - Crea la billetera en el almacenamiento si no existe.
+        - Sobrescribe billeteras corruptas o vacías con una billetera nueva.
+    """
+    datos_cargados = obtener_repositorio().leer_billetera(ruta_archivo)
+
+    if datos_cargados is None:
+        # Si no existe, está vacía o corrupta, se crea una billetera nueva para asegurar la continuidad de la aplicación.
+        billetera_inicial = _crear_billetera_inicial()
+        guardar_billetera(billetera_inicial, ruta_archivo=ruta_archivo)
+        return billetera_inicial
+
+    return _deserializar_billetera(datos_cargados)
+
+
+def guardar_billetera(billetera: Dict[str, Dict], ruta_archivo: Optional[str] = None):
+    """Guarda el estado de la billetera en el almacenamiento configurado.
+
+    Serializa el diccionario de la billetera a un formato compatible con JSON.
+    Antes de guardar, los saldos (objetos `Decimal`) se cuantizan para
+    asegurar una precisión estándar y luego se convierten a `str` (o a enteros
+    en unidades atómicas, con `config.LIBRO_UNIDADES_ATOMICAS` activo).
+
+    Args:
+        billetera (Dict[str, Dict]): El objeto de la billetera a guardar.
+        ruta_archivo (Optional[str]): Ruta al archivo. Si es None, se usa la
+                                     ruta por defecto de la configuración.
+
+    Side Effects:
+        - Reemplaza la billetera almacenada.
+    """
+    obtener_repositorio().escribir_billetera(_serializar_billetera(billetera), ruta_archivo)
@@ -1,112 +1,346 @@
 """Módulo de acceso a datos de cotizaciones de criptomonedas.
 
-Este módulo gestiona la carga y guardado de datos de cotizaciones desde un
-archivo JSON. Para optimizar el acceso a los precios, utiliza un caché en
-memoria que se carga bajo demanda la primera vez que se solicita un precio.
+Este módulo gestiona la carga y guardado de datos de cotizaciones a través del
+repositorio configurado (ver `repositorio.py`). Para optimizar el acceso a los
+precios, mantiene en memoria una instantánea de precios que se carga bajo
+demanda la primera vez que se solicita un precio.
+
+La instantánea (`InstantaneaPrecios`) es inmutable y tiene un número de
+versión. Cada recarga construye una instantánea nueva y la publica
+reemplazando una única referencia, de modo que un hilo que lee precios nunca
+ve una mezcla de precios viejos y nuevos: o ve la instantánea anterior
+completa, o la nueva. Los cachés derivados de los precios pueden guardar la
+versión con la que se calcularon para saber cuándo quedaron desactualizados.
+
+Cada actualización se compara con la instantánea anterior y produce un
+`ConjuntoCambios` con solo los tickers que cambiaron. Los consumidores que se
+suscriben (ver `suscribir_cambios_cotizaciones`) lo reciben y pueden
+actualizar únicamente esos tickers en lugar de recalcular todo. Las
+cotizaciones sin cambios se comparten entre instantáneas sucesivas, de modo
+que comparar su identidad (`is`) basta para saber que no cambiaron. Las
+recargas completas desde el repositorio no generan un conjunto de cambios: un
+consumidor las detecta porque `version_anterior` no coincide con la última
+versión que procesó, y entonces recalcula todo.
 """
 
-import json
-import os
-from decimal import Decimal
-from typing import Any, Optional
+import itertools
+import threading
+from decimal import Decimal, InvalidOperation
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
 
+from backend.acceso_datos.cache_lectura import cache_lectura
+from backend.acceso_datos.repositorio import obtener_repositorio
 import config
 
-# Caché de precios en memoria para un acceso rápido y eficiente.
-# Se puebla bajo demanda y las claves (tickers) se guardan en mayúsculas.
-# Formato: {'TICKER': {'ticker': 'TICKER', 'precio_usd': '123.45', ...}}
-_cache_precios: dict[str, dict[str, Any]] = {}
+
+class InstantaneaPrecios:
+    """Conjunto inmutable de cotizaciones, identificado por su versión.
+
+    Attributes:
+        version (int): Número de versión, único y creciente en el proceso.
+        ruta (Optional[str]): Ruta de la que se cargaron las cotizaciones
+            (None para la ruta por defecto).
+        cotizaciones (Mapping[str, Dict[str, Any]]): Cotización de cada activo,
+            indexada por ticker en mayúsculas.
+        precios (Mapping[str, Decimal]): Precio en USD de cada activo que lo
+            tiene, ya convertido a Decimal.
+        persistida (bool): False si la instantánea tiene cambios que no se
+            escribieron en el repositorio (ver `aplicar_precios`).
+    """
+
+    __slots__ = ("version", "ruta", "cotizaciones", "precios", "persistida")
+
+    def __init__(
+        self,
+        version: int,
+        ruta: Optional[str],
+        lista_criptos: List[Dict[str, Any]],
+        base: Optional["InstantaneaPrecios"] = None,
+        persistida: bool = True,
+    ):
+        """Construye la instantánea.
+
+        Args:
+            version (int): Número de versión.
+            ruta (Optional[str]): Ruta de origen de las cotizaciones.
+            lista_criptos (List[Dict[str, Any]]): Las cotizaciones.
+            base (Optional[InstantaneaPrecios]): Instantánea anterior. Las
+                cotizaciones de `lista_criptos` que son el mismo objeto que en
+                `base` se reutilizan sin copiarlas ni volver a convertir su precio.
+            persistida (bool): Ver el atributo.
+        """
+        cotizaciones: Dict[str, Dict[str, Any]] = {}
+        precios: Dict[str, Decimal] = {}
+        for cripto in lista_criptos:
+            ticker = cripto.get("ticker")
+            if not isinstance(ticker, str) or not ticker:
+                # Se ignora el activo si el ticker no es un string válido.
+                continue
+            ticker = ticker.upper()
+            if base is not None and base.cotizaciones.get(ticker) is cripto:
+                cotizaciones[ticker] = cripto
+                if ticker in base.precios:
+                    precios[ticker] = base.precios[ticker]
+                continue
+            cotizaciones[ticker] = dict(cripto)
+            if "precio_usd" in cripto:
+                try:
+                    precios[ticker] = Decimal(str(cripto["precio_usd"]))
+                except (InvalidOperation, ValueError):
+                    pass
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "ruta", ruta)
+        object.__setattr__(self, "cotizaciones", MappingProxyType(cotizaciones))
+        object.__setattr__(self, "precios", MappingProxyType(precios))
+        object.__setattr__(self, "persistida", persistida)
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("InstantaneaPrecios es inmutable.")
+
+    def precio(self, ticker: str) -> Optional[Decimal]:
+        """Devuelve el precio en USD de un activo, o None si no lo tiene."""
+        return self.precios.get(ticker.upper())
+
+    def __len__(self) -> int:
+        return len(self.cotizaciones)
+
+
+class ConjuntoCambios(NamedTuple):
+    """Diferencia entre dos instantáneas de precios consecutivas.
+
+    Attributes:
+        version (int): Versión de la instantánea nueva.
+        version_anterior (Optional[int]): Versión de la instantánea con la que
+            se comparó (None si no había una).
+        cambios (Dict[str, Dict[str, Any]]): Por cada ticker nuevo o
+            modificado, los campos que cambiaron con su valor nuevo. Un campo
+            que dejó de existir aparece con valor None.
+        eliminados (FrozenSet[str]): Tickers que ya no están.
+    """
+
+    version: int
+    version_anterior: Optional[int]
+    cambios: Dict[str, Dict[str, Any]]
+    eliminados: FrozenSet[str]
+
+    def __bool__(self) -> bool:
+        return bool(self.cambios or self.eliminados)
+
+
+SuscriptorCambios = Callable[[ConjuntoCambios], None]
+
+
+# Generador de versiones: `next` es atómico, así que no requiere un lock.
+_versiones = itertools.count(1)
+
+# Instantánea publicada. Se reemplaza completa (una asignación) y nunca se
+# modifica, por lo que los lectores no necesitan sincronizarse.
+_instantanea: Optional[InstantaneaPrecios] = None
+
+# Serializa las actualizaciones parciales (ver `aplicar_precios`).
+_lock_aplicacion = threading.Lock()
+
+# Funciones notificadas con cada `ConjuntoCambios`. La lista se reemplaza al
+# suscribir o desuscribir, así que se puede recorrer sin el lock.
+_suscriptores: List[SuscriptorCambios] = []
+_lock_suscriptores = threading.Lock()
+
+
+def suscribir_cambios_cotizaciones(suscriptor: SuscriptorCambios) -> Callable[[], None]:
+    """Registra una función que recibe cada `ConjuntoCambios` publicado.
+
+    La función se invoca en el hilo que publicó la instantánea, justo después
+    de publicarla y antes de la siguiente publicación, así que los conjuntos
+    llegan en orden de versión. Debe ser rápida y no publicar precios. Si
+    lanza una excepción, se informa y se continúa con los demás suscriptores.
+
+    Args:
+        suscriptor (SuscriptorCambios): La función a notificar.
+
+    Returns:
+        Callable[[], None]: Una función que cancela la suscripción.
+    """
+    global _suscriptores
+    with _lock_suscriptores:
+        _suscriptores = _suscriptores + [suscriptor]
+
+    def desuscribir() -> None:
+        global _suscriptores
+        with _lock_suscriptores:
+            _suscriptores = [s for s in _suscriptores if s is not suscriptor]
+
+    return desuscribir
+
+
+def _notificar(conjunto: ConjuntoCambios) -> None:
+    for suscriptor in _suscriptores:
+        try:
+            suscriptor(conjunto)
+        except Exception as e:
+            print(f"Advertencia: Un suscriptor de cambios de cotizaciones falló: {e}")
+
+
+def _diferenciar(
+    base: Optional[InstantaneaPrecios], lista_criptos: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]], FrozenSet[str]]:
+    """Compara una lista de cotizaciones con la instantánea anterior.
+
+    Returns:
+        Tuple: La lista de cotizaciones, en la que las que no cambiaron se
+            reemplazan por el objeto de `base` (para que la instantánea nueva
+            las comparta), los campos cambiados por ticker y los tickers
+            eliminados.
+    """
+    anteriores = base.cotizaciones if base is not None else {}
+    lista: List[Dict[str, Any]] = []
+    cambios: Dict[str, Dict[str, Any]] = {}
+    vistos = set()
+    for cripto in lista_criptos:
+        ticker = cripto.get("ticker")
+        if not isinstance(ticker, str) or not ticker:
+            continue
+        ticker = ticker.upper()
+        vistos.add(ticker)
+        anterior = anteriores.get(ticker)
+        if anterior is not None and anterior == cripto:
+            lista.append(anterior)
+            cambios.pop(ticker, None)
+            continue
+        lista.append(cripto)
+        if anterior is None:
+            cambios[ticker] = dict(cripto)
+        else:
+            campos = {campo: valor for campo, valor in cripto.items() if anterior.get(campo) != valor or campo not in anterior}
+            campos.update((campo, None) for campo in anterior if campo not in cripto)
+            cambios[ticker] = campos
+    return lista, cambios, frozenset(anteriores.keys() - vistos)
+
+
+def _publicar(instantanea: Optional[InstantaneaPrecios]) -> Optional[InstantaneaPrecios]:
+    global _instantanea
+    _instantanea = instantanea
+    return instantanea
+
 
 def limpiar_cache_precios():
-    """Limpia el caché de precios en memoria.
+    """Descarta la instantánea de precios en memoria.
 
     Esta función es esencial para el aislamiento de las pruebas, permitiendo
     que cada test se ejecute en un estado limpio sin ser afectado por los
     datos de pruebas anteriores.
 
     Side Effects:
-        - Modifica la variable global `_cache_precios`, reiniciándola a un
-          diccionario vacío.
+        - Descarta la instantánea publicada; la próxima lectura la recarga.
     """
-    global _cache_precios
-    _cache_precios = {}
+    _publicar(None)
     print("🧹 Caché de precios limpiado.")
 
-def recargar_cache_precios(ruta_archivo: Optional[str] = None):
-    """Recarga el caché de precios desde un archivo JSON.
 
-    Esta función lee el archivo de cotizaciones, lo procesa y actualiza la
-    variable global `_cache_precios`. Está diseñada para ser llamada
-    internamente o para fines de prueba.
+def recargar_cache_precios(ruta_archivo: Optional[str] = None) -> InstantaneaPrecios:
+    """Recarga la instantánea de precios desde el repositorio de cotizaciones.
+
+    Lee las cotizaciones almacenadas, construye una instantánea nueva y la
+    publica. Está diseñada para ser llamada internamente o para fines de prueba.
 
     Args:
         ruta_archivo (Optional[str]): La ruta al archivo JSON de cotizaciones.
                                      Si es None, usa la ruta de config.
 
+    Returns:
+        InstantaneaPrecios: La instantánea recién publicada.
+
     Side Effects:
-        - Modifica la variable global `_cache_precios`.
+        - Reemplaza la instantánea publicada.
     """
     ruta_a_usar = ruta_archivo or config.COTIZACIONES_PATH
-    global _cache_precios
     print(f"🔄 Recargando caché de precios desde '{ruta_a_usar}'...")
+    instantanea = _publicar(_construir_instantanea(ruta_archivo))
+    print("✅ Caché de precios actualizado en memoria.")
+    return instantanea
 
-    if not os.path.exists(ruta_a_usar) or os.path.getsize(ruta_a_usar) == 0:
-        lista_criptos = []
-    else:
-        try:
-            with open(ruta_a_usar, "r", encoding="utf-8") as f:
-                lista_criptos = json.load(f)
-        except Exception as e:
-            print(f"⚠️ No se pudo leer el archivo de cotizaciones en '{ruta_a_usar}'. Se usará una lista vacía. Error: {e}")
-            lista_criptos = []
 
-    _cache_precios = {}
-    
-    for cripto in lista_criptos:
-        ticker = cripto.get("ticker")
-        
-        try:
-            if ticker:
-                _cache_precios[ticker.upper()] = cripto
-        except AttributeError:
-            # Se ignora el activo si el ticker no es un string válido.
-            pass
-    
-    print("✅ Caché de precios actualizado en memoria.")
+def _construir_instantanea(
+    ruta_archivo: Optional[str], lista_criptos: Optional[List[Dict[str, Any]]] = None
+) -> InstantaneaPrecios:
+    if lista_criptos is None:
+        lista_criptos = obtener_repositorio().leer_cotizaciones(ruta_archivo)
+    return InstantaneaPrecios(next(_versiones), ruta_archivo, lista_criptos)
+
+
+def obtener_instantanea_precios(ruta_archivo: Optional[str] = None) -> InstantaneaPrecios:
+    """Devuelve la instantánea de precios vigente.
+
+    Sin `ruta_archivo`, devuelve la instantánea publicada, cargándola
+    perezosamente si no existe. Con `ruta_archivo`, devuelve una instantánea
+    de ese archivo y la publica; solo se vuelve a leer el archivo si cambió
+    desde la última lectura (ver `cache_lectura`).
+
+    Args:
+        ruta_archivo (Optional[str]): Ruta al archivo JSON de cotizaciones.
+
+    Returns:
+        InstantaneaPrecios: Una instantánea consistente; las lecturas sucesivas
+                            sobre el mismo objeto nunca cambian.
+    """
+    instantanea = _instantanea
+    if ruta_archivo:
+        # El caché devuelve el mismo objeto mientras el archivo no cambie.
+        instantanea_ruta = cache_lectura.obtener(
+            ruta_archivo,
+            lambda: _construir_instantanea(ruta_archivo),
+            clave=("instantanea_precios", ruta_archivo),
+        )
+        if instantanea_ruta is not instantanea:
+            instantanea = _publicar(instantanea_ruta)
+        return instantanea
+    if instantanea is None:
+        instantanea = recargar_cache_precios()
+    return instantanea
+
+
+def obtener_precio_versionado(
+    ticker: str, ruta_archivo: Optional[str] = None
+) -> Tuple[Optional[Decimal], int]:
+    """Obtiene el precio de un activo junto con la versión de la instantánea leída.
+
+    Args:
+        ticker (str): El ticker del activo, insensible a mayúsculas.
+        ruta_archivo (Optional[str]): Ver `obtener_instantanea_precios`.
+
+    Returns:
+        Tuple[Optional[Decimal], int]: El precio (o None si el ticker no
+                                       existe) y la versión de la instantánea.
+    """
+    instantanea = obtener_instantanea_precios(ruta_archivo)
+    return instantanea.precio(ticker), instantanea.version
+
 
 def obtener_precio(ticker: str, ruta_archivo: Optional[str] = None) -> Optional[Decimal]:
-    """Obtiene el precio de un activo, con opción de recarga forzada desde una ruta.
+    """Obtiene el precio de un activo desde la instantánea de precios vigente.
 
-    Si se proporciona una `ruta_archivo`, fuerza la recarga del caché desde esa
-    ruta. Si no, utiliza el caché existente o lo carga perezosamente si está vacío.
-    Esto es crucial para que los tests puedan operar con datos aislados.
+    Si se proporciona una `ruta_archivo`, los precios se toman de ese archivo
+    (releyéndolo solo si cambió). Si no, se utiliza la instantánea publicada o
+    se carga perezosamente si no existe. Esto es crucial para que los tests
+    puedan operar con datos aislados.
 
     Args:
         ticker (str): El ticker del activo (ej. 'BTC'), insensible a mayúsculas.
-        ruta_archivo (Optional[str], optional): Ruta al archivo JSON para forzar
-            la recarga. Por defecto None.
+        ruta_archivo (Optional[str], optional): Ruta al archivo JSON de
+            cotizaciones. Por defecto None.
 
     Returns:
         Optional[Decimal]: El precio como un objeto Decimal si se encuentra,
                            o None si el ticker no existe.
     """
-    # Si se pasa una ruta, se fuerza la recarga. Si no, se usa lazy-loading.
-    if ruta_archivo:
-        recargar_cache_precios(ruta_archivo)
-    elif not _cache_precios:
-        recargar_cache_precios()
-
-    info_cripto = _cache_precios.get(ticker.upper())
-    if info_cripto and "precio_usd" in info_cripto:
-        return Decimal(str(info_cripto["precio_usd"]))
-    
-    return None
+    return obtener_instantanea_precios(ruta_archivo).precio(ticker)
 
 def cargar_datos_cotizaciones(ruta_archivo: Optional[str] = None) -> list[dict]:
-    """Carga y devuelve la lista completa de cotizaciones desde el archivo JSON.
+    """Carga y devuelve la lista completa de cotizaciones desde el repositorio.
 
-    Esta función lee directamente del disco sin interactuar con el caché. Es ideal
-    para obtener la lista completa de activos para mostrar en la interfaz.
+    Esta función lee directamente del almacenamiento sin interactuar con el
+    caché. Es ideal para obtener la lista completa de activos para mostrar en
+    la interfaz.
 
     Args:
         ruta_archivo (str): La ruta al archivo JSON de cotizaciones.
@@ -115,40 +349,102 @@ def cargar_datos_cotizaciones(ruta_archivo: Optional[str] = None) -> list[dict]:
         list[dict]: Una lista de diccionarios con los datos de las cotizaciones.
                     Devuelve una lista vacía en caso de error.
     """
-    ruta_a_usar = ruta_archivo or config.COTIZACIONES_PATH
-    if not os.path.exists(ruta_a_usar) or os.path.getsize(ruta_a_usar) == 0:
-        return []
-    try:
-        with open(ruta_a_usar, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Advertencia: No se pudo leer o el archivo '{ruta_a_usar}' está corrupto. Error: {e}")
-        return []
+    return obtener_repositorio().leer_cotizaciones(ruta_archivo)
 
-def guardar_datos_cotizaciones(data: list[dict[str, Any]], ruta_archivo: Optional[str] = None):
-    """Guarda los datos de cotizaciones y recarga el caché para mantener consistencia.
+def guardar_datos_cotizaciones(
+    data: list[dict[str, Any]], ruta_archivo: Optional[str] = None
+) -> Optional[ConjuntoCambios]:
+    """Guarda los datos de cotizaciones y publica una nueva instantánea de precios.
 
-    Escribe la lista de datos en el archivo JSON. Si el archivo modificado es el
-    que usa la aplicación principal, se fuerza una recarga del caché para que
-    los cambios se reflejen inmediatamente en el sistema.
+    Compara los datos con la instantánea vigente (si es de la misma ruta). Si
+    nada cambió, no se escribe ni se publica. Si no, escribe la lista en el
+    repositorio, publica una instantánea construida con los mismos datos
+    (para que los cambios se reflejen sin volver a leerlos) y notifica el
+    conjunto de cambios a los suscriptores.
 
     Args:
         data (list[dict[str, Any]]): La lista de cotizaciones a guardar.
         ruta_archivo (str): La ruta del archivo donde se guardarán los datos.
 
+    Returns:
+        Optional[ConjuntoCambios]: Los cambios publicados (vacío si no hubo
+                                   cambios), o None si ocurrió un error.
+
     Side Effects:
-        - Escribe o sobrescribe un archivo en disco.
-        - Puede disparar una recarga del caché de precios.
+        - Sobrescribe las cotizaciones almacenadas.
+        - Reemplaza la instantánea de precios publicada.
+        - Notifica a los suscriptores de cambios.
     """
     ruta_a_usar = ruta_archivo or config.COTIZACIONES_PATH
-    print(f"💾 Guardando datos en '{ruta_a_usar}'...")
     try:
-        with open(ruta_a_usar, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
-        print("✅ Datos de cotizaciones guardados en archivo.")
+        with _lock_aplicacion:
+            base = _instantanea if _instantanea is not None and _instantanea.ruta == ruta_archivo else None
+            lista, cambios, eliminados = _diferenciar(base, data)
+            if base is not None and base.persistida and not cambios and not eliminados:
+                print(f"✅ Cotizaciones sin cambios (versión {base.version}); no se escribe '{ruta_a_usar}'.")
+                return ConjuntoCambios(base.version, base.version, {}, frozenset())
+
+            print(f"💾 Guardando datos en '{ruta_a_usar}'...")
+            obtener_repositorio().escribir_cotizaciones(data, ruta_archivo)
+            print("✅ Datos de cotizaciones guardados.")
 
-        # Forzar recarga del caché desde la ruta usada para mantener consistencia.
-        recargar_cache_precios(ruta_a_usar)
+            # Publicar los precios recién guardados para mantener consistencia.
+            instantanea = _publicar(InstantaneaPrecios(next(_versiones), ruta_archivo, lista, base=base))
+            print(f"✅ Caché de precios actualizado en memoria ({len(cambios)} cambios, {len(eliminados)} eliminados).")
+            conjunto = ConjuntoCambios(
+                instantanea.version, base.version if base is not None else None, cambios, eliminados
+            )
+            _notificar(conjunto)
+        return conjunto
 
     except Exception as e:
-        print(f"❌ Error al guardar los datos de cotizaciones: {e}")
\ No newline at end of file
+        print(f"❌ Error al guardar los datos de cotizaciones: {e}")
+        return None
+
+def aplicar_precios(precios: Dict[str, Decimal]) -> ConjuntoCambios:
+    """Publica una instantánea con los precios de algunos activos actualizados.
+
+    Pensada para las fuentes de precios en streaming: cada lote de cambios
+    genera una instantánea nueva a partir de la vigente, sin escribir en el
+    repositorio. La próxima actualización completa (ver
+    `guardar_datos_cotizaciones`) reemplaza todas las cotizaciones.
+
+    Args:
+        precios (Dict[str, Decimal]): Nuevo precio en USD de cada ticker.
+            Los tickers que no estaban en la instantánea se agregan.
+
+    Returns:
+        ConjuntoCambios: Los tickers cuyo precio cambió. Si ninguno cambió,
+                         está vacío y no se publica una instantánea.
+
+    Side Effects:
+        - Reemplaza la instantánea de precios publicada.
+        - Notifica a los suscriptores de cambios.
+    """
+    nuevos = {ticker.upper(): Decimal(str(precio)) for ticker, precio in precios.items()}
+    # El lock evita que dos lotes concurrentes partan de la misma instantánea y
+    # el segundo descarte los cambios del primero.
+    with _lock_aplicacion:
+        base = obtener_instantanea_precios()
+        cambios = {
+            ticker: {"precio_usd": str(precio)}
+            for ticker, precio in nuevos.items()
+            if base.precios.get(ticker) != precio
+        }
+        if not cambios:
+            return ConjuntoCambios(base.version, base.version, {}, frozenset())
+        lista_criptos = [
+            {**cotizacion, **cambios[ticker]} if ticker in cambios else cotizacion
+            for ticker, cotizacion in base.cotizaciones.items()
+        ]
+        lista_criptos.extend(
+            {"ticker": ticker, **campos} for ticker, campos in cambios.items() if ticker not in base.cotizaciones
+        )
+        for ticker in cambios.keys() - base.cotizaciones.keys():
+            cambios[ticker] = {"ticker": ticker, **cambios[ticker]}
+        instantanea = _publicar(
+            InstantaneaPrecios(next(_versiones), base.ruta, lista_criptos, base=base, persistida=False)
+        )
+        conjunto = ConjuntoCambios(instantanea.version, base.version, cambios, frozenset())
+        _notificar(conjunto)
+    return conjunto
@@ -1,48 +1,79 @@
 """Módulo para la persistencia del historial de transacciones.
 
 Este componente gestiona la lectura y escritura del historial de operaciones
-en un archivo JSON. Cada operación se guarda como un registro inmutable.
+a través del repositorio configurado (ver `repositorio.py`). Cada operación
+se guarda como un registro inmutable que se anexa al historial, por lo que
+registrar una operación no depende del tamaño del historial.
+
+Con el driver JSON, el historial es un archivo JSON Lines (una operación por
+línea) que se lee desde el final, devolviendo las operaciones más recientes
+primero y permitiendo paginar sin cargar el historial completo. Los
+historiales en el formato anterior (`historial.json`, una lista JSON con las
+operaciones más recientes primero) se migran automáticamente la primera vez
+que se accede a ellos (ver `migrar_historial_json`).
 
 El sistema está diseñado para ser robusto, devolviendo una lista vacía si
 el archivo de historial no existe o está corrupto, permitiendo que la
 aplicación continúe funcionando.
 """
 
-import json
-import os
 from datetime import datetime
 from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
-from backend.utils.utilidades_numericas import cuantizar_cripto, cuantizar_usd
-import config
+from backend.acceso_datos.repositorio import obtener_repositorio
+from backend.acceso_datos.repositorio_json import migrar_historial_json
+from backend.utils.unidades_atomicas import serializar_monto_cripto, serializar_monto_usd
 
-def cargar_historial(ruta_archivo: Optional[str] = None) -> List[Dict[str, Any]]:
-    """Carga el historial de transacciones desde un archivo JSON.
+def cargar_historial(
+    ruta_archivo: Optional[str] = None,
+    limite: Optional[int] = None,
+    desplazamiento: int = 0,
+) -> List[Dict[str, Any]]:
+    """Carga el historial de transacciones, de la más reciente a la más antigua.
 
     Es una operación de solo lectura y "a prueba de fallos": si el archivo
-    no existe, está vacío o corrupto, devuelve una lista vacía para no
-    interrumpir la ejecución de la aplicación.
+    no existe o está vacío, devuelve una lista vacía, y las líneas dañadas se
+    omiten para no interrumpir la ejecución de la aplicación.
 
     Args:
         ruta_archivo (Optional[str]): Ruta al archivo. Si es None, se usa la
                                      ruta por defecto de la configuración.
+        limite (Optional[int]): Cantidad máxima de operaciones a devolver. Si
+                                es None, se devuelve el historial completo.
+        desplazamiento (int): Cantidad de operaciones recientes a omitir, para
+                              paginar hacia atrás en el historial.
 
     Returns:
         List[Dict[str, Any]]: Una lista de registros de transacciones.
+
+    Side Effects:
+        - Con el driver JSON, migra un `historial.json` del formato anterior si existe.
     """
-    ruta_efectiva = ruta_archivo or config.HISTORIAL_PATH
-    if not os.path.exists(ruta_efectiva) or os.path.getsize(ruta_efectiva) == 0:
-        return []
-
-    try:
-        with open(ruta_efectiva, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        print(
-            f"Advertencia: No se pudo leer o el archivo '{ruta_efectiva}' está corrupto. Error: {e}"
-        )
-        return []
+    return obtener_repositorio().leer_historial(ruta_archivo, limite, desplazamiento)
+
+def cargar_historial_rango(
+    desde: Optional[str] = None,
+    hasta: Optional[str] = None,
+    ruta_archivo: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Carga las operaciones realizadas en un intervalo de tiempo.
+
+    Con el driver JSON solo se leen los segmentos mensuales cuyo rango se
+    superpone con el intervalo pedido (ver `archivo_segmentado`).
+
+    Args:
+        desde (Optional[str]): Inicio del intervalo (timestamp ISO, incluido).
+                               Si es None, el intervalo no tiene inicio.
+        hasta (Optional[str]): Fin del intervalo (timestamp ISO, excluido).
+                               Si es None, el intervalo no tiene fin.
+        ruta_archivo (Optional[str]): Ruta al archivo de historial.
+
+    Returns:
+        List[Dict[str, Any]]: Las operaciones del intervalo, de la más reciente
+                              a la más antigua.
+    """
+    return obtener_repositorio().leer_historial_rango(desde, hasta, ruta_archivo)
 
 def guardar_en_historial(
     tipo_operacion: str,
@@ -55,10 +86,8 @@ def guardar_en_historial(
 ):
     """Añade un nuevo registro de transacción al historial.
 
-    Implementa un ciclo de "leer-modificar-escribir": carga el historial
-    completo, añade la nueva transacción al principio de la lista y
-    sobrescribe el archivo. Este enfoque mantiene las operaciones más
-    recientes primero.
+    El registro se anexa al historial sin leer ni reescribir las operaciones
+    anteriores (con el driver JSON, como una nueva línea al final del archivo).
 
     Args:
         tipo_operacion (str): Tipo de la operación (ej. 'COMPRA').
@@ -69,34 +98,13 @@ def guardar_en_historial(
         valor_usd (Decimal): Valor total de la transacción en USD.
         ruta_archivo (Optional[str]): Ruta al archivo de historial.
     """
-    ruta_efectiva = ruta_archivo or config.HISTORIAL_PATH
-    os.makedirs(os.path.dirname(ruta_efectiva), exist_ok=True)
-    historial = cargar_historial(ruta_archivo=ruta_efectiva)
-
-    # Cuantizar valores para asegurar precisión y formato estándar.
-    cantidad_origen_q = cuantizar_cripto(cantidad_origen)
-    cantidad_destino_q = cuantizar_cripto(cantidad_destino)
-    valor_usd_q = cuantizar_usd(valor_usd)
-
-    # Creación del nuevo registro de transacción.
+    # Creación del nuevo registro de transacción. El ID lo asigna el repositorio.
     operacion = {
-        "id": len(historial) + 1,
         "timestamp": datetime.now().isoformat(),  # Se va a ver asi: 2025-07-02T22:12:34.123456
         "tipo": tipo_operacion,
-        "origen": {"ticker": moneda_origen, "cantidad": str(cantidad_origen_q)},
-        "destino": {"ticker": moneda_destino, "cantidad": str(cantidad_destino_q)},
-        "valor_usd": str(valor_usd_q),
+        # Montos cuantizados a la precisión estándar (texto o unidades atómicas).
+        "origen": {"ticker": moneda_origen, "cantidad": serializar_monto_cripto(cantidad_origen)},
+        "destino": {"ticker": moneda_destino, "cantidad": serializar_monto_cripto(cantidad_destino)},
+        "valor_usd": serializar_monto_usd(valor_usd),
     }
-
-    # Se inserta la nueva operación al principio de la lista.
-    # Esto asegura que el historial se muestre en orden cronológico descendente.
-    historial.insert(0, operacion)
-
-    try:
-        with open(ruta_efectiva, "w", encoding="utf-8") as f:
-            json.dump(historial, f, indent=4)
-    except Exception as e:
-        # En un entorno de producción, esto debería ser manejado por un sistema de logging.
-        print(
-            f"Error Crítico: No se pudo guardar el archivo de historial en '{ruta_efectiva}'. Error: {e}"
-        )
\ No newline at end of file
+    obtener_repositorio().agregar_operacion(operacion, ruta_archivo)
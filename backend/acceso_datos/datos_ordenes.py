@@ -1,16 +1,36 @@
 """Módulo para la persistencia de órdenes de trading pendientes.
 
 Este módulo gestiona el ciclo de vida (lectura, escritura y modificación)
- de las órdenes pendientes (ej. Límite, Stop-Loss), usando un archivo JSON
- como mecanismo de almacenamiento.
+ de las órdenes pendientes (ej. Límite, Stop-Loss), delegando el
+ almacenamiento en el repositorio configurado (ver `repositorio.py`).
 """
-import json
-import os
-from typing import Optional
+from typing import Hashable, Optional
+
+from backend.acceso_datos.repositorio import obtener_repositorio
+from backend.acceso_datos.secuencias import obtener_secuencia
 import config
 
+
+def version_ordenes(ruta_archivo: Optional[str] = None) -> Hashable:
+    """Devuelve un valor que cambia cuando cambian las órdenes almacenadas.
+
+    Permite a los índices derivados de las órdenes (ej. el libro de
+    disparos del motor) saber si deben reconstruirse sin leerlas. Combina el
+    driver de almacenamiento con la versión que este expone, que solo cambia
+    al confirmarse una escritura (ver `Repositorio.version_ordenes`).
+
+    Args:
+        ruta_archivo (Optional[str]): Ruta al archivo. Si es None, se usa la
+                                     ruta de `config.ORDENES_PENDIENTES_PATH`.
+
+    Returns:
+        Hashable: Un valor comparable con `==`.
+    """
+    repositorio = obtener_repositorio()
+    return id(repositorio), repositorio.version_ordenes(ruta_archivo)
+
 def cargar_ordenes_pendientes(ruta_archivo: Optional[str] = None) -> list[dict]:
-    """Carga la lista de órdenes pendientes desde un archivo JSON.
+    """Carga la lista de órdenes pendientes desde el almacenamiento.
 
     Si el archivo no existe, está vacío o es ilegible, devuelve una lista
     vacía como fallback seguro.
@@ -21,27 +41,13 @@ def cargar_ordenes_pendientes(ruta_archivo: Optional[str] = None) -> list[dict]:
 
     Returns:
         list[dict]: Una lista de diccionarios, donde cada uno es una orden.
-
-    Side Effects:
-        - Crea el directorio para el archivo si este no existe.
     """
-    ruta_efectiva = ruta_archivo or config.ORDENES_PENDIENTES_PATH
-    os.makedirs(os.path.dirname(ruta_efectiva), exist_ok=True)
-    
-    if not os.path.exists(ruta_efectiva) or os.path.getsize(ruta_efectiva) == 0:
-        return []
-
-    try:
-        with open(ruta_efectiva, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Advertencia: No se pudo leer o el archivo '{ruta_efectiva}' está corrupto. Error: {e}")
-        return []
+    return obtener_repositorio().leer_ordenes(ruta_archivo)
 
 def guardar_ordenes_pendientes(lista_ordenes: list[dict], ruta_archivo: Optional[str] = None):
-    """Sobrescribe el archivo de órdenes con la lista proporcionada.
+    """Sobrescribe las órdenes almacenadas con la lista proporcionada.
 
-    ADVERTENCIA: Esta función reemplaza completamente el contenido del archivo.
+    ADVERTENCIA: Esta función reemplaza completamente las órdenes guardadas.
     Debe usarse con cuidado para no perder datos.
 
     Args:
@@ -50,32 +56,50 @@ def guardar_ordenes_pendientes(lista_ordenes: list[dict], ruta_archivo: Optional
                                      ruta de `config.ORDENES_PENDIENTES_PATH`.
 
     Side Effects:
-        - Crea el directorio si no existe.
-        - Escribe en el archivo, reemplazando su contenido.
+        - Reemplaza las órdenes almacenadas.
     """
-    ruta_efectiva = ruta_archivo or config.ORDENES_PENDIENTES_PATH
-    os.makedirs(os.path.dirname(ruta_efectiva), exist_ok=True)
-
-    try:
-        with open(ruta_efectiva, "w", encoding="utf-8") as f:
-            json.dump(lista_ordenes, f, indent=4)
-    except Exception as e:
-        print(
-            f"Advertencia: No se pudo guardar el archivo de órdenes en '{ruta_efectiva}'. Error: {e}"
-        )
+    obtener_repositorio().escribir_ordenes(lista_ordenes, ruta_archivo)
 
 def agregar_orden_pendiente(nueva_orden: dict, ruta_archivo: Optional[str] = None):
     """Añade una nueva orden al final de la lista de pendientes.
 
-    Implementa un ciclo de "leer-modificar-escribir": carga todas las órdenes,
-    añade la nueva y vuelve a guardar la lista completa. No es una operación
-    de bajo nivel optimizada para rendimiento.
+    Con el driver JSON implica un ciclo de "leer-modificar-escribir" del
+    archivo completo; con el driver SQLite es la inserción de una única fila.
 
     Args:
         nueva_orden (dict): La orden a añadir.
         ruta_archivo (Optional[str]): Ruta al archivo. Si es None, se usa la
                                      ruta de `config.ORDENES_PENDIENTES_PATH`.
     """
-    ordenes = cargar_ordenes_pendientes(ruta_archivo=ruta_archivo)
-    ordenes.append(nueva_orden)
-    guardar_ordenes_pendientes(ordenes, ruta_archivo=ruta_archivo)
\ No newline at end of file
+    obtener_repositorio().agregar_orden(nueva_orden, ruta_archivo)
+
+def _ultimo_numero_orden(ruta_archivo: Optional[str] = None) -> int:
+    """Devuelve el mayor sufijo numérico entre los `id_orden` almacenados (0 si no hay)."""
+    numeros = (
+        str(orden.get("id_orden", "")).rsplit("_", 1)[-1]
+        for orden in cargar_ordenes_pendientes(ruta_archivo)
+    )
+    return max((int(numero) for numero in numeros if numero.isdigit()), default=0)
+
+def reservar_numeros_orden(cantidad: int = 1, ruta_archivo: Optional[str] = None) -> range:
+    """Reserva números de orden únicos y crecientes.
+
+    Los números provienen de una secuencia persistente (ver `secuencias.py`),
+    por lo que no se repiten aunque dos órdenes se creen en el mismo instante
+    ni entre reinicios de la aplicación. Al abrirse, la secuencia continúa
+    después del mayor número de las órdenes almacenadas, por si su archivo
+    auxiliar se perdió o las órdenes se restauraron desde una copia.
+
+    Args:
+        cantidad (int): Cantidad de números a reservar (ej. para crear varias
+                        órdenes con una sola reserva).
+        ruta_archivo (Optional[str]): Archivo de órdenes al que se asocia la
+                                     secuencia. Si es None, se usa la ruta de
+                                     `config.ORDENES_PENDIENTES_PATH`.
+
+    Returns:
+        range: Los números reservados, en orden creciente.
+    """
+    return obtener_secuencia(
+        ruta_archivo or config.ORDENES_PENDIENTES_PATH, lambda: _ultimo_numero_orden(ruta_archivo)
+    ).reservar(cantidad)
@@ -0,0 +1,206 @@
+"""Diario de Transacciones (Write-Ahead Log) para el driver JSON.
+
+Una ejecución de orden modifica varios archivos: comisiones, historial,
+billetera y órdenes. Escribirlos uno por uno deja estados intermedios si el
+proceso se interrumpe (ej. la comisión quedó registrada pero la billetera no).
+
+Este módulo registra todas las modificaciones de una transacción como una
+única entrada del diario (una línea JSON) y la confirma con un solo `fsync`.
+A partir de ese momento la transacción es durable, y los archivos de datos se
+actualizan de forma diferida ("checkpoint"), aplicando varias entradas juntas.
+
+Cada entrada contiene una lista de operaciones idempotentes:
+-   `reemplazar`: el contenido completo y final de un archivo JSON (o de
+    una instantánea binaria, con su `tipo`; ver `instantanea_binaria`).
+-   `anexar`: un registro al final de un archivo JSONL (historial).
+-   `insertar_al_inicio`: un registro al principio de una lista JSON
+    (comisiones, que se guardan de la más reciente a la más antigua).
+
+Al iniciar, `recuperar` vuelve a aplicar las entradas que quedaron en el
+diario. Como las operaciones son idempotentes, repetir una entrada que ya se
+había aplicado parcialmente no duplica datos.
+"""
+
+import copy
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from backend.acceso_datos import almacen_jsonl
+from backend.acceso_datos.escritura_atomica import escribir_atomico
+from backend.acceso_datos.instantanea_binaria import TIPO_GENERICO, serializar_documento
+
+ACCION_REEMPLAZAR = "reemplazar"
+ACCION_ANEXAR = "anexar"
+ACCION_INSERTAR_AL_INICIO = "insertar_al_inicio"
+
+# Valor centinela para distinguir "sin imagen pendiente" de un contenido `None`.
+SIN_PENDIENTES = object()
+
+
+def _id_numerico(registro: Optional[Dict[str, Any]]) -> Optional[int]:
+    """Devuelve el ID de un registro como entero, o None si no es numérico."""
+    try:
+        return int(registro.get("id"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class DiarioTransacciones:
+    """Diario de solo-anexado con las transacciones confirmadas pero no aplicadas."""
+
+    def __init__(self, ruta_diario: str, max_pendientes: int):
+        """Abre el diario y recupera las entradas de una ejecución anterior.
+
+        Args:
+            ruta_diario (str): Ruta al archivo JSONL del diario.
+            max_pendientes (int): Cantidad de entradas confirmadas a partir de
+                la cual se aplican automáticamente a los archivos de datos.
+        """
+        self.ruta_diario = ruta_diario
+        self.max_pendientes = max_pendientes
+        self._lock = threading.RLock()
+        self._pendientes: List[List[Dict[str, Any]]] = []
+        self.recuperar()
+
+    # --- Escritura ---
+
+    def registrar(self, operaciones: List[Dict[str, Any]]) -> None:
+        """Confirma una transacción como una única entrada del diario.
+
+        La entrada es durable al retornar (se hace `fsync` del diario). Si se
+        alcanza `max_pendientes`, se aplican todas las entradas a los archivos.
+
+        Args:
+            operaciones (List[Dict[str, Any]]): Operaciones de la transacción.
+        """
+        if not operaciones:
+            return
+        linea = json.dumps({"operaciones": operaciones}, ensure_ascii=False).encode("utf-8") + b"\n"
+
+        with self._lock:
+            os.makedirs(os.path.dirname(self.ruta_diario), exist_ok=True)
+            with open(self.ruta_diario, "ab") as f:
+                f.write(linea)
+                f.flush()
+                os.fsync(f.fileno())
+            self._pendientes.append(copy.deepcopy(operaciones))
+
+            if len(self._pendientes) >= self.max_pendientes:
+                self.aplicar_pendientes()
+
+    # --- Lectura de lo pendiente ---
+
+    def tiene_pendientes(self, ruta_archivo: Optional[str] = None) -> bool:
+        """Indica si hay entradas sin aplicar (opcionalmente, para un archivo)."""
+        with self._lock:
+            if ruta_archivo is None:
+                return bool(self._pendientes)
+            return any(op["ruta"] == ruta_archivo for entrada in self._pendientes for op in entrada)
+
+    def imagen_pendiente(self, ruta_archivo: str) -> Any:
+        """Devuelve el último contenido pendiente de escribir en un archivo.
+
+        Returns:
+            Any: Una copia del contenido, o `SIN_PENDIENTES` si no hay ninguno.
+        """
+        with self._lock:
+            for entrada in reversed(self._pendientes):
+                for op in reversed(entrada):
+                    if op["accion"] == ACCION_REEMPLAZAR and op["ruta"] == ruta_archivo:
+                        return copy.deepcopy(op["datos"])
+        return SIN_PENDIENTES
+
+    def registros_pendientes(self, ruta_archivo: str) -> List[Dict[str, Any]]:
+        """Devuelve los registros pendientes de agregar a un archivo, del más antiguo al más reciente."""
+        with self._lock:
+            return [
+                copy.deepcopy(op["registro"])
+                for entrada in self._pendientes
+                for op in entrada
+                if op["accion"] in (ACCION_ANEXAR, ACCION_INSERTAR_AL_INICIO) and op["ruta"] == ruta_archivo
+            ]
+
+    # --- Aplicación (checkpoint) y recuperación ---
+
+    def aplicar_pendientes(self) -> None:
+        """Aplica todas las entradas pendientes a los archivos y vacía el diario.
+
+        Las operaciones se agrupan por archivo: cada archivo se escribe una
+        sola vez por checkpoint, sin importar cuántas entradas lo modificaron.
+        """
+        with self._lock:
+            if not self._pendientes:
+                return
+            _aplicar_operaciones([op for entrada in self._pendientes for op in entrada])
+            escribir_atomico(self.ruta_diario, b"")
+            self._pendientes = []
+
+    def recuperar(self) -> int:
+        """Vuelve a aplicar las entradas que quedaron en el diario.
+
+        Se invoca al abrir el diario (inicio de la aplicación). Una última
+        línea incompleta corresponde a una transacción que nunca se confirmó
+        y se descarta.
+
+        Returns:
+            int: La cantidad de entradas recuperadas.
+        """
+        with self._lock:
+            if not os.path.exists(self.ruta_diario):
+                return 0
+            entradas = [e.get("operaciones", []) for e in reversed(almacen_jsonl.leer_ultimos(self.ruta_diario))]
+            if entradas:
+                print(f"♻️ Recuperando {len(entradas)} transacciones del diario '{self.ruta_diario}'...")
+            self._pendientes.extend(entradas)
+            self.aplicar_pendientes()
+            return len(entradas)
+
+
+def _aplicar_operaciones(operaciones: List[Dict[str, Any]]) -> None:
+    """Aplica una secuencia de operaciones de forma idempotente, agrupando por archivo."""
+    imagenes: Dict[str, Dict[str, Any]] = {}
+    anexos: Dict[str, List[Dict[str, Any]]] = {}
+    inserciones: Dict[str, List[Dict[str, Any]]] = {}
+
+    for op in operaciones:
+        if op["accion"] == ACCION_REEMPLAZAR:
+            imagenes[op["ruta"]] = op
+        elif op["accion"] == ACCION_ANEXAR:
+            anexos.setdefault(op["ruta"], []).append(op["registro"])
+        elif op["accion"] == ACCION_INSERTAR_AL_INICIO:
+            inserciones.setdefault(op["ruta"], []).append(op["registro"])
+
+    for ruta, registros in anexos.items():
+        ultimo_id = _id_numerico(almacen_jsonl.leer_ultimo(ruta))
+        for registro in registros:
+            id_registro = _id_numerico(registro)
+            if ultimo_id is not None and id_registro is not None and id_registro <= ultimo_id:
+                continue  # Ya aplicado en un checkpoint interrumpido.
+            almacen_jsonl.agregar_registro(ruta, registro, sincronizar=True)
+
+    for ruta, registros in inserciones.items():
+        existentes = _leer_lista(ruta)
+        ultimo_id = _id_numerico(existentes[0]) if existentes else None
+        nuevos = [
+            r for r in registros
+            if ultimo_id is None or _id_numerico(r) is None or _id_numerico(r) > ultimo_id
+        ]
+        escribir_atomico(ruta, json.dumps(list(reversed(nuevos)) + existentes, indent=4).encode("utf-8"))
+
+    for ruta, op in imagenes.items():
+        escribir_atomico(ruta, serializar_documento(op["datos"], ruta, op.get("tipo", TIPO_GENERICO)))
+
+
+def _leer_lista(ruta_archivo: str) -> List[Dict[str, Any]]:
+    """Lee una lista JSON existente, tratando archivos ausentes o inválidos como vacíos."""
+    if not os.path.exists(ruta_archivo) or os.path.getsize(ruta_archivo) == 0:
+        return []
+    try:
+        with open(ruta_archivo, "r", encoding="utf-8") as f:
+            datos = json.load(f)
+    except Exception as e:
+        print(f"Advertencia: No se pudo leer o el archivo '{ruta_archivo}' está corrupto. Error: {e}")
+        return []
+    return datos if isinstance(datos, list) else []
@@ -0,0 +1,182 @@
+"""Escrituras de archivos a prueba de caídas, con confirmación agrupada.
+
+Abrir un archivo con `"w"` lo trunca antes de escribir: un lector concurrente
+(o un reinicio a mitad de la escritura) puede encontrarlo vacío o incompleto.
+Este módulo implementa el patrón estándar para evitarlo:
+
+1.  Escribir el contenido completo en un archivo temporal del mismo directorio.
+2.  Forzar su persistencia en disco con `fsync`.
+3.  Reemplazar el archivo destino con `os.replace`, que es atómico: los
+    lectores ven el archivo anterior completo o el nuevo completo, nunca un
+    estado intermedio.
+
+Además, `CommitAgrupado` implementa *group commit*: las escrituras que llegan
+mientras se confirma otro lote, o dentro de una ventana de pocos milisegundos
+cuando hay concurrencia, se confirman juntas. Si varias apuntan al mismo
+archivo, solo se escribe (y sincroniza) la más reciente, de modo que una
+ráfaga de peticiones no paga un `fsync` por cada una. Un escritor solo no
+espera la ventana.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+def _sincronizar_directorio(directorio: str) -> None:
+    """Persiste la entrada de directorio tras un `os.replace`.
+
+    No todas las plataformas permiten abrir un directorio (ej. Windows); en
+    ese caso se omite, ya que el reemplazo sigue siendo atómico.
+    """
+    try:
+        descriptor = os.open(directorio, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def escribir_atomico(ruta_archivo: str, contenido: bytes) -> None:
+    """Reemplaza un archivo de forma atómica y duradera.
+
+    Args:
+        ruta_archivo (str): Ruta del archivo destino.
+        contenido (bytes): Contenido completo del nuevo archivo.
+
+    Raises:
+        OSError: Si no se pudo escribir el archivo. El destino queda intacto.
+    """
+    directorio = os.path.dirname(ruta_archivo) or "."
+    os.makedirs(directorio, exist_ok=True)
+
+    descriptor, ruta_temporal = tempfile.mkstemp(
+        dir=directorio, prefix=f".{os.path.basename(ruta_archivo)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            f.write(contenido)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(ruta_temporal, ruta_archivo)
+    except BaseException:
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        raise
+
+    _sincronizar_directorio(directorio)
+
+
+class CommitAgrupado:
+    """Agrupa las escrituras atómicas que llegan dentro de una misma ventana.
+
+    El primer hilo que escribe en un lote actúa como "líder": toma todas las
+    escrituras acumuladas y las confirma. Los demás hilos solo registran su
+    contenido y esperan a que el líder termine. Las escrituras que llegan
+    mientras se confirma un lote forman el siguiente.
+
+    El líder espera `ventana_segundos` antes de confirmar solo si el lote
+    anterior agrupó a varios escritores: sin concurrencia, la espera solo
+    agregaría latencia. `escribir` no retorna hasta que el contenido está en
+    disco, por lo que la garantía de durabilidad para el llamador no cambia.
+    """
+
+    def __init__(self, ventana_segundos: float):
+        """Inicializa el agrupador.
+
+        Args:
+            ventana_segundos (float): Tiempo que el líder espera para acumular
+                escrituras cuando hay concurrencia. Con 0, cada escritura se
+                confirma de inmediato, sin agrupar.
+        """
+        self.ventana_segundos = ventana_segundos
+        self._condicion = threading.Condition()
+        # Serializa la fase de escritura para que los lotes lleguen a disco
+        # en el mismo orden en que se formaron.
+        self._lock_escritura = threading.Lock()
+        self._pendientes: Dict[str, bytes] = {}
+        self._lote_abierto = 0
+        self._lote_confirmado = -1
+        self._hay_lider = False
+        # Escritores registrados en el lote abierto.
+        self._escritores = 0
+        # Si el último lote confirmado agrupó a más de un escritor.
+        self._hubo_concurrencia = False
+        # lote -> (error, escritores que todavía no lo leyeron)
+        self._errores: Dict[int, Tuple[BaseException, int]] = {}
+
+    def escribir(self, ruta_archivo: str, contenido: bytes) -> None:
+        """Registra una escritura y espera a que el lote que la contiene se confirme.
+
+        Args:
+            ruta_archivo (str): Ruta del archivo destino.
+            contenido (bytes): Contenido completo del nuevo archivo.
+
+        Raises:
+            OSError: Si la escritura del lote falló.
+        """
+        if self.ventana_segundos <= 0:
+            with self._lock_escritura:
+                escribir_atomico(ruta_archivo, contenido)
+            return
+
+        with self._condicion:
+            self._pendientes[ruta_archivo] = contenido
+            self._escritores += 1
+            lote = self._lote_abierto
+            if self._hay_lider:
+                while self._lote_confirmado < lote:
+                    self._condicion.wait()
+                self._lanzar_error(lote)
+                return
+            self._hay_lider = True
+            esperar = self._hubo_concurrencia
+
+        if esperar:
+            time.sleep(self.ventana_segundos)
+        self._confirmar_lote(lote)
+        self._lanzar_error(lote)
+
+    def _confirmar_lote(self, lote: int) -> None:
+        """Escribe todas las escrituras acumuladas y despierta a los hilos en espera."""
+        error: Optional[BaseException] = None
+        with self._lock_escritura:
+            with self._condicion:
+                pendientes, self._pendientes = self._pendientes, {}
+                escritores, self._escritores = self._escritores, 0
+                self._hubo_concurrencia = escritores > 1
+                self._lote_abierto += 1
+                self._hay_lider = False
+            try:
+                for ruta, contenido in pendientes.items():
+                    escribir_atomico(ruta, contenido)
+            except BaseException as e:
+                error = e
+
+        with self._condicion:
+            if error is not None:
+                self._errores[lote] = (error, escritores)
+            self._lote_confirmado = lote
+            self._condicion.notify_all()
+
+    def _lanzar_error(self, lote: int) -> None:
+        """Propaga al llamador el error ocurrido al confirmar su lote, si lo hubo.
+
+        El error se descarta cuando lo leyó el último escritor del lote.
+        """
+        with self._condicion:
+            registro = self._errores.get(lote)
+            if registro is None:
+                return
+            error, restantes = registro
+            if restantes > 1:
+                self._errores[lote] = (error, restantes - 1)
+            else:
+                del self._errores[lote]
+        raise error
@@ -0,0 +1,273 @@
+"""Historial de Precios en Memoria con Buffers Circulares por Ticker.
+
+Cada actualización de cotizaciones sobrescribe `cotizaciones.json`, por lo que
+los precios anteriores se pierden. Este módulo conserva, para cada ticker, las
+últimas N observaciones `(timestamp, precio, volumen)` en un buffer circular
+de tamaño fijo, respaldado por arreglos `array('d')`:
+
+-   Agregar una observación es O(1) y no reserva memoria nueva: al llenarse,
+    cada observación reemplaza a la más antigua.
+-   Las consultas por ventana de tiempo usan búsqueda binaria sobre los
+    timestamps (que llegan en orden), en O(log N) más el tamaño del resultado.
+
+Con esto se pueden calcular sparklines y variaciones de 1h/24h locales, o
+reproducir precios para el motor, sin nuevas llamadas a las APIs externas.
+Opcionalmente, el historial se persiste como instantánea binaria (ver
+`instantanea_binaria`) para sobrevivir a los reinicios. Como cada guardado
+reescribe el historial completo, se guarda cada
+`config.INTERVALO_GUARDADO_HISTORIAL_PRECIOS_S` segundos y al cerrar el
+proceso, no con cada actualización.
+
+Los precios se guardan como `float`: alcanzan para gráficos y variaciones,
+pero no reemplazan a las cotizaciones `Decimal` usadas para operar.
+"""
+
+import atexit
+import threading
+import time
+from array import array
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from backend.acceso_datos.instantanea_binaria import TIPO_HISTORIAL_PRECIOS, cargar_instantanea, guardar_instantanea
+import config
+
+Observacion = Tuple[float, float, float]
+
+
+class BufferCircular:
+    """Buffer circular de observaciones `(timestamp, precio, volumen)` de un ticker.
+
+    Las escrituras y las lecturas toman `_lock`: un hilo puede consultar el
+    buffer mientras otro registra observaciones.
+    """
+
+    __slots__ = ("capacidad", "_timestamps", "_precios", "_volumenes", "_inicio", "_cantidad", "_lock")
+
+    def __init__(self, capacidad: int):
+        if capacidad <= 0:
+            raise ValueError("La capacidad del buffer debe ser positiva.")
+        self.capacidad = capacidad
+        self._timestamps = array("d", bytes(8 * capacidad))
+        self._precios = array("d", bytes(8 * capacidad))
+        self._volumenes = array("d", bytes(8 * capacidad))
+        self._inicio = 0
+        self._cantidad = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return self._cantidad
+
+    def _posicion(self, indice: int) -> int:
+        """Convierte un índice lógico (0 = más antigua) en una posición del arreglo."""
+        return (self._inicio + indice) % self.capacidad
+
+    def agregar(self, timestamp: float, precio: float, volumen: float = 0.0) -> None:
+        """Agrega una observación, descartando la más antigua si el buffer está lleno.
+
+        Las observaciones con un timestamp anterior al de la última se ignoran,
+        para mantener el orden que requieren las búsquedas por ventana.
+        """
+        with self._lock:
+            if self._cantidad and timestamp < self._timestamps[self._posicion(self._cantidad - 1)]:
+                return
+            if self._cantidad < self.capacidad:
+                posicion = self._posicion(self._cantidad)
+                self._cantidad += 1
+            else:
+                posicion = self._inicio
+                self._inicio = (self._inicio + 1) % self.capacidad
+            self._timestamps[posicion] = timestamp
+            self._precios[posicion] = precio
+            self._volumenes[posicion] = volumen
+
+    def _observacion(self, indice: int) -> Observacion:
+        posicion = self._posicion(indice)
+        return self._timestamps[posicion], self._precios[posicion], self._volumenes[posicion]
+
+    def _primer_indice_desde(self, timestamp: float) -> int:
+        """Índice lógico de la primera observación con timestamp >= `timestamp`."""
+        bajo, alto = 0, self._cantidad
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if self._timestamps[self._posicion(medio)] < timestamp:
+                bajo = medio + 1
+            else:
+                alto = medio
+        return bajo
+
+    def ultima(self) -> Optional[Observacion]:
+        """Devuelve la observación más reciente, o None si el buffer está vacío."""
+        with self._lock:
+            return self._observacion(self._cantidad - 1) if self._cantidad else None
+
+    def ultimas(self, cantidad: int) -> List[Observacion]:
+        """Devuelve las últimas `cantidad` observaciones, de la más antigua a la más reciente."""
+        with self._lock:
+            inicio = max(0, self._cantidad - cantidad)
+            return [self._observacion(i) for i in range(inicio, self._cantidad)]
+
+    def ventana(self, desde: float, hasta: Optional[float] = None) -> List[Observacion]:
+        """Devuelve las observaciones con timestamp en `[desde, hasta)`, en orden cronológico."""
+        with self._lock:
+            inicio = self._primer_indice_desde(desde)
+            fin = self._cantidad if hasta is None else self._primer_indice_desde(hasta)
+            return [self._observacion(i) for i in range(inicio, fin)]
+
+    def precio_en(self, timestamp: float) -> Optional[float]:
+        """Devuelve el último precio observado en o antes de `timestamp`."""
+        with self._lock:
+            indice = self._primer_indice_desde(timestamp)
+            if indice < self._cantidad and self._timestamps[self._posicion(indice)] == timestamp:
+                return self._precios[self._posicion(indice)]
+            return self._precios[self._posicion(indice - 1)] if indice > 0 else None
+
+    def variacion_porcentual(self, segundos: float, ahora: Optional[float] = None) -> Optional[float]:
+        """Variación porcentual del precio en los últimos `segundos`.
+
+        Returns:
+            Optional[float]: La variación, o None si el historial no cubre el
+                             período o el precio de referencia es cero.
+        """
+        with self._lock:
+            ultima = self.ultima()
+            if ultima is None:
+                return None
+            referencia = self.precio_en((ahora if ahora is not None else ultima[0]) - segundos)
+        if not referencia:
+            return None
+        return (ultima[1] - referencia) / referencia * 100
+
+    def exportar(self) -> List[List[float]]:
+        """Devuelve las observaciones en orden cronológico como tres listas paralelas."""
+        with self._lock:
+            observaciones = self.ultimas(self._cantidad)
+        return [[o[0] for o in observaciones], [o[1] for o in observaciones], [o[2] for o in observaciones]]
+
+
+class HistorialPrecios:
+    """Conjunto de buffers circulares, uno por ticker."""
+
+    def __init__(
+        self,
+        capacidad: int,
+        ruta_archivo: Optional[str] = None,
+        intervalo_guardado: float = 0.0,
+        reloj=time.monotonic,
+    ):
+        """Inicializa el historial.
+
+        Args:
+            capacidad (int): Cantidad de observaciones que se conservan por ticker.
+            ruta_archivo (Optional[str]): Si se indica, el historial se carga
+                desde esa instantánea, `guardar` la sobrescribe y se guarda
+                al cerrar el proceso.
+            intervalo_guardado (float): Segundos mínimos entre dos guardados
+                de `guardar_periodico`.
+            reloj: Función que devuelve el tiempo actual en segundos.
+        """
+        self.capacidad = capacidad
+        self.ruta_archivo = ruta_archivo
+        self.intervalo_guardado = intervalo_guardado
+        self._reloj = reloj
+        self._buffers: Dict[str, BufferCircular] = {}
+        self._lock = threading.Lock()
+        self._pendiente = False
+        self._ultimo_guardado = reloj()
+        if ruta_archivo:
+            self._cargar()
+            atexit.register(self.guardar)
+
+    def buffer(self, ticker: str) -> Optional[BufferCircular]:
+        """Devuelve el buffer de un ticker, o None si no tiene observaciones."""
+        return self._buffers.get(ticker.upper())
+
+    def registrar(self, ticker: str, timestamp: float, precio: Any, volumen: Any = 0) -> None:
+        """Agrega una observación al buffer de un ticker, creándolo si no existe."""
+        ticker = ticker.upper()
+        with self._lock:
+            buffer = self._buffers.get(ticker)
+            if buffer is None:
+                buffer = self._buffers[ticker] = BufferCircular(self.capacidad)
+            buffer.agregar(timestamp, float(precio or 0), float(volumen or 0))
+            self._pendiente = True
+
+    def registrar_cotizaciones(self, cotizaciones: Iterable[Dict[str, Any]], timestamp: Optional[float] = None) -> None:
+        """Agrega una observación por cada cotización de una actualización.
+
+        Args:
+            cotizaciones (Iterable[Dict[str, Any]]): Cotizaciones con el formato
+                interno (`ticker`, `precio_usd`, `volumen_24h`).
+            timestamp (Optional[float]): Momento de la actualización (epoch en
+                segundos). Por defecto, el actual.
+        """
+        momento = time.time() if timestamp is None else timestamp
+        for cotizacion in cotizaciones:
+            ticker = cotizacion.get("ticker")
+            if not ticker or "precio_usd" not in cotizacion:
+                continue
+            try:
+                self.registrar(ticker, momento, Decimal(str(cotizacion["precio_usd"])), Decimal(str(cotizacion.get("volumen_24h") or 0)))
+            except (ArithmeticError, ValueError):
+                continue
+
+    # --- Persistencia ---
+
+    def guardar_periodico(self) -> None:
+        """Persiste el historial si pasaron `intervalo_guardado` segundos desde el último guardado."""
+        if self._reloj() - self._ultimo_guardado >= self.intervalo_guardado:
+            self.guardar()
+
+    def guardar(self) -> None:
+        """Persiste el historial en `ruta_archivo` (si se configuró una y hubo observaciones nuevas)."""
+        if not self.ruta_archivo:
+            return
+        with self._lock:
+            if not self._pendiente:
+                return
+            self._pendiente = False
+            self._ultimo_guardado = self._reloj()
+            documento = {
+                "capacidad": self.capacidad,
+                "tickers": {ticker: buffer.exportar() for ticker, buffer in self._buffers.items()},
+            }
+        try:
+            guardar_instantanea(documento, self.ruta_archivo, TIPO_HISTORIAL_PRECIOS)
+        except OSError as e:
+            print(f"Advertencia: No se pudo guardar el historial de precios en '{self.ruta_archivo}'. Error: {e}")
+
+    def _cargar(self) -> None:
+        documento = cargar_instantanea(self.ruta_archivo, TIPO_HISTORIAL_PRECIOS)
+        if not isinstance(documento, dict):
+            return
+        try:
+            for ticker, (timestamps, precios, volumenes) in documento.get("tickers", {}).items():
+                buffer = self._buffers[ticker] = BufferCircular(self.capacidad)
+                # Si la capacidad se redujo, se conservan las observaciones más recientes.
+                for observacion in list(zip(timestamps, precios, volumenes))[-self.capacidad:]:
+                    buffer.agregar(*observacion)
+        except (AttributeError, TypeError, ValueError) as e:
+            # Un documento con otra estructura no debe impedir el arranque.
+            print(f"Advertencia: El historial de precios en '{self.ruta_archivo}' no es válido; se inicia vacío. Error: {e}")
+            self._buffers = {}
+
+
+_historial: Optional[HistorialPrecios] = None
+_lock_historial = threading.Lock()
+
+
+def obtener_historial_precios() -> HistorialPrecios:
+    """Devuelve el historial de precios del proceso, creándolo la primera vez.
+
+    Si `config.PERSISTIR_HISTORIAL_PRECIOS` está activo, se carga desde
+    `config.HISTORIAL_PRECIOS_PATH` y se guarda allí cada
+    `config.INTERVALO_GUARDADO_HISTORIAL_PRECIOS_S` segundos.
+    """
+    global _historial
+    with _lock_historial:
+        if _historial is None:
+            ruta = config.HISTORIAL_PRECIOS_PATH if config.PERSISTIR_HISTORIAL_PRECIOS else None
+            _historial = HistorialPrecios(
+                config.CAPACIDAD_HISTORIAL_PRECIOS, ruta, config.INTERVALO_GUARDADO_HISTORIAL_PRECIOS_S
+            )
+        return _historial
@@ -0,0 +1,126 @@
+"""Índice de Metadatos de Tickers Compartido por los Servicios.
+
+Varios servicios necesitan, para cada ticker, su nombre, su logo y su precio:
+el estado de la billetera, el listado de comisiones y la creación de un
+activo nuevo en la billetera durante una ejecución. En lugar de que cada uno
+reconstruya un diccionario `{ticker: cotización}` a partir de todas las
+cotizaciones en cada llamada, este módulo construye un único índice por cada
+instantánea de precios (ver `datos_cotizaciones.InstantaneaPrecios`) y lo
+comparte.
+
+El índice se reconstruye solo cuando cambia la versión de la instantánea, es
+decir, una vez por cada actualización de cotizaciones. También centraliza los
+datos canónicos de la moneda fiat (Tether), que no siempre vienen en las
+cotizaciones.
+"""
+
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Dict, Iterator, NamedTuple, Optional
+
+from backend.acceso_datos.datos_cotizaciones import InstantaneaPrecios, obtener_instantanea_precios
+import config
+
+# Datos canónicos de la moneda fiat, que prevalecen sobre los de las cotizaciones.
+NOMBRE_FIAT = "Tether"
+LOGO_FIAT = "https://assets.coingecko.com/coins/images/325/large/Tether.png?1696501661"
+
+
+class InfoTicker(NamedTuple):
+    """Metadatos de un ticker.
+
+    Attributes:
+        slot (int): Posición fija del ticker en el índice, útil para guardar
+            datos por ticker en listas en lugar de diccionarios.
+        ticker (str): El ticker en mayúsculas.
+        nombre (str): Nombre del activo.
+        logo (str): URL del logo (vacía si no se conoce).
+        precision (Decimal): Precisión estándar de sus cantidades.
+        precio (Optional[Decimal]): Último precio en USD, o None si no cotiza.
+    """
+
+    slot: int
+    ticker: str
+    nombre: str
+    logo: str
+    precision: Decimal
+    precio: Optional[Decimal]
+
+
+class IndiceTickers:
+    """Índice inmutable de metadatos, construido a partir de una instantánea de precios."""
+
+    __slots__ = ("version", "_por_ticker")
+
+    def __init__(self, instantanea: InstantaneaPrecios):
+        """Construye el índice.
+
+        Args:
+            instantanea (InstantaneaPrecios): Instantánea de la que se toman las
+                cotizaciones; el índice hereda su versión.
+        """
+        por_ticker: Dict[str, InfoTicker] = {}
+        for ticker, cotizacion in instantanea.cotizaciones.items():
+            por_ticker[ticker] = InfoTicker(
+                slot=len(por_ticker),
+                ticker=ticker,
+                nombre=cotizacion.get("nombre") or ticker,
+                logo=cotizacion.get("logo") or "",
+                precision=config.PRECISION_CRIPTOMONEDA,
+                precio=instantanea.precios.get(ticker),
+            )
+
+        fiat = config.MONEDA_FIAT_DEFAULT
+        slot_fiat = por_ticker[fiat].slot if fiat in por_ticker else len(por_ticker)
+        por_ticker[fiat] = InfoTicker(
+            slot=slot_fiat,
+            ticker=fiat,
+            nombre=NOMBRE_FIAT,
+            logo=LOGO_FIAT,
+            precision=config.PRECISION_USD,
+            precio=instantanea.precios.get(fiat, Decimal("1")),
+        )
+
+        self.version = instantanea.version
+        self._por_ticker = MappingProxyType(por_ticker)
+
+    def obtener(self, ticker: Optional[str]) -> Optional[InfoTicker]:
+        """Devuelve los metadatos de un ticker, o None si no está en el índice (o está vacío)."""
+        return self._por_ticker.get(ticker.upper()) if ticker else None
+
+    def info(self, ticker: Optional[str]) -> InfoTicker:
+        """Devuelve los metadatos de un ticker, con datos mínimos si no está en el índice."""
+        info = self.obtener(ticker)
+        if info is None:
+            return InfoTicker(-1, ticker, ticker, "", config.PRECISION_CRIPTOMONEDA, None)
+        return info
+
+    def __contains__(self, ticker: Optional[str]) -> bool:
+        return bool(ticker) and ticker.upper() in self._por_ticker
+
+    def __iter__(self) -> Iterator[InfoTicker]:
+        return iter(self._por_ticker.values())
+
+    def __len__(self) -> int:
+        return len(self._por_ticker)
+
+
+# Último índice construido. Se reemplaza completo, igual que la instantánea.
+_indice: Optional[IndiceTickers] = None
+
+
+def obtener_indice_tickers(ruta_cotizaciones: Optional[str] = None) -> IndiceTickers:
+    """Devuelve el índice de tickers de la instantánea de precios vigente.
+
+    Args:
+        ruta_cotizaciones (Optional[str]): Ver `obtener_instantanea_precios`.
+
+    Returns:
+        IndiceTickers: El índice, reconstruido solo si la instantánea cambió.
+    """
+    global _indice
+    instantanea = obtener_instantanea_precios(ruta_cotizaciones)
+    indice = _indice
+    if indice is None or indice.version != instantanea.version:
+        indice = _indice = IndiceTickers(instantanea)
+    return indice
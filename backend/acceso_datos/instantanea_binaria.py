@@ -0,0 +1,380 @@
+"""Formato Binario de Instantáneas con Versión de Esquema.
+
+Guardar la billetera o las órdenes como JSON con `indent=4` es lo más lento de
+cada escritura cuando el estado crece. Este módulo define un formato binario
+compacto, basado solo en `struct` de la biblioteca estándar, para guardar
+instantáneas de cualquier documento JSON (billetera, órdenes, cachés
+derivados).
+
+Estructura del archivo:
+
+    cabecera        <4sHBBIII>  firma b"SXIB", versión del esquema, tipo de
+                                documento, reservado, cantidad de textos,
+                                bytes de textos y cantidad de nodos
+    largos          <nI>        largo en bytes de cada texto
+    textos          bytes       los textos en UTF-8, uno tras otro
+    etiquetas       bytes       una etiqueta por nodo (ver `_ETIQUETAS`)
+    operandos       struct      el operando de cada nodo que lo necesita
+    crc32           <I>         suma de verificación de todo lo anterior
+
+El documento se recorre en preorden: cada lista o diccionario es un nodo con
+su cantidad de elementos, seguido de sus elementos (en los diccionarios,
+clave y valor). Los textos se guardan una sola vez en una tabla y los nodos
+los referencian por posición, por lo que las claves y los valores repetidos
+(tickers, estados, nombres de campo) ocupan cuatro bytes cada vez.
+
+Todos los operandos se empaquetan y desempaquetan con una única llamada a
+`struct`, con un formato construido a partir de las etiquetas.
+
+Las instantáneas no reemplazan al JSON: `exportar_json` e `importar_json`
+convierten en ambas direcciones. Con `config.INSTANTANEAS_BINARIAS` activo,
+el driver JSON guarda la billetera y las órdenes en este formato (ver
+`serializar_documento`).
+"""
+
+import json
+import struct
+import sys
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.acceso_datos.escritura_atomica import escribir_atomico
+
+FIRMA = b"SXIB"
+VERSION_ESQUEMA = 1
+# Los archivos con esta extensión son instantáneas; los demás, JSON.
+EXTENSION_INSTANTANEA = ".bin"
+
+# Tipos de documento registrados en la cabecera.
+TIPO_GENERICO = 0
+TIPO_BILLETERA = 1
+TIPO_ORDENES = 2
+TIPO_HISTORIAL_PRECIOS = 3
+
+# Nombres de los tipos para la línea de comandos.
+TIPOS_POR_NOMBRE = {
+    "generico": TIPO_GENERICO,
+    "billetera": TIPO_BILLETERA,
+    "ordenes": TIPO_ORDENES,
+    "historial-precios": TIPO_HISTORIAL_PRECIOS,
+}
+
+_CABECERA = struct.Struct("<4sHBBIII")
+_CRC = struct.Struct("<I")
+
+# Etiqueta de cada nodo -> formato de su operando en `struct` ("" si no tiene).
+_NULO, _FALSO, _VERDADERO, _ENTERO, _REAL, _TEXTO, _LISTA, _DICCIONARIO = b"nftirslo"
+_ETIQUETAS = {
+    _NULO: "",
+    _FALSO: "",
+    _VERDADERO: "",
+    _ENTERO: "q",
+    _REAL: "d",
+    _TEXTO: "I",
+    _LISTA: "I",
+    _DICCIONARIO: "I",
+}
+_ETIQUETAS_SIN_OPERANDO = bytes(e for e, f in _ETIQUETAS.items() if not f)
+_FORMATO_POR_ETIQUETA = bytes.maketrans(
+    bytes(e for e, f in _ETIQUETAS.items() if f),
+    b"".join(f.encode("ascii") for f in _ETIQUETAS.values() if f),
+)
+
+_MIN_ENTERO = -(2 ** 63)
+_MAX_ENTERO = 2 ** 63 - 1
+
+
+class _Codificador:
+    """Aplana un documento JSON en etiquetas, operandos y una tabla de textos."""
+
+    def __init__(self):
+        self.etiquetas = bytearray()
+        self.operandos: List[Any] = []
+        self.textos: List[bytes] = []
+        self._indices: Dict[str, int] = {}
+
+    def _texto(self, texto: str) -> int:
+        indice = self._indices.get(texto)
+        if indice is None:
+            indice = self._indices[texto] = len(self.textos)
+            self.textos.append(texto.encode("utf-8"))
+        return indice
+
+    def agregar(self, valor: Any) -> None:
+        if valor is None:
+            self.etiquetas.append(_NULO)
+        elif valor is True:
+            self.etiquetas.append(_VERDADERO)
+        elif valor is False:
+            self.etiquetas.append(_FALSO)
+        elif isinstance(valor, str):
+            self.etiquetas.append(_TEXTO)
+            self.operandos.append(self._texto(valor))
+        elif isinstance(valor, int) and _MIN_ENTERO <= valor <= _MAX_ENTERO:
+            self.etiquetas.append(_ENTERO)
+            self.operandos.append(valor)
+        elif isinstance(valor, float):
+            self.etiquetas.append(_REAL)
+            self.operandos.append(valor)
+        elif isinstance(valor, dict):
+            self.etiquetas.append(_DICCIONARIO)
+            self.operandos.append(len(valor))
+            for clave, elemento in valor.items():
+                self.etiquetas.append(_TEXTO)
+                self.operandos.append(self._texto(str(clave)))
+                self.agregar(elemento)
+        elif isinstance(valor, (list, tuple)):
+            self.etiquetas.append(_LISTA)
+            self.operandos.append(len(valor))
+            for elemento in valor:
+                self.agregar(elemento)
+        else:
+            # Enteros fuera de rango, Decimal, etc.: no tienen representación.
+            raise TypeError(f"Tipo no soportado en una instantánea: {type(valor).__name__}")
+
+
+def codificar(documento: Any, tipo: int = TIPO_GENERICO) -> bytes:
+    """Codifica un documento JSON en el formato binario de instantáneas.
+
+    Args:
+        documento (Any): Un valor compuesto de diccionarios, listas, textos,
+                         enteros de 64 bits, reales, booleanos y None.
+        tipo (int): Tipo de documento a registrar en la cabecera.
+
+    Returns:
+        bytes: La instantánea codificada.
+
+    Raises:
+        TypeError: Si el documento contiene un valor no representable.
+    """
+    codificador = _Codificador()
+    codificador.agregar(documento)
+
+    textos = b"".join(codificador.textos)
+    formato = "<" + codificador.etiquetas.translate(_FORMATO_POR_ETIQUETA, _ETIQUETAS_SIN_OPERANDO).decode("ascii")
+    contenido = b"".join((
+        _CABECERA.pack(FIRMA, VERSION_ESQUEMA, tipo, 0, len(codificador.textos), len(textos), len(codificador.etiquetas)),
+        struct.pack(f"<{len(codificador.textos)}I", *map(len, codificador.textos)),
+        textos,
+        bytes(codificador.etiquetas),
+        struct.pack(formato, *codificador.operandos),
+    ))
+    return contenido + _CRC.pack(zlib.crc32(contenido))
+
+
+def decodificar(datos: bytes) -> Tuple[int, Any]:
+    """Decodifica una instantánea.
+
+    Args:
+        datos (bytes): El contenido completo del archivo.
+
+    Returns:
+        Tuple[int, Any]: El tipo de documento y el documento.
+
+    Raises:
+        ValueError: Si la firma, la versión o la suma de verificación no son
+                    válidas, o si el contenido está truncado.
+    """
+    if len(datos) < _CABECERA.size + _CRC.size or datos[:4] != FIRMA:
+        raise ValueError("El contenido no es una instantánea binaria.")
+    contenido, (crc,) = datos[:-_CRC.size], _CRC.unpack_from(datos, len(datos) - _CRC.size)
+    if zlib.crc32(contenido) != crc:
+        raise ValueError("La instantánea está dañada (suma de verificación incorrecta).")
+
+    _, version, tipo, _, cantidad_textos, bytes_textos, cantidad_nodos = _CABECERA.unpack_from(contenido)
+    if version != VERSION_ESQUEMA:
+        raise ValueError(f"Versión de esquema de instantánea no soportada: {version}.")
+
+    try:
+        posicion = _CABECERA.size
+        largos = struct.unpack_from(f"<{cantidad_textos}I", contenido, posicion)
+        posicion += 4 * cantidad_textos
+        bloque = contenido[posicion:posicion + bytes_textos]
+        textos = []
+        inicio = 0
+        for largo in largos:
+            textos.append(bloque[inicio:inicio + largo].decode("utf-8"))
+            inicio += largo
+        posicion += bytes_textos
+        etiquetas = contenido[posicion:posicion + cantidad_nodos]
+        posicion += cantidad_nodos
+        formato = "<" + etiquetas.translate(_FORMATO_POR_ETIQUETA, _ETIQUETAS_SIN_OPERANDO).decode("ascii")
+        operandos = struct.unpack_from(formato, contenido, posicion)
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ValueError(f"La instantánea está truncada o mal formada: {e}") from e
+
+    return tipo, _reconstruir(etiquetas, operandos, textos)
+
+
+def _reconstruir(etiquetas: bytes, operandos: Tuple[Any, ...], textos: List[str]) -> Any:
+    """Reconstruye el documento a partir de sus nodos en preorden."""
+    nodos = iter(etiquetas)
+    valores = iter(operandos)
+
+    def leer() -> Any:
+        etiqueta = next(nodos)
+        if etiqueta == _TEXTO:
+            return textos[next(valores)]
+        if etiqueta == _DICCIONARIO:
+            resultado = {}
+            for _ in range(next(valores)):
+                next(nodos)  # la clave siempre es un texto
+                clave = textos[next(valores)]
+                resultado[clave] = leer()
+            return resultado
+        if etiqueta == _LISTA:
+            return [leer() for _ in range(next(valores))]
+        if etiqueta in (_ENTERO, _REAL):
+            return next(valores)
+        if etiqueta == _NULO:
+            return None
+        if etiqueta == _VERDADERO:
+            return True
+        if etiqueta == _FALSO:
+            return False
+        raise ValueError(f"Etiqueta de nodo desconocida: {etiqueta!r}")
+
+    try:
+        return leer()
+    except StopIteration as e:
+        raise ValueError("La instantánea está truncada o mal formada.") from e
+
+
+# --- Lectura y escritura de archivos ---
+
+def guardar_instantanea(documento: Any, ruta_archivo: str, tipo: int = TIPO_GENERICO) -> None:
+    """Guarda un documento como instantánea binaria, de forma atómica."""
+    escribir_atomico(ruta_archivo, codificar(documento, tipo))
+
+
+def leer_instantanea(ruta_archivo: str, tipo: Optional[int] = None) -> Optional[Any]:
+    """Lee el documento de una instantánea binaria.
+
+    Args:
+        ruta_archivo (str): Ruta de la instantánea.
+        tipo (Optional[int]): Si se indica, el tipo de documento esperado.
+
+    Returns:
+        Optional[Any]: El documento, o None si el archivo no existe o está vacío.
+
+    Raises:
+        OSError: Si el archivo no puede leerse.
+        ValueError: Si la instantánea no es válida o es de otro tipo.
+    """
+    try:
+        with open(ruta_archivo, "rb") as f:
+            datos = f.read()
+    except FileNotFoundError:
+        return None
+    if not datos:
+        return None
+    tipo_leido, documento = decodificar(datos)
+    if tipo is not None and tipo_leido != tipo:
+        raise ValueError(f"La instantánea no es del tipo esperado ({tipo_leido} != {tipo}).")
+    return documento
+
+
+def cargar_instantanea(ruta_archivo: str, tipo: Optional[int] = None) -> Optional[Any]:
+    """Carga el documento de una instantánea binaria.
+
+    Args:
+        ruta_archivo (str): Ruta de la instantánea.
+        tipo (Optional[int]): Si se indica, el tipo de documento esperado.
+
+    Returns:
+        Optional[Any]: El documento, o None si el archivo no existe, está
+                       dañado o es de otro tipo.
+    """
+    try:
+        return leer_instantanea(ruta_archivo, tipo)
+    except (OSError, ValueError) as e:
+        print(f"Advertencia: No se pudo leer la instantánea '{ruta_archivo}'. Error: {e}")
+        return None
+
+
+def es_instantanea(ruta_archivo: str) -> bool:
+    """Indica si un archivo se guarda como instantánea binaria (por su extensión)."""
+    return ruta_archivo.endswith(EXTENSION_INSTANTANEA)
+
+
+def serializar_documento(documento: Any, ruta_archivo: str, tipo: int = TIPO_GENERICO) -> bytes:
+    """Serializa un documento en el formato de su archivo.
+
+    Args:
+        documento (Any): El documento a guardar.
+        ruta_archivo (str): Ruta de destino; decide el formato (ver `es_instantanea`).
+        tipo (int): Tipo de documento, si se guarda como instantánea.
+
+    Returns:
+        bytes: Una instantánea binaria, o JSON legible con `indent=4`.
+    """
+    if es_instantanea(ruta_archivo):
+        return codificar(documento, tipo)
+    return json.dumps(documento, indent=4).encode("utf-8")
+
+
+# --- Conversión desde y hacia JSON ---
+
+def exportar_json(ruta_instantanea: str, ruta_json: str) -> None:
+    """Convierte una instantánea binaria en un archivo JSON legible.
+
+    Raises:
+        ValueError: Si la instantánea no existe o no es válida.
+    """
+    documento = cargar_instantanea(ruta_instantanea)
+    if documento is None:
+        raise ValueError(f"No hay una instantánea válida en '{ruta_instantanea}'.")
+    escribir_atomico(ruta_json, json.dumps(documento, indent=4).encode("utf-8"))
+
+
+def inferir_tipo(documento: Any) -> int:
+    """Deduce el tipo de un documento por su forma.
+
+    Returns:
+        int: `TIPO_BILLETERA` para un diccionario de activos con saldos,
+             `TIPO_ORDENES` para una lista de órdenes y `TIPO_GENERICO` en
+             cualquier otro caso.
+    """
+    if isinstance(documento, dict) and documento and all(
+        isinstance(activo, dict) and "saldos" in activo for activo in documento.values()
+    ):
+        return TIPO_BILLETERA
+    if isinstance(documento, list) and documento and all(
+        isinstance(orden, dict) and "id_orden" in orden for orden in documento
+    ):
+        return TIPO_ORDENES
+    return TIPO_GENERICO
+
+
+def importar_json(ruta_json: str, ruta_instantanea: str, tipo: Optional[int] = None) -> None:
+    """Convierte un archivo JSON en una instantánea binaria.
+
+    Args:
+        ruta_json (str): Archivo JSON de origen.
+        ruta_instantanea (str): Instantánea de destino.
+        tipo (Optional[int]): Tipo de documento a registrar. Si es None, se
+                              deduce del documento (ver `inferir_tipo`).
+    """
+    with open(ruta_json, "r", encoding="utf-8") as f:
+        documento = json.load(f)
+    guardar_instantanea(documento, ruta_instantanea, inferir_tipo(documento) if tipo is None else tipo)
+
+
+if __name__ == "__main__":
+    _USO = (
+        "Uso: python -m backend.acceso_datos.instantanea_binaria {a-json|desde-json} ORIGEN DESTINO "
+        f"[{'|'.join(TIPOS_POR_NOMBRE)}]"
+    )
+    # El tipo solo se usa con desde-json; si se omite, se deduce del documento.
+    if (
+        len(sys.argv) not in (4, 5)
+        or sys.argv[1] not in ("a-json", "desde-json")
+        or (len(sys.argv) == 5 and (sys.argv[1] != "desde-json" or sys.argv[4] not in TIPOS_POR_NOMBRE))
+    ):
+        print(_USO)
+        sys.exit(2)
+    if sys.argv[1] == "a-json":
+        exportar_json(sys.argv[2], sys.argv[3])
+    else:
+        importar_json(sys.argv[2], sys.argv[3], TIPOS_POR_NOMBRE[sys.argv[4]] if len(sys.argv) == 5 else None)
+    print(f"✅ '{sys.argv[2]}' convertido en '{sys.argv[3]}'.")
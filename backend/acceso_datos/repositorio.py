@@ -0,0 +1,212 @@
+"""Interfaz de Repositorio para la Capa de Persistencia.
+
+Este módulo define el contrato que debe cumplir cualquier mecanismo de
+almacenamiento del simulador (billetera, órdenes, historial, comisiones y
+cotizaciones) y la fábrica que devuelve el driver configurado.
+
+Los drivers trabajan exclusivamente con datos ya serializados (diccionarios y
+listas con valores `str`, listos para JSON). La conversión a `Decimal`, la
+cuantización y las reglas de negocio (ej. crear la billetera inicial) siguen
+siendo responsabilidad de los módulos `datos_*`, que son los únicos que
+interactúan con el repositorio.
+
+Drivers disponibles (seleccionados con `config.BACKEND_ALMACENAMIENTO`):
+-   `json`: Archivos JSON/JSONL en las rutas de `config.py` (por defecto).
+-   `sqlite`: Una base SQLite en modo WAL en `config.SQLITE_PATH`.
+
+Con `config.ESTADO_EN_MEMORIA` activo, el driver elegido se envuelve en
+`RepositorioEnMemoria`, que sirve las lecturas desde memoria y difiere las
+escrituras (ver `repositorio_memoria`).
+
+El parámetro `ruta_archivo` que aceptan los métodos es un localizador propio
+del driver JSON (permite apuntar a archivos aislados, por ejemplo en pruebas).
+El driver SQLite lo ignora: todo su estado vive en una única base de datos.
+
+Las escrituras que deben confirmarse juntas (ej. la ejecución de una orden,
+que modifica comisiones, historial, billetera y órdenes) se agrupan con el
+context manager `transaccion()`.
+"""
+
+import itertools
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, Iterator, List, Optional
+
+import config
+
+BACKEND_JSON = "json"
+BACKEND_SQLITE = "sqlite"
+
+# Generaciones de las órdenes, únicas entre todos los drivers (ver
+# `Repositorio.version_ordenes`). `next` es atómico, así que no requiere un lock.
+_generaciones_ordenes = itertools.count(1)
+
+
+class Repositorio(ABC):
+    """Contrato común para los drivers de almacenamiento."""
+
+    # --- Billetera ---
+
+    @abstractmethod
+    def leer_billetera(self, ruta_archivo: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Devuelve la billetera serializada, o None si no existe o es ilegible."""
+
+    @abstractmethod
+    def escribir_billetera(self, billetera: Dict[str, Any], ruta_archivo: Optional[str] = None) -> None:
+        """Reemplaza la billetera almacenada por la proporcionada."""
+
+    # --- Órdenes ---
+
+    @abstractmethod
+    def leer_ordenes(self, ruta_archivo: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Devuelve todas las órdenes en orden de creación."""
+
+    @abstractmethod
+    def escribir_ordenes(self, ordenes: List[Dict[str, Any]], ruta_archivo: Optional[str] = None) -> None:
+        """Reemplaza la lista completa de órdenes."""
+
+    @abstractmethod
+    def agregar_orden(self, orden: Dict[str, Any], ruta_archivo: Optional[str] = None) -> None:
+        """Añade una orden al final de la lista."""
+
+    # Generación de la última escritura de órdenes confirmada.
+    _generacion_ordenes = 0
+
+    def _ordenes_confirmadas(self) -> None:
+        """Registra que se confirmó una escritura de órdenes (ver `version_ordenes`).
+
+        Los drivers la invocan después de confirmar la escritura, nunca dentro
+        de una transacción en curso: así ningún lector puede asociar la
+        versión nueva a las órdenes anteriores.
+        """
+        self._generacion_ordenes = next(_generaciones_ordenes)
+
+    def version_ordenes(self, ruta_archivo: Optional[str] = None) -> Hashable:
+        """Devuelve un valor que cambia cuando cambian las órdenes almacenadas.
+
+        Returns:
+            Hashable: Un valor comparable con `==`.
+        """
+        return self._generacion_ordenes
+
+    # --- Historial ---
+
+    @abstractmethod
+    def leer_historial(
+        self,
+        ruta_archivo: Optional[str] = None,
+        limite: Optional[int] = None,
+        desplazamiento: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Devuelve una página del historial, de la operación más reciente a la más antigua."""
+
+    @abstractmethod
+    def leer_historial_rango(
+        self,
+        desde: Optional[str] = None,
+        hasta: Optional[str] = None,
+        ruta_archivo: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Devuelve las operaciones con timestamp ISO en `[desde, hasta)`, de la más reciente a la más antigua."""
+
+    @abstractmethod
+    def agregar_operacion(self, operacion: Dict[str, Any], ruta_archivo: Optional[str] = None) -> Dict[str, Any]:
+        """Asigna un ID a la operación, la persiste y la devuelve."""
+
+    # --- Comisiones ---
+
+    @abstractmethod
+    def leer_comisiones(self, ruta_archivo: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Devuelve las comisiones, de la más reciente a la más antigua."""
+
+    @abstractmethod
+    def agregar_comision(self, comision: Dict[str, Any], ruta_archivo: Optional[str] = None) -> Dict[str, Any]:
+        """Asigna un ID a la comisión, la persiste y la devuelve."""
+
+    # --- Cotizaciones ---
+
+    @abstractmethod
+    def leer_cotizaciones(self, ruta_archivo: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Devuelve la lista completa de cotizaciones."""
+
+    @abstractmethod
+    def escribir_cotizaciones(self, cotizaciones: List[Dict[str, Any]], ruta_archivo: Optional[str] = None) -> None:
+        """Reemplaza la lista completa de cotizaciones."""
+
+    # --- Transacciones ---
+
+    @contextmanager
+    def transaccion(self) -> Iterator[None]:
+        """Agrupa las escrituras del bloque para que se confirmen todas o ninguna.
+
+        La implementación por defecto no agrupa nada: cada escritura se
+        confirma por separado. Las transacciones pueden anidarse; solo la más
+        externa confirma.
+        """
+        yield
+
+    def recuperar(self) -> int:
+        """Completa las transacciones confirmadas que no llegaron a aplicarse.
+
+        Returns:
+            int: La cantidad de transacciones recuperadas.
+        """
+        return 0
+
+    def volcar(self) -> None:
+        """Persiste en su destino final las escrituras diferidas por el driver (flush)."""
+
+
+# Instancias de drivers ya creadas, indexadas por (backend, destino).
+_repositorios: Dict[tuple, Repositorio] = {}
+_lock_repositorios = threading.Lock()
+
+
+def obtener_repositorio() -> Repositorio:
+    """Devuelve el driver de almacenamiento seleccionado en la configuración.
+
+    Las instancias se reutilizan mientras la configuración no cambie, de modo
+    que el driver SQLite mantiene sus conexiones abiertas entre peticiones.
+
+    Returns:
+        Repositorio: El driver correspondiente a `config.BACKEND_ALMACENAMIENTO`,
+                     envuelto en el almacén en memoria si está activado.
+
+    Raises:
+        ValueError: Si el backend configurado no es reconocido.
+    """
+    backend = config.BACKEND_ALMACENAMIENTO.lower()
+    clave = (backend, config.SQLITE_PATH if backend == BACKEND_SQLITE else None, config.ESTADO_EN_MEMORIA)
+
+    with _lock_repositorios:
+        if clave not in _repositorios:
+            if backend == BACKEND_JSON:
+                from backend.acceso_datos.repositorio_json import RepositorioJSON
+                repositorio = RepositorioJSON()
+            elif backend == BACKEND_SQLITE:
+                from backend.acceso_datos.repositorio_sqlite import RepositorioSQLite
+                repositorio = RepositorioSQLite(config.SQLITE_PATH)
+            else:
+                raise ValueError(f"Backend de almacenamiento desconocido: '{config.BACKEND_ALMACENAMIENTO}'")
+
+            if config.ESTADO_EN_MEMORIA:
+                from backend.acceso_datos.repositorio_memoria import RepositorioEnMemoria
+                repositorio = RepositorioEnMemoria(repositorio)
+            _repositorios[clave] = repositorio
+        return _repositorios[clave]
+
+
+@contextmanager
+def transaccion() -> Iterator[None]:
+    """Ejecuta el bloque como una única transacción del driver configurado.
+
+    Ejemplo:
+        with transaccion():
+            ejecutar_transaccion(billetera, ...)
+            guardar_billetera(billetera)
+
+    Si el bloque lanza una excepción, ninguna de sus escrituras se confirma.
+    """
+    with obtener_repositorio().transaccion():
+        yield
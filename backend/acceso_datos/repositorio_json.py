@@ -0,0 +1,605 @@
+"""Driver de Almacenamiento basado en Archivos JSON.
+
+Implementa la interfaz `Repositorio` sobre los archivos de `config.py`:
+-   Billetera, órdenes, comisiones y cotizaciones: un archivo JSON cada uno,
+    que se lee y reescribe completo.
+-   Historial: un archivo JSON Lines de solo-anexado (ver `almacen_jsonl`).
+
+El historial y las comisiones conservan en su archivo activo solo el mes en
+curso: al registrar el primer dato de un mes nuevo, los meses anteriores se
+trasladan a segmentos mensuales (ver `archivo_segmentado`).
+
+Es el driver por defecto y conserva el comportamiento "a prueba de fallos"
+original: los archivos inexistentes, vacíos o corruptos se tratan como
+ausencia de datos en lugar de interrumpir la aplicación.
+
+Todas las escrituras de archivos completos son atómicas (ver
+`escritura_atomica`), por lo que un lector concurrente nunca encuentra un
+archivo vacío o a medio escribir. La billetera y las órdenes, que se guardan
+en cada petición de trading, usan además confirmación agrupada.
+
+Dentro de `transaccion()` las escrituras no tocan los archivos: se acumulan y
+al salir del bloque se confirman como una única entrada del diario de
+transacciones (ver `diario_transacciones`), que se aplica a los archivos más
+tarde. Las lecturas combinan el contenido de los archivos con las entradas del
+diario aún no aplicadas, por lo que siempre reflejan el estado confirmado.
+
+Con `config.INSTANTANEAS_BINARIAS` activo, la billetera y las órdenes se
+guardan como instantáneas binarias en `config.INSTANTANEA_BILLETERA_PATH` y
+`config.INSTANTANEA_ORDENES_PATH` (ver `instantanea_binaria`). Mientras una
+instantánea no exista, se lee el archivo JSON correspondiente.
+"""
+
+import atexit
+import copy
+import json
+import os
+import threading
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from backend.acceso_datos import almacen_jsonl
+from backend.acceso_datos.archivo_segmentado import ArchivoSegmentado, filtrar_rango, mes_de_registro
+from backend.acceso_datos.cache_lectura import cache_lectura, firma_archivo
+from backend.acceso_datos.diario_transacciones import (
+    ACCION_ANEXAR,
+    ACCION_INSERTAR_AL_INICIO,
+    ACCION_REEMPLAZAR,
+    SIN_PENDIENTES,
+    DiarioTransacciones,
+)
+from backend.acceso_datos.escritura_atomica import CommitAgrupado, escribir_atomico
+from backend.acceso_datos.instantanea_binaria import (
+    TIPO_BILLETERA,
+    TIPO_ORDENES,
+    es_instantanea,
+    leer_instantanea,
+    serializar_documento,
+)
+from backend.acceso_datos.repositorio import Repositorio
+from backend.acceso_datos.secuencias import obtener_secuencia
+import config
+
+# Serializa la asignación de IDs y la escritura de registros anexados para que
+# dos operaciones simultáneas no obtengan el mismo ID. Es reentrante porque una
+# transacción lo mantiene tomado mientras sus escrituras asignan IDs.
+_lock_escritura = threading.RLock()
+
+NOMBRE_DIARIO = "diario_transacciones.jsonl"
+
+# Diarios abiertos, indexados por ruta. Son compartidos por todas las
+# instancias del driver para que un mismo archivo tenga un único dueño.
+_diarios: Dict[str, DiarioTransacciones] = {}
+_lock_diarios = threading.Lock()
+
+
+def _decodificar_json(ruta_archivo: str) -> Any:
+    """Lee y decodifica un archivo JSON, devolviendo None si no existe o está vacío."""
+    if not os.path.exists(ruta_archivo) or os.path.getsize(ruta_archivo) == 0:
+        return None
+    with open(ruta_archivo, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _leer_json(ruta_archivo: str) -> Any:
+    """Lee un archivo JSON, devolviendo None si no existe o está vacío.
+
+    El resultado decodificado se reutiliza mientras el archivo no cambie (ver
+    `cache_lectura`); cada llamada recibe su propia copia.
+
+    Raises:
+        Exception: Si el archivo existe pero no puede leerse o decodificarse.
+    """
+    return cache_lectura.obtener(ruta_archivo, lambda: _decodificar_json(ruta_archivo))
+
+
+def _serializar_json(datos: Any) -> bytes:
+    """Serializa los datos al formato JSON legible usado en los archivos."""
+    return json.dumps(datos, indent=4).encode("utf-8")
+
+
+def _resolver_ruta_documento(
+    ruta_archivo: Optional[str], ruta_json: str, ruta_instantanea: str
+) -> Tuple[str, Optional[str]]:
+    """Resuelve la ruta de la billetera o las órdenes según `config.INSTANTANEAS_BINARIAS`.
+
+    Args:
+        ruta_archivo (Optional[str]): Ruta pedida por el llamador, o None.
+        ruta_json (str): Ruta JSON configurada para la entidad.
+        ruta_instantanea (str): Ruta de la instantánea configurada para la entidad.
+
+    Returns:
+        Tuple[str, Optional[str]]: La ruta efectiva y, si es la instantánea,
+            la ruta JSON de la que leer mientras la instantánea no exista.
+    """
+    if config.INSTANTANEAS_BINARIAS and ruta_archivo in (None, ruta_json):
+        return ruta_instantanea, ruta_json
+    return ruta_archivo or ruta_json, None
+
+
+def _leer_documento(ruta_archivo: str, tipo: int, ruta_anterior: Optional[str] = None) -> Any:
+    """Lee la billetera o las órdenes en el formato de su archivo (JSON o instantánea).
+
+    Args:
+        ruta_archivo (str): Ruta del archivo.
+        tipo (int): Tipo de documento esperado si es una instantánea.
+        ruta_anterior (Optional[str]): Archivo JSON a leer si la instantánea
+                                       todavía no existe.
+
+    Raises:
+        Exception: Si el archivo existe pero no puede leerse o decodificarse.
+    """
+    if ruta_anterior is not None and not os.path.exists(ruta_archivo):
+        # La primera escritura crea la instantánea a partir de estos datos.
+        return _leer_json(ruta_anterior)
+    if es_instantanea(ruta_archivo):
+        return cache_lectura.obtener(ruta_archivo, lambda: leer_instantanea(ruta_archivo, tipo))
+    return _leer_json(ruta_archivo)
+
+
+def _escribir_json(ruta_archivo: str, datos: Any) -> None:
+    """Reemplaza de forma atómica un archivo JSON con los datos proporcionados."""
+    escribir_atomico(ruta_archivo, _serializar_json(datos))
+
+
+def _resolver_rutas_historial(ruta_archivo: Optional[str] = None) -> Tuple[str, str]:
+    """Determina la ruta del historial JSONL y la de su predecesor en formato JSON.
+
+    Acepta tanto la ruta del nuevo formato (`historial.jsonl`) como la del
+    formato anterior (`historial.json`), de modo que los llamadores que aún
+    usan la ruta antigua siguen funcionando.
+
+    Args:
+        ruta_archivo (Optional[str]): Ruta al historial. Si es None, se usa la
+                                     ruta por defecto de la configuración.
+
+    Returns:
+        Tuple[str, str]: `(ruta_jsonl, ruta_json_anterior)`.
+    """
+    ruta_efectiva = ruta_archivo or config.HISTORIAL_PATH
+    base, extension = os.path.splitext(ruta_efectiva)
+    if extension == ".json":
+        return f"{base}.jsonl", ruta_efectiva
+    return ruta_efectiva, f"{base}.json"
+
+
+def migrar_historial_json(ruta_archivo: Optional[str] = None) -> int:
+    """Convierte un `historial.json` del formato anterior al formato JSONL.
+
+    La migración se ejecuta una única vez: al terminar, el archivo anterior se
+    renombra con el sufijo `.migrado`. Si ya existe un historial JSONL con
+    datos, el archivo anterior no se toca para evitar duplicar operaciones.
+
+    Args:
+        ruta_archivo (Optional[str]): Ruta al historial (nueva o anterior).
+
+    Returns:
+        int: La cantidad de operaciones migradas.
+
+    Side Effects:
+        - Crea el archivo JSONL y renombra el archivo JSON anterior.
+    """
+    ruta_jsonl, ruta_anterior = _resolver_rutas_historial(ruta_archivo)
+    if not os.path.exists(ruta_anterior):
+        return 0
+
+    if os.path.exists(ruta_jsonl) and os.path.getsize(ruta_jsonl) > 0:
+        print(
+            f"Advertencia: Ya existe un historial en '{ruta_jsonl}'. No se migrará '{ruta_anterior}'."
+        )
+        return 0
+
+    try:
+        historial_anterior = _leer_json(ruta_anterior) or []
+    except Exception as e:
+        print(
+            f"Advertencia: No se pudo leer o el archivo '{ruta_anterior}' está corrupto. No se migrará. Error: {e}"
+        )
+        return 0
+
+    if not isinstance(historial_anterior, list):
+        print(f"Advertencia: El archivo '{ruta_anterior}' no contiene una lista. No se migrará.")
+        return 0
+
+    # El formato anterior guardaba las operaciones más recientes primero; en
+    # JSONL se anexan en orden cronológico, así que se invierte la lista.
+    almacen_jsonl.escribir_registros(ruta_jsonl, list(reversed(historial_anterior)))
+    os.replace(ruta_anterior, f"{ruta_anterior}.migrado")
+    print(f"📦 Historial migrado a '{ruta_jsonl}' ({len(historial_anterior)} operaciones).")
+    return len(historial_anterior)
+
+
+def _ultimo_id_historial(ruta_jsonl: str, ultima_operacion: Optional[Dict[str, Any]]) -> int:
+    """Devuelve el ID de la última operación registrada (0 si no hay ninguna)."""
+    if ultima_operacion is None:
+        return 0
+    try:
+        return int(ultima_operacion.get("id"))
+    except (TypeError, ValueError):
+        # IDs no numéricos (datos antiguos o manuales): se recurre al conteo.
+        return sum(1 for _ in almacen_jsonl.iterar_inverso(ruta_jsonl))
+
+
+def _ultimo_id_comisiones(comisiones: List[Dict[str, Any]]) -> int:
+    """Devuelve el mayor ID numérico de una lista de comisiones (0 si no hay ninguno)."""
+    ids = []
+    for comision in comisiones:
+        try:
+            ids.append(int(comision.get("id")))
+        except (TypeError, ValueError):
+            continue
+    return max(ids, default=len(comisiones))
+
+
+class RepositorioJSON(Repositorio):
+    """Driver que persiste cada entidad en su propio archivo JSON o JSONL."""
+
+    def __init__(self):
+        """Inicializa el driver con la ventana de confirmación agrupada configurada."""
+        self._commit_agrupado = CommitAgrupado(config.VENTANA_COMMIT_AGRUPADO_MS / 1000)
+        # Operaciones de la transacción en curso de cada hilo.
+        self._local = threading.local()
+        # Mes del registro más antiguo de cada archivo activo segmentado.
+        self._meses_inicio: Dict[str, Optional[str]] = {}
+        # En un cierre ordenado los archivos quedan al día y el diario vacío.
+        atexit.register(self.volcar)
+
+    # --- Diario de transacciones ---
+
+    def _diario(self) -> DiarioTransacciones:
+        """Devuelve el diario ubicado junto a la billetera configurada, abriéndolo si es necesario."""
+        ruta_diario = os.path.join(os.path.dirname(config.BILLETERA_PATH), NOMBRE_DIARIO)
+        with _lock_diarios:
+            if ruta_diario not in _diarios:
+                _diarios[ruta_diario] = DiarioTransacciones(ruta_diario, config.DIARIO_MAX_PENDIENTES)
+            return _diarios[ruta_diario]
+
+    def _operaciones_en_curso(self) -> Optional[List[Dict[str, Any]]]:
+        """Devuelve las operaciones acumuladas por la transacción del hilo, o None si no hay una."""
+        return getattr(self._local, "operaciones", None)
+
+    @contextmanager
+    def transaccion(self) -> Iterator[None]:
+        if self._operaciones_en_curso() is not None:
+            yield  # Transacción anidada: confirma la más externa.
+            return
+
+        with _lock_escritura:
+            self._local.operaciones = []
+            try:
+                yield
+                operaciones = self._local.operaciones
+            finally:
+                self._local.operaciones = None
+            self._diario().registrar(operaciones)
+            if any(op.get("tipo") == TIPO_ORDENES for op in operaciones):
+                self._ordenes_confirmadas()
+
+    def recuperar(self) -> int:
+        return self._diario().recuperar()
+
+    def volcar(self) -> None:
+        """Aplica a los archivos todas las transacciones confirmadas en el diario."""
+        with _lock_diarios:
+            diarios = list(_diarios.values())
+        for diario in diarios:
+            try:
+                diario.aplicar_pendientes()
+            except Exception as e:
+                # El diario conserva las entradas: se recuperarán en el próximo inicio.
+                print(f"Advertencia: No se pudo aplicar el diario '{diario.ruta_diario}'. Error: {e}")
+
+    def _imagen_pendiente(self, ruta_archivo: str) -> Any:
+        """Último contenido de un archivo aún no aplicado (transacción en curso o diario)."""
+        for op in reversed(self._operaciones_en_curso() or []):
+            if op["accion"] == ACCION_REEMPLAZAR and op["ruta"] == ruta_archivo:
+                return copy.deepcopy(op["datos"])
+        return self._diario().imagen_pendiente(ruta_archivo)
+
+    def _registros_pendientes(self, ruta_archivo: str) -> List[Dict[str, Any]]:
+        """Registros aún no aplicados a un archivo, del más reciente al más antiguo."""
+        registros = self._diario().registros_pendientes(ruta_archivo)
+        registros += [
+            copy.deepcopy(op["registro"])
+            for op in self._operaciones_en_curso() or []
+            if op["accion"] in (ACCION_ANEXAR, ACCION_INSERTAR_AL_INICIO) and op["ruta"] == ruta_archivo
+        ]
+        return list(reversed(registros))
+
+    def _registrar_en_transaccion(self, operacion: Dict[str, Any]) -> bool:
+        """Acumula la operación en la transacción del hilo.
+
+        Fuera de una transacción no registra nada; antes de que el llamador
+        escriba el archivo directamente, se aplica el diario si tiene entradas
+        para ese archivo, para que la escritura directa no quede por detrás de
+        ellas.
+
+        Returns:
+            bool: True si la operación quedó en la transacción en curso.
+        """
+        operaciones = self._operaciones_en_curso()
+        if operaciones is not None:
+            operaciones.append(copy.deepcopy(operacion))
+            return True
+        diario = self._diario()
+        if diario.tiene_pendientes(operacion["ruta"]):
+            diario.aplicar_pendientes()
+        return False
+
+    # --- Billetera ---
+
+    def leer_billetera(self, ruta_archivo: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        ruta_efectiva, ruta_anterior = _resolver_ruta_documento(
+            ruta_archivo, config.BILLETERA_PATH, config.INSTANTANEA_BILLETERA_PATH
+        )
+        imagen = self._imagen_pendiente(ruta_efectiva)
+        if imagen is not SIN_PENDIENTES:
+            return imagen
+        os.makedirs(os.path.dirname(ruta_efectiva), exist_ok=True)
+        try:
+            return _leer_documento(ruta_efectiva, TIPO_BILLETERA, ruta_anterior)
+        except Exception as e:
+            # Se conserva una copia del archivo dañado antes de que sea reemplazado
+            # por una billetera nueva, para poder recuperar los saldos manualmente.
+            ruta_respaldo = f"{ruta_efectiva}.corrupto"
+            try:
+                os.replace(ruta_efectiva, ruta_respaldo)
+            except OSError:
+                ruta_respaldo = "(no se pudo crear)"
+            print(
+                f"Advertencia: Archivo '{ruta_efectiva}' corrupto o ilegible. Se reiniciará la billetera "
+                f"(respaldo: {ruta_respaldo}). Error: {e}"
+            )
+            return None
+
+    def escribir_billetera(self, billetera: Dict[str, Any], ruta_archivo: Optional[str] = None) -> None:
+        ruta_efectiva, _ = _resolver_ruta_documento(
+            ruta_archivo, config.BILLETERA_PATH, config.INSTANTANEA_BILLETERA_PATH
+        )
+        operacion = {"accion": ACCION_REEMPLAZAR, "ruta": ruta_efectiva, "datos": billetera, "tipo": TIPO_BILLETERA}
+        if self._registrar_en_transaccion(operacion):
+            return
+        try:
+            self._commit_agrupado.escribir(ruta_efectiva, serializar_documento(billetera, ruta_efectiva, TIPO_BILLETERA))
+        except Exception as e:
+            print(
+                f"Error Crítico: No se pudo guardar el archivo de billetera en '{ruta_efectiva}'. Error: {e}"
+            )
+
+    # --- Órdenes ---
+
+    def leer_ordenes(self, ruta_archivo: Optional[str] = None) -> List[Dict[str, Any]]:
+        ruta_efectiva, ruta_anterior = _resolver_ruta_documento(
+            ruta_archivo, config.ORDENES_PENDIENTES_PATH, config.INSTANTANEA_ORDENES_PATH
+        )
+        imagen = self._imagen_pendiente(ruta_efectiva)
+        if imagen is not SIN_PENDIENTES:
+            return imagen
+        os.makedirs(os.path.dirname(ruta_efectiva), exist_ok=True)
+        try:
+            return _leer_documento(ruta_efectiva, TIPO_ORDENES, ruta_anterior) or []
+        except Exception as e:
+            print(f"Advertencia: No se pudo leer o el archivo '{ruta_efectiva}' está corrupto. Error: {e}")
+            return []
+
+    def escribir_ordenes(self, ordenes: List[Dict[str, Any]], ruta_archivo: Optional[str] = None) -> None:
+        ruta_efectiva, _ = _resolver_ruta_documento(
+            ruta_archivo, config.ORDENES_PENDIENTES_PATH, config.INSTANTANEA_ORDENES_PATH
+        )
+        operacion = {"accion": ACCION_REEMPLAZAR, "ruta": ruta_efectiva, "datos": ordenes, "tipo": TIPO_ORDENES}
+        if self._registrar_en_transaccion(operacion):
+            return
+        try:
+            self._commit_agrupado.escribir(ruta_efectiva, serializar_documento(ordenes, ruta_efectiva, TIPO_ORDENES))
+        except Exception as e:
+            print(
+                f"Advertencia: No se pudo guardar el archivo de órdenes en '{ruta_efectiva}'. Error: {e}"
+            )
+        self._ordenes_confirmadas()
+
+    def version_ordenes(self, ruta_archivo: Optional[str] = None) -> Hashable:
+        """Combina la generación de las escrituras confirmadas con la firma del archivo.
+
+        La firma cubre las ediciones hechas por fuera de la aplicación.
+        """
+        ruta_efectiva, _ = _resolver_ruta_documento(
+            ruta_archivo, config.ORDENES_PENDIENTES_PATH, config.INSTANTANEA_ORDENES_PATH
+        )
+        return self._generacion_ordenes, ruta_efectiva, firma_archivo(ruta_efectiva)
+
+    def agregar_orden(self, orden: Dict[str, Any], ruta_archivo: Optional[str] = None) -> None:
+        ordenes = self.leer_ordenes(ruta_archivo)
+        ordenes.append(orden)
+        self.escribir_ordenes(ordenes, ruta_archivo)
+
+    # --- Historial ---
+
+    def leer_historial(
+        self,
+        ruta_archivo: Optional[str] = None,
+        limite: Optional[int] = None,
+        desplazamiento: int = 0,
+    ) -> List[Dict[str, Any]]:
+        ruta_jsonl, _ = _resolver_rutas_historial(ruta_archivo)
+        migrar_historial_json(ruta_jsonl)
+
+        # Las operaciones aún no aplicadas son las más recientes: van primero;
+        # luego las del archivo activo y por último las de los segmentos.
+        pendientes = self._registros_pendientes(ruta_jsonl)
+        fin = None if limite is None else desplazamiento + limite
+        pagina = pendientes[desplazamiento:fin]
+        if limite is not None and len(pagina) >= limite:
+            return pagina
+        limite_archivo = None if limite is None else limite - len(pagina)
+        desplazamiento_archivo = max(0, desplazamiento - len(pendientes))
+        try:
+            pagina += self._leer_historial_activo(ruta_jsonl, limite_archivo, desplazamiento_archivo)
+        except OSError as e:
+            print(f"Advertencia: No se pudo leer el archivo '{ruta_jsonl}'. Error: {e}")
+            return pagina
+
+        archivo = ArchivoSegmentado(ruta_jsonl)
+        if (limite is not None and len(pagina) >= limite) or not archivo.segmentos():
+            return pagina
+        saltar = max(0, desplazamiento_archivo - len(self._leer_historial_activo(ruta_jsonl)))
+        restantes = None if limite is None else limite - len(pagina)
+        return pagina + list(islice(archivo.iterar_inverso(saltar), restantes))
+
+    def leer_historial_rango(
+        self,
+        desde: Optional[str] = None,
+        hasta: Optional[str] = None,
+        ruta_archivo: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        ruta_jsonl, _ = _resolver_rutas_historial(ruta_archivo)
+        migrar_historial_json(ruta_jsonl)
+        try:
+            activos = self._leer_historial_activo(ruta_jsonl)
+        except OSError as e:
+            print(f"Advertencia: No se pudo leer el archivo '{ruta_jsonl}'. Error: {e}")
+            activos = []
+        return (
+            filtrar_rango(self._registros_pendientes(ruta_jsonl) + activos, desde, hasta)
+            + list(ArchivoSegmentado(ruta_jsonl).iterar_rango(desde, hasta))
+        )
+
+    def _leer_historial_activo(
+        self, ruta_jsonl: str, limite: Optional[int] = None, desplazamiento: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Lee una página del archivo activo del historial, a través del caché de lecturas."""
+        return cache_lectura.obtener(
+            ruta_jsonl,
+            lambda: almacen_jsonl.leer_ultimos(ruta_jsonl, limite, desplazamiento),
+            clave=(ruta_jsonl, limite, desplazamiento),
+        )
+
+    def agregar_operacion(self, operacion: Dict[str, Any], ruta_archivo: Optional[str] = None) -> Dict[str, Any]:
+        ruta_jsonl, _ = _resolver_rutas_historial(ruta_archivo)
+        migrar_historial_json(ruta_jsonl)
+        try:
+            with _lock_escritura:
+                if "id" not in operacion:
+                    secuencia = obtener_secuencia(ruta_jsonl, lambda: self._ultimo_id_historial_con_pendientes(ruta_jsonl))
+                    operacion = {"id": secuencia.siguiente(), **operacion}
+                self._rotar_si_cambio_de_mes(ruta_jsonl, mes_de_registro(operacion), es_historial=True)
+                if not self._registrar_en_transaccion(
+                    {"accion": ACCION_ANEXAR, "ruta": ruta_jsonl, "registro": operacion}
+                ):
+                    almacen_jsonl.agregar_registro(ruta_jsonl, operacion)
+        except Exception as e:
+            # En un entorno de producción, esto debería ser manejado por un sistema de logging.
+            print(
+                f"Error Crítico: No se pudo guardar el archivo de historial en '{ruta_jsonl}'. Error: {e}"
+            )
+        return operacion
+
+    def _ultimo_id_historial_con_pendientes(self, ruta_jsonl: str) -> int:
+        """Último ID del historial, incluyendo las operaciones aún no aplicadas."""
+        pendientes = self._registros_pendientes(ruta_jsonl)
+        return _ultimo_id_historial(ruta_jsonl, pendientes[0] if pendientes else almacen_jsonl.leer_ultimo(ruta_jsonl))
+
+    # --- Comisiones ---
+
+    def _leer_comisiones_activas(self, ruta_archivo: str) -> List[Dict[str, Any]]:
+        """Lee la lista del archivo activo de comisiones (sin pendientes ni segmentos)."""
+        try:
+            datos = _leer_json(ruta_archivo)
+        except Exception as e:
+            print(f"Advertencia: No se pudo leer o el archivo '{ruta_archivo}' está corrupto. Error: {e}")
+            return []
+        if datos is None:
+            return []
+        # Asegurarse de que siempre devolvemos una lista
+        if not isinstance(datos, list):
+            print(f"Advertencia: El archivo de comisiones '{ruta_archivo}' no contiene una lista. Se devolverá una lista vacía.")
+            return []
+        return datos
+
+    def leer_comisiones(self, ruta_archivo: Optional[str] = None) -> List[Dict[str, Any]]:
+        ruta_efectiva = ruta_archivo or config.COMISIONES_PATH
+        return (
+            self._registros_pendientes(ruta_efectiva)
+            + self._leer_comisiones_activas(ruta_efectiva)
+            + list(ArchivoSegmentado(ruta_efectiva).iterar_inverso())
+        )
+
+    def agregar_comision(self, comision: Dict[str, Any], ruta_archivo: Optional[str] = None) -> Dict[str, Any]:
+        ruta_efectiva = ruta_archivo or config.COMISIONES_PATH
+        with _lock_escritura:
+            if "id" not in comision:
+                secuencia = obtener_secuencia(
+                    ruta_efectiva, lambda: _ultimo_id_comisiones(self.leer_comisiones(ruta_efectiva))
+                )
+                comision = {"id": secuencia.siguiente(), **comision}
+            self._rotar_si_cambio_de_mes(ruta_efectiva, mes_de_registro(comision), es_historial=False)
+            if self._registrar_en_transaccion(
+                {"accion": ACCION_INSERTAR_AL_INICIO, "ruta": ruta_efectiva, "registro": comision}
+            ):
+                return comision
+            # Los pendientes recién aplicados ya forman parte del archivo.
+            comisiones = self._leer_comisiones_activas(ruta_efectiva)
+            # Insertar al principio para que las comisiones más recientes aparezcan primero.
+            comisiones.insert(0, comision)
+            try:
+                _escribir_json(ruta_efectiva, comisiones)
+            except Exception as e:
+                print(f"Error crítico: No se pudo escribir en el archivo de comisiones '{ruta_efectiva}'. Error: {e}")
+        return comision
+
+    # --- Rotación mensual ---
+
+    def _rotar_si_cambio_de_mes(self, ruta_archivo: str, mes_nuevo: str, es_historial: bool) -> None:
+        """Traslada a segmentos los meses anteriores a `mes_nuevo` del archivo activo.
+
+        Se comprueba en cada registro nuevo, pero solo lee el archivo la
+        primera vez: el mes más antiguo de cada archivo activo se recuerda en
+        memoria, así que la rotación efectiva ocurre una vez por mes.
+        """
+        if ruta_archivo not in self._meses_inicio:
+            activos = self._leer_activos_cronologico(ruta_archivo, es_historial)
+            self._meses_inicio[ruta_archivo] = min((mes_de_registro(r) for r in activos), default=None)
+        mes_inicio = self._meses_inicio[ruta_archivo]
+        if mes_inicio is None or mes_inicio >= mes_nuevo:
+            if mes_inicio is None:
+                self._meses_inicio[ruta_archivo] = mes_nuevo
+            return
+
+        # El archivo debe estar completo antes de dividirlo.
+        diario = self._diario()
+        if diario.tiene_pendientes(ruta_archivo):
+            diario.aplicar_pendientes()
+
+        activos = self._leer_activos_cronologico(ruta_archivo, es_historial)
+        antiguos = [r for r in activos if mes_de_registro(r) < mes_nuevo]
+        actuales = [r for r in activos if mes_de_registro(r) >= mes_nuevo]
+
+        # Primero se archiva y luego se recorta el archivo activo: si el proceso
+        # se interrumpe en el medio, repetir la rotación no duplica registros.
+        archivados = ArchivoSegmentado(ruta_archivo).archivar(antiguos)
+        if es_historial:
+            almacen_jsonl.escribir_registros(ruta_archivo, actuales)
+        else:
+            _escribir_json(ruta_archivo, list(reversed(actuales)))
+        self._meses_inicio[ruta_archivo] = min((mes_de_registro(r) for r in actuales), default=mes_nuevo)
+        print(f"🗄️ {archivados} registros de '{os.path.basename(ruta_archivo)}' archivados en segmentos mensuales.")
+
+    def _leer_activos_cronologico(self, ruta_archivo: str, es_historial: bool) -> List[Dict[str, Any]]:
+        """Lee el archivo activo completo, del registro más antiguo al más reciente."""
+        if es_historial:
+            return list(reversed(almacen_jsonl.leer_ultimos(ruta_archivo)))
+        return list(reversed(self._leer_comisiones_activas(ruta_archivo)))
+
+    # --- Cotizaciones ---
+
+    def leer_cotizaciones(self, ruta_archivo: Optional[str] = None) -> List[Dict[str, Any]]:
+        ruta_efectiva = ruta_archivo or config.COTIZACIONES_PATH
+        try:
+            return _leer_json(ruta_efectiva) or []
+        except Exception as e:
+            print(f"Advertencia: No se pudo leer o el archivo '{ruta_efectiva}' está corrupto. Error: {e}")
+            return []
+
+    def escribir_cotizaciones(self, cotizaciones: List[Dict[str, Any]], ruta_archivo: Optional[str] = None) -> None:
+        # Los errores se propagan: el llamador decide si recargar el caché de precios.
+        _escribir_json(ruta_archivo or config.COTIZACIONES_PATH, cotizaciones)
@@ -0,0 +1,334 @@
+"""Almacén de Estado en Memoria con Escritura Diferida (Write-Back).
+
+`RepositorioEnMemoria` envuelve a otro driver (JSON o SQLite) y mantiene en
+memoria la billetera, las órdenes, el historial y las comisiones:
+
+-   **Lecturas**: cada entidad se carga del driver subyacente una sola vez;
+    a partir de ahí se sirve desde memoria, sin acceso a disco.
+-   **Escrituras**: actualizan la memoria y marcan la entidad como "sucia".
+    Un hilo en segundo plano vuelca los cambios al driver subyacente cada
+    `config.INTERVALO_VOLCADO_ESTADO_S` segundos, o antes si se acumulan
+    `config.MAX_CAMBIOS_SIN_VOLCAR` cambios.
+-   **Volcado explícito**: `volcar()` (flush) persiste todo lo pendiente; se
+    invoca automáticamente al cerrar el proceso.
+
+Cada volcado se confirma dentro de una transacción del driver subyacente, de
+modo que nunca persiste a medias el resultado de una operación.
+
+Se activa con `config.ESTADO_EN_MEMORIA`. Supone que el proceso es el único
+escritor de los datos: los cambios hechos a los archivos por fuera de la
+aplicación no se verán hasta reiniciarla. Las cotizaciones no se almacenan
+aquí (ya tienen su propio caché en `datos_cotizaciones`).
+"""
+
+import atexit
+import copy
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from backend.acceso_datos.archivo_segmentado import filtrar_rango
+from backend.acceso_datos.repositorio import Repositorio
+from backend.acceso_datos.repositorio_json import _resolver_rutas_historial
+from backend.acceso_datos.secuencias import obtener_secuencia
+import config
+
+ENTIDAD_BILLETERA = "billetera"
+ENTIDAD_ORDENES = "ordenes"
+ENTIDAD_HISTORIAL = "historial"
+ENTIDAD_COMISIONES = "comisiones"
+
+# Indica que una entidad aún no se cargó desde el driver subyacente.
+_NO_CARGADO = object()
+
+
+def _ruta_por_defecto(entidad: str) -> str:
+    """Devuelve la ruta configurada para una entidad."""
+    return {
+        ENTIDAD_BILLETERA: config.BILLETERA_PATH,
+        ENTIDAD_ORDENES: config.ORDENES_PENDIENTES_PATH,
+        ENTIDAD_HISTORIAL: config.HISTORIAL_PATH,
+        ENTIDAD_COMISIONES: config.COMISIONES_PATH,
+    }[entidad]
+
+
+def _clave(entidad: str, ruta_archivo: Optional[str]) -> Tuple[str, str]:
+    """Normaliza la ruta para que `None` y la ruta explícita equivalente compartan estado."""
+    ruta = os.path.abspath(ruta_archivo or _ruta_por_defecto(entidad))
+    if entidad == ENTIDAD_HISTORIAL:
+        # `historial.json` y `historial.jsonl` son el mismo historial.
+        ruta = os.path.splitext(ruta)[0]
+    return entidad, ruta
+
+
+def _ruta_secuencia(entidad: str, ruta_archivo: Optional[str]) -> str:
+    """Devuelve el archivo cuya secuencia numera los registros, el mismo que usa `RepositorioJSON`."""
+    if entidad == ENTIDAD_HISTORIAL:
+        return _resolver_rutas_historial(ruta_archivo)[0]
+    return ruta_archivo or _ruta_por_defecto(entidad)
+
+
+def _mayor_id(registros: List[Dict[str, Any]]) -> int:
+    """Devuelve el mayor ID numérico de los registros (0 si no hay ninguno)."""
+    ids = []
+    for registro in registros:
+        try:
+            ids.append(int(registro.get("id")))
+        except (TypeError, ValueError):
+            continue
+    return max(ids, default=0)
+
+
+class RepositorioEnMemoria(Repositorio):
+    """Decorador de un driver que sirve las lecturas desde memoria y difiere las escrituras."""
+
+    def __init__(self, base: Repositorio):
+        """Inicializa el almacén sobre el driver que realmente persiste los datos.
+
+        Args:
+            base (Repositorio): Driver subyacente (JSON o SQLite).
+        """
+        self.base = base
+        self._lock = threading.RLock()
+        # Serializa los volcados para que lleguen al driver en orden.
+        self._lock_volcado = threading.Lock()
+        self._local = threading.local()
+
+        # Billetera y órdenes: el valor almacenado nunca se modifica en su
+        # lugar (cada escritura guarda una copia nueva), por lo que una copia
+        # superficial del diccionario basta como punto de restauración.
+        self._documentos: Dict[Tuple[str, str], Any] = {}
+        # Historial y comisiones: listas en orden cronológico (más antiguo primero).
+        self._registros: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._registros_sin_volcar: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._rutas: Dict[Tuple[str, str], Optional[str]] = {}
+        self._sucios: Set[Tuple[str, str]] = set()
+        self._cambios = 0
+
+        self._evento_volcado = threading.Event()
+        self._hilo_volcado: Optional[threading.Thread] = None
+        atexit.register(self.volcar)
+
+    # --- Volcado en segundo plano ---
+
+    def _marcar_cambio(self) -> None:
+        """Cuenta un cambio pendiente y despierta al hilo de volcado si corresponde."""
+        self._cambios += 1
+        if self._hilo_volcado is None:
+            self._hilo_volcado = threading.Thread(
+                target=self._bucle_volcado, name="volcado-estado", daemon=True
+            )
+            self._hilo_volcado.start()
+        if self._cambios >= config.MAX_CAMBIOS_SIN_VOLCAR:
+            self._evento_volcado.set()
+
+    def _bucle_volcado(self) -> None:
+        """Vuelca los cambios periódicamente o al alcanzar el umbral de cambios."""
+        while True:
+            self._evento_volcado.wait(config.INTERVALO_VOLCADO_ESTADO_S)
+            self._evento_volcado.clear()
+            try:
+                self.volcar()
+            except Exception as e:
+                # Los cambios siguen marcados como pendientes: se reintentará.
+                print(f"Advertencia: No se pudo volcar el estado en memoria. Error: {e}")
+
+    def volcar(self) -> None:
+        """Persiste en el driver subyacente todos los cambios pendientes (flush).
+
+        Raises:
+            Exception: Si el driver subyacente falla. Los cambios que no se
+                pudieron escribir quedan pendientes para el próximo volcado.
+        """
+        with self._lock_volcado:
+            with self._lock:
+                sucios, self._sucios = self._sucios, set()
+                documentos = {clave: self._documentos[clave] for clave in sucios}
+                registros, self._registros_sin_volcar = self._registros_sin_volcar, {}
+                rutas = dict(self._rutas)
+                self._cambios = 0
+
+            try:
+                with self.base.transaccion():
+                    for clave, documento in documentos.items():
+                        if clave[0] == ENTIDAD_BILLETERA:
+                            self.base.escribir_billetera(documento, rutas[clave])
+                        else:
+                            self.base.escribir_ordenes(documento, rutas[clave])
+                    for clave, pendientes in registros.items():
+                        agregar = (
+                            self.base.agregar_operacion if clave[0] == ENTIDAD_HISTORIAL
+                            else self.base.agregar_comision
+                        )
+                        for registro in pendientes:
+                            agregar(registro, rutas[clave])
+            except BaseException:
+                with self._lock:
+                    self._sucios |= sucios
+                    for clave, pendientes in registros.items():
+                        self._registros_sin_volcar[clave] = pendientes + self._registros_sin_volcar.get(clave, [])
+                raise
+
+        self.base.volcar()
+
+    # --- Transacciones ---
+
+    @contextmanager
+    def transaccion(self) -> Iterator[None]:
+        if getattr(self._local, "en_transaccion", False):
+            yield  # Transacción anidada: confirma la más externa.
+            return
+
+        with self._lock:
+            punto_restauracion = (
+                dict(self._documentos),
+                {clave: len(lista) for clave, lista in self._registros.items()},
+                {clave: len(lista) for clave, lista in self._registros_sin_volcar.items()},
+                set(self._sucios),
+                self._cambios,
+            )
+            self._local.en_transaccion = True
+            self._local.ordenes_modificadas = False
+            try:
+                yield
+            except BaseException:
+                self._restaurar(*punto_restauracion)
+                raise
+            finally:
+                self._local.en_transaccion = False
+            if self._local.ordenes_modificadas:
+                self._ordenes_confirmadas()
+
+    def _restaurar(self, documentos, largos_registros, largos_sin_volcar, sucios, cambios) -> None:
+        """Descarta los cambios en memoria de una transacción fallida."""
+        self._documentos = documentos
+        for clave in list(self._registros):
+            if clave in largos_registros:
+                del self._registros[clave][largos_registros[clave]:]
+            else:
+                del self._registros[clave]
+        for clave in list(self._registros_sin_volcar):
+            if clave in largos_sin_volcar:
+                del self._registros_sin_volcar[clave][largos_sin_volcar[clave]:]
+            else:
+                del self._registros_sin_volcar[clave]
+        self._sucios = sucios
+        self._cambios = cambios
+
+    def recuperar(self) -> int:
+        return self.base.recuperar()
+
+    # --- Documentos: billetera y órdenes ---
+
+    def _leer_documento(self, entidad: str, ruta_archivo: Optional[str], cargar) -> Any:
+        clave = _clave(entidad, ruta_archivo)
+        with self._lock:
+            documento = self._documentos.get(clave, _NO_CARGADO)
+            if documento is _NO_CARGADO:
+                documento = cargar(ruta_archivo)
+                self._documentos[clave] = documento
+                self._rutas.setdefault(clave, ruta_archivo)
+            return copy.deepcopy(documento)
+
+    def _escribir_documento(self, entidad: str, documento: Any, ruta_archivo: Optional[str]) -> None:
+        clave = _clave(entidad, ruta_archivo)
+        with self._lock:
+            self._documentos[clave] = copy.deepcopy(documento)
+            self._rutas[clave] = ruta_archivo
+            self._sucios.add(clave)
+            self._marcar_cambio()
+            if entidad == ENTIDAD_ORDENES:
+                # Dentro de una transacción, la versión cambia al confirmarla.
+                if getattr(self._local, "en_transaccion", False):
+                    self._local.ordenes_modificadas = True
+                else:
+                    self._ordenes_confirmadas()
+
+    def leer_billetera(self, ruta_archivo: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        return self._leer_documento(ENTIDAD_BILLETERA, ruta_archivo, self.base.leer_billetera)
+
+    def escribir_billetera(self, billetera: Dict[str, Any], ruta_archivo: Optional[str] = None) -> None:
+        self._escribir_documento(ENTIDAD_BILLETERA, billetera, ruta_archivo)
+
+    def leer_ordenes(self, ruta_archivo: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._leer_documento(ENTIDAD_ORDENES, ruta_archivo, self.base.leer_ordenes)
+
+    def escribir_ordenes(self, ordenes: List[Dict[str, Any]], ruta_archivo: Optional[str] = None) -> None:
+        self._escribir_documento(ENTIDAD_ORDENES, ordenes, ruta_archivo)
+
+    def agregar_orden(self, orden: Dict[str, Any], ruta_archivo: Optional[str] = None) -> None:
+        with self._lock:
+            ordenes = self.leer_ordenes(ruta_archivo)
+            ordenes.append(orden)
+            self.escribir_ordenes(ordenes, ruta_archivo)
+
+    # --- Registros: historial y comisiones ---
+
+    def _cargar_registros(self, entidad: str, ruta_archivo: Optional[str]) -> Tuple[str, str]:
+        """Carga (una sola vez) todos los registros de una entidad y devuelve su clave."""
+        clave = _clave(entidad, ruta_archivo)
+        if clave not in self._registros:
+            if entidad == ENTIDAD_HISTORIAL:
+                recientes_primero = self.base.leer_historial(ruta_archivo)
+            else:
+                recientes_primero = self.base.leer_comisiones(ruta_archivo)
+            self._registros[clave] = list(reversed(recientes_primero))
+            self._rutas.setdefault(clave, ruta_archivo)
+        return clave
+
+    def _agregar_registro(self, entidad: str, registro: Dict[str, Any], ruta_archivo: Optional[str]) -> Dict[str, Any]:
+        with self._lock:
+            clave = self._cargar_registros(entidad, ruta_archivo)
+            registros = self._registros[clave]
+            if "id" not in registro:
+                # La misma secuencia persistente que usa el driver JSON: los IDs
+                # no se repiten al cambiar de driver ni entre reinicios.
+                secuencia = obtener_secuencia(_ruta_secuencia(entidad, ruta_archivo), lambda: _mayor_id(registros))
+                # El ID se conserva al volcar: ambos drivers respetan el del registro.
+                registro = {"id": secuencia.siguiente(), **registro}
+            registros.append(registro)
+            self._registros_sin_volcar.setdefault(clave, []).append(registro)
+            self._marcar_cambio()
+            return copy.deepcopy(registro)
+
+    def leer_historial(
+        self,
+        ruta_archivo: Optional[str] = None,
+        limite: Optional[int] = None,
+        desplazamiento: int = 0,
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            registros = self._registros[self._cargar_registros(ENTIDAD_HISTORIAL, ruta_archivo)]
+            fin = len(registros) - desplazamiento
+            inicio = 0 if limite is None else max(0, fin - limite)
+            return copy.deepcopy(registros[inicio:max(0, fin)][::-1])
+
+    def leer_historial_rango(
+        self,
+        desde: Optional[str] = None,
+        hasta: Optional[str] = None,
+        ruta_archivo: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            registros = self._registros[self._cargar_registros(ENTIDAD_HISTORIAL, ruta_archivo)]
+            return copy.deepcopy(filtrar_rango(registros, desde, hasta)[::-1])
+
+    def agregar_operacion(self, operacion: Dict[str, Any], ruta_archivo: Optional[str] = None) -> Dict[str, Any]:
+        return self._agregar_registro(ENTIDAD_HISTORIAL, operacion, ruta_archivo)
+
+    def leer_comisiones(self, ruta_archivo: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            registros = self._registros[self._cargar_registros(ENTIDAD_COMISIONES, ruta_archivo)]
+            return copy.deepcopy(registros[::-1])
+
+    def agregar_comision(self, comision: Dict[str, Any], ruta_archivo: Optional[str] = None) -> Dict[str, Any]:
+        return self._agregar_registro(ENTIDAD_COMISIONES, comision, ruta_archivo)
+
+    # --- Cotizaciones (sin almacenamiento en memoria) ---
+
+    def leer_cotizaciones(self, ruta_archivo: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self.base.leer_cotizaciones(ruta_archivo)
+
+    def escribir_cotizaciones(self, cotizaciones: List[Dict[str, Any]], ruta_archivo: Optional[str] = None) -> None:
+        self.base.escribir_cotizaciones(cotizaciones, ruta_archivo)
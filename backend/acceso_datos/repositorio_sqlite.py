@@ -0,0 +1,298 @@
+"""Driver de Almacenamiento basado en SQLite (modo WAL).
+
+Implementa la interfaz `Repositorio` sobre una única base de datos SQLite,
+usando solo la librería estándar (`sqlite3`). Frente al driver JSON ofrece:
+
+-   **Escrituras incrementales**: una ejecución de orden se traduce en unas
+    pocas escrituras de filas indexadas, en lugar de reescribir archivos
+    completos. Al guardar la billetera o las órdenes, solo se modifican las
+    filas cuyo contenido realmente cambió.
+-   **Lecturas consistentes**: en modo WAL los lectores nunca ven datos a
+    medio escribir y no bloquean a los escritores.
+
+Cada hilo utiliza su propia conexión, ya que los objetos de conexión de
+`sqlite3` no deben compartirse entre hilos. `transaccion()` abre una
+transacción SQLite real (`BEGIN IMMEDIATE`) que abarca todas las escrituras
+del bloque.
+
+El parámetro `ruta_archivo` de la interfaz se ignora en este driver.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from backend.acceso_datos.repositorio import Repositorio
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS billetera (
+    ticker TEXT PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    disponible NOT NULL,
+    reservado NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ordenes (
+    secuencia INTEGER PRIMARY KEY AUTOINCREMENT,
+    id_orden TEXT NOT NULL UNIQUE,
+    estado TEXT,
+    datos TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ordenes_estado ON ordenes (estado);
+CREATE TABLE IF NOT EXISTS historial (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT,
+    datos TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_historial_timestamp ON historial (timestamp);
+CREATE TABLE IF NOT EXISTS comisiones (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cotizaciones (
+    posicion INTEGER PRIMARY KEY,
+    ticker TEXT,
+    datos TEXT NOT NULL
+);
+"""
+
+# Los saldos se guardan en columnas sin tipo para conservar el tipo del valor:
+# un entero son unidades atómicas y un texto es un decimal (ver
+# `unidades_atomicas`). Las bases creadas con columnas TEXT, que convertían
+# los enteros a texto, se migran al abrirlas.
+_MIGRACION_SALDOS_SIN_TIPO = """
+ALTER TABLE billetera RENAME TO billetera_texto;
+CREATE TABLE billetera (
+    ticker TEXT PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    disponible NOT NULL,
+    reservado NOT NULL
+);
+INSERT INTO billetera (ticker, nombre, disponible, reservado)
+    SELECT ticker, nombre, disponible, reservado FROM billetera_texto ORDER BY rowid;
+DROP TABLE billetera_texto;
+"""
+
+
+class RepositorioSQLite(Repositorio):
+    """Driver que persiste todas las entidades en una base SQLite en modo WAL."""
+
+    def __init__(self, ruta_db: str):
+        """Inicializa el driver y crea el esquema si la base no existe.
+
+        Args:
+            ruta_db (str): Ruta al archivo de la base de datos SQLite.
+        """
+        self.ruta_db = ruta_db
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(ruta_db), exist_ok=True)
+        conexion = self._conexion()
+        conexion.executescript(_ESQUEMA)
+        tipos = {columna: tipo for _, columna, tipo, *_ in conexion.execute("PRAGMA table_info(billetera)")}
+        if tipos.get("disponible", "").upper() == "TEXT":
+            with conexion:
+                for sentencia in _MIGRACION_SALDOS_SIN_TIPO.split(";"):
+                    if sentencia.strip():
+                        conexion.execute(sentencia)
+
+    def _conexion(self) -> sqlite3.Connection:
+        """Devuelve la conexión del hilo actual, abriéndola si es necesario."""
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta_db, timeout=10)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            # En modo WAL, NORMAL mantiene la base consistente ante caídas del
+            # proceso sin pagar un fsync en cada transacción.
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexion = conexion
+            self._local.profundidad = 0
+            self._local.ordenes_modificadas = False
+        return conexion
+
+    @contextmanager
+    def _escritura(self) -> Iterator[sqlite3.Connection]:
+        """Devuelve la conexión para escribir, confirmando al salir salvo dentro de una transacción."""
+        conexion = self._conexion()
+        if self._local.profundidad > 0:
+            yield conexion
+            return
+        with conexion:
+            yield conexion
+
+    @contextmanager
+    def transaccion(self) -> Iterator[None]:
+        conexion = self._conexion()
+        if self._local.profundidad == 0:
+            conexion.execute("BEGIN IMMEDIATE")
+        self._local.profundidad += 1
+        try:
+            yield
+        except BaseException:
+            self._local.profundidad -= 1
+            if self._local.profundidad == 0:
+                conexion.rollback()
+                self._local.ordenes_modificadas = False
+            raise
+        self._local.profundidad -= 1
+        if self._local.profundidad == 0:
+            conexion.commit()
+            if self._local.ordenes_modificadas:
+                self._local.ordenes_modificadas = False
+                self._ordenes_confirmadas()
+
+    def _ordenes_escritas(self) -> None:
+        """Registra una escritura de órdenes; dentro de una transacción, se confirma al salir de ella."""
+        if self._local.profundidad > 0:
+            self._local.ordenes_modificadas = True
+        else:
+            self._ordenes_confirmadas()
+
+    # --- Billetera ---
+
+    def leer_billetera(self, ruta_archivo: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        filas = self._conexion().execute(
+            "SELECT ticker, nombre, disponible, reservado FROM billetera ORDER BY rowid"
+        ).fetchall()
+        if not filas:
+            return None
+        return {
+            ticker: {"nombre": nombre, "saldos": {"disponible": disponible, "reservado": reservado}}
+            for ticker, nombre, disponible, reservado in filas
+        }
+
+    def escribir_billetera(self, billetera: Dict[str, Any], ruta_archivo: Optional[str] = None) -> None:
+        filas = [
+            (ticker, activo.get("nombre", ticker), activo["saldos"]["disponible"], activo["saldos"]["reservado"])
+            for ticker, activo in billetera.items()
+        ]
+        with self._escritura() as conexion:
+            # El WHERE del UPSERT evita reescribir las filas que no cambiaron.
+            conexion.executemany(
+                """
+                INSERT INTO billetera (ticker, nombre, disponible, reservado) VALUES (?, ?, ?, ?)
+                ON CONFLICT(ticker) DO UPDATE SET
+                    nombre = excluded.nombre,
+                    disponible = excluded.disponible,
+                    reservado = excluded.reservado
+                WHERE nombre IS NOT excluded.nombre
+                   OR disponible IS NOT excluded.disponible
+                   OR reservado IS NOT excluded.reservado
+                """,
+                filas,
+            )
+            self._eliminar_ausentes(conexion, "billetera", "ticker", [fila[0] for fila in filas])
+
+    @staticmethod
+    def _eliminar_ausentes(conexion: sqlite3.Connection, tabla: str, columna: str, claves: List[str]) -> None:
+        """Elimina de `tabla` las filas cuya `columna` no está en `claves`.
+
+        Las claves se cargan en una tabla temporal en lugar de un `NOT IN
+        (?, ?, ...)`: con miles de filas, los marcadores superarían el límite
+        de variables por sentencia de SQLite.
+        """
+        conexion.execute("CREATE TEMP TABLE IF NOT EXISTS claves_conservadas (clave TEXT PRIMARY KEY)")
+        conexion.execute("DELETE FROM claves_conservadas")
+        conexion.executemany("INSERT OR IGNORE INTO claves_conservadas (clave) VALUES (?)", [(clave,) for clave in claves])
+        conexion.execute(f"DELETE FROM {tabla} WHERE {columna} NOT IN (SELECT clave FROM claves_conservadas)")
+        conexion.execute("DELETE FROM claves_conservadas")
+
+    # --- Órdenes ---
+
+    def leer_ordenes(self, ruta_archivo: Optional[str] = None) -> List[Dict[str, Any]]:
+        filas = self._conexion().execute("SELECT datos FROM ordenes ORDER BY secuencia").fetchall()
+        return [json.loads(datos) for (datos,) in filas]
+
+    def escribir_ordenes(self, ordenes: List[Dict[str, Any]], ruta_archivo: Optional[str] = None) -> None:
+        filas = [(str(orden.get("id_orden")), orden.get("estado"), json.dumps(orden)) for orden in ordenes]
+        with self._escritura() as conexion:
+            conexion.executemany(
+                """
+                INSERT INTO ordenes (id_orden, estado, datos) VALUES (?, ?, ?)
+                ON CONFLICT(id_orden) DO UPDATE SET estado = excluded.estado, datos = excluded.datos
+                WHERE datos IS NOT excluded.datos
+                """,
+                filas,
+            )
+            self._eliminar_ausentes(conexion, "ordenes", "id_orden", [fila[0] for fila in filas])
+        self._ordenes_escritas()
+
+    def agregar_orden(self, orden: Dict[str, Any], ruta_archivo: Optional[str] = None) -> None:
+        with self._escritura() as conexion:
+            conexion.execute(
+                "INSERT OR REPLACE INTO ordenes (id_orden, estado, datos) VALUES (?, ?, ?)",
+                (str(orden.get("id_orden")), orden.get("estado"), json.dumps(orden)),
+            )
+        self._ordenes_escritas()
+
+    # --- Historial y Comisiones ---
+
+    def _leer_registros(self, tabla: str, limite: Optional[int], desplazamiento: int) -> List[Dict[str, Any]]:
+        """Lee una página de una tabla de registros, de la más reciente a la más antigua."""
+        filas = self._conexion().execute(
+            f"SELECT id, datos FROM {tabla} ORDER BY id DESC LIMIT ? OFFSET ?",
+            (-1 if limite is None else limite, desplazamiento),
+        ).fetchall()
+        return [{"id": id_registro, **json.loads(datos)} for id_registro, datos in filas]
+
+    def _agregar_registro(self, tabla: str, registro: Dict[str, Any]) -> Dict[str, Any]:
+        """Inserta un registro y devuelve una copia con el ID asignado por SQLite."""
+        with self._escritura() as conexion:
+            cursor = conexion.execute(
+                f"INSERT INTO {tabla} (timestamp, datos) VALUES (?, ?)",
+                (registro.get("timestamp"), json.dumps(registro)),
+            )
+        return {"id": cursor.lastrowid, **registro}
+
+    def leer_historial(
+        self,
+        ruta_archivo: Optional[str] = None,
+        limite: Optional[int] = None,
+        desplazamiento: int = 0,
+    ) -> List[Dict[str, Any]]:
+        return self._leer_registros("historial", limite, desplazamiento)
+
+    def leer_historial_rango(
+        self,
+        desde: Optional[str] = None,
+        hasta: Optional[str] = None,
+        ruta_archivo: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        # Los timestamps ISO se ordenan como texto, así que el rango usa el índice.
+        condiciones, parametros = [], []
+        if desde is not None:
+            condiciones.append("timestamp >= ?")
+            parametros.append(desde)
+        if hasta is not None:
+            condiciones.append("timestamp < ?")
+            parametros.append(hasta)
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        filas = self._conexion().execute(
+            f"SELECT id, datos FROM historial {where} ORDER BY id DESC", parametros
+        ).fetchall()
+        return [{"id": id_registro, **json.loads(datos)} for id_registro, datos in filas]
+
+    def agregar_operacion(self, operacion: Dict[str, Any], ruta_archivo: Optional[str] = None) -> Dict[str, Any]:
+        return self._agregar_registro("historial", operacion)
+
+    def leer_comisiones(self, ruta_archivo: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._leer_registros("comisiones", None, 0)
+
+    def agregar_comision(self, comision: Dict[str, Any], ruta_archivo: Optional[str] = None) -> Dict[str, Any]:
+        return self._agregar_registro("comisiones", comision)
+
+    # --- Cotizaciones ---
+
+    def leer_cotizaciones(self, ruta_archivo: Optional[str] = None) -> List[Dict[str, Any]]:
+        filas = self._conexion().execute("SELECT datos FROM cotizaciones ORDER BY posicion").fetchall()
+        return [json.loads(datos) for (datos,) in filas]
+
+    def escribir_cotizaciones(self, cotizaciones: List[Dict[str, Any]], ruta_archivo: Optional[str] = None) -> None:
+        with self._escritura() as conexion:
+            conexion.execute("DELETE FROM cotizaciones")
+            conexion.executemany(
+                "INSERT INTO cotizaciones (posicion, ticker, datos) VALUES (?, ?, ?)",
+                [(i, c.get("ticker"), json.dumps(c)) for i, c in enumerate(cotizaciones)],
+            )
@@ -0,0 +1,106 @@
+"""Generador Persistente de IDs Monótonos.
+
+Asignar un ID como `len(lista) + 1` obliga a cargar la lista completa, y
+derivarlo de la hora (`datetime.now().timestamp()`) produce colisiones
+cuando dos órdenes llegan en el mismo microsegundo.
+
+Una `Secuencia` entrega IDs enteros crecientes y únicos en O(1). Para no
+escribir en disco en cada ID, reserva bloques: persiste solo el límite del
+bloque reservado (en un archivo `<archivo>.secuencia` junto al archivo de
+datos) y entrega los IDs del bloque desde memoria. Si el proceso se
+interrumpe, los IDs no usados del último bloque se descartan: puede haber
+huecos, pero nunca repeticiones ni retrocesos.
+"""
+
+import os
+import threading
+from typing import Callable, Dict, Optional
+
+from backend.acceso_datos.escritura_atomica import escribir_atomico
+
+# Cantidad de IDs que se reservan en disco de una sola vez.
+TAMANO_BLOQUE = 64
+
+SUFIJO_SECUENCIA = ".secuencia"
+
+
+class Secuencia:
+    """Secuencia de IDs enteros persistida en un archivo auxiliar."""
+
+    def __init__(self, ruta_secuencia: str, ultimo_id_existente: Callable[[], int]):
+        """Abre la secuencia, retomando desde el último ID persistido o existente.
+
+        Args:
+            ruta_secuencia (str): Archivo donde se persiste el límite reservado.
+            ultimo_id_existente (Callable[[], int]): Devuelve el mayor ID ya
+                presente en los datos. Se consulta una vez al abrir la
+                secuencia, para no repetir IDs de datos previos a ella (o
+                restaurados desde una copia de seguridad).
+        """
+        self.ruta_secuencia = ruta_secuencia
+        self._lock = threading.Lock()
+        ultimo = max(self._leer_limite_persistido(), ultimo_id_existente())
+        self._siguiente = ultimo + 1
+        self._limite = ultimo
+
+    def _leer_limite_persistido(self) -> int:
+        """Lee el límite reservado en una ejecución anterior (0 si no existe)."""
+        try:
+            with open(self.ruta_secuencia, "r", encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            print(f"Advertencia: Archivo de secuencia '{self.ruta_secuencia}' ilegible. Error: {e}")
+            return 0
+
+    def reservar(self, cantidad: int = 1) -> range:
+        """Reserva `cantidad` IDs consecutivos.
+
+        Solo escribe en disco cuando la reserva excede el bloque actual, y en
+        ese caso lo hace una única vez para toda la reserva.
+
+        Args:
+            cantidad (int): Cantidad de IDs a reservar.
+
+        Returns:
+            range: Los IDs reservados, en orden creciente.
+        """
+        with self._lock:
+            inicio = self._siguiente
+            fin = inicio + cantidad - 1
+            if fin > self._limite:
+                nuevo_limite = fin + TAMANO_BLOQUE
+                escribir_atomico(self.ruta_secuencia, str(nuevo_limite).encode("utf-8"))
+                self._limite = nuevo_limite
+            self._siguiente = fin + 1
+            return range(inicio, fin + 1)
+
+    def siguiente(self) -> int:
+        """Devuelve el próximo ID de la secuencia."""
+        return self.reservar(1)[0]
+
+
+# Secuencias abiertas, indexadas por la ruta de su archivo auxiliar.
+_secuencias: Dict[str, Secuencia] = {}
+_lock_secuencias = threading.Lock()
+
+
+def obtener_secuencia(
+    ruta_archivo: str, ultimo_id_existente: Optional[Callable[[], int]] = None
+) -> Secuencia:
+    """Devuelve la secuencia asociada a un archivo de datos.
+
+    Args:
+        ruta_archivo (str): Archivo de datos cuyos registros numera la secuencia.
+        ultimo_id_existente (Optional[Callable[[], int]]): Ver `Secuencia`. Solo
+            se usa la primera vez que se abre la secuencia en el proceso.
+
+    Returns:
+        Secuencia: La secuencia, compartida por todo el proceso.
+    """
+    ruta_secuencia = os.path.abspath(ruta_archivo) + SUFIJO_SECUENCIA
+    with _lock_secuencias:
+        if ruta_secuencia not in _secuencias:
+            _secuencias[ruta_secuencia] = Secuencia(ruta_secuencia, ultimo_id_existente or (lambda: 0))
+        return _secuencias[ruta_secuencia]
@@ -0,0 +1,126 @@
+"""Matriz de Tasas Cruzadas entre Pares.
+
+El simulador admite pares sin USDT (ej. ETH/BNB). El precio de esos pares no
+está en las cotizaciones: se deriva de los precios en USD de ambas monedas.
+Este módulo calcula, una vez por instantánea de precios, la tasa de los pares
+pedidos (ej. los de las órdenes pendientes) y su inversa, para que el motor de
+órdenes y las validaciones las consulten en O(1) sin repetir divisiones
+`Decimal`. Cualquier otro par se calcula al consultarlo y queda memorizado
+hasta la siguiente instantánea: el costo por instantánea es proporcional a
+los pares usados, no al cuadrado de las monedas.
+
+Convenciones:
+-   La tasa de `BASE/COTIZADA` es cuántas unidades de COTIZADA vale una BASE.
+-   La moneda fiat (`config.MONEDA_FIAT_DEFAULT`) es la unidad de cuenta y
+    vale exactamente 1: la tasa de `BTC/USDT` es el precio en USD de BTC.
+"""
+
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from backend.acceso_datos.datos_cotizaciones import InstantaneaPrecios, obtener_instantanea_precios
+import config
+
+_UNO = Decimal("1")
+
+
+def separar_par(par: str) -> Tuple[str, str]:
+    """Separa un par `BASE/COTIZADA` en sus dos tickers, en mayúsculas."""
+    base, _, cotizada = par.upper().partition("/")
+    return base, cotizada or config.MONEDA_FIAT_DEFAULT
+
+
+class MatrizTasasCruzadas:
+    """Tasas de cambio entre pares de monedas, derivadas de una instantánea de precios."""
+
+    __slots__ = ("version", "_precios", "_tasas")
+
+    def __init__(self, instantanea: InstantaneaPrecios, pares: Iterable[str] = ()):
+        """Calcula las tasas de `pares`.
+
+        Args:
+            instantanea (InstantaneaPrecios): Instantánea de la que se toman los
+                precios; la matriz hereda su versión.
+            pares (Iterable[str]): Pares `BASE/COTIZADA` que se precalculan.
+                Los demás se calculan (una sola vez) al consultarlos.
+        """
+        self.version = instantanea.version
+        self._precios = instantanea.precios
+        # (base, cotizada) -> (tasa, inversa), o None si falta algún precio.
+        self._tasas: Dict[Tuple[str, str], Optional[Tuple[Decimal, Decimal]]] = {}
+        for par in pares:
+            self.tasa_par(par)
+
+    def _precio_usd(self, ticker: str) -> Optional[Decimal]:
+        if ticker == config.MONEDA_FIAT_DEFAULT:
+            return _UNO
+        return self._precios.get(ticker)
+
+    def _calcular(self, base: str, cotizada: str) -> Optional[Tuple[Decimal, Decimal]]:
+        clave = (base, cotizada)
+        if clave in self._tasas:
+            return self._tasas[clave]
+        precio_base = self._precio_usd(base)
+        precio_cotizada = self._precio_usd(cotizada)
+        if not precio_base or not precio_cotizada:
+            resultado = None
+        else:
+            tasa = precio_base / precio_cotizada
+            inversa = precio_cotizada / precio_base
+            resultado = (tasa, inversa)
+            # El par inverso sale gratis: comparte las dos divisiones.
+            self._tasas[(cotizada, base)] = (inversa, tasa)
+        self._tasas[clave] = resultado
+        return resultado
+
+    def tasa(self, base: str, cotizada: str) -> Optional[Decimal]:
+        """Devuelve cuántas unidades de `cotizada` vale una unidad de `base`.
+
+        Returns:
+            Optional[Decimal]: La tasa, o None si falta el precio de alguna moneda.
+        """
+        base, cotizada = base.upper(), cotizada.upper()
+        if base == cotizada:
+            return _UNO
+        resultado = self._calcular(base, cotizada)
+        return resultado[0] if resultado else None
+
+    def inversa(self, base: str, cotizada: str) -> Optional[Decimal]:
+        """Devuelve cuántas unidades de `base` vale una unidad de `cotizada`."""
+        return self.tasa(cotizada, base)
+
+    def tasa_par(self, par: str) -> Optional[Decimal]:
+        """Devuelve el precio de un par con formato `BASE/COTIZADA`."""
+        return self.tasa(*separar_par(par))
+
+
+# Última matriz calculada. Se reemplaza completa al cambiar la instantánea.
+_matriz: Optional[MatrizTasasCruzadas] = None
+
+
+def obtener_matriz_tasas(
+    pares: Iterable[str] = (), ruta_cotizaciones: Optional[str] = None
+) -> MatrizTasasCruzadas:
+    """Devuelve la matriz de tasas de la instantánea de precios vigente.
+
+    La matriz se recalcula solo cuando cambia la instantánea, con los pares
+    de esta llamada. Con la misma instantánea, los pares nuevos se agregan a
+    la matriz vigente.
+
+    Args:
+        pares (Iterable[str]): Pares `BASE/COTIZADA` que se necesitan (ej. los
+            de las órdenes pendientes).
+        ruta_cotizaciones (Optional[str]): Ver `obtener_instantanea_precios`.
+
+    Returns:
+        MatrizTasasCruzadas: La matriz vigente.
+    """
+    global _matriz
+    instantanea = obtener_instantanea_precios(ruta_cotizaciones)
+    matriz = _matriz
+    if matriz is None or matriz.version != instantanea.version:
+        matriz = _matriz = MatrizTasasCruzadas(instantanea, pares)
+        return matriz
+    for par in pares:
+        matriz.tasa_par(par)
+    return matriz
@@ -1,49 +1,61 @@
 """Blueprint para la API de Datos de Mercado y Disparador del Motor.
 
 Este módulo actúa como un **Gateway** que expone datos de mercado al frontend.
-Su rol más importante es el endpoint `/actualizar`, que funciona como el
-**'heartbeat' (latido) del simulador**: no solo obtiene los precios más
-recientes, sino que también dispara el motor de ejecución de órdenes pendientes.
+El endpoint `/actualizar` es el **'heartbeat' (latido) del simulador**: informa
+la versión vigente de los datos, que el planificador en segundo plano mantiene
+actualizados ejecutando también el motor de órdenes pendientes.
 
 Las otras rutas proveen datos ya procesados y formateados para la UI.
 """
 
-from flask import Blueprint, jsonify
-from backend.servicios.api_cotizaciones import obtener_datos_criptos_coingecko, obtener_velas_de_api
+from flask import Blueprint, jsonify, request
+from backend.acceso_datos.historial_precios import obtener_historial_precios
+from backend.servicios.api_cotizaciones import obtener_serie_velas
 from backend.servicios.presentacion_datos import obtener_cotizaciones_formateadas
-
-from backend.servicios.trading.motor import verificar_y_ejecutar_ordenes_pendientes
+from backend.servicios.planificador_mercado import obtener_planificador
+from backend.servicios.trading.motor_eventos import obtener_motor_eventos
+from backend.servicios.velas_columnares import SerieVelas
+import config
 
 bp = Blueprint("api_externa", __name__, url_prefix="/api")
 
 
 @bp.route("/actualizar")
 def actualizar():
-    """Endpoint 'Heartbeat': Actualiza precios y ejecuta el motor de órdenes.
+    """Endpoint 'Heartbeat': Devuelve la versión vigente de los datos de mercado.
+
+    Las cotizaciones se actualizan en segundo plano (ver `planificador_mercado`),
+    que también ejecuta el motor de órdenes tras cada actualización. Por eso,
+    esta ruta normalmente no consulta ninguna API externa: el frontend la usa
+    para saber si hay datos nuevos comparando la `version`.
+
+    Se fuerza una actualización si se pide con `?forzar=1` o si el planificador
+    no está en ejecución, pero solo si los datos tienen más de
+    `config.EDAD_MINIMA_ACTUALIZACION_FORZADA_S` segundos. Las actualizaciones
+    concurrentes se agrupan en una sola consulta a la API externa.
+
+    Returns:
+        Una respuesta JSON con `version`, `cantidad_criptos` y
+        `ultima_actualizacion` de los datos de mercado.
+    """
+    planificador = obtener_planificador()
+    if request.args.get("forzar") in ("1", "true") or not planificador.activo:
+        estado = planificador.actualizar_si_antigua(config.EDAD_MINIMA_ACTUALIZACION_FORZADA_S)
+    else:
+        estado = planificador.estado()
+    return jsonify({"estado": "ok", **estado})
 
-    Esta es una de las rutas más importantes del sistema. El frontend la llama
-    periódicamente para simular un mercado en tiempo real. Su flujo es:
 
-    1.  **Obtener Datos Frescos**: Llama a `obtener_datos_criptos_coingecko` para
-        actualizar la caché local de precios con los últimos datos del mercado.
-    2.  **Activar el Motor**: Con los nuevos precios ya guardados, invoca a
-        `verificar_y_ejecutar_ordenes_pendientes`, el corazón del motor de
-        trading, para que evalúe y ejecute órdenes Stop-Limit pendientes.
+@bp.route("/motor")
+def estado_motor():
+    """API Endpoint: Devuelve las métricas del motor de órdenes por eventos.
 
     Returns:
-        Una respuesta JSON simple confirmando que la actualización se completó.
+        Una respuesta JSON con la cantidad de ciclos, las órdenes evaluadas,
+        disparadas y ejecutadas, la duración acumulada y el último ciclo
+        (ver `motor_eventos.MotorEventos.estadisticas`).
     """
-    print("--- PING: Endpoint /api/actualizar ALCANZADO ---")
-    
-    # 1. Obtener los datos más recientes de cotizaciones y guardarlos.
-    datos_criptos = obtener_datos_criptos_coingecko()
-    
-    # --- 2. ¡ACTIVAR EL MOTOR DE EJECUCIÓN DE ÓRDENES! ---
-    # Con los precios frescos en memoria, verificamos si alguna orden pendiente se cumple.
-    verificar_y_ejecutar_ordenes_pendientes()
-    
-    # 3. Devolver la respuesta al frontend.
-    return jsonify({"estado": "ok", "cantidad_criptos": len(datos_criptos)})
+    return jsonify(obtener_motor_eventos().estadisticas())
 
 
 @bp.route("/cotizaciones")
@@ -64,7 +76,7 @@ def get_cotizaciones():
 def obtener_datos_velas_por_ticker(ticker: str, interval: str):
     """API Endpoint: Devuelve datos de velas (candlestick) para un activo.
 
-    Actúa como un passthrough hacia el servicio `obtener_velas_de_api`, que
+    Actúa como un passthrough hacia el servicio `obtener_serie_velas`, que
     se encarga de la comunicación con la API externa (Binance) para obtener
     los datos históricos necesarios para los gráficos de velas.
 
@@ -72,13 +84,52 @@ def obtener_datos_velas_por_ticker(ticker: str, interval: str):
         ticker: El símbolo del activo (ej. "BTC").
         interval: El intervalo de tiempo de las velas (ej. "1h", "4h", "1d").
 
+    Query Params:
+        formato (str, opcional): "columnas" para recibir un objeto con una
+            lista por campo (`{"time": [...], "open": [...], ...}`), mucho más
+            compacto. Por defecto, una lista de velas.
+
     Returns:
-        Una respuesta JSON con los datos para el gráfico o una lista vacía
-        en caso de error.
+        Una respuesta JSON con los datos para el gráfico, o vacía en caso de error.
     """
+    columnar = request.args.get("formato") == "columnas"
     try:
-        datos = obtener_velas_de_api(ticker, interval)
-        return jsonify(datos)
+        serie = obtener_serie_velas(ticker, interval)
+        return jsonify(serie.columnas() if columnar else serie.filas())
     except Exception as e:
         print(f"❌ Error en la ruta de velas para {ticker}/{interval}: {e}")
-        return jsonify([])
\ No newline at end of file
+        return jsonify(SerieVelas().columnas() if columnar else [])
+
+
+@bp.route("/historial-precios/<string:ticker>")
+def obtener_historial_precios_por_ticker(ticker: str):
+    """API Endpoint: Devuelve el historial local de precios de un activo.
+
+    Lee el buffer circular del ticker (ver `historial_precios`), sin llamar a
+    ninguna API externa. Sirve para dibujar sparklines y calcular variaciones
+    con los precios observados por el propio simulador.
+
+    Query Params:
+        segundos (int, opcional): Ventana hacia atrás desde la última
+            observación. Por defecto, 24 horas.
+
+    Returns:
+        Una respuesta JSON con los puntos `[timestamp, precio, volumen]` y las
+        variaciones de 1h y 24h (null si el historial no cubre el período).
+    """
+    try:
+        segundos = int(request.args.get("segundos", 86400))
+    except ValueError:
+        return jsonify({"error": "El parámetro 'segundos' debe ser un entero."}), 400
+
+    buffer = obtener_historial_precios().buffer(ticker)
+    if buffer is None or not len(buffer):
+        return jsonify({"ticker": ticker.upper(), "puntos": [], "1h_%": None, "24h_%": None})
+
+    desde = buffer.ultima()[0] - segundos
+    return jsonify({
+        "ticker": ticker.upper(),
+        "puntos": [list(observacion) for observacion in buffer.ventana(desde)],
+        "1h_%": buffer.variacion_porcentual(3600),
+        "24h_%": buffer.variacion_porcentual(86400),
+    })
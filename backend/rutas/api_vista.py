@@ -10,7 +10,7 @@ Responsabilidades:
 - Delegar toda la lógica de negocio a la capa de `servicios`.
 """
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from backend.servicios.estado_billetera import estado_actual_completo, obtener_historial_formateado, obtener_comisiones_formateadas
 from backend.acceso_datos.datos_ordenes import cargar_ordenes_pendientes
 from backend.servicios.trading.gestor import cancelar_orden_pendiente
@@ -30,8 +30,21 @@ def get_estado_billetera_completo():
 
 @bp.route("/historial")
 def get_historial_transacciones():
-    """API Endpoint: Devuelve el historial de transacciones formateado."""
-    return jsonify(obtener_historial_formateado())
+    """API Endpoint: Devuelve el historial de transacciones formateado.
+
+    Acepta los parámetros opcionales `limite` y `desplazamiento` en la query
+    string para paginar desde la operación más reciente hacia atrás, y
+    `desde`/`hasta` (timestamps ISO, ej. `2025-03-01`) para limitar el
+    historial a un intervalo de tiempo.
+    """
+    limite = request.args.get("limite", type=int)
+    desplazamiento = request.args.get("desplazamiento", default=0, type=int)
+    return jsonify(obtener_historial_formateado(
+        limite=limite,
+        desplazamiento=max(desplazamiento, 0),
+        desde=request.args.get("desde") or None,
+        hasta=request.args.get("hasta") or None,
+    ))
 
 
 @bp.route("/comisiones")
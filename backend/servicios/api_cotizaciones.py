@@ -4,7 +4,9 @@ Este módulo actúa como una capa de abstracción (Facade/Adapter) que aísla al
 resto de la aplicación de las complejidades de las APIs de terceros (CoinGecko,
 Binance). Su responsabilidad sigue un patrón ETL (Extract, Transform, Load):
 
--   **Extract**: Realiza peticiones HTTP a los endpoints de las APIs externas.
+-   **Extract**: Obtiene las respuestas de las APIs externas a través del
+    proveedor configurado (ver `proveedor_mercado`): en vivo, con el cliente
+    HTTP compartido, o grabadas, para repetirlas sin conexión.
 -   **Transform**: Procesa las respuestas JSON, las limpia, y las mapea a un
     esquema de datos interno y estandarizado para el simulador.
 -   **Load**: Persiste los datos transformados en un archivo local (JSON) que
@@ -12,132 +14,263 @@ Binance). Su responsabilidad sigue un patrón ETL (Extract, Transform, Load):
     el rendimiento.
 """
 
-from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
 import requests
-import json
-from typing import Any, Dict, List
+import threading
+from typing import Any, Dict, List, Optional
 
 from backend.utils.utilidades_numericas import a_decimal
 from backend.acceso_datos.datos_cotizaciones import guardar_datos_cotizaciones
+from backend.acceso_datos.historial_precios import obtener_historial_precios
+from backend.servicios.cache_velas import CacheVelas
+from backend.servicios.velas_columnares import SerieVelas
+from backend.servicios.proveedor_mercado import RECURSO_MERCADOS, RECURSO_VELAS, obtener_proveedor
 import config
 
-def obtener_datos_criptos_coingecko() -> List[Dict[str, Any]]:
-    """Implementa el pipeline ETL para los datos de mercado de CoinGecko.
 
-    1.  **Extract**: Realiza una petición GET a la API de CoinGecko para obtener
-        las principales criptomonedas por capitalización de mercado.
-    2.  **Transform**: Itera sobre la respuesta JSON. Cada objeto de criptomoneda
-        es mapeado a un diccionario con una estructura interna definida.
-        Los valores numéricos se convierten a `Decimal` para precisión y luego
-        a `str` para su almacenamiento serializado en JSON.
-    3.  **Load**: Llama a `guardar_datos_cotizaciones` para persistir la lista
-        transformada en un archivo local, que actúa como caché.
+def _peso_velas_binance(limite: int) -> int:
+    """Peso que Binance asigna a una consulta de velas según su `limit`."""
+    if limite < 100:
+        return 1
+    if limite < 500:
+        return 2
+    if limite <= 1000:
+        return 5
+    return 10
+
+
+def _transformar_cotizacion(dato: Dict[str, Any]) -> Dict[str, Any]:
+    """Mapea una criptomoneda de CoinGecko al formato interno (sin su `id` de ranking)."""
+    return {
+        "nombre": dato.get("name"),
+        "ticker": dato.get('symbol', '').upper(),
+        "logo": dato.get("image"),
+        "precio_usd": str(a_decimal(dato.get("current_price"))),
+        "1h_%": str(a_decimal(dato.get("price_change_percentage_1h_in_currency"))),
+        "24h_%": str(a_decimal(dato.get("price_change_percentage_24h_in_currency"))),
+        "7d_%": str(a_decimal(dato.get("price_change_percentage_7d_in_currency"))),
+        "market_cap": str(a_decimal(dato.get("market_cap"))),
+        "volumen_24h": str(a_decimal(dato.get("total_volume"))),
+        "circulating_supply": str(a_decimal(dato.get("circulating_supply"))),
+    }
+
+
+# Última versión válida de cada página de CoinGecko, para reemplazar una página
+# que falle sin descartar el resto de la actualización.
+_ultimas_paginas: Dict[int, List[Dict[str, Any]]] = {}
+# Primera página que se pide en la próxima actualización (ver `_paginas_a_pedir`).
+_siguiente_pagina = 1
+_lock_paginas = threading.Lock()
+
+
+def _paginas_a_pedir(total: int) -> List[int]:
+    """Elige las páginas que se piden en esta actualización, rotando entre todas.
+
+    Con una actualización cada `config.INTERVALO_ACTUALIZACION_MERCADO`
+    segundos, cada una puede hacer como máximo la parte proporcional de
+    `config.LIMITE_PETICIONES_COINGECKO_MINUTO`. Si el listado tiene más
+    páginas, cada actualización pide las siguientes de la rotación y las
+    demás conservan su última versión.
+
+    Args:
+        total (int): Cantidad de páginas del listado.
 
     Returns:
-        Una lista de diccionarios con el formato interno estandarizado.
-        Retorna una lista vacía si ocurre cualquier error de red o de parseo.
+        List[int]: Los números de página (desde 1) que se piden.
+    """
+    global _siguiente_pagina
+    presupuesto = int(config.LIMITE_PETICIONES_COINGECKO_MINUTO * config.INTERVALO_ACTUALIZACION_MERCADO / 60)
+    cantidad = max(1, min(total, presupuesto))
+    with _lock_paginas:
+        inicio = (_siguiente_pagina - 1) % total
+        _siguiente_pagina = (inicio + cantidad) % total + 1
+    return [(inicio + i) % total + 1 for i in range(cantidad)]
 
-    Side Effects:
-        - Sobrescribe el archivo de cotizaciones (`cotizaciones.json`) con los
-          nuevos datos obtenidos.
+
+def _obtener_pagina_coingecko(pagina: int, por_pagina: int) -> Optional[List[Dict[str, Any]]]:
+    """Pide y transforma una página del listado de mercado de CoinGecko.
+
+    Returns:
+        Las criptomonedas de la página en el formato interno. Si la petición o
+        el procesamiento fallan, la última versión válida de esa página, o None
+        si nunca se obtuvo.
     """
     params = {
         "vs_currency": "usd",
         "order": "market_cap_desc",
-        "per_page": config.CANTIDAD_CRIPTOMONEDAS,
-        "page": 1,
+        "per_page": por_pagina,
+        "page": pagina,
         "sparkline": "false",
         "price_change_percentage": "1h,24h,7d",
     }
 
     try:
-        respuesta = requests.get(config.COINGECKO_URL, params, timeout=10)
-        respuesta.raise_for_status()
-    except Exception as e:
-        print(f"❌ Error al obtener datos de CoinGecko: {str(e)}")
-        return []
+        datos = obtener_proveedor().obtener(
+            "coingecko", RECURSO_MERCADOS, f"{pagina}/{por_pagina}", config.COINGECKO_URL, params
+        )
+        filas = [_transformar_cotizacion(dato) for dato in datos]
+    except (requests.exceptions.RequestException, AttributeError, LookupError, TypeError, ValueError) as e:
+        print(f"❌ Error al obtener la página {pagina} de CoinGecko: {str(e)}")
+        with _lock_paginas:
+            return _ultimas_paginas.get(pagina)
 
-    print(f"✅ Estado de la respuesta CoinGecko: {respuesta.status_code}")
+    with _lock_paginas:
+        _ultimas_paginas[pagina] = filas
+    return filas
 
-    try:
-        datos = respuesta.json()
-        resultado = []
-        
-        # Itera sobre los datos recibidos de la API de cada criptomoneda, comenzando en 1.
-        for i, dato in enumerate(datos, start=1):
-            resultado.append({
-                "id": i,
-                "nombre": dato.get("name"),
-                "ticker": dato.get('symbol', '').upper(),
-                "logo": dato.get("image"),
-                "precio_usd": str(a_decimal(dato.get("current_price"))),
-                "1h_%": str(a_decimal(dato.get("price_change_percentage_1h_in_currency"))),
-                "24h_%": str(a_decimal(dato.get("price_change_percentage_24h_in_currency"))),
-                "7d_%": str(a_decimal(dato.get("price_change_percentage_7d_in_currency"))),
-                "market_cap": str(a_decimal(dato.get("market_cap"))),
-                "volumen_24h": str(a_decimal(dato.get("total_volume"))),
-                "circulating_supply": str(a_decimal(dato.get("circulating_supply"))),
-            })
-    except (KeyError, TypeError, ValueError, json.JSONDecodeError) as e:
-        print(f"❌ Error al procesar los datos de CoinGecko: {str(e)}")
+
+def obtener_datos_criptos_coingecko() -> List[Dict[str, Any]]:
+    """Implementa el pipeline ETL para los datos de mercado de CoinGecko.
+
+    1.  **Extract**: Pide a CoinGecko las `config.CANTIDAD_CRIPTOMONEDAS`
+        principales criptomonedas por capitalización de mercado. El listado
+        se pagina (`config.POR_PAGINA_COINGECKO` por página) y las páginas se
+        piden en paralelo en un pool de `config.HILOS_INGESTA_COINGECKO` hilos,
+        respetando el límite de tasa del cliente compartido. Si todas las
+        páginas no entran en el límite por actualización, se piden por turnos
+        (ver `_paginas_a_pedir`).
+    2.  **Transform**: Cada objeto de criptomoneda es mapeado a un diccionario
+        con una estructura interna definida. Los valores numéricos se
+        convierten a `Decimal` para precisión y luego a `str` para su
+        almacenamiento serializado en JSON. Las páginas se combinan por
+        capitalización de mercado, sin tickers repetidos.
+    3.  **Load**: Llama a `guardar_datos_cotizaciones` para persistir la lista
+        transformada en un archivo local, que actúa como caché, y agrega una
+        observación por ticker al historial de precios en memoria.
+
+    Si una página falla, se usa su última versión válida en lugar de
+    descartar toda la actualización.
+
+    Returns:
+        Una lista de diccionarios con el formato interno estandarizado.
+        Retorna una lista vacía si no se pudo obtener ninguna página nueva.
+
+    Side Effects:
+        - Sobrescribe el archivo de cotizaciones (`cotizaciones.json`) con los
+          nuevos datos obtenidos.
+        - Agrega los precios al historial de precios (y lo persiste si
+          `config.PERSISTIR_HISTORIAL_PRECIOS` está activo).
+    """
+    cantidad = config.CANTIDAD_CRIPTOMONEDAS
+    por_pagina = min(cantidad, config.POR_PAGINA_COINGECKO)
+    paginas = range(1, -(-cantidad // por_pagina) + 1)
+    pedidas = _paginas_a_pedir(len(paginas))
+
+    with _lock_paginas:
+        anteriores = {pagina: _ultimas_paginas.get(pagina) for pagina in paginas}
+    if len(pedidas) == 1:
+        nuevas = [_obtener_pagina_coingecko(pedidas[0], por_pagina)]
+    else:
+        with ThreadPoolExecutor(max_workers=min(config.HILOS_INGESTA_COINGECKO, len(pedidas))) as pool:
+            nuevas = list(pool.map(lambda pagina: _obtener_pagina_coingecko(pagina, por_pagina), pedidas))
+
+    # Sin ninguna página nueva no hay nada que actualizar.
+    if all(filas is None or filas is anteriores[pagina] for pagina, filas in zip(pedidas, nuevas)):
         return []
+    # Las páginas que no se pidieron en esta actualización usan su última versión.
+    resultados = [anteriores[pagina] for pagina in paginas]
+    for pagina, filas in zip(pedidas, nuevas):
+        resultados[pagina - 1] = filas
+
+    # Las páginas se piden en momentos distintos y el ranking puede moverse
+    # entre ellas: se reordena por capitalización y se descartan los repetidos.
+    filas = [fila for pagina in resultados if pagina for fila in pagina]
+    filas.sort(key=lambda fila: a_decimal(fila["market_cap"]), reverse=True)
+    resultado = []
+    vistos = set()
+    for fila in filas:
+        if fila["ticker"] in vistos:
+            continue
+        vistos.add(fila["ticker"])
+        resultado.append({"id": len(resultado) + 1, **fila})
+        if len(resultado) == cantidad:
+            break
 
     print(f"💡 Total de criptos procesadas: {len(resultado)}")
     guardar_datos_cotizaciones(resultado)
+    historial = obtener_historial_precios()
+    historial.registrar_cotizaciones(resultado, timestamp=obtener_proveedor().ahora())
+    historial.guardar_periodico()
     return resultado
 
 
-def obtener_velas_de_api(ticker: str, interval: str) -> List[Dict[str, Any]]:
-    """Obtiene y transforma datos de velas (K-lines) desde la API de Binance.
+def _consultar_velas_binance(simbolo: str, interval: str, desde_ms: Optional[int] = None) -> Optional[SerieVelas]:
+    """Pide velas a la API de Binance y las convierte a una serie columnar.
 
-    Realiza una petición a la API de Binance y transforma la respuesta, que es
-    una lista de listas, en un formato más legible y útil para el frontend:
-    una lista de diccionarios con claves explícitas (timestamp, open, high, etc.).
+    La API de Binance devuelve una lista de listas; se recorre una sola vez
+    para llenar las columnas de la serie (ver `velas_columnares`).
 
     Args:
-        ticker: El ticker del par a consultar (ej. "BTC"). Se le añade "USDT"
-                automáticamente para formar el par de trading.
-        interval: El intervalo de tiempo para las velas (ej. "1h", "4h", "1d").
+        simbolo: El ticker base (ej. "BTC"). Se le añade "USDT" para formar el par.
+        interval: El intervalo de tiempo de las velas (ej. "1h", "4h", "1d").
+        desde_ms: Si se indica, solo se piden las velas desde ese momento
+                  (`startTime`, en milisegundos).
 
     Returns:
-        Una lista de diccionarios, donde cada uno representa una vela. Devuelve
-        una lista vacía si ocurre un error de red o de formato de datos.
+        Las velas en orden cronológico, o None si ocurre un error de red o de
+        formato de datos.
     """
     params = {
-        "symbol": f"{ticker.upper()}USDT",
+        "symbol": f"{simbolo.upper()}USDT",
         "interval": interval,
-        "limit": config.CANTIDAD_VELAS,
+        "limit": config.CANTIDAD_VELAS_BASE,
     }
+    if desde_ms is not None:
+        params["startTime"] = desde_ms
     try:
-        respuesta = requests.get(config.BINANCE_URL, params, timeout=10)
-        respuesta.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Error al obtener datos de Binance para {ticker} ({interval}): {str(e)}")
-        return []
-
-    print(f"✅ Estado de la respuesta Binance para {ticker} ({interval}): {respuesta.status_code}")
+        datos = obtener_proveedor().obtener(
+            "binance", RECURSO_VELAS, f"{params['symbol']}/{interval}", config.BINANCE_URL, params,
+            peso=_peso_velas_binance(config.CANTIDAD_VELAS_BASE),
+        )
+    except (requests.exceptions.RequestException, LookupError, ValueError) as e:
+        print(f"❌ Error al obtener datos de Binance para {simbolo} ({interval}): {str(e)}")
+        return None
 
+    if not isinstance(datos, list):
+        print(f"⚠️ Respuesta inesperada de Binance para {simbolo} ({interval}): {datos}")
+        return None
     try:
-        datos = respuesta.json()
-        if not isinstance(datos, list):
-            print(f"⚠️ Respuesta inesperada de Binance para {ticker} ({interval}): {datos}")
-            return []
-        
-        # La API de Binance devuelve una lista de listas.
-        # Cada sub-lista se mapea a un diccionario con claves descriptivas.
-        # El timestamp se convierte de milisegundos a segundos.
-        resultado = [
-            {
-                "time": int(vela[0] / 1000),
-                "open": str(Decimal(vela[1])),
-                "high": str(Decimal(vela[2])),
-                "low": str(Decimal(vela[3])),
-                "close": str(Decimal(vela[4])),
-                "volume": str(Decimal(vela[5])),
-            }
-            for vela in datos
-        ]
-        return resultado
-    except (json.JSONDecodeError, IndexError, TypeError) as e:
-        print(f"❌ Error al procesar los datos de velas de Binance para {ticker}: {e}")
-        return []
\ No newline at end of file
+        return SerieVelas.desde_binance(datos)
+    except (IndexError, TypeError, ValueError) as e:
+        print(f"❌ Error al procesar los datos de velas de Binance para {simbolo}: {e}")
+        return None
+
+
+def _ahora_mercado() -> float:
+    """Instante actual según el proveedor de datos (virtual al reproducir una grabación)."""
+    return obtener_proveedor().ahora()
+
+
+_cache_velas = CacheVelas(_consultar_velas_binance, config.MAX_SERIES_VELAS, reloj=_ahora_mercado)
+
+
+def obtener_serie_velas(ticker: str, interval: str) -> SerieVelas:
+    """Obtiene la serie columnar de velas (K-lines) de Binance, a través de una caché.
+
+    Las series se guardan por `(ticker, interval)` (ver `cache_velas`): mientras
+    la última vela no cierre, se sirven sin consultar Binance, y al vencer
+    solo se piden las velas posteriores a la última guardada. Un intervalo
+    mayor puede construirse remuestreando uno menor ya guardado.
+
+    Args:
+        ticker: El ticker del par a consultar (ej. "BTC"). Se le añade "USDT"
+                automáticamente para formar el par de trading.
+        interval: El intervalo de tiempo para las velas (ej. "1h", "4h", "1d").
+
+    Returns:
+        La serie de velas. Si ocurre un error de red o de formato de datos, la
+        última serie guardada, o una serie vacía.
+    """
+    return _cache_velas.obtener(ticker, interval)
+
+
+def obtener_velas_de_api(ticker: str, interval: str) -> List[Dict[str, Any]]:
+    """Obtiene las velas de un par como una lista de diccionarios.
+
+    Equivale a `obtener_serie_velas(ticker, interval).filas()`.
+
+    Returns:
+        Una lista de diccionarios, donde cada uno representa una vela
+        (time, open, high, low, close, volume).
+    """
+    return obtener_serie_velas(ticker, interval).filas()
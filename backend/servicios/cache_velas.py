@@ -0,0 +1,159 @@
+"""Caché LRU de Series de Velas por Símbolo e Intervalo.
+
+Cada carga del gráfico y cada cambio de intervalo en la página de trading
+pedía a Binance las `config.CANTIDAD_VELAS` velas completas. Este módulo
+guarda la última serie de cada `(símbolo, intervalo)`:
+
+-   Mientras la entrada esté vigente, la serie se sirve sin consultar Binance.
+-   Una entrada vence al cerrar su última vela (o antes, tras
+    `config.TTL_MAXIMO_VELAS_S`, para que la vela en curso no quede congelada
+    en intervalos largos).
+-   Al vencer, solo se piden las velas desde la última guardada (`startTime`):
+    la vela en curso se reemplaza, las nuevas se agregan y la serie se
+    recorta a `config.CANTIDAD_VELAS_BASE`.
+
+Cada serie guarda `config.CANTIDAD_VELAS_BASE` velas (más de las
+`config.CANTIDAD_VELAS` que se muestran) para poder servir intervalos
+mayores sin consultar Binance: si se pide un intervalo que no está guardado,
+se remuestrea la serie guardada más gruesa cuyo intervalo lo divide (ej. 1h
+a partir de 15m, 4h a partir de 1h), siempre que alcance para una serie
+completa. Solo si ninguna alcanza, se consulta Binance.
+
+La caché está acotada: al superar `config.MAX_SERIES_VELAS` se descarta la
+serie usada menos recientemente. Las series son `SerieVelas` inmutables, así
+que se comparten con los llamadores sin copiarlas.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from backend.servicios.velas_columnares import SerieVelas
+import config
+
+# Duración en segundos de cada intervalo de Binance. El mes se aproxima a 31
+# días: solo se usa para decidir cuándo vence la entrada.
+DURACION_INTERVALOS = {
+    "1s": 1, "1m": 60, "3m": 180, "5m": 300, "15m": 900, "30m": 1800,
+    "1h": 3600, "2h": 7200, "4h": 14400, "6h": 21600, "8h": 28800, "12h": 43200,
+    "1d": 86400, "3d": 259200, "1w": 604800, "1M": 2678400,
+}
+
+# Intervalos que pueden construirse remuestreando uno menor, con el desfase
+# de sus bloques respecto de la época: las velas semanales de Binance empiezan
+# el lunes (la época fue un jueves). Los meses no tienen duración fija.
+DESFASE_REMUESTREO = {
+    intervalo: 0 for intervalo in ("1m", "3m", "5m", "15m", "30m", "1h", "2h", "4h", "6h", "8h", "12h", "1d")
+}
+DESFASE_REMUESTREO["1w"] = 4 * 86400
+
+# (símbolo, intervalo, desde en ms o None) -> velas, o None si falló la consulta.
+Consulta = Callable[[str, str, Optional[int]], Optional[SerieVelas]]
+
+
+class CacheVelas:
+    """Caché LRU de series de velas, con actualización incremental de la cola."""
+
+    def __init__(self, consulta: Consulta, max_series: int, reloj: Callable[[], float] = time.time):
+        """Inicializa la caché vacía.
+
+        Args:
+            consulta (Consulta): Función que pide velas a la API externa.
+            max_series (int): Cantidad máxima de series guardadas.
+            reloj: Inyectable para las pruebas.
+        """
+        self._consulta = consulta
+        self.max_series = max_series
+        self._reloj = reloj
+        # (símbolo, intervalo) -> (velas, vencimiento)
+        self._series: "OrderedDict[Tuple[str, str], Tuple[SerieVelas, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _vencimiento(self, velas: SerieVelas, intervalo: str) -> float:
+        ahora = self._reloj()
+        duracion = DURACION_INTERVALOS.get(intervalo)
+        if not len(velas) or duracion is None:
+            return ahora
+        cierre_ultima = velas.ultimo_tiempo + duracion
+        return min(cierre_ultima, ahora + config.TTL_MAXIMO_VELAS_S)
+
+    def obtener(self, simbolo: str, intervalo: str) -> SerieVelas:
+        """Devuelve las últimas `config.CANTIDAD_VELAS` velas de un símbolo e intervalo.
+
+        Usa, en orden de preferencia, la serie guardada del intervalo, una
+        serie guardada de un intervalo menor remuestreada, o una consulta.
+
+        Returns:
+            SerieVelas: La serie. Si la consulta falla, la última serie
+                        guardada (aunque esté vencida), o una serie vacía.
+        """
+        simbolo = simbolo.upper()
+        with self._lock:
+            guardada = (simbolo, intervalo) in self._series
+        serie = None if guardada else self._remuestrear_guardada(simbolo, intervalo)
+        if serie is None:
+            serie = self._serie(simbolo, intervalo)
+        return serie.rebanada(max(0, len(serie) - config.CANTIDAD_VELAS))
+
+    def _remuestrear_guardada(self, simbolo: str, intervalo: str) -> Optional[SerieVelas]:
+        """Construye la serie de `intervalo` a partir de una serie guardada de un intervalo menor.
+
+        Returns:
+            Optional[SerieVelas]: La serie remuestreada, o None si ninguna
+                serie guardada cubre `config.CANTIDAD_VELAS` velas del intervalo.
+        """
+        if intervalo not in DESFASE_REMUESTREO:
+            return None
+        duracion, desfase = DURACION_INTERVALOS[intervalo], DESFASE_REMUESTREO[intervalo]
+        with self._lock:
+            bases = [
+                base for (simbolo_guardado, base) in self._series
+                if simbolo_guardado == simbolo
+                and base in DESFASE_REMUESTREO
+                and DURACION_INTERVALOS[base] < duracion
+                and duracion % DURACION_INTERVALOS[base] == 0
+            ]
+        # La base más gruesa que alcance requiere menos velas por bloque.
+        for base in sorted(bases, key=DURACION_INTERVALOS.get, reverse=True):
+            remuestreada = self._serie(simbolo, base).remuestrear(duracion, desfase)
+            if len(remuestreada) >= config.CANTIDAD_VELAS:
+                return remuestreada
+        return None
+
+    def _serie(self, simbolo: str, intervalo: str) -> SerieVelas:
+        """Devuelve la serie guardada de un intervalo, actualizando su cola si venció."""
+        clave = (simbolo, intervalo)
+        with self._lock:
+            entrada = self._series.get(clave)
+            if entrada is not None:
+                self._series.move_to_end(clave)
+                if self._reloj() < entrada[1]:
+                    return entrada[0]
+
+        guardadas = entrada[0] if entrada is not None else SerieVelas()
+        ultimo = guardadas.ultimo_tiempo
+        desde_ms = ultimo * 1000 if ultimo is not None else None
+        duracion = DURACION_INTERVALOS.get(intervalo)
+        if desde_ms is not None and (
+            duracion is None or (self._reloj() - ultimo) / duracion >= config.CANTIDAD_VELAS_BASE - 1
+        ):
+            # Con `startTime`, Binance devuelve las velas más antiguas desde esa
+            # fecha: si faltan más de una serie completa, se pide la serie entera.
+            desde_ms = None
+        nuevas = self._consulta(clave[0], intervalo, desde_ms)
+        if nuevas is None:
+            return guardadas
+
+        velas = guardadas.fusionar(nuevas, config.CANTIDAD_VELAS_BASE)
+        with self._lock:
+            self._series[clave] = (velas, self._vencimiento(velas, intervalo))
+            self._series.move_to_end(clave)
+            while len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+        return velas
+
+    def limpiar(self) -> None:
+        """Descarta todas las series guardadas."""
+        with self._lock:
+            self._series.clear()
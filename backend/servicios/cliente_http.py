@@ -0,0 +1,279 @@
+"""Cliente HTTP Compartido para las APIs Externas (CoinGecko y Binance).
+
+Antes, cada consulta usaba `requests.get` a nivel de módulo: una conexión
+TCP+TLS nueva por petición, sin reintentos y sin tener en cuenta los límites
+de peso de peticiones de cada API. Este módulo centraliza esas llamadas:
+
+-   **Conexiones reutilizables**: cada API externa tiene su propia
+    `requests.Session` con un pool de conexiones keep-alive hacia su host.
+-   **Limitador de tasa**: un "token bucket" por API externa. Cada petición
+    consume tokens según su peso; si no alcanzan, espera a que se repongan
+    en lugar de recibir un 429.
+-   **Reintentos con backoff exponencial y jitter** ante errores de red,
+    429 y 5xx, respetando la cabecera `Retry-After` si viene. Si el servidor
+    pide esperar más que el máximo configurado, la petición falla en lugar
+    de reintentarse antes de tiempo.
+-   **Cabeceras de límite**: lee el peso usado (`X-MBX-USED-WEIGHT-1M` de
+    Binance) o las peticiones restantes (`X-RateLimit-Remaining`) y ajusta el
+    limitador para no exceder el límite real del servidor.
+
+Las URLs se toman de `config`, así que las pruebas pueden apuntar los
+clientes a un servidor HTTP local.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+
+# Códigos de estado que justifican reintentar la petición.
+ESTADOS_REINTENTABLES = frozenset({429, 500, 502, 503, 504})
+
+# Cabeceras con el peso ya consumido en la ventana actual.
+_CABECERAS_PESO_USADO = ("X-MBX-USED-WEIGHT-1M", "X-MBX-USED-WEIGHT")
+# Cabeceras con las peticiones que quedan en la ventana actual.
+_CABECERAS_RESTANTES = ("X-RateLimit-Remaining", "RateLimit-Remaining")
+
+
+def _segundos_retry_after(valor: str) -> Optional[float]:
+    """Interpreta una cabecera `Retry-After` (segundos o fecha HTTP).
+
+    Returns:
+        Optional[float]: Los segundos a esperar (nunca negativos), o None si
+                         el valor no es válido.
+    """
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        fecha = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, fecha.timestamp() - time.time())
+
+
+class LimitadorTokens:
+    """Limitador de tasa "token bucket", seguro entre hilos."""
+
+    def __init__(
+        self,
+        capacidad: float,
+        por_segundo: float,
+        reloj: Callable[[], float] = time.monotonic,
+        dormir: Callable[[float], None] = time.sleep,
+    ):
+        """Inicializa el limitador con el balde lleno.
+
+        Args:
+            capacidad (float): Cantidad máxima de tokens acumulables (ráfaga).
+            por_segundo (float): Tokens que se reponen por segundo.
+            reloj, dormir: Inyectables para las pruebas.
+        """
+        self.capacidad = capacidad
+        self.por_segundo = por_segundo
+        self._reloj = reloj
+        self._dormir = dormir
+        self._tokens = capacidad
+        self._ultima_reposicion = reloj()
+        self._lock = threading.Lock()
+
+    def _reponer(self) -> None:
+        ahora = self._reloj()
+        self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultima_reposicion) * self.por_segundo)
+        self._ultima_reposicion = ahora
+
+    def adquirir(self, peso: float = 1) -> float:
+        """Consume `peso` tokens, esperando si no hay suficientes.
+
+        Returns:
+            float: Los segundos que se esperó.
+        """
+        peso = min(peso, self.capacidad)
+        esperado = 0.0
+        while True:
+            with self._lock:
+                self._reponer()
+                if self._tokens >= peso:
+                    self._tokens -= peso
+                    return esperado
+                espera = (peso - self._tokens) / self.por_segundo
+            self._dormir(espera)
+            esperado += espera
+
+    def limitar_disponibles(self, disponibles: float) -> None:
+        """Reduce los tokens disponibles a lo que informa el servidor."""
+        with self._lock:
+            self._reponer()
+            self._tokens = min(self._tokens, max(0.0, disponibles))
+
+
+class ClienteUpstream:
+    """Cliente HTTP de una API externa: pool de conexiones, limitador y reintentos."""
+
+    def __init__(
+        self,
+        nombre: str,
+        limitador: LimitadorTokens,
+        limite_peso: Optional[float] = None,
+        reintentos: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        retry_after_max: float = 60.0,
+        timeout: float = 10.0,
+        dormir: Callable[[float], None] = time.sleep,
+    ):
+        """Inicializa el cliente.
+
+        Args:
+            nombre (str): Nombre de la API, para los mensajes.
+            limitador (LimitadorTokens): Limitador de tasa de esta API.
+            limite_peso (Optional[float]): Peso máximo por ventana que admite
+                el servidor; permite traducir el peso usado que informa en sus
+                cabeceras a tokens disponibles.
+            reintentos (int): Reintentos tras el primer intento fallido.
+            backoff_base (float): Espera base (segundos) antes del primer reintento.
+            backoff_max (float): Espera máxima entre reintentos.
+            retry_after_max (float): Espera máxima que se acepta de una
+                cabecera `Retry-After`; si el servidor pide más, la
+                petición falla.
+            timeout (float): Timeout de cada petición, en segundos.
+            dormir: Inyectable para las pruebas.
+        """
+        self.nombre = nombre
+        self.limitador = limitador
+        self.limite_peso = limite_peso
+        self.reintentos = reintentos
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+        self.timeout = timeout
+        self._dormir = dormir
+        self.sesion = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=config.CONEXIONES_POR_HOST_HTTP)
+        self.sesion.mount("http://", adaptador)
+        self.sesion.mount("https://", adaptador)
+
+    def _espera_reintento(self, intento: int, respuesta: Optional[requests.Response]) -> Optional[float]:
+        """Calcula la espera antes de un reintento.
+
+        Si la respuesta trae `Retry-After`, se respeta; si no, se usa "full
+        jitter" sobre el backoff exponencial.
+
+        Returns:
+            Optional[float]: Los segundos a esperar, o None si `Retry-After`
+                             excede `retry_after_max`.
+        """
+        if respuesta is not None:
+            retry_after = respuesta.headers.get("Retry-After")
+            espera = _segundos_retry_after(retry_after) if retry_after is not None else None
+            if espera is not None:
+                return espera if espera <= self.retry_after_max else None
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** intento))
+
+    def _leer_cabeceras_limite(self, respuesta: requests.Response) -> None:
+        """Ajusta el limitador según las cabeceras de límite de la respuesta."""
+        if self.limite_peso is not None:
+            for cabecera in _CABECERAS_PESO_USADO:
+                valor = respuesta.headers.get(cabecera)
+                if valor is not None:
+                    try:
+                        self.limitador.limitar_disponibles(self.limite_peso - float(valor))
+                    except ValueError:
+                        pass
+                    return
+        for cabecera in _CABECERAS_RESTANTES:
+            valor = respuesta.headers.get(cabecera)
+            if valor is not None:
+                try:
+                    self.limitador.limitar_disponibles(float(valor))
+                except ValueError:
+                    pass
+                return
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, peso: float = 1) -> requests.Response:
+        """Realiza un GET respetando el límite de tasa y reintentando los fallos transitorios.
+
+        Args:
+            url (str): URL a consultar.
+            params (Optional[Dict[str, Any]]): Parámetros de la query string.
+            peso (float): Peso de la petición según la API (ej. Binance asigna
+                más peso a las consultas de velas grandes).
+
+        Returns:
+            requests.Response: Una respuesta exitosa.
+
+        Raises:
+            requests.exceptions.RequestException: Si la petición sigue fallando
+                después de agotar los reintentos, o si el servidor pide
+                esperar más de `retry_after_max`.
+        """
+        intento = 0
+        while True:
+            self.limitador.adquirir(peso)
+            respuesta = None
+            try:
+                respuesta = self.sesion.get(url, params=params, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if intento >= self.reintentos:
+                    raise
+            else:
+                self._leer_cabeceras_limite(respuesta)
+                if respuesta.status_code not in ESTADOS_REINTENTABLES or intento >= self.reintentos:
+                    respuesta.raise_for_status()
+                    return respuesta
+                if respuesta.status_code == 429:
+                    # El servidor ya considera excedido el límite: se vacía el balde.
+                    self.limitador.limitar_disponibles(0)
+
+            espera = self._espera_reintento(intento, respuesta)
+            if espera is None:
+                # Reintentar antes de lo pedido solo sumaría rechazos.
+                print(
+                    f"❌ {self.nombre} pide esperar más de {self.retry_after_max:.0f}s "
+                    f"(Retry-After: {respuesta.headers.get('Retry-After')}). Se abandona la petición."
+                )
+                respuesta.raise_for_status()
+            print(f"⚠️ Reintentando petición a {self.nombre} en {espera:.2f}s (intento {intento + 1}/{self.reintentos}).")
+            self._dormir(espera)
+            intento += 1
+
+
+_clientes: Dict[str, ClienteUpstream] = {}
+_lock_clientes = threading.Lock()
+
+
+def _crear_cliente(nombre: str) -> ClienteUpstream:
+    por_minuto, limite_peso = {
+        "coingecko": (config.LIMITE_PETICIONES_COINGECKO_MINUTO, None),
+        "binance": (config.LIMITE_PESO_BINANCE_MINUTO, config.LIMITE_PESO_BINANCE_MINUTO),
+    }[nombre]
+    return ClienteUpstream(
+        nombre,
+        LimitadorTokens(capacidad=por_minuto, por_segundo=por_minuto / 60),
+        limite_peso=limite_peso,
+        reintentos=config.REINTENTOS_HTTP,
+        backoff_base=config.BACKOFF_BASE_HTTP,
+        backoff_max=config.BACKOFF_MAX_HTTP,
+        retry_after_max=config.RETRY_AFTER_MAX_HTTP,
+        timeout=config.TIMEOUT_HTTP,
+    )
+
+
+def obtener_cliente(nombre: str) -> ClienteUpstream:
+    """Devuelve el cliente compartido de una API externa ("coingecko" o "binance").
+
+    Raises:
+        KeyError: Si la API no es conocida.
+    """
+    with _lock_clientes:
+        cliente = _clientes.get(nombre)
+        if cliente is None:
+            cliente = _clientes[nombre] = _crear_cliente(nombre)
+        return cliente
@@ -15,14 +15,14 @@ El pipeline de datos es el siguiente:
 """
 
 from decimal import Decimal
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from backend.acceso_datos.datos_billetera import cargar_billetera
 from backend.acceso_datos.datos_comisiones import cargar_comisiones
-from backend.acceso_datos.datos_cotizaciones import cargar_datos_cotizaciones
-from backend.acceso_datos.datos_historial import cargar_historial
+from backend.acceso_datos.indice_tickers import InfoTicker, obtener_indice_tickers
+from backend.acceso_datos.datos_historial import cargar_historial, cargar_historial_rango
 from backend.utils.formatters import format_datetime
-from backend.utils import utilidades_numericas
+from backend.utils import unidades_atomicas, utilidades_numericas
 import config
 
 def _division_segura(numerador: Decimal, denominador: Decimal) -> Decimal:
@@ -45,8 +45,14 @@ def _preparar_datos_compra(
     Returns:
         Un diccionario que mapea cada ticker a su `total_invertido` y
         `cantidad_comprada` acumulados.
+
+    Note:
+        Los montos guardados en unidades atómicas se acumulan como enteros y
+        se convierten a Decimal una única vez por ticker, al final.
     """
     datos_compra_por_ticker: Dict[str, Dict[str, Decimal]] = {}
+    # ticker -> [total invertido en unidades de USD, cantidad en unidades de cripto]
+    unidades_por_ticker: Dict[str, List[int]] = {}
     for operacion in historial:
         if config.ACCION_COMPRAR in operacion.get("tipo", "").lower():
             destino = operacion.get("destino", {})
@@ -58,12 +64,23 @@ def _preparar_datos_compra(
                     "total_invertido": utilidades_numericas.a_decimal(0),
                     "cantidad_comprada": utilidades_numericas.a_decimal(0),
                 }
-            datos_compra_por_ticker[ticker]["total_invertido"] += utilidades_numericas.a_decimal(
-                operacion.get("valor_usd")
-            )
-            datos_compra_por_ticker[ticker]["cantidad_comprada"] += utilidades_numericas.a_decimal(
-                destino.get("cantidad")
-            )
+                unidades_por_ticker[ticker] = [0, 0]
+            valor_usd = operacion.get("valor_usd")
+            if unidades_atomicas.es_unidades(valor_usd):
+                unidades_por_ticker[ticker][0] += valor_usd
+            else:
+                datos_compra_por_ticker[ticker]["total_invertido"] += utilidades_numericas.a_decimal(valor_usd)
+            cantidad = destino.get("cantidad")
+            if unidades_atomicas.es_unidades(cantidad):
+                unidades_por_ticker[ticker][1] += cantidad
+            else:
+                datos_compra_por_ticker[ticker]["cantidad_comprada"] += utilidades_numericas.a_decimal(cantidad)
+
+    for ticker, (unidades_usd, unidades_cripto) in unidades_por_ticker.items():
+        if unidades_usd:
+            datos_compra_por_ticker[ticker]["total_invertido"] += unidades_atomicas.desde_unidades_usd(unidades_usd)
+        if unidades_cripto:
+            datos_compra_por_ticker[ticker]["cantidad_comprada"] += unidades_atomicas.desde_unidades_cripto(unidades_cripto)
     return datos_compra_por_ticker
 
 def _calcular_metricas_activo(
@@ -104,7 +121,7 @@ def _calcular_metricas_activo(
 
 def _formatear_activo_para_presentacion(
     activo_calculado: Dict[str, Any],
-    cripto_info: Dict[str, Any],
+    cripto_info: InfoTicker,
     saldos: Dict[str, Decimal],
     total_billetera_usd: Decimal,
 ) -> Dict[str, Any]:
@@ -117,7 +134,7 @@ def _formatear_activo_para_presentacion(
 
     Args:
         activo_calculado: Diccionario con las métricas pre-calculadas.
-        cripto_info: Diccionario con información estática (nombre, logo).
+        cripto_info: Metadatos del ticker (nombre, logo), del índice de tickers.
         saldos: Diccionario con los saldos 'disponible' y 'reservado'.
         total_billetera_usd: Valor total del portafolio para calcular el %.
 
@@ -133,8 +150,8 @@ def _formatear_activo_para_presentacion(
 
     return {
         "ticker": activo_calculado["ticker"],
-        "nombre": cripto_info.get("nombre", activo_calculado["ticker"]),
-        "logo": cripto_info.get("logo", ""),
+        "nombre": cripto_info.nombre,
+        "logo": cripto_info.logo,
         "es_polvo": es_polvo,
         
         "cantidad_total": str(cantidad_total),
@@ -161,18 +178,8 @@ def estado_actual_completo(
     """Orquesta la creación del estado completo y formateado de la billetera."""
     billetera = cargar_billetera(ruta_archivo=ruta_billetera)
     historial = cargar_historial(ruta_archivo=ruta_historial)
-    cotizaciones_raw = cargar_datos_cotizaciones(ruta_archivo=ruta_cotizaciones)
-    
-    # Crear un diccionario para búsqueda rápida de información y precios
-    info_criptos = {c.get('ticker'): c for c in cotizaciones_raw if c.get('ticker')}
-    precios_locales = {ticker: utilidades_numericas.a_decimal(info.get('precio_usd', '0')) for ticker, info in info_criptos.items()}
-    
-    # Forzar datos canónicos para USDT para asegurar consistencia
-    info_criptos[config.MONEDA_FIAT_DEFAULT] = {
-        'nombre': 'Tether', 
-        'logo': 'https://assets.coingecko.com/coins/images/325/large/Tether.png?1696501661',
-        'ticker': config.MONEDA_FIAT_DEFAULT
-    }
+    # Nombres, logos y precios salen del índice compartido (que incluye los datos canónicos de USDT).
+    indice_tickers = obtener_indice_tickers(ruta_cotizaciones)
 
     datos_compra_por_ticker = _preparar_datos_compra(historial)
     activos_calculados = []
@@ -182,7 +189,7 @@ def estado_actual_completo(
         cantidad_total = utilidades_numericas.a_decimal(saldos.get("disponible", 0)) + utilidades_numericas.a_decimal(saldos.get("reservado", 0))
 
         if cantidad_total >= config.UMBRAL_CASI_CERO:
-            cripto_info_actual = info_criptos.get(ticker, {"nombre": ticker, "logo": ""})
+            cripto_info_actual = indice_tickers.info(ticker)
 
             if ticker == config.MONEDA_FIAT_DEFAULT:
                 metricas = {
@@ -191,7 +198,7 @@ def estado_actual_completo(
                     "porcentaje_ganancia": utilidades_numericas.a_decimal(0),
                 }
             else:
-                precio_actual = precios_locales.get(ticker, utilidades_numericas.a_decimal(0))
+                precio_actual = cripto_info_actual.precio or utilidades_numericas.a_decimal(0)
                 datos_compra_activo = datos_compra_por_ticker.get(ticker, {})
                 metricas = _calcular_metricas_activo(ticker, cantidad_total, precio_actual, datos_compra_activo)
             
@@ -210,9 +217,26 @@ def estado_actual_completo(
 
 def obtener_historial_formateado(
     ruta_historial: str = config.HISTORIAL_PATH,
+    limite: Optional[int] = None,
+    desplazamiento: int = 0,
+    desde: Optional[str] = None,
+    hasta: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
-    """Carga y formatea el historial de transacciones para el frontend."""
-    historial_crudo = cargar_historial(ruta_archivo=ruta_historial)
+    """Carga y formatea el historial de transacciones para el frontend.
+
+    Las operaciones se devuelven de la más reciente a la más antigua. Con
+    `limite` y `desplazamiento` solo se leen las operaciones de la página
+    solicitada, sin recorrer el historial completo. Con `desde` y/o `hasta`
+    (timestamps ISO, `hasta` excluido) se devuelven las operaciones de ese
+    intervalo, paginadas de la misma forma.
+    """
+    if desde is None and hasta is None:
+        historial_crudo = cargar_historial(
+            ruta_archivo=ruta_historial, limite=limite, desplazamiento=desplazamiento
+        )
+    else:
+        fin = None if limite is None else desplazamiento + limite
+        historial_crudo = cargar_historial_rango(desde, hasta, ruta_archivo=ruta_historial)[desplazamiento:fin]
     historial_formateado = []
 
     for item in historial_crudo:
@@ -224,9 +248,9 @@ def obtener_historial_formateado(
         
         # Lógica simplificada para determinar la cantidad principal de la operación
         if config.ACCION_COMPRAR in tipo_op.lower():
-            cantidad = utilidades_numericas.a_decimal(destino.get('cantidad'))
+            cantidad = unidades_atomicas.leer_monto_cripto(destino.get('cantidad'))
         else: # Venta
-            cantidad = utilidades_numericas.a_decimal(origen.get('cantidad'))
+            cantidad = unidades_atomicas.leer_monto_cripto(origen.get('cantidad'))
 
         item_formateado = {
             "id": item.get("id"),
@@ -235,7 +259,7 @@ def obtener_historial_formateado(
             "par_formatted": f"{par_destino}/{par_origen}",
             "tipo_formatted": tipo_op.replace('-', ' ').capitalize(),
             "cantidad_formatted": utilidades_numericas.formato_cantidad_cripto(cantidad),
-            "valor_total_formatted": utilidades_numericas.formato_cantidad_usd(utilidades_numericas.a_decimal(item.get('valor_usd'))),
+            "valor_total_formatted": utilidades_numericas.formato_cantidad_usd(unidades_atomicas.leer_monto_usd(item.get('valor_usd'))),
         }
         historial_formateado.append(item_formateado)
 
@@ -251,29 +275,20 @@ def obtener_comisiones_formateadas(
     como logos y valores formateados.
     """
     comisiones_crudas = cargar_comisiones(ruta_archivo=ruta_comisiones)
-    cotizaciones_crudas = cargar_datos_cotizaciones(ruta_archivo=ruta_cotizaciones)
-
-    # Crear un diccionario para búsqueda rápida de logos para mayor eficiencia
-    info_criptos = {c.get('ticker'): c for c in cotizaciones_crudas if c.get('ticker')}
-    
-    # Añadir info de USDT por si no viene en las cotizaciones
-    if config.MONEDA_FIAT_DEFAULT not in info_criptos:
-        info_criptos[config.MONEDA_FIAT_DEFAULT] = {
-            'logo': 'https://assets.coingecko.com/coins/images/325/large/Tether.png?1696501661'
-        }
+    indice_tickers = obtener_indice_tickers(ruta_cotizaciones)
 
     comisiones_formateadas = []
     for comision in comisiones_crudas:
         ticker = comision.get('ticker')
-        cripto_info = info_criptos.get(ticker, {})
+        cripto_info = indice_tickers.info(ticker)
 
         item_formateado = {
             "id": comision.get("id"),
             "timestamp_formatted": format_datetime(comision.get('timestamp')),
             "ticker": ticker,
-            "logo": cripto_info.get('logo', ''),  # Usar un string vacío como fallback seguro
-            "cantidad_formatted": utilidades_numericas.formato_cantidad_cripto(utilidades_numericas.a_decimal(comision.get('cantidad'))),
-            "valor_usd_formatted": utilidades_numericas.formato_cantidad_usd(utilidades_numericas.a_decimal(comision.get('valor_usd')))
+            "logo": cripto_info.logo,  # String vacío si el ticker no se conoce
+            "cantidad_formatted": utilidades_numericas.formato_cantidad_cripto(unidades_atomicas.leer_monto_cripto(comision.get('cantidad'))),
+            "valor_usd_formatted": utilidades_numericas.formato_cantidad_usd(unidades_atomicas.leer_monto_usd(comision.get('valor_usd')))
         }
         comisiones_formateadas.append(item_formateado)
     
@@ -0,0 +1,200 @@
+"""Planificador en Segundo Plano de la Actualización de Datos de Mercado.
+
+Antes, cada pestaña abierta del frontend llamaba a `/api/actualizar`, y cada
+llamada consultaba CoinGecko (con hasta 10 segundos de espera) y ejecutaba el
+motor de órdenes dentro de la propia petición HTTP. Con varias pestañas, eso
+multiplicaba las llamadas a la API externa y bloqueaba los hilos del servidor.
+
+Este módulo mueve ese "latido" a un hilo en segundo plano:
+
+-   Cada `config.INTERVALO_ACTUALIZACION_MERCADO` segundos actualiza las
+    cotizaciones y, a continuación, ejecuta el motor de órdenes pendientes.
+    Al reproducir una grabación, son segundos del reloj virtual (ver
+    `proveedor_mercado`).
+-   Las actualizaciones manuales concurrentes se agrupan en un único "vuelo":
+    si ya hay una en curso, las demás esperan su resultado en lugar de
+    consultar de nuevo la API externa.
+-   `/api/actualizar` solo devuelve la versión vigente de los datos. Una
+    actualización forzada solo consulta la API externa si los datos tienen
+    más de `config.EDAD_MINIMA_ACTUALIZACION_FORZADA_S` segundos.
+
+Nota: cada proceso del servidor tiene su propio planificador. Con varios
+workers (ej. Gunicorn), cada uno actualiza por su cuenta.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from flask import Flask
+
+from backend.acceso_datos.datos_cotizaciones import obtener_instantanea_precios
+from backend.servicios.api_cotizaciones import obtener_datos_criptos_coingecko
+from backend.servicios.proveedor_mercado import obtener_proveedor
+from backend.servicios.trading.motor import verificar_y_ejecutar_ordenes_pendientes
+from backend.servicios.trading.motor_eventos import motor_eventos_activo
+import config
+
+
+class _Vuelo:
+    """Una actualización en curso, compartida por todos los que la pidieron."""
+
+    __slots__ = ("terminado", "resultado")
+
+    def __init__(self):
+        self.terminado = threading.Event()
+        self.resultado: Optional[Dict[str, Any]] = None
+
+
+class PlanificadorMercado:
+    """Actualiza periódicamente las cotizaciones y ejecuta el motor de órdenes."""
+
+    def __init__(self, intervalo: float):
+        """Inicializa el planificador sin arrancar su hilo.
+
+        Args:
+            intervalo (float): Segundos entre el fin de una actualización y el
+                inicio de la siguiente.
+        """
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._vuelo: Optional[_Vuelo] = None
+        self._hilo: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+        self._cantidad_criptos = 0
+        self._ultima_actualizacion: Optional[float] = None
+
+    @property
+    def activo(self) -> bool:
+        """Indica si el hilo de actualización está en ejecución."""
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def iniciar(self) -> None:
+        """Arranca el hilo de actualización. Si ya está en ejecución, no hace nada."""
+        with self._lock:
+            if self.activo:
+                return
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._bucle, name="planificador-mercado", daemon=True)
+            self._hilo.start()
+
+    def detener(self, espera: Optional[float] = None) -> None:
+        """Pide al hilo que termine y espera (como máximo `espera` segundos) a que lo haga."""
+        self._detener.set()
+        hilo = self._hilo
+        if hilo is not None and hilo is not threading.current_thread():
+            hilo.join(espera)
+
+    def _bucle(self) -> None:
+        while not self._detener.is_set():
+            try:
+                self.actualizar_ahora()
+            except Exception as e:
+                # Un fallo en una pasada no debe detener las siguientes.
+                print(f"❌ Error en la actualización periódica del mercado: {e}")
+            self._detener.wait(self.intervalo)
+
+    def actualizar_ahora(self) -> Dict[str, Any]:
+        """Actualiza las cotizaciones y ejecuta el motor, agrupando las llamadas concurrentes.
+
+        Si ya hay una actualización en curso, espera a que termine y devuelve
+        su resultado, sin iniciar otra consulta a la API externa.
+
+        Returns:
+            Dict[str, Any]: El estado de los datos tras la actualización (ver `estado`).
+
+        Side Effects:
+            - Sobrescribe las cotizaciones y publica una nueva instantánea de precios.
+            - Puede ejecutar órdenes pendientes (modifica billetera, órdenes e historial).
+        """
+        with self._lock:
+            vuelo = self._vuelo
+            es_lider = vuelo is None
+            if es_lider:
+                vuelo = self._vuelo = _Vuelo()
+
+        if not es_lider:
+            vuelo.terminado.wait()
+            return vuelo.resultado if vuelo.resultado is not None else self.estado()
+
+        try:
+            datos_criptos = obtener_datos_criptos_coingecko()
+            # Con los precios frescos publicados, se evalúan las órdenes pendientes
+            # (si el motor por eventos está activo, ya recibió los cambios).
+            if not motor_eventos_activo():
+                verificar_y_ejecutar_ordenes_pendientes()
+            self._cantidad_criptos = len(datos_criptos)
+            self._ultima_actualizacion = time.time()
+            vuelo.resultado = self.estado()
+        finally:
+            with self._lock:
+                self._vuelo = None
+            vuelo.terminado.set()
+        return vuelo.resultado
+
+    def actualizar_si_antigua(self, edad_minima: float) -> Dict[str, Any]:
+        """Actualiza como `actualizar_ahora`, solo si la última actualización tiene al menos `edad_minima` segundos.
+
+        Así, los clientes que piden actualizar no pueden multiplicar las
+        consultas a la API externa.
+
+        Args:
+            edad_minima (float): Antigüedad mínima (en segundos) de los datos
+                para volver a consultarlos.
+
+        Returns:
+            Dict[str, Any]: El estado de los datos (ver `estado`).
+        """
+        ultima = self._ultima_actualizacion
+        if ultima is not None and time.time() - ultima < edad_minima:
+            return self.estado()
+        return self.actualizar_ahora()
+
+    def estado(self) -> Dict[str, Any]:
+        """Devuelve la versión vigente de los datos de mercado, sin actualizarlos.
+
+        Returns:
+            Dict[str, Any]: `version` (de la instantánea de precios),
+                `cantidad_criptos` de la última actualización y
+                `ultima_actualizacion` (epoch en segundos, o None).
+        """
+        return {
+            "version": obtener_instantanea_precios().version,
+            "cantidad_criptos": self._cantidad_criptos,
+            "ultima_actualizacion": self._ultima_actualizacion,
+        }
+
+
+_planificador: Optional[PlanificadorMercado] = None
+_lock_planificador = threading.Lock()
+
+
+def obtener_planificador() -> PlanificadorMercado:
+    """Devuelve el planificador del proceso, creándolo la primera vez."""
+    global _planificador
+    with _lock_planificador:
+        if _planificador is None:
+            _planificador = PlanificadorMercado(
+                obtener_proveedor().segundos_reales(config.INTERVALO_ACTUALIZACION_MERCADO)
+            )
+        return _planificador
+
+
+def registrar_planificador(app: Flask) -> None:
+    """Configura el arranque del planificador para una aplicación Flask.
+
+    El hilo se inicia con la primera petición y no al crear la aplicación:
+    con el recargador de Flask (`debug=True`), el proceso padre también crea
+    la aplicación pero nunca atiende peticiones, y no debe consultar la API.
+
+    Args:
+        app (Flask): La aplicación en la que se registra el arranque.
+    """
+    if not config.PLANIFICADOR_MERCADO_ACTIVO:
+        return
+
+    @app.before_request
+    def _iniciar_planificador() -> None:
+        planificador = obtener_planificador()
+        if not planificador.activo:
+            planificador.iniciar()
@@ -10,9 +10,14 @@ Este enfoque desacopla la lógica de negocio del formato de presentación,
 permitiendo que cada uno evolucione de forma independiente.
 """
 
-from typing import Any, Dict, List
+import threading
+from typing import Any, Dict, List, Optional
 
-from backend.acceso_datos.datos_cotizaciones import cargar_datos_cotizaciones
+from backend.acceso_datos.datos_cotizaciones import (
+    ConjuntoCambios,
+    obtener_instantanea_precios,
+    suscribir_cambios_cotizaciones,
+)
 from backend.utils.formatters import get_performance_indicator
 from backend.utils.utilidades_numericas import (
     a_decimal,
@@ -21,65 +26,108 @@ from backend.utils.utilidades_numericas import (
     formato_porcentaje,
 )
 
+# Caché de cotizaciones formateadas de la instantánea `_version_formateadas`.
+# Con cada conjunto de cambios solo se descartan los tickers que cambiaron;
+# el resto se reutiliza sin volver a formatearlo.
+_formateadas: Dict[str, Dict[str, Any]] = {}
+_lista_formateada: Optional[List[Dict[str, Any]]] = None
+_version_formateadas: Optional[int] = None
+_lock_formateadas = threading.Lock()
+
+
+def _aplicar_cambios(conjunto: ConjuntoCambios) -> None:
+    """Invalida las cotizaciones formateadas de los tickers que cambiaron."""
+    global _lista_formateada, _version_formateadas
+    with _lock_formateadas:
+        if conjunto.version_anterior != _version_formateadas:
+            # Se perdió la continuidad (ej. una recarga completa): se descarta todo.
+            _formateadas.clear()
+        else:
+            for ticker in conjunto.cambios.keys() | conjunto.eliminados:
+                _formateadas.pop(ticker, None)
+        _lista_formateada = None
+        _version_formateadas = conjunto.version
+
+
+suscribir_cambios_cotizaciones(_aplicar_cambios)
+
+
 def obtener_cotizaciones_formateadas() -> List[Dict[str, Any]]:
     """Carga, procesa y formatea los datos de cotizaciones para la UI.
 
     Esta función implementa un pipeline de transformación en tres pasos:
-    1.  **Carga y Deserialización**: Carga los datos crudos y convierte todos los
-        valores numéricos (almacenados como strings) a objetos `Decimal` para
-        garantizar la precisión.
+    1.  **Carga y Deserialización**: Toma las cotizaciones de la instantánea de
+        precios vigente y convierte todos los valores numéricos (almacenados
+        como strings) a objetos `Decimal` para garantizar la precisión.
     2.  **Enriquecimiento y Formateo**: Crea un nuevo diccionario de presentación
         que contiene tanto los datos originales como nuevos campos con el sufijo
         `_formatted` (ej. "$1,234.56", "+5.2%").
     3.  **Añadir Indicadores**: Genera indicadores visuales (ej. 'positivo',
         'negativo') para facilitar el renderizado condicional en el frontend.
 
+    Las cotizaciones formateadas se guardan por ticker: tras una
+    actualización solo se formatean los tickers que cambiaron.
+
     Returns:
         Una lista de diccionarios, donde cada uno representa una criptomoneda
         con datos listos para ser mostrados en la interfaz de usuario.
     """
-    cotizaciones_crudas = cargar_datos_cotizaciones()
-    cotizaciones_presentacion = []
-
-    for cripto in cotizaciones_crudas:
-        # 1. Deserialización: Convertir strings a Decimal para poder operar.
-        precio_usd = a_decimal(cripto.get("precio_usd"))
-        perf_1h = a_decimal(cripto.get("1h_%"))
-        perf_24h = a_decimal(cripto.get("24h_%"))
-        perf_7d = a_decimal(cripto.get("7d_%"))
-        market_cap = a_decimal(cripto.get("market_cap"))
-        volumen_24h = a_decimal(cripto.get("volumen_24h"))
-        circulating_supply = a_decimal(cripto.get("circulating_supply"))
-        ticker = cripto.get("ticker", "")
-
-        # 2. Enriquecimiento: Crear un nuevo diccionario con campos formateados.
-        # Se mantienen los campos originales y se añaden nuevos con el sufijo `_formatted`
-        # o `perf_` para ser usados directamente en la UI.
-
-        cripto_presentacion = {
-            "id": cripto.get("id"),
-            "nombre": cripto.get("nombre"),
-            "ticker": ticker,
-            "logo": cripto.get("logo"),
-
-            "precio_usd_formatted": formato_cantidad_usd(precio_usd),
-            "market_cap_formatted": formato_numero_grande(market_cap),
-            "volumen_24h_formatted": formato_numero_grande(volumen_24h),
-            
-            "circulating_supply_formatted": (
-                f"{formato_numero_grande(circulating_supply)} {ticker}"
-                if circulating_supply > 0
-                else "-"
-            ),
-
-            "1h_formatted": formato_porcentaje(perf_1h),
-            "24h_formatted": formato_porcentaje(perf_24h),
-            "7d_formatted": formato_porcentaje(perf_7d),
-
-            "perf_1h": get_performance_indicator(perf_1h),
-            "perf_24h": get_performance_indicator(perf_24h),
-            "perf_7d": get_performance_indicator(perf_7d),
-        }
-        cotizaciones_presentacion.append(cripto_presentacion)
-
-    return cotizaciones_presentacion
\ No newline at end of file
+    global _lista_formateada, _version_formateadas
+    instantanea = obtener_instantanea_precios()
+    with _lock_formateadas:
+        if instantanea.version != _version_formateadas:
+            _formateadas.clear()
+            _lista_formateada = None
+            _version_formateadas = instantanea.version
+        if _lista_formateada is None:
+            lista = []
+            for ticker, cripto in instantanea.cotizaciones.items():
+                formateada = _formateadas.get(ticker)
+                if formateada is None:
+                    formateada = _formateadas[ticker] = _formatear_cotizacion(cripto)
+                lista.append(formateada)
+            _lista_formateada = lista
+        return list(_lista_formateada)
+
+
+def _formatear_cotizacion(cripto: Dict[str, Any]) -> Dict[str, Any]:
+    """Formatea una cotización cruda para la UI (ver `obtener_cotizaciones_formateadas`)."""
+    # 1. Deserialización: Convertir strings a Decimal para poder operar.
+    precio_usd = a_decimal(cripto.get("precio_usd"))
+    perf_1h = a_decimal(cripto.get("1h_%"))
+    perf_24h = a_decimal(cripto.get("24h_%"))
+    perf_7d = a_decimal(cripto.get("7d_%"))
+    market_cap = a_decimal(cripto.get("market_cap"))
+    volumen_24h = a_decimal(cripto.get("volumen_24h"))
+    circulating_supply = a_decimal(cripto.get("circulating_supply"))
+    ticker = cripto.get("ticker", "")
+
+    # 2. Enriquecimiento: Crear un nuevo diccionario con campos formateados.
+    # Se mantienen los campos originales y se añaden nuevos con el sufijo `_formatted`
+    # o `perf_` para ser usados directamente en la UI.
+
+    cripto_presentacion = {
+        "id": cripto.get("id"),
+        "nombre": cripto.get("nombre"),
+        "ticker": ticker,
+        "logo": cripto.get("logo"),
+
+        "precio_usd_formatted": formato_cantidad_usd(precio_usd),
+        "market_cap_formatted": formato_numero_grande(market_cap),
+        "volumen_24h_formatted": formato_numero_grande(volumen_24h),
+        
+        "circulating_supply_formatted": (
+            f"{formato_numero_grande(circulating_supply)} {ticker}"
+            if circulating_supply > 0
+            else "-"
+        ),
+
+        "1h_formatted": formato_porcentaje(perf_1h),
+        "24h_formatted": formato_porcentaje(perf_24h),
+        "7d_formatted": formato_porcentaje(perf_7d),
+
+        "perf_1h": get_performance_indicator(perf_1h),
+        "perf_24h": get_performance_indicator(perf_24h),
+        "perf_7d": get_performance_indicator(perf_7d),
+    }
+    return cripto_presentacion
@@ -0,0 +1,192 @@
+"""Proveedores de Datos de Mercado: En Vivo, Grabación y Repetición.
+
+`api_cotizaciones` obtiene las respuestas de CoinGecko y Binance a través de
+un proveedor, elegido con `config.PROVEEDOR_DATOS_MERCADO`:
+
+-   **"en_vivo"** (por defecto): consulta las APIs externas.
+-   **"grabar"**: consulta las APIs externas y agrega cada respuesta a un
+    archivo JSONL (`config.ARCHIVO_MERCADO_PATH`), con el momento en que se
+    obtuvo.
+-   **"reproducir"**: responde desde ese archivo, sin red. Un reloj virtual
+    avanza `config.FACTOR_TIEMPO_REPETICION` veces más rápido que el real
+    (ej. 1440 reproduce un día en un minuto). Cada consulta devuelve la
+    última respuesta grabada hasta ese instante virtual. La caché de velas
+    y el planificador de mercado siguen el mismo reloj (ver `ahora` y
+    `segundos_reales`).
+
+Permite hacer pruebas de carga y benchmarks deterministas del motor y de la
+API sin depender de las APIs externas.
+
+Formato de cada línea del archivo:
+
+    {"t": 1700000000.0, "recurso": "velas", "clave": "BTCUSDT/1h",
+     "params": {...}, "datos": <respuesta JSON>}
+"""
+
+import json
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from backend.servicios.cliente_http import obtener_cliente
+import config
+
+RECURSO_MERCADOS = "mercados"
+RECURSO_VELAS = "velas"
+
+
+class ProveedorEnVivo:
+    """Obtiene las respuestas de las APIs externas."""
+
+    def ahora(self) -> float:
+        """Devuelve el instante actual de los datos de mercado (epoch en segundos)."""
+        return time.time()
+
+    def segundos_reales(self, segundos: float) -> float:
+        """Convierte una duración del reloj de los datos de mercado a segundos reales."""
+        return segundos
+
+    def obtener(
+        self, upstream: str, recurso: str, clave: str, url: str, params: Dict[str, Any], peso: float = 1
+    ) -> Any:
+        """Consulta una API externa y devuelve su respuesta JSON decodificada.
+
+        Args:
+            upstream (str): Nombre del cliente HTTP ("coingecko" o "binance").
+            recurso (str): Tipo de respuesta (`RECURSO_MERCADOS` o `RECURSO_VELAS`).
+            clave (str): Identifica la serie de respuestas del recurso (ej. la
+                página del listado, o el símbolo y el intervalo de las velas).
+            url (str): URL a consultar.
+            params (Dict[str, Any]): Parámetros de la query string.
+            peso (float): Peso de la petición (ver `cliente_http`).
+
+        Raises:
+            requests.exceptions.RequestException: Si la petición falla.
+            ValueError: Si la respuesta no es JSON válido.
+        """
+        respuesta = obtener_cliente(upstream).get(url, params, peso=peso)
+        print(f"✅ Estado de la respuesta {upstream} ({clave}): {respuesta.status_code}")
+        return respuesta.json()
+
+
+class ProveedorGrabacion(ProveedorEnVivo):
+    """Consulta las APIs externas y graba cada respuesta en un archivo JSONL."""
+
+    def __init__(self, ruta_archivo: str):
+        self.ruta_archivo = ruta_archivo
+        self._lock = threading.Lock()
+
+    def obtener(self, upstream, recurso, clave, url, params, peso=1):
+        datos = super().obtener(upstream, recurso, clave, url, params, peso)
+        registro = {"t": self.ahora(), "recurso": recurso, "clave": clave, "params": params, "datos": datos}
+        linea = json.dumps(registro, separators=(",", ":")) + "\n"
+        with self._lock, open(self.ruta_archivo, "a", encoding="utf-8") as f:
+            f.write(linea)
+        return datos
+
+
+class ProveedorRepeticion:
+    """Responde con las respuestas grabadas, siguiendo un reloj virtual acelerado."""
+
+    def __init__(self, ruta_archivo: str, factor_tiempo: float = 1.0, reloj=time.monotonic):
+        """Carga el archivo grabado e inicia el reloj virtual en su primer registro.
+
+        Args:
+            ruta_archivo (str): Archivo JSONL generado por `ProveedorGrabacion`.
+            factor_tiempo (float): Segundos virtuales por segundo real.
+            reloj: Reloj monótono real, inyectable para las pruebas.
+
+        Raises:
+            FileNotFoundError: Si el archivo no existe.
+        """
+        self.factor_tiempo = factor_tiempo
+        self._reloj = reloj
+        # (recurso, clave) -> registros ordenados por momento de grabación.
+        self._registros: Dict[tuple, List[Dict[str, Any]]] = defaultdict(list)
+        with open(ruta_archivo, "r", encoding="utf-8") as f:
+            for numero, linea in enumerate(f, start=1):
+                try:
+                    registro = json.loads(linea)
+                    self._registros[(registro["recurso"], registro["clave"])].append(registro)
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    print(f"Advertencia: Línea {numero} inválida en '{ruta_archivo}'. Se omite.")
+        for registros in self._registros.values():
+            registros.sort(key=lambda r: r["t"])
+        self._tiempos = {clave: [r["t"] for r in registros] for clave, registros in self._registros.items()}
+        todos = [t for tiempos in self._tiempos.values() for t in tiempos]
+        self.inicio_grabacion = min(todos) if todos else time.time()
+        self.fin_grabacion = max(todos) if todos else self.inicio_grabacion
+        self._inicio_real = reloj()
+
+    def ahora(self) -> float:
+        """Devuelve el instante virtual: avanza desde el inicio de la grabación y se detiene en su fin."""
+        transcurrido = (self._reloj() - self._inicio_real) * self.factor_tiempo
+        return min(self.inicio_grabacion + transcurrido, self.fin_grabacion)
+
+    def segundos_reales(self, segundos: float) -> float:
+        """Convierte una duración virtual a segundos reales, según `factor_tiempo`."""
+        return segundos / self.factor_tiempo if self.factor_tiempo > 0 else segundos
+
+    def obtener(self, upstream, recurso, clave, url, params, peso=1):
+        registros = self._registros.get((recurso, clave))
+        if not registros:
+            raise LookupError(f"No hay respuestas grabadas para {recurso} '{clave}'.")
+        # Hasta el primer registro, se responde con él.
+        hasta = max(1, bisect_right(self._tiempos[(recurso, clave)], self.ahora()))
+        if recurso == RECURSO_VELAS:
+            return self._velas(registros[:hasta], params)
+        return registros[hasta - 1]["datos"]
+
+    @staticmethod
+    def _velas(registros: List[Dict[str, Any]], params: Dict[str, Any]) -> List[list]:
+        """Reconstruye la serie de velas a partir de la última grabación completa.
+
+        Las respuestas incrementales (con `startTime`) grabadas después se
+        aplican encima, reemplazando las velas con la misma apertura.
+        """
+        base = 0
+        for i, registro in enumerate(registros):
+            if "startTime" not in (registro.get("params") or {}):
+                base = i
+        velas: Dict[Any, list] = {}
+        for registro in registros[base:]:
+            for vela in registro["datos"]:
+                velas[vela[0]] = vela
+        serie = [velas[apertura] for apertura in sorted(velas)]
+        desde = params.get("startTime")
+        if desde is not None:
+            serie = [vela for vela in serie if vela[0] >= desde]
+        limite = params.get("limit")
+        return serie[-limite:] if limite else serie
+
+
+_proveedor: Optional[Any] = None
+_clave_proveedor: Optional[tuple] = None
+_lock_proveedor = threading.Lock()
+
+
+def obtener_proveedor():
+    """Devuelve el proveedor de datos de mercado configurado.
+
+    El proveedor se reutiliza mientras la configuración no cambie.
+
+    Raises:
+        ValueError: Si `config.PROVEEDOR_DATOS_MERCADO` no es reconocido.
+    """
+    global _proveedor, _clave_proveedor
+    modo = config.PROVEEDOR_DATOS_MERCADO.lower()
+    clave = (modo, config.ARCHIVO_MERCADO_PATH, config.FACTOR_TIEMPO_REPETICION)
+    with _lock_proveedor:
+        if _proveedor is None or _clave_proveedor != clave:
+            if modo == "en_vivo":
+                _proveedor = ProveedorEnVivo()
+            elif modo == "grabar":
+                _proveedor = ProveedorGrabacion(config.ARCHIVO_MERCADO_PATH)
+            elif modo == "reproducir":
+                _proveedor = ProveedorRepeticion(config.ARCHIVO_MERCADO_PATH, config.FACTOR_TIEMPO_REPETICION)
+            else:
+                raise ValueError(f"Proveedor de datos de mercado desconocido: '{config.PROVEEDOR_DATOS_MERCADO}'.")
+            _clave_proveedor = clave
+        return _proveedor
@@ -0,0 +1,300 @@
+"""Adaptador de Precios en Streaming y Fuente de Repetición Local.
+
+Con el sondeo de `/api/actualizar`, los precios solo cambian en cada
+actualización completa, y las órdenes límite y stop se disparan tarde y en
+ráfagas. Este módulo define una interfaz para fuentes de precios que empujan
+actualizaciones a medida que llegan, con el formato de los frames
+"miniTicker" de Binance:
+
+    {"e": "24hrMiniTicker", "E": 1700000000000, "s": "BTCUSDT",
+     "c": "43000.10", "o": "...", "h": "...", "l": "...", "v": "...", "q": "..."}
+
+Cada lote de frames que entrega una fuente se aplica a la instantánea de
+precios (ver `datos_cotizaciones.aplicar_precios`), se agrega al historial de
+precios y, si hubo cambios, dispara un ciclo del motor de órdenes.
+
+Se incluye `FuenteRepeticion`, que reproduce ticks grabados en un archivo
+JSONL a la velocidad configurada, para ejecutar todo el circuito sin conexión.
+Una fuente en vivo (ej. el WebSocket `!miniTicker@arr` de Binance) solo
+necesita implementar `FuentePrecios`.
+"""
+
+import json
+import threading
+from abc import ABC, abstractmethod
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from flask import Flask
+
+from backend.acceso_datos.datos_cotizaciones import aplicar_precios
+from backend.acceso_datos.historial_precios import obtener_historial_precios
+from backend.servicios.trading.motor import verificar_y_ejecutar_ordenes_pendientes
+from backend.servicios.trading.motor_eventos import motor_eventos_activo
+import config
+
+Frame = Dict[str, Any]
+Entrega = Callable[[List[Frame]], None]
+
+
+class TickPrecio(NamedTuple):
+    """Actualización de precio de un ticker, extraída de un frame."""
+
+    ticker: str
+    precio: Decimal
+    volumen_usd: Decimal
+    timestamp: float
+
+
+def interpretar_mini_ticker(frame: Frame) -> Optional[TickPrecio]:
+    """Convierte un frame miniTicker en un `TickPrecio`.
+
+    Solo se aceptan pares cotizados en la moneda fiat (ej. `BTCUSDT`), que es
+    la unidad de cuenta de las cotizaciones.
+
+    Returns:
+        Optional[TickPrecio]: El tick, o None si el frame no es válido o es de
+                              otro par.
+    """
+    simbolo = frame.get("s")
+    fiat = config.MONEDA_FIAT_DEFAULT
+    if not isinstance(simbolo, str) or not simbolo.upper().endswith(fiat) or len(simbolo) <= len(fiat):
+        return None
+    try:
+        precio = Decimal(str(frame["c"]))
+        volumen = Decimal(str(frame.get("q") or 0))
+        timestamp = int(frame["E"]) / 1000
+    except (KeyError, TypeError, ValueError, InvalidOperation):
+        return None
+    if precio <= 0:
+        return None
+    return TickPrecio(simbolo.upper()[: -len(fiat)], precio, volumen, timestamp)
+
+
+class FuentePrecios(ABC):
+    """Interfaz de una fuente de precios en streaming."""
+
+    @abstractmethod
+    def iniciar(self, entregar: Entrega) -> None:
+        """Comienza a emitir lotes de frames, llamando a `entregar` con cada uno.
+
+        No debe bloquear: la fuente emite desde su propio hilo.
+        """
+
+    @abstractmethod
+    def detener(self) -> None:
+        """Deja de emitir frames y libera sus recursos."""
+
+
+class FuenteRepeticion(FuentePrecios):
+    """Reproduce frames miniTicker grabados en un archivo JSONL.
+
+    Cada línea del archivo es un frame o una lista de frames (un lote, como
+    los del stream `!miniTicker@arr`). Los lotes se emiten respetando la
+    separación entre sus tiempos de evento (`E`), dividida por `velocidad`.
+
+    Al repetir, los tiempos de evento de cada pasada se desplazan para
+    continuar después de los de la anterior, de modo que el historial de
+    precios (que descarta las observaciones que retroceden en el tiempo) siga
+    recibiendo los ticks.
+    """
+
+    def __init__(self, ruta_archivo: str, velocidad: float = 1.0, repetir: bool = False):
+        """Inicializa la fuente.
+
+        Args:
+            ruta_archivo (str): Archivo JSONL con los frames grabados.
+            velocidad (float): Factor de velocidad (2.0 = el doble de rápido).
+                Con 0, los lotes se emiten sin esperas.
+            repetir (bool): Si es True, vuelve a empezar al terminar el archivo.
+        """
+        self.ruta_archivo = ruta_archivo
+        self.velocidad = velocidad
+        self.repetir = repetir
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self.terminada = threading.Event()
+
+    def _lotes(self) -> Iterator[List[Frame]]:
+        with open(self.ruta_archivo, "r", encoding="utf-8") as f:
+            for numero, linea in enumerate(f, start=1):
+                if not linea.strip():
+                    continue
+                try:
+                    contenido = json.loads(linea)
+                except json.JSONDecodeError:
+                    print(f"Advertencia: Línea {numero} inválida en '{self.ruta_archivo}'. Se omite.")
+                    continue
+                yield contenido if isinstance(contenido, list) else [contenido]
+
+    @staticmethod
+    def _tiempo_evento(lote: List[Frame]) -> Optional[float]:
+        tiempos = [frame["E"] for frame in lote if isinstance(frame, dict) and isinstance(frame.get("E"), (int, float))]
+        return max(tiempos) / 1000 if tiempos else None
+
+    @staticmethod
+    def _desplazar(lote: List[Frame], segundos: float) -> List[Frame]:
+        """Devuelve una copia del lote con los tiempos de evento desplazados."""
+        milisegundos = round(segundos * 1000)
+        return [
+            {**frame, "E": frame["E"] + milisegundos}
+            if isinstance(frame, dict) and isinstance(frame.get("E"), (int, float)) else frame
+            for frame in lote
+        ]
+
+    def _reproducir(self, entregar: Entrega) -> None:
+        try:
+            anterior = None
+            # Segundos que se suman a los tiempos de evento de la pasada en curso.
+            desplazamiento = 0.0
+            while not self._detener.is_set():
+                primero = segundo = None
+                entregados = 0
+                for lote in self._lotes():
+                    tiempo = self._tiempo_evento(lote)
+                    if tiempo is not None:
+                        if primero is None:
+                            primero = tiempo
+                        elif segundo is None and tiempo > primero:
+                            segundo = tiempo
+                        if desplazamiento:
+                            lote = self._desplazar(lote, desplazamiento)
+                            tiempo += desplazamiento
+                    if self.velocidad > 0 and anterior is not None and tiempo is not None and tiempo > anterior:
+                        if self._detener.wait((tiempo - anterior) / self.velocidad):
+                            return
+                    elif self._detener.is_set():
+                        return
+                    anterior = tiempo if tiempo is not None else anterior
+                    entregar(lote)
+                    entregados += 1
+                if not self.repetir:
+                    return
+                if not entregados:
+                    print(f"Advertencia: La repetición de precios '{self.ruta_archivo}' no tiene frames. Se detiene.")
+                    return
+                if primero is not None and anterior is not None:
+                    # La pasada siguiente empieza después de la última, separada
+                    # como los dos primeros lotes (o un segundo, si no los hay).
+                    desplazamiento = anterior - primero + (segundo - primero if segundo is not None else 1.0)
+        except OSError as e:
+            print(f"❌ Error al leer la repetición de precios '{self.ruta_archivo}': {e}")
+        finally:
+            self.terminada.set()
+
+    def iniciar(self, entregar: Entrega) -> None:
+        self._detener.clear()
+        self.terminada.clear()
+        self._hilo = threading.Thread(target=self._reproducir, args=(entregar,), name="fuente-repeticion", daemon=True)
+        self._hilo.start()
+
+    def detener(self) -> None:
+        self._detener.set()
+        hilo = self._hilo
+        if hilo is not None and hilo is not threading.current_thread():
+            hilo.join()
+
+
+class AdaptadorStreaming:
+    """Aplica los lotes de una `FuentePrecios` a los precios y al motor de órdenes."""
+
+    def __init__(self, fuente: FuentePrecios, ejecutar_motor: bool = True):
+        """Inicializa el adaptador.
+
+        Args:
+            fuente (FuentePrecios): La fuente de la que se reciben los frames.
+            ejecutar_motor (bool): Si es True, cada lote con cambios dispara
+                un ciclo del motor de órdenes (salvo que el motor por eventos
+                esté activo: en ese caso, él recibe los cambios).
+        """
+        self.fuente = fuente
+        self.ejecutar_motor = ejecutar_motor
+        self.lotes_procesados = 0
+
+    def iniciar(self) -> None:
+        """Conecta el adaptador a su fuente."""
+        self.fuente.iniciar(self.procesar_lote)
+
+    def detener(self) -> None:
+        """Desconecta la fuente."""
+        self.fuente.detener()
+
+    def procesar_lote(self, frames: List[Frame]) -> Dict[str, Decimal]:
+        """Aplica un lote de frames.
+
+        Dentro de un lote, el último precio de cada ticker prevalece.
+
+        Returns:
+            Dict[str, Decimal]: El precio aplicado a cada ticker.
+
+        Side Effects:
+            - Publica una nueva instantánea de precios.
+            - Agrega observaciones al historial de precios.
+            - Si algún precio cambió, puede ejecutar órdenes pendientes.
+        """
+        ticks: Dict[str, TickPrecio] = {}
+        for frame in frames:
+            tick = interpretar_mini_ticker(frame) if isinstance(frame, dict) else None
+            if tick is not None:
+                ticks[tick.ticker] = tick
+        if not ticks:
+            return {}
+
+        precios = {ticker: tick.precio for ticker, tick in ticks.items()}
+        conjunto = aplicar_precios(precios)
+        historial = obtener_historial_precios()
+        for tick in ticks.values():
+            historial.registrar(tick.ticker, tick.timestamp, tick.precio, tick.volumen_usd)
+        self.lotes_procesados += 1
+
+        if self.ejecutar_motor and conjunto and not motor_eventos_activo():
+            try:
+                verificar_y_ejecutar_ordenes_pendientes()
+            except Exception as e:
+                print(f"❌ Error al ejecutar el motor tras un lote de precios: {e}")
+        return precios
+
+
+_adaptador: Optional[AdaptadorStreaming] = None
+_lock_adaptador = threading.Lock()
+
+
+def _crear_fuente_configurada() -> Optional[FuentePrecios]:
+    fuente = config.FUENTE_STREAMING_PRECIOS.lower()
+    if not fuente:
+        return None
+    if fuente == "repeticion":
+        return FuenteRepeticion(
+            config.REPETICION_STREAMING_PATH,
+            velocidad=config.VELOCIDAD_REPETICION_STREAMING,
+            repetir=True,
+        )
+    raise ValueError(f"Fuente de precios en streaming desconocida: '{config.FUENTE_STREAMING_PRECIOS}'.")
+
+
+def registrar_streaming(app: Flask) -> None:
+    """Configura el arranque de la fuente de precios en streaming (si hay una).
+
+    Igual que el planificador de mercado, la fuente se conecta con la primera
+    petición, para que el proceso padre del recargador de Flask no la inicie.
+
+    Args:
+        app (Flask): La aplicación en la que se registra el arranque.
+
+    Raises:
+        ValueError: Si `config.FUENTE_STREAMING_PRECIOS` no es reconocida.
+    """
+    fuente = _crear_fuente_configurada()
+    if fuente is None:
+        return
+
+    @app.before_request
+    def _iniciar_streaming() -> None:
+        global _adaptador
+        if _adaptador is not None:
+            return
+        with _lock_adaptador:
+            if _adaptador is None:
+                adaptador = AdaptadorStreaming(fuente)
+                adaptador.iniciar()
+                _adaptador = adaptador
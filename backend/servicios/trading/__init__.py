@@ -13,6 +13,10 @@ Arquitectura y Componentes Clave:
     orden, modificando la billetera y registrando la transacción en el historial.
 -   `motor`: Simula un motor de matching de órdenes que verifica continuamente
     las condiciones de mercado para activar órdenes pendientes (Limit, Stop).
+-   `libro_disparos`: Indexa las órdenes pendientes por par y precio de
+    disparo, para que el motor solo evalúe las que el precio cruzó.
+-   `motor_eventos`: Ejecuta el motor en segundo plano solo para los pares
+    cuyos precios cambiaron, y expone las métricas de cada ciclo.
 
 Este diseño modular permite mantener, probar y extender las funcionalidades
 de trading de manera controlada y robusta.
@@ -13,18 +13,18 @@ Responsabilidades:
 
 Importante: Este módulo modifica el estado de la billetera en memoria, pero
 no la guarda en disco. La persistencia de la billetera es responsabilidad
-del servicio que invoca a este módulo (ej. `gestor`).
+del servicio que invoca a este módulo (ej. `gestor`), que debe invocarlo
+dentro de `transaccion()` para que la comisión, el historial y la billetera
+se confirmen juntos.
 """
 
 from decimal import Decimal
 from typing import Any, Dict, Tuple, Optional
 
 from backend.acceso_datos.datos_comisiones import registrar_comision
-from backend.acceso_datos.datos_cotizaciones import (
-    cargar_datos_cotizaciones,
-    obtener_precio,
-)
+from backend.acceso_datos.datos_cotizaciones import obtener_instantanea_precios
 from backend.acceso_datos.datos_historial import guardar_en_historial
+from backend.acceso_datos.indice_tickers import obtener_indice_tickers
 from backend.utils.utilidades_numericas import a_decimal
 import config
 
@@ -45,9 +45,8 @@ def _crear_activo_si_no_existe(billetera: Dict[str, Any], ticker: str, ruta_coti
         Modifica el diccionario `billetera` en memoria si el activo no existe.
     """
     if ticker not in billetera:
-        info_criptos = {c['ticker']: c for c in cargar_datos_cotizaciones(ruta_cotizaciones)}
-        info_nueva_moneda = info_criptos.get(ticker, {"nombre": ticker})
-        billetera[ticker] = {"nombre": info_nueva_moneda.get("nombre", ticker), "saldos": {"disponible": a_decimal("0"), "reservado": a_decimal("0")}}
+        nombre = obtener_indice_tickers(ruta_cotizaciones).info(ticker).nombre
+        billetera[ticker] = {"nombre": nombre, "saldos": {"disponible": a_decimal("0"), "reservado": a_decimal("0")}}
 
 # --- Punto de Entrada Público del Módulo ---
 
@@ -86,9 +85,13 @@ def ejecutar_transaccion(
         - Modifica el diccionario `billetera` directamente.
         - Escribe en los archivos de historial y comisiones.
         - El llamador es responsable de guardar la billetera modificada.
+        - Dentro de `transaccion()`, los registros se confirman junto con las
+          demás escrituras del llamador como una única entrada del diario.
     """
-    precio_origen_usdt = obtener_precio(moneda_origen, ruta_archivo=ruta_cotizaciones)
-    precio_destino_usdt = obtener_precio(moneda_destino, ruta_archivo=ruta_cotizaciones)
+    # Ambos precios salen de la misma instantánea, para que sean consistentes entre sí.
+    precios = obtener_instantanea_precios(ruta_archivo=ruta_cotizaciones)
+    precio_origen_usdt = precios.precio(moneda_origen)
+    precio_destino_usdt = precios.precio(moneda_destino)
 
     if precio_origen_usdt is None or precio_destino_usdt is None:
         return False, {"error": "No se pudo obtener la cotización para ejecutar la transacción."}
@@ -15,6 +15,7 @@ from datetime import datetime
 import config
 from backend.acceso_datos.datos_billetera import cargar_billetera, guardar_billetera
 from backend.acceso_datos.datos_ordenes import cargar_ordenes_pendientes, guardar_ordenes_pendientes
+from backend.acceso_datos.repositorio import transaccion
 from backend.servicios.estado_billetera import estado_actual_completo
 from backend.servicios.trading.motor import _crear_nueva_orden, _ejecutar_orden_pendiente
 from backend.utils.responses import crear_respuesta_error, crear_respuesta_exitosa
@@ -56,78 +57,82 @@ def crear_orden(
     if config.ESTADO_ERROR in nueva_orden:
         return nueva_orden
 
-    # 2. Cargar billetera y validar fondos.
-    billetera = cargar_billetera()
-    moneda_a_reservar = nueva_orden["moneda_reservada"]
-    cantidad_a_reservar = a_decimal(nueva_orden["cantidad_reservada"])
+    # Los pasos 2 a 5 forman una única transacción: la reserva de fondos, la
+    # posible ejecución y la orden guardada se confirman juntas.
+    with transaccion():
+        # 2. Cargar billetera y validar fondos.
+        billetera = cargar_billetera()
+        moneda_a_reservar = nueva_orden["moneda_reservada"]
+        cantidad_a_reservar = a_decimal(nueva_orden["cantidad_reservada"])
 
-    if not _validar_fondos_disponibles(billetera, moneda_a_reservar, cantidad_a_reservar):
-        return crear_respuesta_error(f"Fondos insuficientes de {moneda_a_reservar}.")
+        if not _validar_fondos_disponibles(billetera, moneda_a_reservar, cantidad_a_reservar):
+            return crear_respuesta_error(f"Fondos insuficientes de {moneda_a_reservar}.")
 
-    # 3. Reservar fondos (operación en memoria).
-    billetera[moneda_a_reservar]['saldos']['disponible'] -= cantidad_a_reservar
-    billetera[moneda_a_reservar]['saldos']['reservado'] += cantidad_a_reservar
+        # 3. Reservar fondos (operación en memoria).
+        billetera[moneda_a_reservar]['saldos']['disponible'] -= cantidad_a_reservar
+        billetera[moneda_a_reservar]['saldos']['reservado'] += cantidad_a_reservar
 
-    # 4. Si es una orden de mercado, ejecutarla inmediatamente.
-    if nueva_orden["tipo_orden"] == config.TIPO_ORDEN_MERCADO:
-        print(f"📈 Orden de mercado detectada ({nueva_orden['id_orden']}). Ejecutando inmediatamente...")
-        billetera = _ejecutar_orden_pendiente(nueva_orden, billetera)
+        # 4. Si es una orden de mercado, ejecutarla inmediatamente.
+        if nueva_orden["tipo_orden"] == config.TIPO_ORDEN_MERCADO:
+            print(f"📈 Orden de mercado detectada ({nueva_orden['id_orden']}). Ejecutando inmediatamente...")
+            billetera = _ejecutar_orden_pendiente(nueva_orden, billetera)
 
-    # 5. Persistir los cambios en los archivos de datos.
-    todas_las_ordenes = cargar_ordenes_pendientes()
+        # 5. Persistir los cambios en los archivos de datos.
+        todas_las_ordenes = cargar_ordenes_pendientes()
     
-    # Busca si la orden ya existe para reemplazarla (caso de una orden de mercado
-    # que se ejecutó y su estado cambió), si no, la añade.
-    indices_existentes = [i for i, o in enumerate(todas_las_ordenes) if o.get("id_orden") == nueva_orden['id_orden']]
-    if indices_existentes:
-        todas_las_ordenes[indices_existentes[0]] = nueva_orden
-    else:
-        todas_las_ordenes.append(nueva_orden)
+        # Busca si la orden ya existe para reemplazarla (caso de una orden de mercado
+        # que se ejecutó y su estado cambió), si no, la añade.
+        indices_existentes = [i for i, o in enumerate(todas_las_ordenes) if o.get("id_orden") == nueva_orden['id_orden']]
+        if indices_existentes:
+            todas_las_ordenes[indices_existentes[0]] = nueva_orden
+        else:
+            todas_las_ordenes.append(nueva_orden)
     
-    guardar_ordenes_pendientes(todas_las_ordenes)
-    guardar_billetera(billetera)
+        guardar_ordenes_pendientes(todas_las_ordenes)
+        guardar_billetera(billetera)
 
     print(f"✅ Orden {nueva_orden['id_orden']} creada exitosamente.")
     return nueva_orden
 
 def cancelar_orden_pendiente(id_orden: str) -> Dict[str, Any]:
     """Cancela una orden pendiente y libera los fondos asociados."""
-    todas_las_ordenes = cargar_ordenes_pendientes()
+    with transaccion():
+        todas_las_ordenes = cargar_ordenes_pendientes()
     
-    # Filtrar la orden por ID usando comprensión de listas
-    ordenes_encontradas = [o for o in todas_las_ordenes if o.get("id_orden") == id_orden]
-    orden_a_cancelar = ordenes_encontradas[0] if ordenes_encontradas else None
+        # Filtrar la orden por ID usando comprensión de listas
+        ordenes_encontradas = [o for o in todas_las_ordenes if o.get("id_orden") == id_orden]
+        orden_a_cancelar = ordenes_encontradas[0] if ordenes_encontradas else None
 
-    if not orden_a_cancelar:
-        return crear_respuesta_error(f"No se encontró una orden con el ID {id_orden}.")
+        if not orden_a_cancelar:
+            return crear_respuesta_error(f"No se encontró una orden con el ID {id_orden}.")
 
-    if orden_a_cancelar.get("estado") != config.ESTADO_PENDIENTE:
-        estado_actual = orden_a_cancelar.get("estado", "desconocido")
-        return crear_respuesta_error(f"La orden {id_orden} no puede ser cancelada (estado actual: '{estado_actual}').")
+        if orden_a_cancelar.get("estado") != config.ESTADO_PENDIENTE:
+            estado_actual = orden_a_cancelar.get("estado", "desconocido")
+            return crear_respuesta_error(f"La orden {id_orden} no puede ser cancelada (estado actual: '{estado_actual}').")
 
-    billetera = cargar_billetera()
-    moneda_reservada = orden_a_cancelar["moneda_reservada"]
-    cantidad_a_liberar = a_decimal(orden_a_cancelar["cantidad_reservada"])
+        billetera = cargar_billetera()
+        moneda_reservada = orden_a_cancelar["moneda_reservada"]
+        cantidad_a_liberar = a_decimal(orden_a_cancelar["cantidad_reservada"])
     
-    # Verificación de consistencia de fondos reservados
-    if not _validar_fondos_reservados(billetera, moneda_reservada, cantidad_a_liberar):
-        orden_a_cancelar["estado"] = config.ESTADO_ERROR
-        orden_a_cancelar["mensaje_error"] = "Error de consistencia: los fondos a liberar no coinciden con la billetera."
+        # Verificación de consistencia de fondos reservados
+        if not _validar_fondos_reservados(billetera, moneda_reservada, cantidad_a_liberar):
+            orden_a_cancelar["estado"] = config.ESTADO_ERROR
+            orden_a_cancelar["mensaje_error"] = "Error de consistencia: los fondos a liberar no coinciden con la billetera."
+            guardar_ordenes_pendientes(todas_las_ordenes)
+            return crear_respuesta_error(orden_a_cancelar["mensaje_error"])
+
+        # Liberar fondos (operación en memoria)
+        activo_en_billetera = billetera[moneda_reservada]
+        activo_en_billetera["saldos"]["reservado"] -= cantidad_a_liberar
+        activo_en_billetera["saldos"]["disponible"] += cantidad_a_liberar
+
+        # Actualizar estado de la orden
+        orden_a_cancelar["estado"] = config.ESTADO_CANCELADA
+        orden_a_cancelar["timestamp_cancelacion"] = datetime.now().isoformat()
+
+        # Persistir todos los cambios
         guardar_ordenes_pendientes(todas_las_ordenes)
-        return crear_respuesta_error(orden_a_cancelar["mensaje_error"])
-
-    # Liberar fondos (operación en memoria)
-    activo_en_billetera = billetera[moneda_reservada]
-    activo_en_billetera["saldos"]["reservado"] -= cantidad_a_liberar
-    activo_en_billetera["saldos"]["disponible"] += cantidad_a_liberar
-
-    # Actualizar estado de la orden
-    orden_a_cancelar["estado"] = config.ESTADO_CANCELADA
-    orden_a_cancelar["timestamp_cancelacion"] = datetime.now().isoformat()
-
-    # Persistir todos los cambios
-    guardar_ordenes_pendientes(todas_las_ordenes)
-    guardar_billetera(billetera)
+        guardar_billetera(billetera)
 
     # Construir y devolver una respuesta clara para el frontend
     mensaje_exito = f"Orden {orden_a_cancelar['par']} cancelada. Se liberaron {formato_cantidad_cripto(cantidad_a_liberar)} {moneda_reservada}."
@@ -0,0 +1,154 @@
+"""Libro de Disparos: Índice de Órdenes Pendientes por Precio.
+
+En cada ciclo, el motor evaluaba todas las órdenes pendientes contra el
+precio de su par, aunque casi ninguna se disparara. Este módulo mantiene, por
+cada par, las órdenes pendientes ordenadas por su precio de disparo, en
+cuatro listas según el tipo de orden y la acción:
+
+-   **Límite de compra** y **stop-limit de venta**: se disparan cuando el
+    precio baja hasta el de disparo (`precio <= disparo`).
+-   **Límite de venta** y **stop-limit de compra**: se disparan cuando el
+    precio sube hasta el de disparo (`precio >= disparo`).
+
+Como cada lista está ordenada, las órdenes disparadas por un precio forman
+un extremo de la lista y se encuentran con una búsqueda binaria: evaluar un
+par cuesta O(log n + k), con k la cantidad de órdenes disparadas, en lugar de
+O(n).
+
+El libro se deriva de las órdenes almacenadas y se reconstruye solo cuando
+cambian (ver `datos_ordenes.version_ordenes`).
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from decimal import Decimal
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from backend.acceso_datos.datos_ordenes import cargar_ordenes_pendientes, version_ordenes
+from backend.acceso_datos.tasas_cruzadas import separar_par
+from backend.utils.utilidades_numericas import a_decimal
+import config
+
+LIMITE_COMPRA = "limite_compra"
+LIMITE_VENTA = "limite_venta"
+STOP_COMPRA = "stop_compra"
+STOP_VENTA = "stop_venta"
+
+# Lados que se disparan cuando el precio baja hasta el de disparo; los demás,
+# cuando sube.
+LADOS_A_LA_BAJA = frozenset({LIMITE_COMPRA, STOP_VENTA})
+
+_LADOS = {
+    (config.TIPO_ORDEN_LIMITE, config.ACCION_COMPRAR): LIMITE_COMPRA,
+    (config.TIPO_ORDEN_LIMITE, config.ACCION_VENDER): LIMITE_VENTA,
+    (config.TIPO_ORDEN_STOP_LIMIT, config.ACCION_COMPRAR): STOP_COMPRA,
+    (config.TIPO_ORDEN_STOP_LIMIT, config.ACCION_VENDER): STOP_VENTA,
+}
+
+# (precio de disparo, id de la orden)
+Entrada = Tuple[Decimal, str]
+
+
+def _precio_entrada(entrada: Entrada) -> Decimal:
+    return entrada[0]
+
+
+def lado_orden(orden: Dict[str, Any]) -> Optional[str]:
+    """Devuelve el lado del libro de una orden, o None si no se dispara por precio."""
+    return _LADOS.get((orden.get("tipo_orden", config.TIPO_ORDEN_LIMITE), orden.get("accion")))
+
+
+class LibroDisparos:
+    """Órdenes pendientes indexadas por par, lado y precio de disparo (inmutable)."""
+
+    def __init__(self, ordenes: Iterable[Dict[str, Any]] = (), version: Hashable = None):
+        """Construye el libro con las órdenes pendientes de `ordenes`.
+
+        Args:
+            ordenes (Iterable[Dict[str, Any]]): Órdenes; las que no están
+                pendientes o no se disparan por precio se ignoran.
+            version (Hashable): Versión de las órdenes con las que se
+                construyó (ver `datos_ordenes.version_ordenes`).
+        """
+        self.version = version
+        # par -> lado -> entradas ordenadas
+        self._pares: Dict[str, Dict[str, List[Entrada]]] = {}
+        self._ids: Set[str] = set()
+        por_lado: Dict[Tuple[str, str], List[Entrada]] = {}
+        for orden in ordenes:
+            ubicacion = self._ubicar(orden)
+            if ubicacion is not None:
+                por_lado.setdefault(ubicacion[:2], []).append(ubicacion[2])
+                self._ids.add(orden["id_orden"])
+        # Ordenar cada lista una vez es más barato que insertar de a una.
+        for (par, lado), entradas in por_lado.items():
+            entradas.sort()
+            self._pares.setdefault(par, {})[lado] = entradas
+
+    @staticmethod
+    def _ubicar(orden: Dict[str, Any]) -> Optional[Tuple[str, str, Entrada]]:
+        if orden.get("estado") != config.ESTADO_PENDIENTE or not orden.get("id_orden"):
+            return None
+        lado = lado_orden(orden)
+        if lado is None:
+            return None
+        par = "/".join(separar_par(orden["par"]))
+        return par, lado, (a_decimal(orden.get("precio_disparo")), orden["id_orden"])
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, id_orden: str) -> bool:
+        return id_orden in self._ids
+
+    @property
+    def pares(self) -> List[str]:
+        """Pares con al menos una orden en el libro."""
+        return list(self._pares)
+
+    def cantidad(self, par: str) -> int:
+        """Cantidad de órdenes de un par en el libro."""
+        return sum(len(entradas) for entradas in self._pares.get("/".join(separar_par(par)), {}).values())
+
+    def tickers(self) -> Set[str]:
+        """Monedas de todos los pares del libro."""
+        return {ticker for par in self._pares for ticker in separar_par(par)}
+
+    def disparadas(self, par: str, precio: Decimal) -> List[str]:
+        """Devuelve los ids de las órdenes de un par cuyo disparo cruza `precio`.
+
+        Args:
+            par (str): El par (ej. "BTC/USDT").
+            precio (Decimal): El precio actual del par.
+
+        Returns:
+            List[str]: Los ids de las órdenes disparadas, sin un orden particular.
+        """
+        ids: List[str] = []
+        for lado, entradas in self._pares.get("/".join(separar_par(par)), {}).items():
+            if lado in LADOS_A_LA_BAJA:
+                # precio <= disparo: las entradas desde el primer disparo >= precio.
+                ids.extend(e[1] for e in entradas[bisect_left(entradas, precio, key=_precio_entrada):])
+            else:
+                # precio >= disparo: las entradas hasta el último disparo <= precio.
+                ids.extend(e[1] for e in entradas[: bisect_right(entradas, precio, key=_precio_entrada)])
+        return ids
+
+
+_libro: Optional[LibroDisparos] = None
+_lock_libro = threading.Lock()
+
+
+def obtener_libro_disparos() -> LibroDisparos:
+    """Devuelve el libro de las órdenes almacenadas, reconstruyéndolo si cambiaron.
+
+    Returns:
+        LibroDisparos: El libro vigente.
+    """
+    global _libro
+    version = version_ordenes()
+    with _lock_libro:
+        libro = _libro
+        if libro is None or libro.version != version:
+            libro = _libro = LibroDisparos(cargar_ordenes_pendientes(), version)
+        return libro
@@ -3,8 +3,8 @@
 Este módulo es el corazón del simulador de exchange. Emula el comportamiento
 de un motor de coincidencias (`matching engine`), siendo responsable de:
 
-1.  **Verificar Órdenes Pendientes**: Itera sobre todas las órdenes que no han
-    sido ejecutadas ni canceladas.
+1.  **Verificar Órdenes Pendientes**: Busca, en el libro de disparos, las
+    órdenes pendientes cuyo precio de disparo fue cruzado.
 2.  **Consultar Precios de Mercado**: Obtiene los precios actuales para los
     pares de las órdenes.
 3.  **Disparar Órdenes**: Comprueba si el precio de mercado cumple las
@@ -15,17 +15,30 @@ de un motor de coincidencias (`matching engine`), siendo responsable de:
 La función principal es `verificar_y_ejecutar_ordenes_pendientes()`, que
 representa un "ciclo" o "tick" del motor.
 """
+import threading
+import time
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Iterable, NamedTuple, Optional, Tuple
 
 from backend.acceso_datos.datos_billetera import cargar_billetera, guardar_billetera
-from backend.acceso_datos.datos_cotizaciones import obtener_precio
-from backend.acceso_datos.datos_ordenes import cargar_ordenes_pendientes, guardar_ordenes_pendientes
+from backend.acceso_datos.tasas_cruzadas import obtener_matriz_tasas, separar_par
+from backend.acceso_datos.datos_ordenes import (
+    cargar_ordenes_pendientes,
+    guardar_ordenes_pendientes,
+    reservar_numeros_orden,
+)
+from backend.acceso_datos.repositorio import transaccion
+from backend.servicios.trading.libro_disparos import obtener_libro_disparos
 import config
 from backend.servicios.trading.ejecutar_orden import ejecutar_transaccion
 from backend.utils.utilidades_numericas import a_decimal, cuantizar_cripto
 
+# Los ciclos del motor pueden dispararse desde varios hilos (el planificador,
+# la fuente de precios en streaming o una actualización manual). Se ejecutan
+# de a uno para que una orden no se evalúe dos veces contra la misma billetera.
+_lock_ciclo = threading.Lock()
+
 
 # backend/servicios/trading/motor.py
 
@@ -39,6 +52,9 @@ def _verificar_condicion_orden(orden: Dict[str, Any], precio_actual: Decimal) ->
     -   **Stop-Limit de Compra**: Se activa si el precio actual es MAYOR O IGUAL al de disparo (stop).
     -   **Venta Stop-Limit**: Se activa si el precio actual es MENOR O IGUAL al de disparo (stop).
 
+    Los precios se expresan en términos del par (unidades de la moneda
+    cotizada por unidad de la principal), también en pares cruzados como ETH/BNB.
+
     Args:
         orden: La orden a verificar.
         precio_actual: El precio de mercado actual del par.
@@ -87,9 +103,8 @@ def _ejecutar_orden_pendiente(orden: Dict[str, Any], billetera: Dict[str, Any])
              orden["estado"] = config.ESTADO_ERROR
              return billetera
               
-        # El precio de mercado se obtiene para el activo principal del par (ej: BTC en BTC/USDT)
-        ticker_principal = orden["par"].split('/')[0]
-        precio_actual_mercado = obtener_precio(ticker_principal)
+        # El precio de mercado es el del par (ej: BTC en USDT para BTC/USDT, o ETH en BNB para ETH/BNB)
+        precio_actual_mercado = obtener_matriz_tasas((orden["par"],)).tasa_par(orden["par"])
         if not precio_actual_mercado:
              print(f"⚠️  No se pudo obtener el precio de mercado para {orden['par']} para validar el límite de la orden {orden['id_orden']}.")
              return billetera
@@ -134,46 +149,121 @@ def _ejecutar_orden_pendiente(orden: Dict[str, Any], billetera: Dict[str, Any])
     return billetera
 
 
-def verificar_y_ejecutar_ordenes_pendientes() -> None:
-    """Ciclo principal del motor: verifica y ejecuta todas las órdenes pendientes.
+class ResultadoCiclo(NamedTuple):
+    """Métricas de un ciclo del motor.
+
+    Attributes:
+        pares_evaluados (int): Pares cuyo precio se comparó con el libro.
+        ordenes_evaluadas (int): Órdenes pendientes de esos pares.
+        ordenes_disparadas (int): Órdenes cuyo disparo cruzó el precio.
+        ordenes_ejecutadas (int): Órdenes disparadas que se ejecutaron.
+        ordenes_modificadas (int): Órdenes disparadas que cambiaron de estado
+            (ejecutadas, canceladas o fallidas).
+        truncado (bool): True si quedaron órdenes disparadas sin procesar por
+            superar el máximo del ciclo.
+        duracion_s (float): Duración del ciclo, en segundos.
+    """
+
+    pares_evaluados: int = 0
+    ordenes_evaluadas: int = 0
+    ordenes_disparadas: int = 0
+    ordenes_ejecutadas: int = 0
+    ordenes_modificadas: int = 0
+    truncado: bool = False
+    duracion_s: float = 0.0
+
+
+def verificar_y_ejecutar_ordenes_pendientes(
+    tickers: Optional[Iterable[str]] = None, max_ordenes: Optional[int] = None
+) -> ResultadoCiclo:
+    """Ciclo principal del motor: ejecuta las órdenes pendientes que se dispararon.
 
     Esta función representa un "tick" o ciclo completo del motor de trading.
     Orquesta el proceso de extremo a extremo:
-    1.  Carga todas las órdenes y filtra las que están 'pendientes'.
-    2.  Carga la billetera para poder modificarla.
-    3.  Itera sobre cada orden pendiente:
-        a. Obtiene el precio de mercado actual para el par de la orden.
-        b. Llama a `_verificar_condicion_orden` para ver si se dispara.
-        c. Si se dispara, llama a `_ejecutar_orden_pendiente`.
-    4.  Persiste el estado final de las órdenes y la billetera en el almacenamiento.
-    """
-    todas_las_ordenes = cargar_ordenes_pendientes()
-    ordenes_pendientes = [o for o in todas_las_ordenes if o.get("estado") == config.ESTADO_PENDIENTE]
-    if not ordenes_pendientes: 
-        return
+    1.  Obtiene el libro de disparos (ver `libro_disparos`), que indexa las
+        órdenes pendientes por par y precio de disparo.
+    2.  Para cada par del libro (o solo los de `tickers`), obtiene el precio
+        de mercado actual y busca en el libro las órdenes cuyo disparo cruzó
+        ese precio.
+    3.  Solo si alguna se disparó, carga las órdenes y la billetera, verifica
+        cada orden disparada con `_verificar_condicion_orden` y la ejecuta
+        con `_ejecutar_orden_pendiente`.
+    4.  Si alguna orden cambió de estado, persiste las órdenes y la
+        billetera en el almacenamiento.
+
+    Todo el ciclo se ejecuta dentro de una única transacción: las comisiones,
+    el historial, las órdenes y la billetera se confirman juntos. Los ciclos
+    concurrentes se serializan.
 
-    billetera = cargar_billetera()
-    ordenes_modificadas = []
-    
-    for orden in ordenes_pendientes:
-        # El precio de mercado se obtiene para el activo principal del par (ej: BTC en BTC/USDT)
-        ticker_principal = orden["par"].split('/')[0]
-        precio_actual = obtener_precio(ticker_principal)
-        if not precio_actual:
-            print(f"⚠️  No se pudo obtener precio para el par {orden['par']}. Saltando orden {orden['id_orden']}.")
-            continue
-
-        if _verificar_condicion_orden(orden, precio_actual):
-            print(f"🔔 CONDICIÓN CUMPLIDA para orden {orden['id_orden']}. Intentando ejecutar...")
-            billetera = _ejecutar_orden_pendiente(orden, billetera)
-        
-        ordenes_modificadas.append(orden)
+    Args:
+        tickers (Optional[Iterable[str]]): Si se indican, solo se evalúan los
+            pares que contienen alguno de estos tickers (ej. los que cambiaron
+            de precio). Por defecto, todos los pares.
+        max_ordenes (Optional[int]): Máximo de órdenes disparadas que pueden
+            cambiar de estado en el ciclo, para acotar su duración. Las
+            disparadas que siguen pendientes sin cambios (ej. un stop-limit
+            cuyo límite no se cumple) no cuentan: no se guardan y no deben
+            ocupar el cupo de las siguientes. Las demás se procesan en el
+            siguiente ciclo si el precio sigue cruzado.
 
-    ordenes_no_modificadas = [o for o in todas_las_ordenes if o.get("estado") != config.ESTADO_PENDIENTE]
-    
-    guardar_ordenes_pendientes(ordenes_no_modificadas + ordenes_modificadas)
-    guardar_billetera(billetera)
+    Returns:
+        ResultadoCiclo: Las métricas del ciclo.
+    """
+    inicio = time.perf_counter()
+    filtro = {ticker.upper() for ticker in tickers} if tickers is not None else None
+    with _lock_ciclo, transaccion():
+        libro = obtener_libro_disparos()
+        pares = [
+            par for par in libro.pares
+            if filtro is None or not filtro.isdisjoint(separar_par(par))
+        ]
+        if not pares:
+            return ResultadoCiclo(duracion_s=time.perf_counter() - inicio)
+
+        # Todos los pares de esta pasada se evalúan contra la misma instantánea de
+        # precios, con las tasas de todos ellos calculadas una sola vez.
+        matriz = obtener_matriz_tasas(pares)
+        evaluadas = 0
+        disparadas = set()
+        for par in pares:
+            evaluadas += libro.cantidad(par)
+            # El precio de mercado es el del par, también en pares cruzados (ej: ETH/BNB)
+            precio_actual = matriz.tasa_par(par)
+            if not precio_actual:
+                print(f"⚠️  No se pudo obtener precio para el par {par}. Saltando sus órdenes.")
+                continue
+            disparadas.update(libro.disparadas(par, precio_actual))
+        if not disparadas:
+            return ResultadoCiclo(len(pares), evaluadas, duracion_s=time.perf_counter() - inicio)
+
+        todas_las_ordenes = cargar_ordenes_pendientes()
+        billetera = cargar_billetera()
+        modificadas = ejecutadas = 0
+        truncado = False
+        for orden in todas_las_ordenes:
+            if orden.get("id_orden") not in disparadas or orden.get("estado") != config.ESTADO_PENDIENTE:
+                continue
+            if max_ordenes is not None and modificadas >= max_ordenes:
+                truncado = True
+                break
+            precio_actual = matriz.tasa_par(orden["par"])
+            if precio_actual and _verificar_condicion_orden(orden, precio_actual):
+                print(f"🔔 CONDICIÓN CUMPLIDA para orden {orden['id_orden']}. Intentando ejecutar...")
+                billetera = _ejecutar_orden_pendiente(orden, billetera)
+                # Un stop-limit disparado cuyo límite no se cumple sigue pendiente, sin cambios.
+                if orden.get("estado") != config.ESTADO_PENDIENTE:
+                    modificadas += 1
+                if orden.get("estado") == config.ESTADO_EJECUTADA:
+                    ejecutadas += 1
+
+        # Guardar sin cambios invalidaría el libro de disparos (ver `version_ordenes`).
+        if modificadas:
+            guardar_ordenes_pendientes(todas_las_ordenes)
+            guardar_billetera(billetera)
     print("--- Ciclo de motor de trading finalizado ---")
+    return ResultadoCiclo(
+        len(pares), evaluadas, len(disparadas), ejecutadas, modificadas, truncado, time.perf_counter() - inicio
+    )
 
 
 def _crear_nueva_orden(
@@ -186,9 +276,10 @@ def _crear_nueva_orden(
 ) -> Dict[str, Any]:
     """Función de fábrica para construir el objeto de una nueva orden.
 
-    Esta es una función pura que valida los datos de entrada y construye el
-    diccionario que representa una orden. No tiene efectos secundarios (no guarda
-    nada en disco ni modifica la billetera).
+    Valida los datos de entrada y construye el diccionario que representa una
+    orden. No guarda la orden ni modifica la billetera; su único efecto es
+    reservar el número de orden de la secuencia persistente, que garantiza un
+    `id_orden` único aunque lleguen dos órdenes en el mismo instante.
 
     Calcula la `cantidad_reservada` y `moneda_reservada` basándose en la lógica
     de negocio para cada tipo de orden y acción.
@@ -225,7 +316,8 @@ def _crear_nueva_orden(
         moneda_reservada = moneda_principal
         cantidad_reservada = cantidad
 
-    id_orden = f"{par.replace('/', '_').lower()}_{accion}_{datetime.now().timestamp()}"
+    numero_orden = reservar_numeros_orden()[0]
+    id_orden = f"{par.replace('/', '_').lower()}_{accion}_{numero_orden}"
     
     precio_disparo_final = precio_disparo if precio_disparo else precio_limite
 
@@ -0,0 +1,209 @@
+"""Motor de Órdenes por Eventos de Cambio de Precio.
+
+Antes, el motor se ejecutaba tras cada actualización del mercado y evaluaba
+todos los pares con órdenes pendientes, aunque sus precios no hubieran
+cambiado. `MotorEventos` se suscribe a los conjuntos de cambios de las
+cotizaciones (ver `datos_cotizaciones.suscribir_cambios_cotizaciones`):
+
+-   Cada conjunto agrega a una cola los tickers cuyo precio cambió. La
+    suscripción solo anota los tickers; el trabajo se hace en un hilo propio.
+-   El hilo ejecuta ciclos del motor restringidos a los pares de esos
+    tickers. Los cambios que llegan durante un ciclo se acumulan y se
+    evalúan juntos en el siguiente.
+-   En cada ciclo, como máximo `config.MAX_ORDENES_POR_CICLO_MOTOR`
+    órdenes disparadas cambian de estado. Si quedan más, sus tickers
+    vuelven a la cola.
+-   Si se pierde la continuidad de las versiones (ej. una recarga completa de
+    las cotizaciones), el siguiente ciclo evalúa todos los pares.
+
+Las métricas acumuladas (ciclos, órdenes evaluadas, disparadas y ejecutadas,
+duración) se exponen con `estadisticas()`.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional, Set
+
+from flask import Flask
+
+from backend.acceso_datos.datos_cotizaciones import (
+    ConjuntoCambios,
+    obtener_instantanea_precios,
+    suscribir_cambios_cotizaciones,
+)
+from backend.servicios.trading.motor import ResultadoCiclo, verificar_y_ejecutar_ordenes_pendientes
+import config
+
+
+class MotorEventos:
+    """Ejecuta el motor de órdenes en un hilo, solo para los tickers que cambiaron de precio."""
+
+    def __init__(self, max_ordenes: Optional[int] = None):
+        """Inicializa el motor sin suscribirlo ni arrancar su hilo.
+
+        Args:
+            max_ordenes (Optional[int]): Máximo de órdenes disparadas por ciclo.
+        """
+        self.max_ordenes = max_ordenes
+        self._lock = threading.Lock()
+        self._hay_trabajo = threading.Event()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self._desuscribir: Optional[Callable[[], None]] = None
+        # Tickers por evaluar; `_todos` pide evaluar todos los pares.
+        self._tickers: Set[str] = set()
+        self._todos = True
+        self._ultima_version: Optional[int] = None
+        self._estadisticas: Dict[str, Any] = {
+            "ciclos": 0,
+            "pares_evaluados": 0,
+            "ordenes_evaluadas": 0,
+            "ordenes_disparadas": 0,
+            "ordenes_ejecutadas": 0,
+            "duracion_total_s": 0.0,
+            "ultimo_ciclo": None,
+        }
+
+    @property
+    def activo(self) -> bool:
+        """Indica si el hilo del motor está en ejecución."""
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def iniciar(self) -> None:
+        """Se suscribe a los cambios de cotizaciones y arranca el hilo.
+
+        El primer ciclo evalúa todos los pares, por si alguna orden ya quedó
+        cruzada antes del arranque.
+        """
+        with self._lock:
+            if self.activo:
+                return
+            self._detener.clear()
+            self._todos = True
+            self._hay_trabajo.set()
+            self._desuscribir = suscribir_cambios_cotizaciones(self.notificar)
+            # El primer ciclo cubre la instantánea vigente: los cambios se
+            # encadenan desde su versión.
+            self._ultima_version = obtener_instantanea_precios().version
+            self._hilo = threading.Thread(target=self._bucle, name="motor-eventos", daemon=True)
+            self._hilo.start()
+
+    def detener(self, espera: Optional[float] = None) -> None:
+        """Cancela la suscripción y espera (como máximo `espera` segundos) a que el hilo termine."""
+        if self._desuscribir is not None:
+            self._desuscribir()
+            self._desuscribir = None
+        self._detener.set()
+        self._hay_trabajo.set()
+        hilo = self._hilo
+        if hilo is not None and hilo is not threading.current_thread():
+            hilo.join(espera)
+
+    def notificar(self, conjunto: ConjuntoCambios) -> None:
+        """Anota los tickers cuyo precio cambió (suscriptor de `ConjuntoCambios`)."""
+        with self._lock:
+            if conjunto.version_anterior != self._ultima_version:
+                self._todos = True
+            else:
+                self._tickers.update(
+                    ticker for ticker, campos in conjunto.cambios.items() if "precio_usd" in campos
+                )
+                self._tickers.update(conjunto.eliminados)
+            self._ultima_version = conjunto.version
+            if self._todos or self._tickers:
+                self._hay_trabajo.set()
+
+    def _bucle(self) -> None:
+        while True:
+            self._hay_trabajo.wait()
+            if self._detener.is_set():
+                return
+            try:
+                self.procesar_pendientes()
+            except Exception as e:
+                # Un ciclo fallido no debe detener los siguientes.
+                print(f"❌ Error en un ciclo del motor por eventos: {e}")
+
+    def procesar_pendientes(self) -> Optional[ResultadoCiclo]:
+        """Ejecuta un ciclo del motor con los tickers acumulados.
+
+        Returns:
+            Optional[ResultadoCiclo]: Las métricas del ciclo, o None si no
+                                      había nada que evaluar.
+        """
+        with self._lock:
+            self._hay_trabajo.clear()
+            todos, tickers = self._todos, self._tickers
+            self._todos, self._tickers = False, set()
+        if not todos and not tickers:
+            return None
+
+        resultado = verificar_y_ejecutar_ordenes_pendientes(None if todos else tickers, self.max_ordenes)
+        with self._lock:
+            if resultado.truncado and resultado.ordenes_modificadas:
+                # Las órdenes disparadas que no entraron en el ciclo se evalúan en el
+                # siguiente. Un ciclo sin cambios no se repite: volvería a ver lo mismo.
+                self._todos = self._todos or todos
+                self._tickers.update(tickers)
+                self._hay_trabajo.set()
+            estadisticas = self._estadisticas
+            estadisticas["ciclos"] += 1
+            estadisticas["pares_evaluados"] += resultado.pares_evaluados
+            estadisticas["ordenes_evaluadas"] += resultado.ordenes_evaluadas
+            estadisticas["ordenes_disparadas"] += resultado.ordenes_disparadas
+            estadisticas["ordenes_ejecutadas"] += resultado.ordenes_ejecutadas
+            estadisticas["duracion_total_s"] += resultado.duracion_s
+            estadisticas["ultimo_ciclo"] = resultado._asdict()
+        return resultado
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Devuelve las métricas acumuladas y las del último ciclo.
+
+        Returns:
+            Dict[str, Any]: `activo`, `ciclos`, `pares_evaluados`,
+                `ordenes_evaluadas`, `ordenes_disparadas`,
+                `ordenes_ejecutadas`, `duracion_total_s` y `ultimo_ciclo`
+                (o None si no hubo ciclos).
+        """
+        with self._lock:
+            return {"activo": self.activo, **self._estadisticas}
+
+
+_motor_eventos: Optional[MotorEventos] = None
+_lock_motor_eventos = threading.Lock()
+
+
+def obtener_motor_eventos() -> MotorEventos:
+    """Devuelve el motor por eventos del proceso, creándolo la primera vez."""
+    global _motor_eventos
+    with _lock_motor_eventos:
+        if _motor_eventos is None:
+            _motor_eventos = MotorEventos(config.MAX_ORDENES_POR_CICLO_MOTOR)
+        return _motor_eventos
+
+
+def motor_eventos_activo() -> bool:
+    """Indica si el motor por eventos está en ejecución.
+
+    Mientras lo está, quienes actualizan precios no necesitan ejecutar el
+    motor: el motor por eventos recibe los cambios.
+    """
+    return _motor_eventos is not None and _motor_eventos.activo
+
+
+def registrar_motor_eventos(app: Flask) -> None:
+    """Configura el arranque del motor por eventos para una aplicación Flask.
+
+    Igual que el planificador de mercado, el hilo se inicia con la primera
+    petición, para que el proceso padre del recargador de Flask no lo inicie.
+
+    Args:
+        app (Flask): La aplicación en la que se registra el arranque.
+    """
+    if not config.MOTOR_POR_EVENTOS_ACTIVO:
+        return
+
+    @app.before_request
+    def _iniciar_motor_eventos() -> None:
+        motor = obtener_motor_eventos()
+        if not motor.activo:
+            motor.iniciar()
@@ -21,8 +21,10 @@ from typing import Tuple, Dict, Any
 
 from backend.acceso_datos.datos_billetera import cargar_billetera, guardar_billetera
 import config
-from backend.acceso_datos.datos_cotizaciones import obtener_precio
+from backend.acceso_datos.datos_cotizaciones import obtener_instantanea_precios
+from backend.acceso_datos.tasas_cruzadas import obtener_matriz_tasas
 from backend.acceso_datos.datos_ordenes import agregar_orden_pendiente
+from backend.acceso_datos.repositorio import transaccion
 from backend.servicios.trading.ejecutar_orden import ejecutar_transaccion
 from backend.servicios.trading.motor import _crear_nueva_orden
 from backend.utils.responses import crear_respuesta_error, crear_respuesta_exitosa
@@ -91,8 +93,9 @@ def _ejecutar_orden_mercado(
     accion: str,
 ) -> Dict[str, Any]:
     """Orquesta la ejecución completa de una orden de mercado."""
-    precio_origen_usdt = obtener_precio(moneda_origen)
-    precio_destino_usdt = obtener_precio(moneda_destino)
+    precios = obtener_instantanea_precios()
+    precio_origen_usdt = precios.precio(moneda_origen)
+    precio_destino_usdt = precios.precio(moneda_destino)
     if not all([precio_origen_usdt, precio_destino_usdt]):
         return crear_respuesta_error("❌ No se pudo obtener la cotización para realizar el swap.")
 
@@ -101,29 +104,31 @@ def _ejecutar_orden_mercado(
         return crear_respuesta_error(f"❌ {detalles_brutos}")
 
     cantidad_origen_bruta = detalles_brutos["cantidad_origen_bruta"]
-    billetera = cargar_billetera()
-    exito_validacion, mensaje_error = _validar_saldo_disponible(billetera, moneda_origen, cantidad_origen_bruta)
-    if not exito_validacion: 
-        return crear_respuesta_error(mensaje_error)
-
-    tipo_orden_str = config.TIPO_ORDEN_MERCADO.upper()
-    accion_str = accion.upper()
-    tipo_op_historial = f"{tipo_orden_str}-{accion_str}"
-
-    exito_ejecucion, detalles_ejecucion = ejecutar_transaccion(
-        billetera=billetera,
-        moneda_origen=moneda_origen,
-        cantidad_origen_bruta=cantidad_origen_bruta,
-        moneda_destino=moneda_destino,
-        tipo_operacion_historial=tipo_op_historial,
-        es_orden_pendiente=False
-    )
-
-    if not exito_ejecucion:
-        error_msg = detalles_ejecucion.get("error", "Error desconocido durante la ejecución.")
-        return crear_respuesta_error(error_msg)
-
-    guardar_billetera(billetera)
+    # La comisión, el historial y la billetera se confirman como una única transacción.
+    with transaccion():
+        billetera = cargar_billetera()
+        exito_validacion, mensaje_error = _validar_saldo_disponible(billetera, moneda_origen, cantidad_origen_bruta)
+        if not exito_validacion: 
+            return crear_respuesta_error(mensaje_error)
+
+        tipo_orden_str = config.TIPO_ORDEN_MERCADO.upper()
+        accion_str = accion.upper()
+        tipo_op_historial = f"{tipo_orden_str}-{accion_str}"
+
+        exito_ejecucion, detalles_ejecucion = ejecutar_transaccion(
+            billetera=billetera,
+            moneda_origen=moneda_origen,
+            cantidad_origen_bruta=cantidad_origen_bruta,
+            moneda_destino=moneda_destino,
+            tipo_operacion_historial=tipo_op_historial,
+            es_orden_pendiente=False
+        )
+
+        if not exito_ejecucion:
+            error_msg = detalles_ejecucion.get("error", "Error desconocido durante la ejecución.")
+            return crear_respuesta_error(error_msg)
+
+        guardar_billetera(billetera)
 
     resultado_operacion = {
         "titulo": "Operación de Mercado Exitosa",
@@ -236,11 +241,16 @@ def procesar_operacion_trading(formulario: Dict[str, Any]) -> Dict[str, Any]:
         if tipo_orden == config.TIPO_ORDEN_STOP_LIMIT and precio_limite <= 0:
             return crear_respuesta_error("❌ Se requiere un precio límite válido y positivo para una orden Stop-Limit.")
 
-        # Obtener precios para las validaciones y cálculos
-        precio_mercado_actual = obtener_precio(ticker_principal)
-        # OBTENER PRECIOS DE AMBAS MONEDAS
-        precio_origen_usdt = obtener_precio(moneda_origen)
-        precio_destino_usdt = obtener_precio(moneda_destino)
+        # Los precios de disparo y límite se expresan en la moneda cotizada del par
+        # (ej. BNB por ETH en ETH/BNB); el precio de mercado del par sale de la
+        # matriz de tasas cruzadas.
+        moneda_cotizada = moneda_origen if accion == config.ACCION_COMPRAR else moneda_destino
+        matriz = obtener_matriz_tasas((f"{ticker_principal}/{moneda_cotizada}",))
+        precio_mercado_actual = matriz.tasa(ticker_principal, moneda_cotizada)
+        # OBTENER PRECIOS DE AMBAS MONEDAS (de la misma instantánea que la matriz)
+        precios = obtener_instantanea_precios()
+        precio_origen_usdt = precios.precio(moneda_origen)
+        precio_destino_usdt = precios.precio(moneda_destino)
         
         if not all([precio_origen_usdt, precio_destino_usdt]):
             return crear_respuesta_error("❌ No se pudo obtener la cotización para una o ambas monedas.")
@@ -269,6 +279,10 @@ def procesar_operacion_trading(formulario: Dict[str, Any]) -> Dict[str, Any]:
                         return crear_respuesta_error(f"❌ Venta Stop-Limit: Precio Límite ({formato_cantidad_usd(precio_limite)}) no puede ser > al Precio Stop ({formato_cantidad_usd(precio_disparo)}).")
         
         precio_referencia = precio_limite if tipo_orden == config.TIPO_ORDEN_STOP_LIMIT else precio_disparo
+        # Los cálculos de reserva trabajan en USD: en un par cruzado, el precio
+        # en moneda cotizada se convierte con la tasa de esa moneda.
+        if moneda_cotizada != config.MONEDA_FIAT_DEFAULT:
+            precio_referencia *= matriz.tasa(moneda_cotizada, config.MONEDA_FIAT_DEFAULT) or Decimal("0")
         
         # LLAMADA A LA FUNCIÓN MODIFICADA
         respuesta_calculo = _calcular_reserva_y_cantidad_principal(
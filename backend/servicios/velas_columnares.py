@@ -0,0 +1,169 @@
+"""Representación Columnar de Series de Velas (OHLCV).
+
+Antes, cada vela de Binance se convertía en un diccionario con cinco valores
+`str(Decimal(...))`, y `jsonify` serializaba cientos de diccionarios con las
+mismas claves repetidas. `SerieVelas` guarda la serie en columnas paralelas
+respaldadas por `array` (`'q'` para los tiempos, `'d'` para los valores),
+construidas en una sola pasada sobre la respuesta de Binance.
+
+La serie puede entregarse en dos formatos:
+
+-   `filas()`: una lista de diccionarios `{time, open, high, low, close,
+    volume}`, el formato histórico de `/api/velas`.
+-   `columnas()`: un diccionario con una lista por campo. Es el formato
+    compacto de `/api/velas?formato=columnas`, menos de la mitad de grande.
+
+Los valores se guardan como `float`: son para gráficos, no para operar.
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional
+
+CAMPOS = ("time", "open", "high", "low", "close", "volume")
+
+
+class SerieVelas:
+    """Serie inmutable de velas en columnas paralelas, ordenada por tiempo de apertura."""
+
+    __slots__ = ("tiempos", "aperturas", "maximos", "minimos", "cierres", "volumenes")
+
+    def __init__(
+        self,
+        tiempos: Optional[array] = None,
+        aperturas: Optional[array] = None,
+        maximos: Optional[array] = None,
+        minimos: Optional[array] = None,
+        cierres: Optional[array] = None,
+        volumenes: Optional[array] = None,
+    ):
+        """Crea una serie a partir de sus columnas (vacía si no se indican).
+
+        Las columnas pasan a ser de la serie: no deben modificarse después.
+        """
+        self.tiempos = tiempos if tiempos is not None else array("q")
+        self.aperturas = aperturas if aperturas is not None else array("d")
+        self.maximos = maximos if maximos is not None else array("d")
+        self.minimos = minimos if minimos is not None else array("d")
+        self.cierres = cierres if cierres is not None else array("d")
+        self.volumenes = volumenes if volumenes is not None else array("d")
+
+    @classmethod
+    def desde_binance(cls, filas: Iterable[List[Any]]) -> "SerieVelas":
+        """Construye la serie a partir de las filas de la API de klines de Binance.
+
+        Cada fila es `[apertura_ms, open, high, low, close, volume, ...]`; el
+        tiempo se convierte a segundos.
+
+        Raises:
+            IndexError, TypeError, ValueError: Si alguna fila no tiene el formato esperado.
+        """
+        serie = cls()
+        tiempos, aperturas, maximos = serie.tiempos.append, serie.aperturas.append, serie.maximos.append
+        minimos, cierres, volumenes = serie.minimos.append, serie.cierres.append, serie.volumenes.append
+        for fila in filas:
+            tiempos(int(fila[0]) // 1000)
+            aperturas(float(fila[1]))
+            maximos(float(fila[2]))
+            minimos(float(fila[3]))
+            cierres(float(fila[4]))
+            volumenes(float(fila[5]))
+        return serie
+
+    @classmethod
+    def desde_filas(cls, filas: Iterable[Dict[str, Any]]) -> "SerieVelas":
+        """Construye la serie a partir de velas en el formato de filas (ver `filas`)."""
+        serie = cls()
+        for fila in filas:
+            serie.tiempos.append(int(fila["time"]))
+            serie.aperturas.append(float(fila["open"]))
+            serie.maximos.append(float(fila["high"]))
+            serie.minimos.append(float(fila["low"]))
+            serie.cierres.append(float(fila["close"]))
+            serie.volumenes.append(float(fila["volume"]))
+        return serie
+
+    def _columnas(self):
+        return (self.tiempos, self.aperturas, self.maximos, self.minimos, self.cierres, self.volumenes)
+
+    def __len__(self) -> int:
+        return len(self.tiempos)
+
+    @property
+    def ultimo_tiempo(self) -> Optional[int]:
+        """Tiempo de apertura (en segundos) de la última vela, o None si está vacía."""
+        return self.tiempos[-1] if self.tiempos else None
+
+    def rebanada(self, inicio: int, fin: Optional[int] = None) -> "SerieVelas":
+        """Devuelve una serie nueva con las velas de las posiciones `[inicio, fin)`."""
+        return SerieVelas(*(columna[inicio:fin] for columna in self._columnas()))
+
+    def fusionar(self, nuevas: "SerieVelas", maximo: Optional[int] = None) -> "SerieVelas":
+        """Devuelve una serie nueva con `nuevas` agregadas al final.
+
+        Las velas guardadas desde la primera apertura de `nuevas` se
+        reemplazan (ej. la vela que estaba en curso).
+
+        Args:
+            nuevas (SerieVelas): Velas más recientes, ordenadas.
+            maximo (Optional[int]): Si se indica, solo se conservan las
+                últimas `maximo` velas.
+        """
+        if not len(nuevas):
+            return self if maximo is None or len(self) <= maximo else self.rebanada(len(self) - maximo)
+        corte = bisect_left(self.tiempos, nuevas.tiempos[0])
+        columnas = [propia[:corte] + nueva for propia, nueva in zip(self._columnas(), nuevas._columnas())]
+        if maximo is not None and len(columnas[0]) > maximo:
+            columnas = [columna[-maximo:] for columna in columnas]
+        return SerieVelas(*columnas)
+
+    def remuestrear(self, duracion: int, desfase: int = 0) -> "SerieVelas":
+        """Agrupa la serie en velas de mayor duración (ej. de 15m a 1h).
+
+        Cada vela se asigna al bloque que empieza en
+        `desfase + k * duracion` (en segundos desde la época). Por bloque, la
+        apertura es la de su primera vela, el cierre el de la última, el
+        máximo y el mínimo los extremos, y el volumen la suma. El primer
+        bloque se descarta si la serie empieza a mitad de él, porque estaría
+        incompleto; el último puede estar en curso, igual que en Binance.
+
+        Args:
+            duracion (int): Duración del bloque destino, en segundos.
+            desfase (int): Desplazamiento de los bloques (ej. las velas
+                semanales de Binance empiezan el lunes, 4 días después de la época).
+
+        Returns:
+            SerieVelas: La serie remuestreada.
+        """
+        destino = SerieVelas()
+        tiempos, aperturas, maximos = destino.tiempos, destino.aperturas, destino.maximos
+        minimos, cierres, volumenes = destino.minimos, destino.cierres, destino.volumenes
+        bloque_actual = None
+        for tiempo, apertura, maximo, minimo, cierre, volumen in zip(*self._columnas()):
+            bloque = tiempo - (tiempo - desfase) % duracion
+            if bloque != bloque_actual:
+                if bloque_actual is None and bloque != tiempo:
+                    continue
+                bloque_actual = bloque
+                tiempos.append(bloque)
+                aperturas.append(apertura)
+                maximos.append(maximo)
+                minimos.append(minimo)
+                cierres.append(cierre)
+                volumenes.append(volumen)
+            else:
+                if maximo > maximos[-1]:
+                    maximos[-1] = maximo
+                if minimo < minimos[-1]:
+                    minimos[-1] = minimo
+                cierres[-1] = cierre
+                volumenes[-1] += volumen
+        return destino
+
+    def columnas(self) -> Dict[str, List[Any]]:
+        """Devuelve la serie en formato columnar: una lista por campo."""
+        return {campo: columna.tolist() for campo, columna in zip(CAMPOS, self._columnas())}
+
+    def filas(self) -> List[Dict[str, Any]]:
+        """Devuelve la serie como una lista de velas `{time, open, high, low, close, volume}`."""
+        return [dict(zip(CAMPOS, valores)) for valores in zip(*self._columnas())]
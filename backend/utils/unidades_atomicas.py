@@ -0,0 +1,91 @@
+"""Representación de Montos como Enteros en Unidades Atómicas.
+
+Un monto con precisión fija puede guardarse como un entero que cuenta
+unidades mínimas de esa precisión (como los "satoshis" de Bitcoin):
+
+    Decimal("0.015")  en cripto (1e-8) -> 1500000
+    Decimal("12.5")   en USD    (1e-4) -> 125000
+
+Los enteros se suman y comparan de forma exacta y mucho más rápido que los
+`Decimal`, y leerlos no requiere interpretar texto ni volver a cuantizar: el
+valor guardado ya tiene la precisión estándar.
+
+Con `config.LIBRO_UNIDADES_ATOMICAS` activo, la capa `acceso_datos` guarda
+los montos en este formato. Al leer, los enteros se interpretan como unidades
+atómicas y el texto como un decimal, de modo que ambos formatos conviven en
+los mismos archivos.
+"""
+
+from decimal import Decimal
+from typing import Any, Union
+
+from backend.utils.utilidades_numericas import a_decimal, cuantizar_cripto, cuantizar_usd
+import config
+
+# Cantidad de decimales de cada precisión (ej. 8 para 0.00000001).
+DECIMALES_CRIPTO = -config.PRECISION_CRIPTOMONEDA.as_tuple().exponent
+DECIMALES_USD = -config.PRECISION_USD.as_tuple().exponent
+
+_UNIDAD = Decimal(1)
+
+
+def es_unidades(valor: Any) -> bool:
+    """Indica si un valor guardado está expresado en unidades atómicas."""
+    return isinstance(valor, int) and not isinstance(valor, bool)
+
+
+def a_unidades_cripto(valor: Decimal) -> int:
+    """Convierte una cantidad de cripto a unidades de 1e-8, redondeando como `cuantizar_cripto`."""
+    return int(valor.scaleb(DECIMALES_CRIPTO).quantize(_UNIDAD))
+
+
+def a_unidades_usd(valor: Decimal) -> int:
+    """Convierte un valor en USD a unidades de 1e-4, redondeando como `cuantizar_usd`."""
+    return int(valor.scaleb(DECIMALES_USD).quantize(_UNIDAD))
+
+
+def desde_unidades_cripto(unidades: int) -> Decimal:
+    """Convierte unidades de 1e-8 a un Decimal con la precisión de cripto."""
+    return Decimal(unidades).scaleb(-DECIMALES_CRIPTO)
+
+
+def desde_unidades_usd(unidades: int) -> Decimal:
+    """Convierte unidades de 1e-4 a un Decimal con la precisión de USD."""
+    return Decimal(unidades).scaleb(-DECIMALES_USD)
+
+
+def leer_monto_cripto(valor: Any) -> Decimal:
+    """Lee una cantidad de cripto guardada en cualquiera de los dos formatos.
+
+    Args:
+        valor (Any): Un entero en unidades atómicas, o un valor decimal
+                     (ver `a_decimal`).
+
+    Returns:
+        Decimal: La cantidad como Decimal.
+    """
+    return desde_unidades_cripto(valor) if es_unidades(valor) else a_decimal(valor)
+
+
+def leer_monto_usd(valor: Any) -> Decimal:
+    """Lee un valor en USD guardado en cualquiera de los dos formatos (ver `leer_monto_cripto`)."""
+    return desde_unidades_usd(valor) if es_unidades(valor) else a_decimal(valor)
+
+
+def serializar_monto_cripto(valor: Decimal) -> Union[int, str]:
+    """Prepara una cantidad de cripto para guardarla, según el modo del libro.
+
+    Returns:
+        Union[int, str]: Unidades atómicas si `config.LIBRO_UNIDADES_ATOMICAS`
+                         está activo; si no, el valor cuantizado como texto.
+    """
+    if config.LIBRO_UNIDADES_ATOMICAS:
+        return a_unidades_cripto(valor)
+    return str(cuantizar_cripto(valor))
+
+
+def serializar_monto_usd(valor: Decimal) -> Union[int, str]:
+    """Prepara un valor en USD para guardarlo, según el modo del libro (ver `serializar_monto_cripto`)."""
+    if config.LIBRO_UNIDADES_ATOMICAS:
+        return a_unidades_usd(valor)
+    return str(cuantizar_usd(valor))
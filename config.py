@@ -43,10 +43,48 @@ os.makedirs(BASE_DATA_DIR, exist_ok=True)  # Asegura que el directorio de datos
 # Rutas absolutas a los archivos JSON que actúan como base de datos.
 COTIZACIONES_PATH = os.path.join(BASE_DATA_DIR, "cotizaciones.json")
 BILLETERA_PATH = os.path.join(BASE_DATA_DIR, "billetera.json")
-HISTORIAL_PATH = os.path.join(BASE_DATA_DIR, "historial.json")
+# El historial se guarda en formato JSON Lines (una operación por línea).
+# Un `historial.json` del formato anterior se migra automáticamente.
+HISTORIAL_PATH = os.path.join(BASE_DATA_DIR, "historial.jsonl")
 VELAS_PATH = os.path.join(BASE_DATA_DIR, "velas.json")
 COMISIONES_PATH = os.path.join(BASE_DATA_DIR, "comisiones.json")
 ORDENES_PENDIENTES_PATH = os.path.join(BASE_DATA_DIR, "ordenes_pendientes.json")
+# Instantáneas binarias de la billetera y las órdenes (ver `instantanea_binaria`).
+# Con INSTANTANEAS_BINARIAS=1, el driver JSON guarda la billetera y las órdenes
+# en estas rutas, en un formato más rápido de leer y escribir que el JSON
+# legible. Los archivos JSON existentes se leen hasta la primera escritura.
+INSTANTANEAS_BINARIAS = os.getenv("INSTANTANEAS_BINARIAS", "0").lower() in ("1", "true")
+INSTANTANEA_BILLETERA_PATH = os.path.join(BASE_DATA_DIR, "billetera.bin")
+INSTANTANEA_ORDENES_PATH = os.path.join(BASE_DATA_DIR, "ordenes_pendientes.bin")
+HISTORIAL_PRECIOS_PATH = os.path.join(BASE_DATA_DIR, "historial_precios.bin")
+
+# Driver de almacenamiento para la capa `acceso_datos`:
+# - "json": archivos JSON/JSONL en las rutas anteriores (por defecto).
+# - "sqlite": una única base SQLite en modo WAL en `SQLITE_PATH`.
+BACKEND_ALMACENAMIENTO = os.getenv("BACKEND_ALMACENAMIENTO", "json")
+SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join(BASE_DATA_DIR, "exchange.sqlite3"))
+
+# Ventana (en milisegundos) durante la cual las escrituras de billetera y
+# órdenes se agrupan en una sola confirmación a disco (group commit). Solo se
+# espera si el lote anterior agrupó a varios escritores concurrentes.
+# Con 0, cada escritura se confirma de inmediato.
+VENTANA_COMMIT_AGRUPADO_MS = float(os.getenv("VENTANA_COMMIT_AGRUPADO_MS", "2"))
+# Cantidad de transacciones confirmadas en el diario (driver JSON) a partir de
+# la cual se aplican a los archivos de datos.
+DIARIO_MAX_PENDIENTES = int(os.getenv("DIARIO_MAX_PENDIENTES", "32"))
+
+# Almacén de estado en memoria (write-back): si está activo, la billetera, las
+# órdenes, el historial y las comisiones se leen una vez y se sirven desde
+# memoria; los cambios se vuelcan al driver cada INTERVALO_VOLCADO_ESTADO_S
+# segundos o al acumular MAX_CAMBIOS_SIN_VOLCAR cambios.
+ESTADO_EN_MEMORIA = os.getenv("ESTADO_EN_MEMORIA", "0").lower() in ("1", "true")
+INTERVALO_VOLCADO_ESTADO_S = float(os.getenv("INTERVALO_VOLCADO_ESTADO_S", "1"))
+MAX_CAMBIOS_SIN_VOLCAR = int(os.getenv("MAX_CAMBIOS_SIN_VOLCAR", "100"))
+
+# El historial y las comisiones conservan en su archivo activo solo el mes en
+# curso; los meses anteriores pasan a segmentos mensuales, de los cuales los
+# SEGMENTOS_SIN_COMPRIMIR más recientes quedan sin comprimir.
+SEGMENTOS_SIN_COMPRIMIR = int(os.getenv("SEGMENTOS_SIN_COMPRIMIR", "1"))
 
 # --- Parámetros de Simulación ---
 
@@ -66,9 +104,75 @@ FLASK_SECRET_KEY = os.getenv("FLASK_SECRET_KEY", "clave_por_defecto_insegura")
 COINGECKO_URL = "https://api.coingecko.com/api/v3/coins/markets"
 BINANCE_URL = "https://api.binance.com/api/v3/klines"
 
+# Cliente HTTP de las APIs externas: conexiones por host, límites de tasa
+# (CoinGecko cuenta peticiones por minuto; Binance, peso por minuto) y reintentos
+# con backoff exponencial. La cabecera Retry-After se respeta hasta
+# RETRY_AFTER_MAX_HTTP segundos; si el servidor pide más, la petición falla.
+CONEXIONES_POR_HOST_HTTP = int(os.getenv("CONEXIONES_POR_HOST_HTTP", "4"))
+LIMITE_PETICIONES_COINGECKO_MINUTO = float(os.getenv("LIMITE_PETICIONES_COINGECKO_MINUTO", "30"))
+LIMITE_PESO_BINANCE_MINUTO = float(os.getenv("LIMITE_PESO_BINANCE_MINUTO", "6000"))
+REINTENTOS_HTTP = int(os.getenv("REINTENTOS_HTTP", "3"))
+BACKOFF_BASE_HTTP = float(os.getenv("BACKOFF_BASE_HTTP", "0.5"))
+BACKOFF_MAX_HTTP = float(os.getenv("BACKOFF_MAX_HTTP", "8"))
+RETRY_AFTER_MAX_HTTP = float(os.getenv("RETRY_AFTER_MAX_HTTP", "60"))
+TIMEOUT_HTTP = float(os.getenv("TIMEOUT_HTTP", "10"))
+
 # Parámetros de scraping
-CANTIDAD_CRIPTOMONEDAS = 100
+# Las criptomonedas se piden a CoinGecko en páginas de POR_PAGINA_COINGECKO
+# (máximo 250), en paralelo en un pool de HILOS_INGESTA_COINGECKO hilos. Cada
+# actualización pide como máximo las páginas que permite
+# LIMITE_PETICIONES_COINGECKO_MINUTO en INTERVALO_ACTUALIZACION_MERCADO
+# segundos; si hay más, se piden por turnos en las actualizaciones siguientes.
+CANTIDAD_CRIPTOMONEDAS = int(os.getenv("CANTIDAD_CRIPTOMONEDAS", "100"))
+POR_PAGINA_COINGECKO = int(os.getenv("POR_PAGINA_COINGECKO", "250"))
+HILOS_INGESTA_COINGECKO = int(os.getenv("HILOS_INGESTA_COINGECKO", "4"))
 CANTIDAD_VELAS = 250
+# Velas que se piden y guardan por serie (máximo 1000 en Binance). Las que
+# exceden CANTIDAD_VELAS permiten construir intervalos mayores sin consultar
+# Binance (ej. 250 velas de 4h a partir de 1000 de 1h).
+CANTIDAD_VELAS_BASE = int(os.getenv("CANTIDAD_VELAS_BASE", "1000"))
+
+# Proveedor de datos de mercado: "en_vivo" (APIs externas), "grabar" (APIs
+# externas, guardando las respuestas en ARCHIVO_MERCADO_PATH) o "reproducir"
+# (respuestas grabadas, con un reloj FACTOR_TIEMPO_REPETICION veces más rápido).
+PROVEEDOR_DATOS_MERCADO = os.getenv("PROVEEDOR_DATOS_MERCADO", "en_vivo")
+ARCHIVO_MERCADO_PATH = os.getenv("ARCHIVO_MERCADO_PATH", os.path.join(BASE_DATA_DIR, "mercado_grabado.jsonl"))
+FACTOR_TIEMPO_REPETICION = float(os.getenv("FACTOR_TIEMPO_REPETICION", "1"))
+
+# Fuente de precios en streaming: "" (desactivada) o "repeticion", que
+# reproduce los frames miniTicker grabados en REPETICION_STREAMING_PATH a
+# VELOCIDAD_REPETICION_STREAMING veces la velocidad real (0 = sin esperas).
+FUENTE_STREAMING_PRECIOS = os.getenv("FUENTE_STREAMING_PRECIOS", "")
+REPETICION_STREAMING_PATH = os.getenv("REPETICION_STREAMING_PATH", os.path.join(BASE_DATA_DIR, "ticks_repeticion.jsonl"))
+VELOCIDAD_REPETICION_STREAMING = float(os.getenv("VELOCIDAD_REPETICION_STREAMING", "1"))
+
+# Caché de velas: series guardadas por (ticker, intervalo) y vencimiento máximo
+# de cada una, aunque su última vela todavía no haya cerrado.
+MAX_SERIES_VELAS = int(os.getenv("MAX_SERIES_VELAS", "32"))
+TTL_MAXIMO_VELAS_S = float(os.getenv("TTL_MAXIMO_VELAS_S", "60"))
+
+# Planificador de datos de mercado: actualiza las cotizaciones y ejecuta el
+# motor de órdenes en segundo plano cada INTERVALO_ACTUALIZACION_MERCADO segundos.
+# Una actualización forzada desde /api/actualizar solo consulta la API externa
+# si los datos tienen más de EDAD_MINIMA_ACTUALIZACION_FORZADA_S segundos.
+PLANIFICADOR_MERCADO_ACTIVO = os.getenv("PLANIFICADOR_MERCADO_ACTIVO", "1").lower() in ("1", "true")
+INTERVALO_ACTUALIZACION_MERCADO = float(os.getenv("INTERVALO_ACTUALIZACION_MERCADO", "15"))
+EDAD_MINIMA_ACTUALIZACION_FORZADA_S = float(os.getenv("EDAD_MINIMA_ACTUALIZACION_FORZADA_S", "15"))
+
+# Motor de órdenes por eventos: en lugar de evaluar todos los pares tras cada
+# actualización, un hilo evalúa solo los pares cuyos precios cambiaron, con
+# hasta MAX_ORDENES_POR_CICLO_MOTOR órdenes disparadas por ciclo.
+MOTOR_POR_EVENTOS_ACTIVO = os.getenv("MOTOR_POR_EVENTOS_ACTIVO", "1").lower() in ("1", "true")
+MAX_ORDENES_POR_CICLO_MOTOR = int(os.getenv("MAX_ORDENES_POR_CICLO_MOTOR", "200"))
+
+# Historial de precios en memoria: observaciones que se conservan por ticker
+# (5760 = 24 horas con una actualización cada 15 segundos) y si se persiste
+# en HISTORIAL_PRECIOS_PATH para sobrevivir a los reinicios. Cada guardado
+# reescribe el historial completo: se guarda como mucho cada
+# INTERVALO_GUARDADO_HISTORIAL_PRECIOS_S segundos y al cerrar el proceso.
+CAPACIDAD_HISTORIAL_PRECIOS = int(os.getenv("CAPACIDAD_HISTORIAL_PRECIOS", "5760"))
+PERSISTIR_HISTORIAL_PRECIOS = os.getenv("PERSISTIR_HISTORIAL_PRECIOS", "0").lower() in ("1", "true")
+INTERVALO_GUARDADO_HISTORIAL_PRECIOS_S = float(os.getenv("INTERVALO_GUARDADO_HISTORIAL_PRECIOS_S", "300"))
 
 # --- CONFIGURACIÓN NUMÉRICA GLOBAL ---
 # Precisión para los cálculos intermedios de la librería Decimal
@@ -82,6 +186,12 @@ PRECISION_CRIPTOMONEDA = Decimal("0.00000001")
 # Precisión de decimales 4 para valores en USD
 PRECISION_USD = Decimal("0.0001")
 
+# Libro en unidades atómicas: si está activo, los saldos de la billetera y los
+# montos del historial y de las comisiones se guardan como enteros en la unidad
+# mínima de cada precisión (1e-8 para cripto, 1e-4 para USD). Los datos
+# guardados como texto decimal se siguen leyendo en ambos modos.
+LIBRO_UNIDADES_ATOMICAS = os.getenv("LIBRO_UNIDADES_ATOMICAS", "0").lower() in ("1", "true")
+
 # Umbrales para la lógica de "polvo" (saldos pequeños)
 UMBRAL_POLVO_USD = Decimal("0.01") # Valor en USD por debajo del cual se considera polvo
 UMBRAL_CASI_CERO = Decimal("0.00000001") # Cantidad por debajo de la cual se considera cero para ciertas validaciones
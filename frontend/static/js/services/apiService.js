@@ -65,12 +65,24 @@ export const fetchHistorial = () => _fetchData('/api/historial');
 
 /**
  * Obtiene los datos de velas (OHLCV) para un par de trading y un intervalo específicos.
+ * Los pide en el formato columnar (una lista por campo), más compacto, y los
+ * convierte al array de velas que espera el gráfico.
  * @param {string} ticker - El par de trading (ej. 'BTCUSDT').
  * @param {string} interval - El intervalo de tiempo de las velas (ej. '1h', '1d').
  * @returns {Promise<Array<object>>} Una promesa que se resuelve con un array de datos de velas.
  * @throws {Error} Si la solicitud a `GET /api/velas/{ticker}/{interval}` falla.
  */
-export const fetchVelas = (ticker, interval) => _fetchData(`/api/velas/${ticker}/${interval}`);
+export const fetchVelas = async (ticker, interval) => {
+    const columnas = await _fetchData(`/api/velas/${ticker}/${interval}?formato=columnas`);
+    return columnas.time.map((time, i) => ({
+        time,
+        open: columnas.open[i],
+        high: columnas.high[i],
+        low: columnas.low[i],
+        close: columnas.close[i],
+        volume: columnas.volume[i],
+    }));
+};
 
 /**
  * Solicita al backend que actualice sus datos de mercado desde la fuente externa.
@@ -18,11 +18,15 @@ from backend import crear_app
 from backend.acceso_datos.datos_cotizaciones import limpiar_cache_precios
 
 @pytest.fixture
-def app():
+def app(monkeypatch):
     """
     Crea y configura una nueva instancia de la aplicación Flask para cada test.
     Esto asegura que cada prueba se ejecute en un entorno limpio y aislado.
+    El planificador de datos de mercado se desactiva para no consultar APIs externas,
+    y el motor por eventos para no ejecutar órdenes en segundo plano.
     """
+    monkeypatch.setattr(config, 'PLANIFICADOR_MERCADO_ACTIVO', False)
+    monkeypatch.setattr(config, 'MOTOR_POR_EVENTOS_ACTIVO', False)
     # Crear la instancia de la aplicación usando tu fábrica.
     app = crear_app()
 
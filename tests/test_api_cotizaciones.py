@@ -0,0 +1,98 @@
+"""
+Pruebas Unitarias para la Ingesta Paginada de Cotizaciones de CoinGecko.
+"""
+
+import requests
+
+from backend.servicios import api_cotizaciones, proveedor_mercado
+import config
+
+
+class _Respuesta:
+    status_code = 200
+
+    def __init__(self, datos):
+        self._datos = datos
+
+    def json(self):
+        return self._datos
+
+
+class _CoinGeckoFalso:
+    """Cliente falso: devuelve la página pedida o lanza un error si está en `fallidas`."""
+
+    def __init__(self, paginas):
+        self.paginas = paginas
+        self.fallidas = set()
+
+    def get(self, url, params=None, peso=1):
+        if params["page"] in self.fallidas:
+            raise requests.exceptions.ConnectionError("sin conexión")
+        return _Respuesta(self.paginas[params["page"]])
+
+
+def _moneda(ticker, market_cap, precio="1"):
+    return {"symbol": ticker.lower(), "name": ticker, "current_price": precio, "market_cap": market_cap}
+
+
+def _preparar(monkeypatch, paginas):
+    cliente = _CoinGeckoFalso(paginas)
+    monkeypatch.setattr(proveedor_mercado, "obtener_cliente", lambda nombre: cliente)
+    monkeypatch.setattr(api_cotizaciones, "_ultimas_paginas", {})
+    monkeypatch.setattr(api_cotizaciones, "_siguiente_pagina", 1)
+    monkeypatch.setattr(config, "CANTIDAD_CRIPTOMONEDAS", 4)
+    monkeypatch.setattr(config, "POR_PAGINA_COINGECKO", 2)
+    return cliente
+
+
+def test_paginas_se_combinan_por_capitalizacion_sin_repetidos(test_environment, monkeypatch):
+    _preparar(monkeypatch, {
+        1: [_moneda("BTC", 1000), _moneda("ETH", 500)],
+        # Entre una página y otra, SOL superó a ETH, que reaparece en la página 2.
+        2: [_moneda("ETH", 500), _moneda("SOL", 600)],
+    })
+
+    resultado = api_cotizaciones.obtener_datos_criptos_coingecko()
+
+    assert [(c["id"], c["ticker"]) for c in resultado] == [(1, "BTC"), (2, "SOL"), (3, "ETH")]
+
+
+def test_pagina_fallida_conserva_su_ultima_version_valida(test_environment, monkeypatch):
+    cliente = _preparar(monkeypatch, {
+        1: [_moneda("BTC", 1000), _moneda("ETH", 500)],
+        2: [_moneda("SOL", 100), _moneda("XRP", 50)],
+    })
+    api_cotizaciones.obtener_datos_criptos_coingecko()
+
+    cliente.paginas[1] = [_moneda("BTC", 1100, precio="2"), _moneda("ETH", 500)]
+    cliente.fallidas = {2}
+    resultado = api_cotizaciones.obtener_datos_criptos_coingecko()
+
+    assert [c["ticker"] for c in resultado] == ["BTC", "ETH", "SOL", "XRP"]
+    assert resultado[0]["precio_usd"] == "2"
+
+    # Si no llega ninguna página nueva, no hay actualización.
+    cliente.fallidas = {1, 2}
+    assert api_cotizaciones.obtener_datos_criptos_coingecko() == []
+
+
+def test_paginas_se_piden_por_turnos_dentro_del_limite_de_tasa(test_environment, monkeypatch):
+    cliente = _preparar(monkeypatch, {
+        1: [_moneda("BTC", 1000), _moneda("ETH", 500)],
+        2: [_moneda("SOL", 100), _moneda("XRP", 50)],
+        3: [_moneda("ADA", 10), _moneda("DOT", 5)],
+    })
+    monkeypatch.setattr(config, "CANTIDAD_CRIPTOMONEDAS", 6)
+    # 8 peticiones por minuto con una actualización cada 15 segundos: 2 páginas por actualización.
+    monkeypatch.setattr(config, "LIMITE_PETICIONES_COINGECKO_MINUTO", 8)
+    monkeypatch.setattr(config, "INTERVALO_ACTUALIZACION_MERCADO", 15)
+    pedidas = []
+    get = cliente.get
+    monkeypatch.setattr(cliente, "get", lambda url, params=None, peso=1: pedidas.append(params["page"]) or get(url, params))
+
+    primera = api_cotizaciones.obtener_datos_criptos_coingecko()
+    segunda = api_cotizaciones.obtener_datos_criptos_coingecko()
+
+    assert sorted(pedidas) == [1, 1, 2, 3]
+    assert [c["ticker"] for c in primera] == ["BTC", "ETH", "SOL", "XRP"]
+    assert [c["ticker"] for c in segunda] == ["BTC", "ETH", "SOL", "XRP", "ADA", "DOT"]
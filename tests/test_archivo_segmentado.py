@@ -0,0 +1,77 @@
+"""
+Pruebas Unitarias para la Rotación Mensual del Historial en Segmentos.
+"""
+
+import os
+
+from backend.acceso_datos import almacen_jsonl
+from backend.acceso_datos.archivo_segmentado import ArchivoSegmentado
+from backend.acceso_datos.repositorio_json import RepositorioJSON
+
+
+def _operacion(timestamp, tipo="COMPRA"):
+    return {"timestamp": timestamp, "tipo": tipo}
+
+
+def _cargar_meses(repositorio, ruta, meses, por_mes=3):
+    for mes in meses:
+        for dia in range(1, por_mes + 1):
+            repositorio.agregar_operacion(_operacion(f"{mes}-{dia:02d}T10:00:00"), ruta)
+
+
+def test_cambio_de_mes_traslada_los_meses_anteriores_a_segmentos(test_environment, tmp_path):
+    ruta = str(tmp_path / "historial.jsonl")
+    repositorio = RepositorioJSON()
+
+    _cargar_meses(repositorio, ruta, ["2025-01", "2025-02", "2025-03"])
+
+    # El archivo activo solo conserva el mes en curso.
+    activos = almacen_jsonl.leer_ultimos(ruta)
+    assert {op["timestamp"][:7] for op in activos} == {"2025-03"}
+
+    # El segmento más antiguo se comprime; el más reciente queda sin comprimir.
+    segmentos = ArchivoSegmentado(ruta).segmentos()
+    assert [(s["mes"], s["comprimido"], s["cantidad"]) for s in segmentos] == [
+        ("2025-01", True, 3),
+        ("2025-02", False, 3),
+    ]
+    assert os.path.exists(str(tmp_path / "historial.segmentos" / "2025-01.jsonl.gz"))
+    assert not os.path.exists(str(tmp_path / "historial.segmentos" / "2025-01.jsonl"))
+
+
+def test_paginacion_recorre_el_archivo_activo_y_los_segmentos(test_environment, tmp_path):
+    ruta = str(tmp_path / "historial.jsonl")
+    repositorio = RepositorioJSON()
+    _cargar_meses(repositorio, ruta, ["2025-01", "2025-02", "2025-03"])
+
+    completo = repositorio.leer_historial(ruta)
+    assert [op["id"] for op in completo] == list(range(9, 0, -1))
+
+    pagina = repositorio.leer_historial(ruta, limite=4, desplazamiento=2)
+    assert [op["id"] for op in pagina] == [7, 6, 5, 4]
+
+    ultima = repositorio.leer_historial(ruta, limite=4, desplazamiento=7)
+    assert [op["id"] for op in ultima] == [2, 1]
+
+
+def test_consulta_por_rango_solo_devuelve_el_intervalo(test_environment, tmp_path):
+    ruta = str(tmp_path / "historial.jsonl")
+    repositorio = RepositorioJSON()
+    _cargar_meses(repositorio, ruta, ["2025-01", "2025-02", "2025-03"])
+
+    febrero = repositorio.leer_historial_rango("2025-02-01", "2025-03-01", ruta)
+    assert [op["timestamp"][:10] for op in febrero] == ["2025-02-03", "2025-02-02", "2025-02-01"]
+
+    desde_marzo_2 = repositorio.leer_historial_rango("2025-03-02", None, ruta)
+    assert [op["id"] for op in desde_marzo_2] == [9, 8]
+
+
+def test_rotacion_repetida_no_duplica_registros(tmp_path):
+    ruta = str(tmp_path / "historial.jsonl")
+    archivo = ArchivoSegmentado(ruta)
+    registros = [{"id": i, "timestamp": f"2025-01-0{i}T00:00:00"} for i in range(1, 4)]
+
+    assert archivo.archivar(registros) == 3
+    # Simula una rotación interrumpida antes de recortar el archivo activo.
+    assert archivo.archivar(registros) == 0
+    assert archivo.cantidad_total() == 3
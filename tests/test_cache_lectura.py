@@ -0,0 +1,55 @@
+"""
+Pruebas Unitarias para el Caché de Lecturas Validado por Metadatos.
+"""
+
+import os
+import time
+
+from backend.acceso_datos.cache_lectura import CacheLectura
+from backend.acceso_datos.escritura_atomica import escribir_atomico
+
+
+def _envejecer(ruta):
+    """Lleva la fecha de modificación al pasado para que la entrada sea confiable."""
+    antes = time.time() - 10
+    os.utime(ruta, (antes, antes))
+
+
+def test_reutiliza_el_resultado_mientras_el_archivo_no_cambia(tmp_path):
+    ruta = str(tmp_path / "billetera.json")
+    escribir_atomico(ruta, b"{}")
+    _envejecer(ruta)
+    cache = CacheLectura()
+    lecturas = []
+
+    def cargar():
+        lecturas.append(1)
+        return {"USDT": {"saldos": {"disponible": "1"}}}
+
+    primero = cache.obtener(ruta, cargar)
+    primero["USDT"]["saldos"]["disponible"] = "modificado"
+    segundo = cache.obtener(ruta, cargar)
+
+    assert len(lecturas) == 1
+    assert segundo["USDT"]["saldos"]["disponible"] == "1"
+
+
+def test_vuelve_a_leer_cuando_cambia_la_firma(tmp_path):
+    ruta = str(tmp_path / "ordenes.json")
+    escribir_atomico(ruta, b"[]")
+    _envejecer(ruta)
+    cache = CacheLectura()
+
+    assert cache.obtener(ruta, lambda: "anterior") == "anterior"
+    escribir_atomico(ruta, b"[1]")
+    assert cache.obtener(ruta, lambda: "nuevo") == "nuevo"
+
+
+def test_no_confia_en_archivos_recien_modificados(tmp_path):
+    """Un archivo que acaba de cambiar puede volver a cambiar sin alterar su firma."""
+    ruta = str(tmp_path / "comisiones.json")
+    escribir_atomico(ruta, b"[]")
+    cache = CacheLectura()
+
+    assert cache.obtener(ruta, lambda: "primera") == "primera"
+    assert cache.obtener(ruta, lambda: "segunda") == "segunda"
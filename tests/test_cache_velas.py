@@ -0,0 +1,93 @@
+"""
+Pruebas Unitarias para la Caché de Velas.
+"""
+
+from backend.servicios.cache_velas import CacheVelas
+from backend.servicios.velas_columnares import SerieVelas
+import config
+
+
+def _velas(desde: int, cantidad: int, paso: int = 60, cierre: float = 1.0):
+    return SerieVelas.desde_binance(
+        [(desde + i * paso) * 1000, "1", "1", "1", cierre, "1"] for i in range(cantidad)
+    )
+
+
+class _BinanceFalso:
+    def __init__(self):
+        self.consultas = []
+        self.respuesta = []
+
+    def __call__(self, simbolo, intervalo, desde_ms):
+        self.consultas.append((simbolo, intervalo, desde_ms))
+        return self.respuesta
+
+
+def test_serie_vigente_se_sirve_sin_consultar_y_al_vencer_se_pide_solo_la_cola():
+    reloj = [130.0]
+    binance = _BinanceFalso()
+    cache = CacheVelas(binance, max_series=4, reloj=lambda: reloj[0])
+    binance.respuesta = _velas(0, 3)  # velas de 0, 60 y 120 (en curso hasta 180)
+
+    cache.obtener("btc", "1m")
+    reloj[0] = 170.0
+    cache.obtener("BTC", "1m")
+    assert binance.consultas == [("BTC", "1m", None)]
+
+    # Al cerrar la vela de 120, se pide desde ella: se reemplaza y se agrega la de 180.
+    reloj[0] = 185.0
+    binance.respuesta = _velas(120, 2, cierre=2.0)
+    velas = cache.obtener("BTC", "1m")
+
+    assert binance.consultas[-1] == ("BTC", "1m", 120_000)
+    assert list(velas.tiempos) == [0, 60, 120, 180]
+    assert velas.cierres[2] == 2.0
+
+
+def test_cola_se_recorta_y_un_fallo_devuelve_la_ultima_serie(monkeypatch):
+    monkeypatch.setattr(config, "CANTIDAD_VELAS", 3)
+    reloj = [130.0]
+    binance = _BinanceFalso()
+    cache = CacheVelas(binance, max_series=4, reloj=lambda: reloj[0])
+    binance.respuesta = _velas(0, 3)
+    cache.obtener("BTC", "1m")
+
+    reloj[0] = 245.0
+    binance.respuesta = _velas(120, 3)
+    assert list(cache.obtener("BTC", "1m").tiempos) == [120, 180, 240]
+
+    reloj[0] = 1000.0
+    binance.respuesta = None
+    assert list(cache.obtener("BTC", "1m").tiempos) == [120, 180, 240]
+
+
+def test_se_descarta_la_serie_usada_menos_recientemente():
+    binance = _BinanceFalso()
+    binance.respuesta = _velas(0, 1)
+    cache = CacheVelas(binance, max_series=2, reloj=lambda: 10.0)
+
+    cache.obtener("BTC", "1m")
+    cache.obtener("ETH", "1m")
+    cache.obtener("BTC", "1m")  # BTC pasa a ser la más reciente.
+    cache.obtener("SOL", "1m")  # Descarta ETH.
+    cache.obtener("BTC", "1m")
+    cache.obtener("ETH", "1m")
+
+    assert [c[0] for c in binance.consultas] == ["BTC", "ETH", "SOL", "ETH"]
+
+
+def test_intervalo_mayor_se_remuestrea_desde_una_serie_guardada(monkeypatch):
+    monkeypatch.setattr(config, "CANTIDAD_VELAS", 2)
+    binance = _BinanceFalso()
+    # 15m: 9 velas desde las 00:00 (la última, de las 02:00, en curso).
+    binance.respuesta = _velas(0, 9, paso=900)
+    cache = CacheVelas(binance, max_series=4, reloj=lambda: 2 * 3600 + 60.0)
+    cache.obtener("BTC", "15m")
+
+    horas = cache.obtener("BTC", "1h")
+
+    assert len(binance.consultas) == 1
+    assert list(horas.tiempos) == [3600, 7200]
+    # Si la serie base no alcanza, se consulta Binance.
+    cache.obtener("BTC", "4h")
+    assert binance.consultas[-1] == ("BTC", "4h", None)
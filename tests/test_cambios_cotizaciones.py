@@ -0,0 +1,77 @@
+"""
+Pruebas Unitarias para los Conjuntos de Cambios de Cotizaciones.
+"""
+
+from decimal import Decimal
+
+from backend.acceso_datos.datos_cotizaciones import (
+    aplicar_precios,
+    guardar_datos_cotizaciones,
+    obtener_instantanea_precios,
+    suscribir_cambios_cotizaciones,
+)
+from backend.servicios import presentacion_datos
+from backend.servicios.presentacion_datos import obtener_cotizaciones_formateadas
+
+
+def _cotizaciones(precio_btc="50000"):
+    return [
+        {"ticker": "BTC", "nombre": "Bitcoin", "precio_usd": precio_btc},
+        {"ticker": "ETH", "nombre": "Ethereum", "precio_usd": "3000"},
+    ]
+
+
+def test_guardar_emite_solo_los_tickers_cambiados(test_environment):
+    recibidos = []
+    desuscribir = suscribir_cambios_cotizaciones(recibidos.append)
+    try:
+        primero = guardar_datos_cotizaciones(_cotizaciones())
+        eth_anterior = obtener_instantanea_precios().cotizaciones["ETH"]
+
+        datos = _cotizaciones("51000")[:1] + [{"ticker": "sol", "precio_usd": "150"}]
+        segundo = guardar_datos_cotizaciones(datos)
+        tercero = guardar_datos_cotizaciones(datos)
+    finally:
+        desuscribir()
+
+    assert set(primero.cambios) == {"BTC", "ETH"} and primero.version_anterior is None
+    assert segundo.version_anterior == primero.version
+    assert segundo.cambios == {"BTC": {"precio_usd": "51000"}, "SOL": {"ticker": "sol", "precio_usd": "150"}}
+    assert segundo.eliminados == frozenset({"ETH"})
+    # Sin cambios no se publica una versión nueva ni se notifica.
+    assert not tercero and tercero.version == segundo.version
+    assert recibidos == [primero, segundo]
+    assert obtener_instantanea_precios().precio("BTC") == Decimal("51000")
+    assert eth_anterior["precio_usd"] == "3000"
+
+
+def test_cotizaciones_sin_cambios_se_comparten_entre_instantaneas(test_environment):
+    guardar_datos_cotizaciones(_cotizaciones())
+    anterior = obtener_instantanea_precios()
+
+    conjunto = aplicar_precios({"btc": Decimal("52000"), "ETH": Decimal("3000")})
+    actual = obtener_instantanea_precios()
+
+    assert conjunto.cambios == {"BTC": {"precio_usd": "52000"}}
+    assert actual.cotizaciones["ETH"] is anterior.cotizaciones["ETH"]
+    assert actual.cotizaciones["BTC"]["nombre"] == "Bitcoin" and not actual.persistida
+    assert not aplicar_precios({"BTC": Decimal("52000")})
+    assert obtener_instantanea_precios() is actual
+
+
+def test_presentacion_solo_formatea_los_tickers_cambiados(test_environment, monkeypatch):
+    formateados = []
+    formatear = presentacion_datos._formatear_cotizacion
+    monkeypatch.setattr(
+        presentacion_datos, "_formatear_cotizacion", lambda cripto: formateados.append(cripto["ticker"]) or formatear(cripto)
+    )
+    guardar_datos_cotizaciones(_cotizaciones())
+
+    primera = obtener_cotizaciones_formateadas()
+    assert obtener_cotizaciones_formateadas() == primera
+    aplicar_precios({"BTC": Decimal("60000")})
+    segunda = obtener_cotizaciones_formateadas()
+
+    assert formateados == ["BTC", "ETH", "BTC"]
+    assert [c["precio_usd_formatted"] for c in segunda] == ["$60,000", "$3,000"]
+    assert segunda[1] is primera[1]
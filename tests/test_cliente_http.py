@@ -0,0 +1,100 @@
+"""
+Pruebas Unitarias para el Cliente HTTP de las APIs Externas, contra un servidor local.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from backend.servicios.cliente_http import ClienteUpstream, LimitadorTokens
+
+
+@pytest.fixture
+def servidor_stub():
+    """Servidor HTTP local que responde, en orden, las respuestas encoladas en `respuestas`."""
+    estado = {"respuestas": [], "peticiones": 0, "conexiones": set()}
+
+    class Manejador(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            estado["peticiones"] += 1
+            estado["conexiones"].add(self.client_address)
+            codigo, cabeceras, cuerpo = estado["respuestas"].pop(0) if estado["respuestas"] else (200, {}, [])
+            datos = json.dumps(cuerpo).encode()
+            self.send_response(codigo)
+            for nombre, valor in {**cabeceras, "Content-Length": str(len(datos))}.items():
+                self.send_header(nombre, valor)
+            self.end_headers()
+            self.wfile.write(datos)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+    hilo = threading.Thread(target=servidor.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    hilo.start()
+    estado["url"] = f"http://127.0.0.1:{servidor.server_address[1]}/api"
+    yield estado
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _cliente(**kwargs) -> ClienteUpstream:
+    esperas = []
+    cliente = ClienteUpstream("stub", LimitadorTokens(100, 100), dormir=esperas.append, **kwargs)
+    cliente.esperas = esperas
+    return cliente
+
+
+def test_reintenta_errores_transitorios_y_reutiliza_la_conexion(servidor_stub):
+    servidor_stub["respuestas"] = [(503, {}, {}), (429, {"Retry-After": "1"}, {}), (200, {}, [1, 2])]
+    cliente = _cliente(reintentos=3)
+
+    respuesta = cliente.get(servidor_stub["url"])
+
+    assert respuesta.json() == [1, 2]
+    assert servidor_stub["peticiones"] == 3
+    # La segunda espera respeta `Retry-After`.
+    assert cliente.esperas[1] == 1.0
+    # Keep-alive: las tres peticiones usaron la misma conexión.
+    assert len(servidor_stub["conexiones"]) == 1
+
+
+def test_agota_los_reintentos_y_propaga_el_error(servidor_stub):
+    servidor_stub["respuestas"] = [(500, {}, {})] * 3
+    cliente = _cliente(reintentos=2)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        cliente.get(servidor_stub["url"])
+    assert servidor_stub["peticiones"] == 3
+    assert all(0 <= espera <= cliente.backoff_max for espera in cliente.esperas)
+
+
+def test_retry_after_largo_se_respeta_hasta_el_maximo(servidor_stub):
+    servidor_stub["respuestas"] = [(429, {"Retry-After": "30"}, {}), (200, {}, []), (503, {"Retry-After": "120"}, {})]
+    cliente = _cliente(reintentos=3, backoff_max=8, retry_after_max=60)
+
+    cliente.get(servidor_stub["url"])
+    assert cliente.esperas == [30.0]
+
+    # Si el servidor pide más que el máximo, no se reintenta antes de tiempo.
+    with pytest.raises(requests.exceptions.HTTPError):
+        cliente.get(servidor_stub["url"])
+    assert servidor_stub["peticiones"] == 3 and cliente.esperas == [30.0]
+
+
+def test_cabecera_de_peso_usado_ajusta_el_limitador(servidor_stub):
+    servidor_stub["respuestas"] = [(200, {"X-MBX-USED-WEIGHT-1M": "95"}, [])]
+    reloj = [0.0]
+    limitador = LimitadorTokens(100, 10, reloj=lambda: reloj[0], dormir=lambda s: reloj.__setitem__(0, reloj[0] + s))
+    cliente = ClienteUpstream("stub", limitador, limite_peso=100)
+
+    cliente.get(servidor_stub["url"])
+
+    # El servidor informa que solo quedan 5 de peso: una petición de peso 10
+    # espera medio segundo (5 tokens a 10 por segundo) en lugar de recibir un 429.
+    assert limitador.adquirir(10) == pytest.approx(0.5)
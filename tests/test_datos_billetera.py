@@ -12,6 +12,7 @@ import pytest
 from decimal import Decimal
 
 from backend.acceso_datos.datos_billetera import cargar_billetera, guardar_billetera, _crear_billetera_inicial
+from backend.acceso_datos.repositorio import obtener_repositorio
 import config
 
 def test_cargar_billetera_crea_una_nueva_si_no_existe(test_environment):
@@ -90,6 +91,30 @@ def test_guardar_y_cargar_billetera_ciclo_completo(test_environment):
     assert billetera_cargada["BTC"]["saldos"]["disponible"] == Decimal("1.23456789")
     assert billetera_cargada["BTC"]["saldos"]["reservado"] == Decimal("0.50000000")
 
+@pytest.mark.parametrize("unidades_atomicas", [False, True])
+@pytest.mark.parametrize("driver", ["json", "sqlite", "memoria"])
+def test_billetera_ida_y_vuelta_en_cada_driver(test_environment, tmp_path, monkeypatch, driver, unidades_atomicas):
+    """Los saldos se recuperan intactos en cualquier driver y formato del libro."""
+    monkeypatch.setattr(config, "LIBRO_UNIDADES_ATOMICAS", unidades_atomicas)
+    if driver == "sqlite":
+        monkeypatch.setattr(config, "BACKEND_ALMACENAMIENTO", "sqlite")
+        monkeypatch.setattr(config, "SQLITE_PATH", str(tmp_path / "exchange.sqlite3"))
+    elif driver == "memoria":
+        monkeypatch.setattr(config, "ESTADO_EN_MEMORIA", True)
+        monkeypatch.setattr(config, "INTERVALO_VOLCADO_ESTADO_S", 60)
+    billetera = {
+        "USDT": {"nombre": "Tether", "saldos": {"disponible": Decimal("10000"), "reservado": Decimal("0.5")}},
+        "BTC": {"nombre": "Bitcoin", "saldos": {"disponible": Decimal("1.23456789"), "reservado": Decimal("0")}},
+    }
+
+    guardar_billetera(billetera)
+    if driver == "memoria":
+        # Vuelca ahora: el almacén se comparte entre pruebas y no debe quedar sucio.
+        obtener_repositorio().volcar()
+    cargada = cargar_billetera()
+
+    assert {t: d["saldos"] for t, d in cargada.items()} == {t: d["saldos"] for t, d in billetera.items()}
+
 # --- Función de ayuda para los tests ---
 
 def if_exists_delete(filepath):
@@ -25,7 +25,9 @@ from pathlib import Path
 from backend.acceso_datos.datos_cotizaciones import (
     cargar_datos_cotizaciones,
     guardar_datos_cotizaciones,
+    obtener_instantanea_precios,
     obtener_precio,
+    obtener_precio_versionado,
     recargar_cache_precios
 )
 
@@ -129,4 +131,38 @@ def test_guardar_datos_cotizaciones_debe_actualizar_cache_de_precios_cuando_se_g
     # 3. Verificación:
     # La función `guardar_datos_cotizaciones` debe haber recargado el caché global.
     # Ahora, `obtener_precio` debe devolver el nuevo valor.
-    assert obtener_precio('TESTCOIN') == Decimal("9999")
\ No newline at end of file
+    assert obtener_precio('TESTCOIN') == Decimal("9999")
+
+def test_instantanea_de_precios_es_inmutable_y_versionada(test_environment):
+    """Cada publicación crea una instantánea nueva; las anteriores no cambian."""
+    guardar_datos_cotizaciones([{'ticker': 'BTC', 'precio_usd': "100"}])
+    anterior = obtener_instantanea_precios()
+
+    guardar_datos_cotizaciones([{'ticker': 'BTC', 'precio_usd': "200"}])
+    precio, version = obtener_precio_versionado('btc')
+
+    assert precio == Decimal("200")
+    assert version > anterior.version
+    assert anterior.precio('BTC') == Decimal("100")
+    with pytest.raises(AttributeError):
+        anterior.version = 0
+
+
+def test_precio_con_ruta_no_recarga_si_el_archivo_no_cambio(test_environment, tmp_path, monkeypatch):
+    """Con `ruta_archivo`, el archivo solo se vuelve a leer cuando cambia."""
+    import time
+    from backend.acceso_datos import cache_lectura
+
+    ruta = tmp_path / "cotizaciones_aisladas.json"
+    ruta.write_text(json.dumps([{'ticker': 'ETH', 'precio_usd': "3000"}]))
+    # Evita el margen de seguridad del caché para archivos recién modificados.
+    monkeypatch.setattr(cache_lectura, "MARGEN_MODIFICACION_NS", 0)
+    time.sleep(0.01)
+
+    primera = obtener_instantanea_precios(str(ruta))
+    segunda = obtener_instantanea_precios(str(ruta))
+    assert segunda is primera
+    assert obtener_precio('ETH', ruta_archivo=str(ruta)) == Decimal("3000")
+
+    ruta.write_text(json.dumps([{'ticker': 'ETH', 'precio_usd': "3100.5"}]))
+    assert obtener_precio('ETH', ruta_archivo=str(ruta)) == Decimal("3100.5")
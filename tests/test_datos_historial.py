@@ -0,0 +1,72 @@
+"""
+Pruebas Unitarias para el Módulo de Acceso a Datos del Historial.
+
+Verifica el almacenamiento de solo-anexado en formato JSON Lines, la lectura
+paginada desde el final del archivo y la migración del formato JSON anterior.
+"""
+
+import json
+import os
+from decimal import Decimal
+
+from backend.acceso_datos.datos_historial import cargar_historial, guardar_en_historial, migrar_historial_json
+
+
+def _guardar_operacion(ruta, valor_usd):
+    guardar_en_historial("compra", "USDT", Decimal(valor_usd), "BTC", Decimal("0.1"), Decimal(valor_usd), ruta_archivo=ruta)
+
+
+def test_guardar_en_historial_anexa_una_linea_por_operacion(tmp_path):
+    """Cada operación se escribe como una línea JSON al final del archivo."""
+    ruta = str(tmp_path / "historial.jsonl")
+
+    _guardar_operacion(ruta, "100")
+    _guardar_operacion(ruta, "200")
+
+    with open(ruta, "r", encoding="utf-8") as f:
+        lineas = f.read().splitlines()
+    assert len(lineas) == 2
+    assert json.loads(lineas[0])["id"] == 1
+    assert json.loads(lineas[1])["valor_usd"] == "200.0000"
+
+
+def test_cargar_historial_devuelve_mas_recientes_primero_y_pagina(tmp_path):
+    """La lectura inversa devuelve las operaciones recientes y respeta límite y desplazamiento."""
+    ruta = str(tmp_path / "historial.jsonl")
+    for valor in range(1, 6):
+        _guardar_operacion(ruta, str(valor))
+
+    completo = cargar_historial(ruta)
+    pagina = cargar_historial(ruta, limite=2, desplazamiento=1)
+
+    assert [op["id"] for op in completo] == [5, 4, 3, 2, 1]
+    assert [op["id"] for op in pagina] == [4, 3]
+
+
+def test_cargar_historial_ignora_linea_truncada(tmp_path):
+    """Una última línea incompleta (escritura interrumpida) no invalida el historial."""
+    ruta = str(tmp_path / "historial.jsonl")
+    _guardar_operacion(ruta, "100")
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write('{"id": 2, "tipo": "comp')
+
+    assert [op["id"] for op in cargar_historial(ruta)] == [1]
+
+    _guardar_operacion(ruta, "300")
+    assert [op["id"] for op in cargar_historial(ruta)] == [2, 1]
+
+
+def test_migrar_historial_json_convierte_formato_anterior(tmp_path):
+    """Un historial.json antiguo se convierte a JSONL conservando el orden y se renombra."""
+    ruta_anterior = tmp_path / "historial.json"
+    ruta_anterior.write_text(json.dumps([{"id": 2, "tipo": "venta"}, {"id": 1, "tipo": "compra"}]), encoding="utf-8")
+
+    historial = cargar_historial(str(ruta_anterior))
+
+    assert [op["id"] for op in historial] == [2, 1]
+    assert not ruta_anterior.exists()
+    assert os.path.exists(str(ruta_anterior) + ".migrado")
+    assert migrar_historial_json(str(ruta_anterior)) == 0
+
+    _guardar_operacion(str(ruta_anterior), "50")
+    assert cargar_historial(str(tmp_path / "historial.jsonl"))[0]["id"] == 3
@@ -3,7 +3,7 @@ Pruebas Unitarias para el Módulo de Acceso a Datos de Órdenes.
 """
 
 import json
-from backend.acceso_datos.datos_ordenes import cargar_ordenes_pendientes, guardar_ordenes_pendientes
+from backend.acceso_datos.datos_ordenes import cargar_ordenes_pendientes, guardar_ordenes_pendientes, reservar_numeros_orden
 
 def test_cargar_ordenes_pendientes_devuelve_lista_vacia_si_archivo_corrupto(test_environment):
     """
@@ -42,4 +42,15 @@ def test_guardar_ordenes_pendientes_sobrescribe_correctamente(test_environment):
     ordenes_cargadas = cargar_ordenes_pendientes(ruta_archivo=ruta_ordenes)
     assert len(ordenes_cargadas) == 2
     assert ordenes_cargadas[0]['id_orden'] == '2'
-    assert ordenes_cargadas == ordenes_nuevas
\ No newline at end of file
+    assert ordenes_cargadas == ordenes_nuevas
+
+
+def test_numeros_de_orden_continuan_despues_de_los_almacenados(test_environment):
+    """Sin archivo de secuencia, la numeración sigue al mayor sufijo numérico existente."""
+    guardar_ordenes_pendientes([
+        {"id_orden": "btc_usdt_compra_41"},
+        {"id_orden": "eth_usdt_venta_7"},
+        {"id_orden": "btc_usdt_compra_1700000000.123456"},
+    ])
+
+    assert reservar_numeros_orden(2) == range(42, 44)
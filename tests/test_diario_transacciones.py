@@ -0,0 +1,87 @@
+"""
+Pruebas Unitarias para el Diario de Transacciones del Driver JSON.
+"""
+
+import json
+import os
+from decimal import Decimal
+
+import pytest
+
+from backend.acceso_datos.datos_billetera import cargar_billetera, guardar_billetera
+from backend.acceso_datos.datos_comisiones import cargar_comisiones, registrar_comision
+from backend.acceso_datos.datos_historial import cargar_historial, guardar_en_historial
+from backend.acceso_datos.diario_transacciones import DiarioTransacciones
+from backend.acceso_datos.repositorio import obtener_repositorio, transaccion
+
+
+def _ruta_diario(test_environment):
+    return os.path.join(os.path.dirname(test_environment["billetera"]), "diario_transacciones.jsonl")
+
+
+def _ejecutar_fill():
+    """Simula la ejecución de una orden: comisión, historial y billetera."""
+    billetera = cargar_billetera()
+    billetera["USDT"]["saldos"]["disponible"] -= Decimal("100")
+    registrar_comision("USDT", Decimal("0.1"), Decimal("0.1"))
+    guardar_en_historial("COMPRA", "USDT", Decimal("99.9"), "BTC", Decimal("0.001"), Decimal("99.9"))
+    guardar_billetera(billetera)
+
+
+def test_transaccion_confirma_una_entrada_y_aplica_los_archivos_de_forma_diferida(billetera_con_fondos_suficientes):
+    test_environment = billetera_con_fondos_suficientes
+    with transaccion():
+        _ejecutar_fill()
+
+    # Una única línea en el diario; los archivos de datos aún no se tocaron.
+    with open(_ruta_diario(test_environment)) as f:
+        assert len(f.readlines()) == 1
+    with open(test_environment["comisiones"]) as f:
+        assert json.load(f) == {}
+
+    # Las lecturas ya reflejan la transacción confirmada.
+    assert cargar_billetera()["USDT"]["saldos"]["disponible"] == Decimal("9900")
+    assert len(cargar_comisiones()) == 1
+    assert cargar_historial()[0]["id"] == 1
+
+    obtener_repositorio().volcar()
+
+    with open(test_environment["comisiones"]) as f:
+        assert json.load(f)[0]["ticker"] == "USDT"
+    with open(test_environment["billetera"]) as f:
+        assert Decimal(json.load(f)["USDT"]["saldos"]["disponible"]) == Decimal("9900")
+    assert os.path.getsize(_ruta_diario(test_environment)) == 0
+
+
+def test_transaccion_con_error_no_confirma_ninguna_escritura(test_environment):
+    with pytest.raises(RuntimeError):
+        with transaccion():
+            registrar_comision("USDT", Decimal("0.1"), Decimal("0.1"))
+            raise RuntimeError("fallo a mitad de la ejecución")
+
+    assert cargar_comisiones() == []
+    assert not os.path.exists(_ruta_diario(test_environment)) or os.path.getsize(_ruta_diario(test_environment)) == 0
+
+
+def test_recuperar_reaplica_entradas_sin_duplicar_registros(test_environment):
+    """Una entrada ya aplicada en parte (ej. caída durante el checkpoint) no duplica el historial."""
+    ruta_historial = test_environment["historial"].replace(".json", ".jsonl")
+    operacion = {"id": 1, "tipo": "COMPRA"}
+    entrada = {"operaciones": [
+        {"accion": "anexar", "ruta": ruta_historial, "registro": operacion},
+        {"accion": "reemplazar", "ruta": test_environment["billetera"], "datos": {"USDT": {"nombre": "Tether", "saldos": {"disponible": "5", "reservado": "0"}}}},
+    ]}
+    with open(ruta_historial, "w") as f:
+        f.write(json.dumps(operacion) + "\n")
+    ruta_diario = _ruta_diario(test_environment)
+    with open(ruta_diario, "w") as f:
+        # La última línea quedó truncada: esa transacción nunca se confirmó.
+        f.write(json.dumps(entrada) + "\n" + '{"operaciones": [')
+
+    diario = DiarioTransacciones(ruta_diario, max_pendientes=32)
+
+    assert not diario.tiene_pendientes()
+    assert len(cargar_historial(ruta_historial)) == 1
+    with open(test_environment["billetera"]) as f:
+        assert json.load(f)["USDT"]["saldos"]["disponible"] == "5"
+    assert os.path.getsize(ruta_diario) == 0
@@ -19,6 +19,7 @@ from decimal import Decimal
 
 from backend.servicios.trading.ejecutar_orden import ejecutar_transaccion
 from backend.acceso_datos.datos_billetera import cargar_billetera, guardar_billetera
+from backend.acceso_datos.datos_historial import cargar_historial
 from config import TASA_COMISION
 
 def test_ejecutar_transaccion_debe_completar_compra_y_actualizar_archivos_cuando_es_orden_de_mercado_valida(test_environment):
@@ -71,9 +72,8 @@ def test_ejecutar_transaccion_debe_completar_compra_y_actualizar_archivos_cuando
     assert detalles['cantidad_comision'] == comision_esperada
     assert detalles['cantidad_destino_final'] == cantidad_destino_esperada
 
-    # 2. Verificar historial.json
-    with open(ruta_historial, 'r') as f:
-        historial = json.load(f)
+    # 2. Verificar el historial (JSON Lines, más recientes primero)
+    historial = cargar_historial(ruta_historial)
     assert len(historial) == 1
     assert historial[0]['tipo'] == 'Compra Mercado'
     assert historial[0]['destino']['ticker'] == 'BTC'
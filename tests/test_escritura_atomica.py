@@ -0,0 +1,111 @@
+"""
+Pruebas Unitarias para las Escrituras Atómicas y la Confirmación Agrupada.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from backend.acceso_datos import escritura_atomica
+from backend.acceso_datos.escritura_atomica import CommitAgrupado, escribir_atomico
+from backend.acceso_datos.datos_billetera import cargar_billetera
+
+
+def test_escribir_atomico_reemplaza_contenido_sin_dejar_temporales(tmp_path):
+    ruta = tmp_path / "billetera.json"
+    ruta.write_text("contenido anterior")
+
+    escribir_atomico(str(ruta), b'{"USDT": {}}')
+
+    assert ruta.read_bytes() == b'{"USDT": {}}'
+    assert os.listdir(tmp_path) == ["billetera.json"]
+
+
+def test_commit_agrupado_confirma_una_sola_vez_las_escrituras_de_la_misma_ventana(tmp_path, monkeypatch):
+    """Las escrituras que llegan mientras se confirma un lote producen una única escritura a disco."""
+    escrituras = []
+    escribir_original = escritura_atomica.escribir_atomico
+
+    def escribir_contando(ruta, contenido):
+        escrituras.append(contenido)
+        if len(escrituras) == 1:
+            # Un disco lento: los demás escritores llegan durante el primer lote.
+            time.sleep(0.2)
+        escribir_original(ruta, contenido)
+
+    monkeypatch.setattr(escritura_atomica, "escribir_atomico", escribir_contando)
+    agrupador = CommitAgrupado(ventana_segundos=0.2)
+    ruta = str(tmp_path / "ordenes.json")
+    barrera = threading.Barrier(5)
+
+    def escribir(i):
+        barrera.wait()
+        agrupador.escribir(ruta, f"[{i}]".encode())
+
+    hilos = [threading.Thread(target=escribir, args=(i,)) for i in range(5)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    # El primer lote sale sin esperar; los escritores que llegaron durante él van juntos en el siguiente.
+    assert len(escrituras) <= 2
+    with open(ruta, "rb") as f:
+        assert f.read() == escrituras[-1]
+
+
+def test_commit_agrupado_no_espera_la_ventana_sin_concurrencia(tmp_path, monkeypatch):
+    esperas = []
+    monkeypatch.setattr(escritura_atomica.time, "sleep", esperas.append)
+    agrupador = CommitAgrupado(ventana_segundos=0.2)
+    ruta = str(tmp_path / "billetera.json")
+
+    for i in range(3):
+        agrupador.escribir(ruta, f"{i}".encode())
+
+    assert esperas == []
+    with open(ruta, "rb") as f:
+        assert f.read() == b"2"
+
+
+def test_commit_agrupado_descarta_el_error_cuando_todos_lo_leyeron(tmp_path, monkeypatch):
+    def escribir_fallando(ruta, contenido):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(escritura_atomica, "escribir_atomico", escribir_fallando)
+    agrupador = CommitAgrupado(ventana_segundos=0.2)
+    barrera = threading.Barrier(3)
+    errores = []
+
+    def escribir(i):
+        barrera.wait()
+        try:
+            agrupador.escribir(str(tmp_path / f"{i}.json"), b"{}")
+        except OSError as e:
+            errores.append(e)
+
+    hilos = [threading.Thread(target=escribir, args=(i,)) for i in range(3)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert len(errores) == 3
+    assert agrupador._errores == {}
+    with pytest.raises(OSError):
+        agrupador.escribir(str(tmp_path / "otro.json"), b"{}")
+    assert agrupador._errores == {}
+
+
+def test_cargar_billetera_corrupta_conserva_respaldo(test_environment):
+    """Antes de reiniciar una billetera corrupta se guarda una copia del archivo dañado."""
+    ruta_billetera = test_environment['billetera']
+    with open(ruta_billetera, 'w') as f:
+        f.write('{"USDT": ')
+
+    cargar_billetera(ruta_archivo=ruta_billetera)
+
+    with open(f"{ruta_billetera}.corrupto") as f:
+        assert f.read() == '{"USDT": '
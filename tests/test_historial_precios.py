@@ -0,0 +1,78 @@
+"""
+Pruebas Unitarias para el Historial de Precios en Buffers Circulares.
+"""
+
+import os
+
+import pytest
+
+from backend.acceso_datos.historial_precios import BufferCircular, HistorialPrecios
+from backend.acceso_datos.instantanea_binaria import TIPO_HISTORIAL_PRECIOS, guardar_instantanea
+
+
+def test_buffer_descarta_las_observaciones_mas_antiguas():
+    buffer = BufferCircular(3)
+    for segundo in range(5):
+        buffer.agregar(float(segundo), 100.0 + segundo, 1.0)
+
+    assert len(buffer) == 3
+    assert [o[0] for o in buffer.ultimas(10)] == [2.0, 3.0, 4.0]
+    assert buffer.ultima() == (4.0, 104.0, 1.0)
+    # Una observación fuera de orden se ignora.
+    buffer.agregar(1.0, 1.0)
+    assert buffer.ultima()[0] == 4.0
+
+    with pytest.raises(ValueError):
+        BufferCircular(0)
+
+
+def test_ventanas_y_variacion_porcentual():
+    buffer = BufferCircular(10)
+    for minuto, precio in enumerate([100, 110, 120, 130, 150]):
+        buffer.agregar(minuto * 60.0, float(precio))
+
+    assert [o[1] for o in buffer.ventana(60.0, 180.0)] == [110.0, 120.0]
+    assert buffer.precio_en(150.0) == 120.0
+    assert buffer.precio_en(-1.0) is None
+    # De 110 (hace 3 minutos) a 150.
+    assert buffer.variacion_porcentual(180) == pytest.approx(36.3636, rel=1e-4)
+    # El historial no cubre una hora completa.
+    assert buffer.variacion_porcentual(3600) is None
+
+
+def test_historial_registra_cotizaciones_y_se_persiste(tmp_path):
+    ruta = str(tmp_path / "historial_precios.bin")
+    historial = HistorialPrecios(capacidad=2, ruta_archivo=ruta)
+    historial.registrar_cotizaciones([{"ticker": "btc", "precio_usd": "50000", "volumen_24h": "10"}], timestamp=1.0)
+    historial.registrar_cotizaciones([{"ticker": "BTC", "precio_usd": "51000"}, {"nombre": "sin ticker"}], timestamp=2.0)
+    historial.guardar()
+
+    recargado = HistorialPrecios(capacidad=1, ruta_archivo=ruta)
+
+    assert historial.buffer("BTC").ultimas(2) == [(1.0, 50000.0, 10.0), (2.0, 51000.0, 0.0)]
+    # Con menos capacidad se conservan solo las observaciones más recientes.
+    assert recargado.buffer("btc").ultimas(5) == [(2.0, 51000.0, 0.0)]
+    assert recargado.buffer("ETH") is None
+
+
+def test_guardado_periodico_respeta_el_intervalo(tmp_path):
+    ruta = str(tmp_path / "historial_precios.bin")
+    reloj = [0.0]
+    historial = HistorialPrecios(capacidad=5, ruta_archivo=ruta, intervalo_guardado=60, reloj=lambda: reloj[0])
+
+    historial.registrar("BTC", 1.0, "50000")
+    historial.guardar_periodico()
+    assert not os.path.exists(ruta)
+
+    reloj[0] = 60.0
+    historial.guardar_periodico()
+    assert HistorialPrecios(capacidad=5, ruta_archivo=ruta).buffer("BTC").ultima() == (1.0, 50000.0, 0.0)
+
+
+def test_historial_con_estructura_invalida_se_inicia_vacio(tmp_path):
+    ruta = str(tmp_path / "historial_precios.bin")
+    guardar_instantanea({"capacidad": 5, "tickers": {"BTC": [[1.0], [2.0]]}}, ruta, TIPO_HISTORIAL_PRECIOS)
+
+    historial = HistorialPrecios(capacidad=5, ruta_archivo=ruta)
+
+    assert historial.buffer("BTC") is None
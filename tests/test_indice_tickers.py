@@ -0,0 +1,42 @@
+"""
+Pruebas Unitarias para el Índice de Metadatos de Tickers.
+"""
+
+from decimal import Decimal
+
+from backend.acceso_datos.datos_cotizaciones import guardar_datos_cotizaciones
+from backend.acceso_datos.indice_tickers import LOGO_FIAT, NOMBRE_FIAT, obtener_indice_tickers
+import config
+
+
+def test_indice_se_reconstruye_solo_al_cambiar_las_cotizaciones(test_environment):
+    guardar_datos_cotizaciones([
+        {"ticker": "BTC", "nombre": "Bitcoin", "logo": "btc.png", "precio_usd": "50000"},
+        {"ticker": "eth", "nombre": "Ethereum", "precio_usd": "3000"},
+    ])
+
+    indice = obtener_indice_tickers()
+    assert obtener_indice_tickers() is indice
+    btc = indice.info("btc")
+    assert (btc.slot, btc.nombre, btc.logo, btc.precio) == (0, "Bitcoin", "btc.png", Decimal("50000"))
+    assert indice.info("ETH").precision == config.PRECISION_CRIPTOMONEDA
+
+    guardar_datos_cotizaciones([{"ticker": "BTC", "nombre": "Bitcoin", "precio_usd": "51000"}])
+    nuevo = obtener_indice_tickers()
+    assert nuevo is not indice
+    assert nuevo.info("BTC").precio == Decimal("51000")
+    assert "ETH" not in nuevo
+
+
+def test_indice_incluye_datos_canonicos_de_la_moneda_fiat(test_environment):
+    guardar_datos_cotizaciones([{"ticker": "BTC", "precio_usd": "50000"}])
+
+    fiat = obtener_indice_tickers().info(config.MONEDA_FIAT_DEFAULT)
+
+    assert (fiat.nombre, fiat.logo) == (NOMBRE_FIAT, LOGO_FIAT)
+    assert fiat.precision == config.PRECISION_USD
+    # Un ticker desconocido recibe datos mínimos en lugar de un error.
+    assert obtener_indice_tickers().info("XYZ").nombre == "XYZ"
+    # Igual que la búsqueda anterior, un ticker vacío no es un error.
+    assert obtener_indice_tickers().info(None).slot == -1
+    assert obtener_indice_tickers().obtener("") is None and None not in obtener_indice_tickers()
@@ -0,0 +1,93 @@
+"""
+Pruebas Unitarias para el Formato Binario de Instantáneas.
+"""
+
+import json
+from decimal import Decimal
+
+import pytest
+
+import config
+from backend.acceso_datos import instantanea_binaria
+from backend.acceso_datos.datos_billetera import cargar_billetera, guardar_billetera
+from backend.acceso_datos.datos_ordenes import agregar_orden_pendiente, cargar_ordenes_pendientes
+from backend.acceso_datos.instantanea_binaria import codificar, decodificar, exportar_json, importar_json, leer_instantanea
+from backend.acceso_datos.repositorio import obtener_repositorio, transaccion
+
+
+def test_codificar_y_decodificar_conserva_el_documento():
+    documento = {
+        "texto": "Ñandú ₿",
+        "entero": -(2 ** 40),
+        "real": 1.25,
+        "nulos": [None, True, False],
+        "anidado": {"lista": [{"a": "x"}, {"a": "x"}], "vacio": {}},
+    }
+
+    tipo, decodificado = decodificar(codificar(documento, instantanea_binaria.TIPO_ORDENES))
+
+    assert tipo == instantanea_binaria.TIPO_ORDENES
+    assert decodificado == documento
+
+
+def test_instantanea_danada_o_de_otra_version_se_rechaza():
+    datos = bytearray(codificar({"a": 1}))
+    datos[-8] ^= 0xFF
+    with pytest.raises(ValueError):
+        decodificar(bytes(datos))
+
+    otra_version = bytearray(codificar({"a": 1}))
+    otra_version[4] = 99
+    with pytest.raises(ValueError):
+        decodificar(bytes(otra_version))
+
+
+def test_driver_json_guarda_billetera_y_ordenes_como_instantaneas(test_environment, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "INSTANTANEAS_BINARIAS", True)
+    monkeypatch.setattr(config, "INSTANTANEA_BILLETERA_PATH", str(tmp_path / "billetera.bin"))
+    monkeypatch.setattr(config, "INSTANTANEA_ORDENES_PATH", str(tmp_path / "ordenes.bin"))
+    with open(config.BILLETERA_PATH, "w") as f:
+        json.dump({"USDT": {"nombre": "Tether", "saldos": {"disponible": "9500.1234", "reservado": "500"}}}, f)
+
+    # Mientras no hay instantánea, se parte del JSON existente.
+    billetera = cargar_billetera()
+    assert billetera["USDT"]["saldos"]["disponible"] == Decimal("9500.1234")
+
+    billetera["ETH"] = {"nombre": "Ethereum", "saldos": {"disponible": Decimal("1.5"), "reservado": Decimal("0")}}
+    with transaccion():
+        guardar_billetera(billetera)
+        agregar_orden_pendiente({"id_orden": "ETH/USDT-1", "estado": "pendiente", "timestamp_ejecucion": None})
+    obtener_repositorio().volcar()
+
+    assert cargar_billetera() == billetera
+    assert cargar_ordenes_pendientes() == [{"id_orden": "ETH/USDT-1", "estado": "pendiente", "timestamp_ejecucion": None}]
+    assert leer_instantanea(config.INSTANTANEA_BILLETERA_PATH, instantanea_binaria.TIPO_BILLETERA)["ETH"]["saldos"]["disponible"] == "1.50000000"
+    assert leer_instantanea(config.INSTANTANEA_ORDENES_PATH, instantanea_binaria.TIPO_ORDENES)[0]["id_orden"] == "ETH/USDT-1"
+    # El JSON original no se modifica.
+    assert "ETH" not in json.loads(open(config.BILLETERA_PATH).read())
+    with pytest.raises(ValueError):
+        leer_instantanea(config.INSTANTANEA_ORDENES_PATH, instantanea_binaria.TIPO_BILLETERA)
+
+
+def test_conversion_desde_y_hacia_json(tmp_path):
+    documento = [{"ticker": "BTC", "precio": "65000.5"}]
+    ruta_json = tmp_path / "origen.json"
+    ruta_json.write_text(json.dumps(documento))
+
+    importar_json(str(ruta_json), str(tmp_path / "datos.bin"))
+    exportar_json(str(tmp_path / "datos.bin"), str(tmp_path / "exportado.json"))
+
+    assert json.loads((tmp_path / "exportado.json").read_text()) == documento
+
+
+def test_importar_json_deduce_el_tipo_del_documento(tmp_path):
+    ruta_json = tmp_path / "billetera.json"
+    ruta_json.write_text(json.dumps({"USDT": {"nombre": "Tether", "saldos": {"disponible": "1", "reservado": "0"}}}))
+
+    importar_json(str(ruta_json), str(tmp_path / "billetera.bin"))
+    importar_json(str(ruta_json), str(tmp_path / "generico.bin"), instantanea_binaria.TIPO_GENERICO)
+
+    assert leer_instantanea(str(tmp_path / "billetera.bin"), instantanea_binaria.TIPO_BILLETERA)["USDT"]["nombre"] == "Tether"
+    assert instantanea_binaria.inferir_tipo([{"id_orden": "1"}]) == instantanea_binaria.TIPO_ORDENES
+    with pytest.raises(ValueError):
+        leer_instantanea(str(tmp_path / "generico.bin"), instantanea_binaria.TIPO_BILLETERA)
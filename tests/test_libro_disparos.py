@@ -0,0 +1,105 @@
+"""
+Pruebas Unitarias para el Libro de Disparos del Motor de Trading.
+"""
+
+import json
+from decimal import Decimal
+
+import pytest
+
+import config
+from backend.acceso_datos.datos_cotizaciones import guardar_datos_cotizaciones
+from backend.acceso_datos.datos_ordenes import agregar_orden_pendiente, cargar_ordenes_pendientes, version_ordenes
+from backend.acceso_datos.repositorio import obtener_repositorio, transaccion
+from backend.servicios.trading import motor
+from backend.servicios.trading.libro_disparos import LibroDisparos, obtener_libro_disparos
+
+
+def _orden(id_orden, accion, tipo, disparo, par="BTC/USDT", estado="pendiente"):
+    return {"id_orden": id_orden, "par": par, "accion": accion, "tipo_orden": tipo, "precio_disparo": disparo, "estado": estado}
+
+
+def test_disparadas_por_lado_y_precio():
+    libro = LibroDisparos([
+        _orden("lc1", "compra", "limit", "40000"),
+        _orden("lc2", "compra", "limit", "39000"),
+        _orden("lv", "venta", "limit", "60000"),
+        _orden("sc", "compra", "stop-limit", "55000"),
+        _orden("sv", "venta", "stop-limit", "45000"),
+        _orden("otra", "compra", "limit", "50000", par="eth/btc"),
+        _orden("cancelada", "compra", "limit", "90000", estado="cancelada"),
+    ])
+
+    assert len(libro) == 6 and "cancelada" not in libro
+    assert libro.tickers() == {"BTC", "USDT", "ETH"}
+    assert libro.disparadas("BTC/USDT", Decimal("50000")) == []
+    assert sorted(libro.disparadas("BTC/USDT", Decimal("40000"))) == ["lc1", "sv"]
+    assert sorted(libro.disparadas("btc/usdt", Decimal("38000"))) == ["lc1", "lc2", "sv"]
+    assert sorted(libro.disparadas("BTC/USDT", Decimal("60000"))) == ["lv", "sc"]
+    assert libro.disparadas("SOL/USDT", Decimal("1")) == []
+
+
+def test_motor_solo_carga_las_ordenes_si_alguna_se_disparo(test_environment, monkeypatch):
+    with open(config.BILLETERA_PATH, "w") as f:
+        json.dump({"USDT": {"saldos": {"disponible": "0", "reservado": "4000"}}}, f)
+    agregar_orden_pendiente({
+        **_orden("1", "compra", "limit", "40000"),
+        "moneda_reservada": "USDT", "cantidad_reservada": "4000", "moneda_origen": "USDT", "moneda_destino": "BTC",
+    })
+    agregar_orden_pendiente(_orden("2", "venta", "limit", "60000"))
+    cargas = []
+    cargar = motor.cargar_billetera
+    monkeypatch.setattr(motor, "cargar_billetera", lambda: cargas.append(1) or cargar())
+
+    guardar_datos_cotizaciones([{"ticker": "BTC", "precio_usd": "50000"}, {"ticker": "USDT", "precio_usd": "1"}])
+    motor.verificar_y_ejecutar_ordenes_pendientes()
+    assert cargas == [] and len(obtener_libro_disparos()) == 2
+
+    guardar_datos_cotizaciones([{"ticker": "BTC", "precio_usd": "39000"}, {"ticker": "USDT", "precio_usd": "1"}])
+    motor.verificar_y_ejecutar_ordenes_pendientes()
+
+    estados = {o["id_orden"]: o["estado"] for o in cargar_ordenes_pendientes()}
+    assert cargas == [1]
+    assert estados == {"1": "ejecutada", "2": "pendiente"}
+    # El libro se reconstruye con las órdenes que siguen pendientes.
+    assert "1" not in obtener_libro_disparos() and "2" in obtener_libro_disparos()
+
+
+@pytest.mark.parametrize("driver", ["json", "sqlite", "memoria"])
+def test_version_cambia_solo_al_confirmar_la_transaccion(test_environment, tmp_path, monkeypatch, driver):
+    if driver == "sqlite":
+        monkeypatch.setattr(config, "BACKEND_ALMACENAMIENTO", "sqlite")
+        monkeypatch.setattr(config, "SQLITE_PATH", str(tmp_path / "exchange.sqlite3"))
+    elif driver == "memoria":
+        monkeypatch.setattr(config, "ESTADO_EN_MEMORIA", True)
+        monkeypatch.setattr(config, "INTERVALO_VOLCADO_ESTADO_S", 60)
+    inicial = version_ordenes()
+
+    with transaccion():
+        agregar_orden_pendiente(_orden("1", "compra", "limit", "40000"))
+        assert version_ordenes() == inicial
+    confirmada = version_ordenes()
+
+    with pytest.raises(RuntimeError):
+        with transaccion():
+            agregar_orden_pendiente(_orden("2", "compra", "limit", "40000"))
+            raise RuntimeError("falla")
+
+    assert confirmada != inicial
+    assert version_ordenes() == confirmada
+    assert "1" in obtener_libro_disparos() and "2" not in obtener_libro_disparos()
+    # El almacén en memoria se comparte entre pruebas y no debe quedar sucio.
+    obtener_repositorio().volcar()
+
+
+def test_stop_limit_disparada_sin_ejecutar_no_reescribe_las_ordenes(test_environment):
+    # Disparo en 50000, pero el límite (49000) queda por debajo del precio.
+    agregar_orden_pendiente({**_orden("1", "compra", "stop-limit", "50000"), "precio_limite": "49000"})
+    guardar_datos_cotizaciones([{"ticker": "BTC", "precio_usd": "51000"}, {"ticker": "USDT", "precio_usd": "1"}])
+    version = version_ordenes()
+
+    resultado = motor.verificar_y_ejecutar_ordenes_pendientes()
+
+    assert (resultado.ordenes_disparadas, resultado.ordenes_ejecutadas) == (1, 0)
+    assert version_ordenes() == version
+    assert cargar_ordenes_pendientes()[0]["estado"] == "pendiente"
@@ -0,0 +1,100 @@
+"""
+Pruebas Unitarias para el Motor de Órdenes por Eventos.
+"""
+
+import json
+import time
+
+import config
+from backend.acceso_datos.datos_cotizaciones import guardar_datos_cotizaciones
+from backend.acceso_datos.datos_ordenes import agregar_orden_pendiente, cargar_ordenes_pendientes
+from backend.servicios.trading.motor_eventos import MotorEventos
+
+
+def _preparar(reservado_usdt="8000"):
+    with open(config.BILLETERA_PATH, "w") as f:
+        json.dump({"USDT": {"saldos": {"disponible": "0", "reservado": reservado_usdt}}}, f)
+    for id_orden, par in (("btc1", "BTC/USDT"), ("btc2", "BTC/USDT"), ("eth1", "ETH/USDT")):
+        agregar_orden_pendiente({
+            "id_orden": id_orden, "par": par, "accion": "compra", "tipo_orden": "limit", "precio_disparo": "100",
+            "estado": "pendiente", "moneda_reservada": "USDT", "cantidad_reservada": "4000",
+            "moneda_origen": "USDT", "moneda_destino": par.split("/")[0],
+        })
+
+
+def _esperar(condicion, segundos=5):
+    limite = time.monotonic() + segundos
+    while not condicion() and time.monotonic() < limite:
+        time.sleep(0.01)
+
+
+def _cotizaciones(btc, eth):
+    return [{"ticker": "BTC", "precio_usd": btc}, {"ticker": "ETH", "precio_usd": eth}, {"ticker": "USDT", "precio_usd": "1"}]
+
+
+def test_solo_evalua_los_pares_que_cambiaron_y_acota_el_ciclo(test_environment):
+    _preparar()
+    motor = MotorEventos(max_ordenes=1)
+    motor.notificar(guardar_datos_cotizaciones(_cotizaciones("50000", "3000")))
+    primero = motor.procesar_pendientes()
+    assert (primero.pares_evaluados, primero.ordenes_evaluadas, primero.ordenes_disparadas) == (2, 3, 0)
+
+    # Solo BTC cruza el disparo: ETH no se evalúa.
+    motor.notificar(guardar_datos_cotizaciones(_cotizaciones("90", "3000")))
+    segundo = motor.procesar_pendientes()
+    assert (segundo.pares_evaluados, segundo.ordenes_evaluadas, segundo.ordenes_disparadas) == (1, 2, 2)
+    assert segundo.ordenes_ejecutadas == 1 and segundo.truncado
+
+    # La orden que no entró en el ciclo se procesa en el siguiente, sin un nuevo cambio.
+    tercero = motor.procesar_pendientes()
+    assert (tercero.ordenes_disparadas, tercero.ordenes_ejecutadas, tercero.truncado) == (1, 1, False)
+    assert motor.procesar_pendientes() is None
+
+    estados = {o["id_orden"]: o["estado"] for o in cargar_ordenes_pendientes()}
+    assert estados == {"btc1": "ejecutada", "btc2": "ejecutada", "eth1": "pendiente"}
+    estadisticas = motor.estadisticas()
+    assert (estadisticas["ciclos"], estadisticas["ordenes_evaluadas"], estadisticas["ordenes_ejecutadas"]) == (3, 6, 2)
+
+
+def test_hilo_ejecuta_las_ordenes_al_recibir_cambios(test_environment):
+    _preparar()
+    guardar_datos_cotizaciones(_cotizaciones("50000", "3000"))
+    motor = MotorEventos()
+    motor.iniciar()
+    try:
+        # El primer ciclo evalúa todos los pares.
+        _esperar(lambda: motor.estadisticas()["ciclos"] >= 1)
+        guardar_datos_cotizaciones(_cotizaciones("50000", "90"))
+        _esperar(lambda: motor.estadisticas()["ordenes_ejecutadas"] >= 1)
+    finally:
+        motor.detener(espera=5)
+
+    assert not motor.activo
+    assert motor.estadisticas()["ultimo_ciclo"]["pares_evaluados"] == 1
+    assert {o["id_orden"] for o in cargar_ordenes_pendientes() if o["estado"] == "ejecutada"} == {"eth1"}
+
+
+def test_stop_limits_sin_ejecutar_no_ocupan_el_cupo_del_ciclo(test_environment):
+    with open(config.BILLETERA_PATH, "w") as f:
+        json.dump({"USDT": {"saldos": {"disponible": "0", "reservado": "4000"}}}, f)
+    # Disparadas a 51000, pero con el límite (49000) por debajo del precio: siguen pendientes.
+    for id_orden in ("stop1", "stop2", "stop3"):
+        agregar_orden_pendiente({
+            "id_orden": id_orden, "par": "BTC/USDT", "accion": "compra", "tipo_orden": "stop-limit",
+            "precio_disparo": "50000", "precio_limite": "49000", "estado": "pendiente",
+        })
+    agregar_orden_pendiente({
+        "id_orden": "limite", "par": "BTC/USDT", "accion": "compra", "tipo_orden": "limit", "precio_disparo": "60000",
+        "estado": "pendiente", "moneda_reservada": "USDT", "cantidad_reservada": "4000",
+        "moneda_origen": "USDT", "moneda_destino": "BTC",
+    })
+    motor = MotorEventos(max_ordenes=2)
+    motor.notificar(guardar_datos_cotizaciones(_cotizaciones("51000", "3000")))
+
+    resultado = motor.procesar_pendientes()
+
+    assert (resultado.ordenes_disparadas, resultado.ordenes_modificadas, resultado.truncado) == (4, 1, False)
+    # Sin nuevos cambios de precio, el ciclo no se repite.
+    assert motor.procesar_pendientes() is None
+    estados = {o["id_orden"]: o["estado"] for o in cargar_ordenes_pendientes()}
+    assert estados == {"stop1": "pendiente", "stop2": "pendiente", "stop3": "pendiente", "limite": "ejecutada"}
@@ -0,0 +1,85 @@
+"""
+Pruebas Unitarias para el Planificador de Datos de Mercado.
+"""
+
+import json
+import threading
+import time
+
+import config
+from backend.servicios import planificador_mercado
+from backend.servicios.planificador_mercado import PlanificadorMercado
+
+
+def test_actualizaciones_concurrentes_comparten_una_sola_consulta(test_environment, monkeypatch):
+    iniciada, liberar = threading.Event(), threading.Event()
+    llamadas = []
+
+    def consulta_lenta():
+        llamadas.append(1)
+        iniciada.set()
+        liberar.wait(5)
+        return [{"ticker": "BTC"}]
+
+    monkeypatch.setattr(planificador_mercado, "obtener_datos_criptos_coingecko", consulta_lenta)
+    monkeypatch.setattr(planificador_mercado, "verificar_y_ejecutar_ordenes_pendientes", lambda: None)
+    planificador = PlanificadorMercado(intervalo=60)
+
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(planificador.actualizar_ahora())) for _ in range(5)]
+    for hilo in hilos:
+        hilo.start()
+    assert iniciada.wait(5)
+    # Margen para que los demás hilos se sumen a la consulta en curso.
+    time.sleep(0.2)
+    liberar.set()
+    for hilo in hilos:
+        hilo.join(5)
+
+    assert len(llamadas) == 1
+    assert len(resultados) == 5
+    assert all(r["cantidad_criptos"] == 1 for r in resultados)
+
+
+def test_el_hilo_actualiza_y_ejecuta_el_motor(test_environment, monkeypatch):
+    motor_ejecutado = threading.Event()
+    monkeypatch.setattr(planificador_mercado, "obtener_datos_criptos_coingecko", lambda: [])
+    monkeypatch.setattr(planificador_mercado, "verificar_y_ejecutar_ordenes_pendientes", motor_ejecutado.set)
+    planificador = PlanificadorMercado(intervalo=60)
+
+    planificador.iniciar()
+    try:
+        assert motor_ejecutado.wait(5)
+        assert planificador.activo
+    finally:
+        planificador.detener(espera=5)
+
+    assert not planificador.activo
+    assert planificador.estado()["ultima_actualizacion"] is not None
+
+
+def test_actualizacion_forzada_respeta_la_edad_minima(test_environment, monkeypatch):
+    consultas = []
+    monkeypatch.setattr(planificador_mercado, "obtener_datos_criptos_coingecko", lambda: consultas.append(1) or [])
+    monkeypatch.setattr(planificador_mercado, "verificar_y_ejecutar_ordenes_pendientes", lambda: None)
+    planificador = PlanificadorMercado(intervalo=60)
+
+    planificador.actualizar_si_antigua(15)
+    planificador.actualizar_si_antigua(15)
+    assert consultas == [1]
+
+    planificador._ultima_actualizacion -= 20
+    planificador.actualizar_si_antigua(15)
+    assert consultas == [1, 1]
+
+
+def test_intervalo_se_acelera_al_reproducir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "PROVEEDOR_DATOS_MERCADO", "reproducir")
+    ruta = tmp_path / "mercado.jsonl"
+    ruta.write_text(json.dumps({"t": 0.0, "recurso": "mercados", "clave": "1/250", "params": {}, "datos": []}) + "\n")
+    monkeypatch.setattr(config, "ARCHIVO_MERCADO_PATH", str(ruta))
+    monkeypatch.setattr(config, "FACTOR_TIEMPO_REPETICION", 60)
+    monkeypatch.setattr(config, "INTERVALO_ACTUALIZACION_MERCADO", 15)
+    monkeypatch.setattr(planificador_mercado, "_planificador", None)
+
+    assert planificador_mercado.obtener_planificador().intervalo == 0.25
@@ -0,0 +1,90 @@
+"""
+Pruebas Unitarias para la Grabación y Repetición de Datos de Mercado.
+"""
+
+import json
+
+import pytest
+
+from backend.servicios import proveedor_mercado
+from backend.servicios.proveedor_mercado import (
+    RECURSO_MERCADOS,
+    RECURSO_VELAS,
+    ProveedorGrabacion,
+    ProveedorRepeticion,
+)
+
+
+class _Respuesta:
+    status_code = 200
+
+    def __init__(self, datos):
+        self._datos = datos
+
+    def json(self):
+        return self._datos
+
+
+class _ClienteFalso:
+    def get(self, url, params=None, peso=1):
+        return _Respuesta([{"symbol": "btc"}])
+
+
+def _grabar(ruta, registros):
+    with open(ruta, "w", encoding="utf-8") as f:
+        for registro in registros:
+            f.write(json.dumps(registro) + "\n")
+
+
+def test_grabacion_agrega_cada_respuesta_al_archivo(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "mercado.jsonl")
+    monkeypatch.setattr(proveedor_mercado, "obtener_cliente", lambda nombre: _ClienteFalso())
+    proveedor = ProveedorGrabacion(ruta)
+
+    datos = proveedor.obtener("coingecko", RECURSO_MERCADOS, "1/250", "http://stub", {"page": 1})
+
+    registro = json.loads(open(ruta, encoding="utf-8").read())
+    assert datos == [{"symbol": "btc"}]
+    assert (registro["recurso"], registro["clave"], registro["datos"]) == (RECURSO_MERCADOS, "1/250", datos)
+
+
+def test_repeticion_avanza_con_el_reloj_acelerado(tmp_path):
+    ruta = str(tmp_path / "mercado.jsonl")
+    _grabar(ruta, [
+        {"t": 1000.0, "recurso": RECURSO_MERCADOS, "clave": "1/250", "params": {}, "datos": ["dia 1"]},
+        {"t": 1000.0 + 86400, "recurso": RECURSO_MERCADOS, "clave": "1/250", "params": {}, "datos": ["dia 2"]},
+    ])
+    reloj = [0.0]
+    # Un día virtual por cada 10 segundos reales.
+    proveedor = ProveedorRepeticion(ruta, factor_tiempo=8640, reloj=lambda: reloj[0])
+
+    assert proveedor.obtener("coingecko", RECURSO_MERCADOS, "1/250", "", {}) == ["dia 1"]
+    reloj[0] = 10.0
+    assert proveedor.obtener("coingecko", RECURSO_MERCADOS, "1/250", "", {}) == ["dia 2"]
+    # Al terminar la grabación, el reloj virtual se detiene en su último registro.
+    reloj[0] = 1000.0
+    assert proveedor.ahora() == 1000.0 + 86400
+    # Las esperas del planificador se acortan en la misma proporción.
+    assert proveedor.segundos_reales(86400) == 10.0
+
+    with pytest.raises(LookupError):
+        proveedor.obtener("coingecko", RECURSO_MERCADOS, "2/250", "", {})
+
+
+def test_repeticion_de_velas_aplica_las_respuestas_incrementales(tmp_path):
+    ruta = str(tmp_path / "mercado.jsonl")
+    _grabar(ruta, [
+        {"t": 0.0, "recurso": RECURSO_VELAS, "clave": "BTCUSDT/1m", "params": {"limit": 3},
+         "datos": [[0, "1"], [60000, "2"], [120000, "3"]]},
+        {"t": 130.0, "recurso": RECURSO_VELAS, "clave": "BTCUSDT/1m", "params": {"limit": 3, "startTime": 120000},
+         "datos": [[120000, "3.5"], [180000, "4"]]},
+    ])
+    reloj = [0.0]
+    proveedor = ProveedorRepeticion(ruta, factor_tiempo=1, reloj=lambda: reloj[0])
+    reloj[0] = 130.0
+
+    completa = proveedor.obtener("binance", RECURSO_VELAS, "BTCUSDT/1m", "", {"limit": 3})
+    cola = proveedor.obtener("binance", RECURSO_VELAS, "BTCUSDT/1m", "", {"limit": 3, "startTime": 120000})
+
+    assert completa == [[60000, "2"], [120000, "3.5"], [180000, "4"]]
+    assert cola == [[120000, "3.5"], [180000, "4"]]
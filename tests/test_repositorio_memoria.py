@@ -0,0 +1,94 @@
+"""
+Pruebas Unitarias para el Almacén de Estado en Memoria (Write-Back).
+"""
+
+import json
+import time
+from decimal import Decimal
+
+import pytest
+import config
+
+from backend.acceso_datos.datos_billetera import cargar_billetera, guardar_billetera
+from backend.acceso_datos.datos_comisiones import cargar_comisiones, registrar_comision
+from backend.acceso_datos.datos_historial import cargar_historial, guardar_en_historial
+from backend.acceso_datos.repositorio import obtener_repositorio, transaccion
+
+
+@pytest.fixture
+def estado_en_memoria(billetera_con_fondos_suficientes, monkeypatch):
+    """Activa el almacén en memoria sin volcados automáticos durante la prueba."""
+    monkeypatch.setattr(config, "ESTADO_EN_MEMORIA", True)
+    monkeypatch.setattr(config, "INTERVALO_VOLCADO_ESTADO_S", 60)
+    return billetera_con_fondos_suficientes
+
+
+def _leer_archivo(ruta):
+    with open(ruta) as f:
+        return json.load(f)
+
+
+def test_escrituras_se_sirven_desde_memoria_hasta_el_volcado(estado_en_memoria):
+    billetera = cargar_billetera()
+    billetera["USDT"]["saldos"]["disponible"] = Decimal("9000")
+    guardar_billetera(billetera)
+    registrar_comision("USDT", Decimal("1"), Decimal("1"))
+    guardar_en_historial("COMPRA", "USDT", Decimal("999"), "BTC", Decimal("0.01"), Decimal("999"))
+
+    # La memoria refleja los cambios; los archivos todavía no.
+    assert cargar_billetera()["USDT"]["saldos"]["disponible"] == Decimal("9000")
+    assert cargar_comisiones()[0]["id"] == 1
+    assert cargar_historial()[0]["id"] == 1
+    assert _leer_archivo(estado_en_memoria["billetera"])["USDT"]["saldos"]["disponible"] == "10000.0"
+
+    obtener_repositorio().volcar()
+
+    assert Decimal(_leer_archivo(estado_en_memoria["billetera"])["USDT"]["saldos"]["disponible"]) == Decimal("9000")
+    assert _leer_archivo(estado_en_memoria["comisiones"])[0]["id"] == 1
+    assert cargar_historial(estado_en_memoria["historial"])[0]["tipo"] == "COMPRA"
+
+
+def test_lecturas_no_vuelven_a_leer_el_disco(estado_en_memoria):
+    cargar_billetera()
+    with open(estado_en_memoria["billetera"], "w") as f:
+        f.write("{}")
+
+    assert cargar_billetera()["USDT"]["saldos"]["disponible"] == Decimal("10000.0")
+
+
+def test_transaccion_fallida_descarta_los_cambios_en_memoria(estado_en_memoria):
+    with pytest.raises(RuntimeError):
+        with transaccion():
+            billetera = cargar_billetera()
+            billetera["USDT"]["saldos"]["disponible"] = Decimal("0")
+            guardar_billetera(billetera)
+            registrar_comision("USDT", Decimal("1"), Decimal("1"))
+            raise RuntimeError("fallo a mitad de la ejecución")
+
+    assert cargar_billetera()["USDT"]["saldos"]["disponible"] == Decimal("10000.0")
+    assert cargar_comisiones() == []
+
+
+def test_umbral_de_cambios_dispara_el_volcado_en_segundo_plano(estado_en_memoria, monkeypatch):
+    monkeypatch.setattr(config, "MAX_CAMBIOS_SIN_VOLCAR", 1)
+    registrar_comision("USDT", Decimal("1"), Decimal("1"))
+
+    limite = time.monotonic() + 5
+    while _leer_archivo(estado_en_memoria["comisiones"]) == {} and time.monotonic() < limite:
+        time.sleep(0.01)
+
+    assert _leer_archivo(estado_en_memoria["comisiones"])[0]["ticker"] == "USDT"
+
+
+def test_ids_nuevos_salen_de_la_secuencia_persistente(estado_en_memoria):
+    ruta = estado_en_memoria["comisiones"]
+    with open(ruta, "w") as f:
+        json.dump([{"id": "manual"}, {"id": 7}, {"id": 1}], f)
+
+    registrar_comision("USDT", Decimal("1"), Decimal("1"))
+
+    # Un ID no numérico no hace retroceder la numeración.
+    assert cargar_comisiones()[0]["id"] == 8
+    with open(ruta + ".secuencia") as f:
+        assert int(f.read()) >= 8
+    obtener_repositorio().volcar()
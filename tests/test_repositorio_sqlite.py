@@ -0,0 +1,101 @@
+"""
+Pruebas de Integración para el Driver de Almacenamiento SQLite.
+
+Verifica que los módulos de `acceso_datos` funcionan de forma transparente
+cuando `config.BACKEND_ALMACENAMIENTO` selecciona el driver SQLite.
+"""
+
+from decimal import Decimal
+
+import pytest
+import config
+
+from backend.acceso_datos.datos_billetera import cargar_billetera, guardar_billetera
+from backend.acceso_datos.datos_comisiones import cargar_comisiones, registrar_comision
+from backend.acceso_datos.datos_cotizaciones import cargar_datos_cotizaciones, guardar_datos_cotizaciones, obtener_precio
+from backend.acceso_datos.datos_historial import cargar_historial, guardar_en_historial
+from backend.acceso_datos.datos_ordenes import agregar_orden_pendiente, cargar_ordenes_pendientes, guardar_ordenes_pendientes
+
+
+@pytest.fixture
+def backend_sqlite(tmp_path, monkeypatch):
+    """Selecciona el driver SQLite apuntando a una base temporal."""
+    monkeypatch.setattr(config, "BACKEND_ALMACENAMIENTO", "sqlite")
+    monkeypatch.setattr(config, "SQLITE_PATH", str(tmp_path / "exchange.sqlite3"))
+    return config.SQLITE_PATH
+
+
+def test_sqlite_usa_modo_wal(backend_sqlite):
+    from backend.acceso_datos.repositorio import obtener_repositorio
+    conexion = obtener_repositorio()._conexion()
+    assert conexion.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_sqlite_billetera_ciclo_completo(backend_sqlite):
+    """La billetera se crea si no existe y conserva los Decimal al guardarse."""
+    billetera = cargar_billetera()
+    assert billetera["USDT"]["saldos"]["disponible"] == Decimal(config.BALANCE_INICIAL_USDT)
+
+    billetera["BTC"] = {"nombre": "Bitcoin", "saldos": {"disponible": Decimal("1.5"), "reservado": Decimal("0")}}
+    guardar_billetera(billetera)
+    del billetera["BTC"]
+    billetera["ETH"] = {"nombre": "Ethereum", "saldos": {"disponible": Decimal("2"), "reservado": Decimal("0")}}
+    guardar_billetera(billetera)
+
+    billetera_cargada = cargar_billetera()
+    assert set(billetera_cargada) == {"USDT", "ETH"}
+    assert billetera_cargada["ETH"]["saldos"]["disponible"] == Decimal("2")
+
+
+def test_sqlite_ordenes_conservan_orden_y_se_actualizan(backend_sqlite):
+    agregar_orden_pendiente({"id_orden": "a", "estado": "pendiente"})
+    agregar_orden_pendiente({"id_orden": "b", "estado": "pendiente"})
+
+    ordenes = cargar_ordenes_pendientes()
+    ordenes[0]["estado"] = "ejecutada"
+    guardar_ordenes_pendientes(ordenes)
+
+    assert cargar_ordenes_pendientes() == [{"id_orden": "a", "estado": "ejecutada"}, {"id_orden": "b", "estado": "pendiente"}]
+
+
+def test_sqlite_guardar_mas_ordenes_que_variables_permitidas(backend_sqlite):
+    import sqlite3
+    from backend.acceso_datos.repositorio import obtener_repositorio
+    obtener_repositorio()._conexion().setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 10)
+    ordenes = [{"id_orden": str(i), "estado": "pendiente"} for i in range(30)]
+    guardar_ordenes_pendientes(ordenes)
+
+    guardar_ordenes_pendientes(ordenes[5:])
+
+    assert cargar_ordenes_pendientes() == ordenes[5:]
+
+
+def test_sqlite_historial_y_comisiones_asignan_ids_y_paginan(backend_sqlite):
+    for valor in ("1", "2", "3"):
+        guardar_en_historial("compra", "USDT", Decimal(valor), "BTC", Decimal("0.1"), Decimal(valor))
+    registrar_comision("USDT", Decimal("0.5"), Decimal("0.5"))
+
+    assert [op["id"] for op in cargar_historial()] == [3, 2, 1]
+    assert [op["id"] for op in cargar_historial(limite=1, desplazamiento=1)] == [2]
+    assert cargar_comisiones()[0]["id"] == 1
+
+
+def test_sqlite_cotizaciones_actualizan_cache(backend_sqlite):
+    guardar_datos_cotizaciones([{"ticker": "BTC", "precio_usd": "50000"}, {"ticker": "ETH", "precio_usd": "3000"}])
+
+    assert [c["ticker"] for c in cargar_datos_cotizaciones()] == ["BTC", "ETH"]
+    assert obtener_precio("eth") == Decimal("3000")
+
+
+def test_sqlite_transaccion_revierte_todas_las_escrituras_ante_un_error(backend_sqlite):
+    from backend.acceso_datos.repositorio import transaccion
+    cargar_billetera()
+
+    with pytest.raises(RuntimeError):
+        with transaccion():
+            registrar_comision("USDT", Decimal("0.1"), Decimal("0.1"))
+            guardar_en_historial("COMPRA", "USDT", Decimal("99.9"), "BTC", Decimal("0.001"), Decimal("99.9"))
+            raise RuntimeError("fallo a mitad de la ejecución")
+
+    assert cargar_comisiones() == []
+    assert cargar_historial() == []
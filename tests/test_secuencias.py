@@ -0,0 +1,55 @@
+"""
+Pruebas Unitarias para el Generador Persistente de IDs.
+"""
+
+import threading
+
+from backend.acceso_datos import secuencias
+from backend.acceso_datos.secuencias import Secuencia
+
+
+def test_ids_unicos_y_crecientes_entre_hilos(tmp_path):
+    secuencia = Secuencia(str(tmp_path / "ordenes.json.secuencia"), lambda: 0)
+    ids = []
+    lock = threading.Lock()
+
+    def generar():
+        for _ in range(200):
+            nuevo = secuencia.siguiente()
+            with lock:
+                ids.append(nuevo)
+
+    hilos = [threading.Thread(target=generar) for _ in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert sorted(ids) == list(range(1, 801))
+
+
+def test_reabrir_la_secuencia_nunca_repite_ids(tmp_path):
+    ruta = str(tmp_path / "historial.jsonl.secuencia")
+    primera = Secuencia(ruta, lambda: 0)
+    usados = [primera.siguiente() for _ in range(3)]
+
+    # Simula un reinicio: los IDs no usados del bloque se descartan.
+    segunda = Secuencia(ruta, lambda: 0)
+
+    assert segunda.siguiente() > max(usados)
+
+
+def test_continua_desde_los_datos_existentes(tmp_path):
+    secuencia = Secuencia(str(tmp_path / "comisiones.json.secuencia"), lambda: 41)
+    assert secuencia.siguiente() == 42
+
+
+def test_reserva_por_lotes_escribe_una_sola_vez(tmp_path, monkeypatch):
+    escrituras = []
+    monkeypatch.setattr(secuencias, "escribir_atomico", lambda ruta, contenido: escrituras.append(contenido))
+    secuencia = Secuencia(str(tmp_path / "ordenes.json.secuencia"), lambda: 0)
+
+    reservados = secuencia.reservar(500)
+
+    assert list(reservados) == list(range(1, 501))
+    assert len(escrituras) == 1
@@ -0,0 +1,81 @@
+"""
+Pruebas Unitarias para el Adaptador de Precios en Streaming.
+"""
+
+import json
+from decimal import Decimal
+
+from backend.acceso_datos.datos_cotizaciones import guardar_datos_cotizaciones, obtener_instantanea_precios
+from backend.acceso_datos import historial_precios
+from backend.acceso_datos.historial_precios import obtener_historial_precios
+from backend.servicios import streaming_precios
+from backend.servicios.streaming_precios import AdaptadorStreaming, FuenteRepeticion, interpretar_mini_ticker
+
+
+def _frame(simbolo, cierre, evento_ms):
+    return {"e": "24hrMiniTicker", "E": evento_ms, "s": simbolo, "c": cierre, "q": "1000"}
+
+
+def test_interpretar_mini_ticker():
+    tick = interpretar_mini_ticker(_frame("btcusdt", "43000.5", 1_700_000_000_000))
+
+    assert (tick.ticker, tick.precio, tick.timestamp) == ("BTC", Decimal("43000.5"), 1_700_000_000.0)
+    # Pares sin la moneda fiat, o con datos inválidos, se descartan.
+    assert interpretar_mini_ticker(_frame("ETHBTC", "0.05", 1)) is None
+    assert interpretar_mini_ticker(_frame("USDT", "1", 1)) is None
+    assert interpretar_mini_ticker(_frame("BTCUSDT", "abc", 1)) is None
+
+
+def test_repeticion_aplica_los_lotes_a_los_precios_y_al_motor(test_environment, tmp_path, monkeypatch):
+    guardar_datos_cotizaciones([{"ticker": "BTC", "nombre": "Bitcoin", "precio_usd": "40000"}])
+    monkeypatch.setattr(historial_precios, "_historial", None)
+    ciclos_motor = []
+    monkeypatch.setattr(streaming_precios, "verificar_y_ejecutar_ordenes_pendientes", lambda: ciclos_motor.append(1))
+    ruta = tmp_path / "ticks.jsonl"
+    ruta.write_text("\n".join([
+        json.dumps([_frame("BTCUSDT", "41000", 1_000), _frame("ETHUSDT", "3000", 1_000)]),
+        json.dumps(_frame("BTCUSDT", "42000", 2_000)),
+        "no es json",
+    ]))
+    fuente = FuenteRepeticion(str(ruta), velocidad=0)
+    adaptador = AdaptadorStreaming(fuente)
+
+    adaptador.iniciar()
+    assert fuente.terminada.wait(5)
+    adaptador.detener()
+
+    instantanea = obtener_instantanea_precios()
+    assert instantanea.precio("BTC") == Decimal("42000")
+    assert instantanea.precio("ETH") == Decimal("3000")
+    # Los datos que no vienen en el stream se conservan.
+    assert instantanea.cotizaciones["BTC"]["nombre"] == "Bitcoin"
+    assert adaptador.lotes_procesados == 2
+    assert len(ciclos_motor) == 2
+    assert obtener_historial_precios().buffer("BTC").precio_en(2.0) == 42000.0
+
+
+def test_repeticion_continua_los_tiempos_en_cada_pasada(tmp_path):
+    ruta = tmp_path / "ticks.jsonl"
+    ruta.write_text("\n".join(json.dumps(_frame("BTCUSDT", "41000", ms)) for ms in (1_000, 1_500, 3_000)))
+    fuente = FuenteRepeticion(str(ruta), velocidad=0, repetir=True)
+    tiempos = []
+
+    def entregar(lote):
+        tiempos.append(lote[0]["E"])
+        if len(tiempos) == 7:
+            fuente._detener.set()
+
+    fuente.iniciar(entregar)
+    assert fuente.terminada.wait(5)
+
+    assert tiempos == [1_000, 1_500, 3_000, 3_500, 4_000, 5_500, 6_000]
+
+
+def test_repeticion_de_un_archivo_vacio_se_detiene(tmp_path):
+    ruta = tmp_path / "ticks.jsonl"
+    ruta.write_text("\n")
+    fuente = FuenteRepeticion(str(ruta), velocidad=0, repetir=True)
+
+    fuente.iniciar(lambda lote: None)
+
+    assert fuente.terminada.wait(5)
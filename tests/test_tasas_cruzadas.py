@@ -0,0 +1,54 @@
+"""
+Pruebas Unitarias para la Matriz de Tasas Cruzadas.
+"""
+
+from decimal import Decimal
+
+from backend.acceso_datos.datos_cotizaciones import guardar_datos_cotizaciones
+from backend.acceso_datos.tasas_cruzadas import obtener_matriz_tasas
+from backend.servicios.trading.motor import _verificar_condicion_orden
+import config
+
+
+def test_tasas_de_pares_cruzados_e_inversas(test_environment):
+    guardar_datos_cotizaciones([
+        {"ticker": "ETH", "precio_usd": "3000"},
+        {"ticker": "BNB", "precio_usd": "600"},
+    ])
+
+    matriz = obtener_matriz_tasas(["ETH/BNB"])
+
+    assert matriz.tasa_par("ETH/BNB") == Decimal("5")
+    assert matriz.inversa("ETH", "BNB") == Decimal("0.2")
+    # La moneda fiat es la unidad de cuenta: el par con USDT es el precio en USD.
+    assert matriz.tasa("ETH", config.MONEDA_FIAT_DEFAULT) == Decimal("3000")
+    assert matriz.tasa("ETH", "XYZ") is None
+    # Sin cambios de precios, la matriz se reutiliza.
+    assert obtener_matriz_tasas(["ETH/USDT"]) is matriz
+
+
+def test_matriz_se_recalcula_con_cada_instantanea(test_environment):
+    guardar_datos_cotizaciones([{"ticker": "ETH", "precio_usd": "3000"}, {"ticker": "BNB", "precio_usd": "600"}])
+    anterior = obtener_matriz_tasas(["ETH/BNB"])
+
+    guardar_datos_cotizaciones([{"ticker": "ETH", "precio_usd": "3600"}, {"ticker": "BNB", "precio_usd": "600"}])
+    actual = obtener_matriz_tasas()
+
+    assert actual.version != anterior.version
+    # Solo se precalculan los pares pedidos para la instantánea vigente.
+    assert actual._tasas == {}
+    assert actual.tasa_par("ETH/BNB") == Decimal("6")
+    assert set(actual._tasas) == {("ETH", "BNB"), ("BNB", "ETH")}
+
+
+def test_disparo_de_orden_cruzada_se_evalua_en_terminos_del_par(test_environment):
+    guardar_datos_cotizaciones([{"ticker": "ETH", "precio_usd": "3000"}, {"ticker": "BNB", "precio_usd": "600"}])
+    orden = {
+        "par": "ETH/BNB",
+        "accion": config.ACCION_VENDER,
+        "tipo_orden": config.TIPO_ORDEN_LIMITE,
+        "precio_disparo": "4.5",
+    }
+
+    # 1 ETH = 5 BNB >= 4.5 BNB: la venta límite se dispara aunque 3000 USD no se compare con 4.5.
+    assert _verificar_condicion_orden(orden, obtener_matriz_tasas().tasa_par(orden["par"]))
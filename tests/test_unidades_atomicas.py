@@ -0,0 +1,54 @@
+"""
+Pruebas Unitarias para el Libro en Unidades Atómicas.
+"""
+
+import json
+from decimal import Decimal
+
+from backend.acceso_datos.datos_billetera import cargar_billetera, guardar_billetera
+from backend.servicios.estado_billetera import _preparar_datos_compra
+from backend.utils.unidades_atomicas import (
+    a_unidades_cripto,
+    a_unidades_usd,
+    desde_unidades_cripto,
+    leer_monto_cripto,
+)
+from backend.utils.utilidades_numericas import cuantizar_cripto
+import config
+
+
+def test_conversion_ida_y_vuelta_respeta_la_precision():
+    assert a_unidades_cripto(Decimal("0.015")) == 1_500_000
+    assert a_unidades_usd(Decimal("12.5")) == 125_000
+    assert desde_unidades_cripto(a_unidades_cripto(Decimal("1.123456789"))) == cuantizar_cripto(Decimal("1.123456789"))
+    # El texto decimal se sigue leyendo igual que antes.
+    assert leer_monto_cripto("0.5") == Decimal("0.5")
+    assert leer_monto_cripto(50_000_000) == Decimal("0.5")
+
+
+def test_billetera_se_guarda_en_unidades_y_se_recupera_igual(test_environment, monkeypatch):
+    monkeypatch.setattr(config, "LIBRO_UNIDADES_ATOMICAS", True)
+    billetera = {
+        "USDT": {"nombre": "Tether", "saldos": {"disponible": Decimal("9876.5432"), "reservado": Decimal("0")}},
+        "BTC": {"nombre": "Bitcoin", "saldos": {"disponible": Decimal("0.12345678"), "reservado": Decimal("0.5")}},
+    }
+
+    guardar_billetera(billetera)
+
+    with open(test_environment["billetera"]) as f:
+        en_disco = json.load(f)
+    assert en_disco["USDT"]["saldos"]["disponible"] == 98_765_432
+    assert en_disco["BTC"]["saldos"]["disponible"] == 12_345_678
+    assert cargar_billetera() == billetera
+
+
+def test_costo_base_acumula_formatos_mixtos():
+    historial = [
+        {"tipo": "compra", "destino": {"ticker": "BTC", "cantidad": "0.5"}, "valor_usd": "15000.0000"},
+        {"tipo": "compra", "destino": {"ticker": "BTC", "cantidad": 25_000_000}, "valor_usd": 80_000_000},
+    ]
+
+    datos = _preparar_datos_compra(historial)
+
+    assert datos["BTC"]["cantidad_comprada"] == Decimal("0.75")
+    assert datos["BTC"]["total_invertido"] == Decimal("23000")
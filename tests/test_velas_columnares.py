@@ -0,0 +1,82 @@
+"""
+Pruebas Unitarias para la Representación Columnar de Velas.
+"""
+
+import json
+from decimal import Decimal
+
+from backend.servicios.velas_columnares import SerieVelas
+
+FILAS_BINANCE = [
+    [1_700_000_000_000, "100.5", "110.0", "99.0", "105.25", "12.5", 1_700_000_059_999, "1300.0", 42],
+    [1_700_000_060_000, "105.25", "106.0", "101.0", "102.0", "8.0", 1_700_000_119_999, "820.0", 30],
+]
+
+
+def test_parseo_de_binance_a_columnas_y_filas():
+    serie = SerieVelas.desde_binance(FILAS_BINANCE)
+
+    assert serie.columnas() == {
+        "time": [1_700_000_000, 1_700_000_060],
+        "open": [100.5, 105.25],
+        "high": [110.0, 106.0],
+        "low": [99.0, 101.0],
+        "close": [105.25, 102.0],
+        "volume": [12.5, 8.0],
+    }
+    assert serie.filas()[1] == {"time": 1_700_000_060, "open": 105.25, "high": 106.0, "low": 101.0, "close": 102.0, "volume": 8.0}
+    assert SerieVelas.desde_filas(serie.filas()).columnas() == serie.columnas()
+
+
+def test_fusionar_reemplaza_la_vela_en_curso_y_recorta():
+    serie = SerieVelas.desde_binance(FILAS_BINANCE)
+    nuevas = SerieVelas.desde_binance([
+        [1_700_000_060_000, "105.25", "107.0", "101.0", "106.0", "9.0"],
+        [1_700_000_120_000, "106.0", "108.0", "105.0", "107.0", "3.0"],
+    ])
+
+    fusionada = serie.fusionar(nuevas, maximo=2)
+
+    assert list(fusionada.tiempos) == [1_700_000_060, 1_700_000_120]
+    assert list(fusionada.cierres) == [106.0, 107.0]
+    # La serie original no cambia.
+    assert len(serie) == 2 and serie.cierres[1] == 102.0
+
+
+def test_formato_columnar_es_menos_de_la_mitad_del_formato_anterior():
+    # Binance envía los valores con 8 decimales.
+    filas = [
+        [1_700_000_000_000 + i * 60_000, "43000.10000000", "43010.00000000", "42990.50000000", "43005.20000000", "1.23450000"]
+        for i in range(250)
+    ]
+    # Formato anterior: una vela por diccionario, con valores `str(Decimal(...))`.
+    anterior = [
+        {"time": fila[0] // 1000, **{campo: str(Decimal(valor)) for campo, valor in zip(("open", "high", "low", "close", "volume"), fila[1:])}}
+        for fila in filas
+    ]
+
+    tamano_anterior = len(json.dumps(anterior, separators=(",", ":")))
+    tamano_columnas = len(json.dumps(SerieVelas.desde_binance(filas).columnas(), separators=(",", ":")))
+
+    assert tamano_columnas * 2 < tamano_anterior
+
+
+def test_remuestrear_agrupa_por_bloques_alineados():
+    # Velas de 1h desde las 23:00 del día 0 hasta las 04:00 del día 1.
+    inicio = 86400 - 3600
+    filas = [[(inicio + i * 3600) * 1000, i + 1, i + 10, i, i + 2, 1] for i in range(6)]
+
+    cuatro_horas = SerieVelas.desde_binance(filas).remuestrear(4 * 3600)
+
+    # El bloque de las 20:00 está incompleto y se descarta.
+    assert cuatro_horas.columnas() == {
+        "time": [86400, 86400 + 4 * 3600],
+        "open": [2.0, 6.0],
+        "high": [14.0, 15.0],
+        "low": [1.0, 5.0],
+        "close": [6.0, 7.0],
+        "volume": [4.0, 1.0],
+    }
+    # Las semanas de Binance empiezan el lunes: 4 días después de la época.
+    semanal = SerieVelas.desde_binance([[d * 86400_000, 1, 1, 1, 1, 1] for d in range(3, 12)]).remuestrear(7 * 86400, 4 * 86400)
+    assert list(semanal.tiempos) == [4 * 86400, 11 * 86400]